@@ -0,0 +1,3 @@
+"""
+Benchmark harness for GridGen with synthetic reference data.
+"""
@@ -0,0 +1,205 @@
+"""
+GridGen Benchmark
+
+Run the create_grid steps on synthetic reference data (see synthetic.py)
+at several scales and record per-step wall-clock time, CPU time (including
+worker processes) and peak resident memory as JSON, so results of
+different revisions can be compared. Needs no network access and no
+reference_data downloads.
+
+Usage (from gridgen/python):
+    python -m benchmark.run_benchmark --scales small medium
+    python -m benchmark.run_benchmark --scales large --out large.json --compare baseline.json
+
+Last Update: 2025
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+_python_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _python_dir not in sys.path:
+    sys.path.insert(0, _python_dir)
+
+# create_grid resolves every step function (including the io writers)
+import create_grid as cg
+from utils.progress import Instrument
+
+try:
+    from .synthetic import ORIGIN, SCALES, make_reference_data
+except ImportError:
+    from benchmark.synthetic import ORIGIN, SCALES, make_reference_data
+
+RESULT_VERSION = 1
+
+
+def _run_stage(inst, name, func, *args, **kwargs):
+    with inst.stage(name):
+        return func(*args, **kwargs)
+
+
+def run_pipeline(ref_dir, out_dir, spec):
+    """
+    Run the create_grid steps for one synthetic domain, one stage each.
+
+    Returns the per-step measurements and a few output counts.
+    """
+    p = {'dx': spec['dx'], 'dy': spec['dx'], 'DRY_VAL': 999999, 'CUT_OFF': 0.1, 'LIM_BATHY': 0.1,
+         'LIM_VAL': 0.5, 'OFFSET': spec['dx'], 'LAKE_TOL': -1, 'IS_GLOBAL': 0, 'OBSTR_OFFSET': 1,
+         'MIN_DIST': 4.0, 'SPLIT_LIM': 0.0}
+    inst = Instrument(sample_interval=0.005)
+    lon0, lat0 = ORIGIN
+    nx = int(round(spec['extent'] / p['dx'])) + 1
+    ny = int(round(spec['extent'] / p['dy'])) + 1
+
+    def coordinates():
+        return np.meshgrid(np.linspace(lon0, lon0 + spec['extent'], nx),
+                           np.linspace(lat0, lat0 + spec['extent'], ny))
+
+    lon, lat = _run_stage(inst, 'coordinates', coordinates)
+
+    # Cold read (.mat parse, dateline split, cache write), then the cached read
+    boundary_file = os.path.join(ref_dir, 'coastal_bound_full.mat')
+    cache_file = os.path.splitext(boundary_file)[0] + '_dateline.npz'
+    if os.path.exists(cache_file):
+        os.remove(cache_file)
+    _run_stage(inst, 'read_boundary', cg.load_boundary, boundary_file)
+    bound = _run_stage(inst, 'read_boundary_cached', cg.load_boundary, boundary_file)
+
+    depth = _run_stage(inst, 'generate_grid', cg.generate_grid, 'rect', lon, lat, ref_dir, 'gebco',
+                      p['LIM_BATHY'], p['CUT_OFF'], p['DRY_VAL'], 'lon', 'lat', 'elevation')
+
+    coord = [np.min(lat) - p['dy'], np.min(lon) - p['dx'], np.max(lat) + p['dy'], np.max(lon) + p['dx']]
+    b, n_seg = _run_stage(inst, 'compute_boundary', lambda: cg.compute_boundary(
+        coord, cg.BoundaryIndex(bound).query(coord), p['MIN_DIST']))
+
+    m = np.ones_like(depth)
+    m[depth == p['DRY_VAL']] = 0
+    m4 = m
+    if n_seg > 0:
+        b_split = _run_stage(inst, 'split_boundary', cg.split_boundary, b, p['SPLIT_LIM'], p['MIN_DIST'])
+        m = _run_stage(inst, 'clean_mask', cg.clean_mask, lon, lat, m, b_split, p['LIM_VAL'], p['OFFSET'])
+    m4, _ = _run_stage(inst, 'remove_lake', cg.remove_lake, m, p['LAKE_TOL'], p['IS_GLOBAL'])
+    if n_seg > 0:
+        sx, sy = _run_stage(inst, 'create_obstr', cg.create_obstr, lon, lat, b, m4, p['OBSTR_OFFSET'], p['OBSTR_OFFSET'])
+    else:
+        sx = sy = np.zeros_like(m4)
+
+    def write_files():
+        prefix = os.path.join(out_dir, 'grid')
+        cg.write_ww3file(f'{prefix}.bot', np.round(depth * 1000).astype(int))
+        cg.write_ww3file(f'{prefix}.mask', m4)
+        cg.write_ww3obstr(f'{prefix}.obst', np.round(sx * 100).astype(int), np.round(sy * 100).astype(int))
+        cg.write_ww3meta(os.path.abspath(prefix).replace("\\", "/"), None, 'RECT', lon, lat, 1.0 / 1000, 1.0 / 100, 1.0)
+
+    os.makedirs(out_dir, exist_ok=True)
+    _run_stage(inst, 'write_files', write_files)
+    counts = {'grid': [nx, ny], 'segments': int(n_seg), 'wet_cells': int(np.sum(m4 == 1))}
+    steps = {r['stage']: {'wall_s': r['duration_s'], 'cpu_s': r['cpu_s'], 'peak_rss_mb': r['peak_rss_mb'],
+                          'rss_delta_mb': r['rss_delta_mb']} for r in inst.records}
+    return steps, counts
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=_python_dir,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmark(scales, data_dir, repeat=1, seed=0):
+    """
+    Benchmark every scale and return the JSON-serialisable result.
+
+    With repeat > 1 each step reports the run with the median wall time.
+    """
+    result = {
+        'version': RESULT_VERSION,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'git': _git_revision(),
+        'host': {'platform': platform.platform(), 'python': platform.python_version(),
+                 'numpy': np.__version__, 'cpus': os.cpu_count()},
+        'scales': {},
+    }
+    for name in scales:
+        spec = SCALES[name]
+        ref_dir = os.path.join(data_dir, name)
+        print(f'[{name}] preparing synthetic reference data in {ref_dir}', flush=True)
+        info = make_reference_data(ref_dir, name, seed)
+
+        runs = []
+        for i in range(repeat):
+            print(f'[{name}] run {i + 1}/{repeat}', flush=True)
+            steps, counts = run_pipeline(ref_dir, os.path.join(ref_dir, 'result'), spec)
+            runs.append(steps)
+        steps = {}
+        for step in runs[0]:
+            ordered = sorted((r[step] for r in runs), key=lambda s: s['wall_s'])
+            steps[step] = dict(ordered[len(ordered) // 2], wall_runs=[r[step]['wall_s'] for r in runs])
+        result['scales'][name] = {
+            'spec': spec,
+            'seed': seed,
+            'data': info,
+            'counts': counts,
+            'steps': steps,
+            'total_wall_s': round(sum(s['wall_s'] for s in steps.values()), 4),
+        }
+        print(f"[{name}] total {result['scales'][name]['total_wall_s']:.2f} s", flush=True)
+    return result
+
+
+def print_table(result, baseline=None):
+    """Print per-step timings, with the ratio to a baseline result when given."""
+    for name, scale in result['scales'].items():
+        nx, ny = scale['counts']['grid']
+        print(f"\n{name}: {nx} x {ny} cells, {scale['data']['polygons']} polygons, "
+              f"{scale['data']['vertices']} vertices", flush=True)
+        base = (baseline or {}).get('scales', {}).get(name, {}).get('steps', {})
+        header = f"  {'step':<22}{'wall s':>10}{'cpu s':>10}{'peak MB':>10}"
+        print(header + (f"{'base s':>10}{'speedup':>9}" if base else ''), flush=True)
+        for step, s in scale['steps'].items():
+            line = f"  {step:<22}{s['wall_s']:>10.3f}{s['cpu_s']:>10.3f}{s['peak_rss_mb']:>10.1f}"
+            if step in base:
+                old = base[step]['wall_s']
+                line += f"{old:>10.3f}{old / max(s['wall_s'], 1e-9):>8.2f}x"
+            print(line, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the create_grid steps on synthetic data')
+    parser.add_argument('--scales', nargs='+', default=['small', 'medium'], choices=sorted(SCALES))
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'gridgen_bench'),
+                        help='directory for the synthetic reference data (reused between runs)')
+    parser.add_argument('--out', help='result JSON file (default: <data-dir>/results/bench_<time>.json)')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compare', help='earlier result JSON to compare against')
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args.scales, os.path.abspath(args.data_dir), max(1, args.repeat), args.seed)
+    out = args.out or os.path.join(args.data_dir, 'results',
+                                   f"bench_{datetime.datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=1)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_table(result, baseline)
+    print(f'\nResults written to {out}', flush=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Synthetic Reference Data
+
+Generate offline stand-ins for the reference_data downloads used by
+create_grid: a GEBCO-like NetCDF bathymetry (lon, lat, elevation) and a
+GSHHS-like coastal_bound_<level>.mat polygon set.
+
+Coastlines are star-shaped islands whose radius varies with a few random
+harmonics, plus one large "mainland" polygon reaching outside the domain.
+The elevation is built from the same shapes (positive inside a polygon,
+negative outside, deepening away from the coast), so the bathymetry
+wet/dry pattern and the polygons agree as they do with the real data.
+
+Last Update: 2025
+"""
+
+import os
+
+import netCDF4
+import numpy as np
+import scipy.io
+
+# Benchmark scales: domain extent (deg), grid step (deg), base bathymetry
+# step (deg), number of islands and coastline vertex spacing (deg)
+SCALES = {
+    'small': {'extent': 2.0, 'dx': 0.02, 'base_res': 1.0 / 120, 'islands': 8, 'vertex_spacing': 0.01},
+    'medium': {'extent': 5.0, 'dx': 0.02, 'base_res': 1.0 / 120, 'islands': 30, 'vertex_spacing': 0.005},
+    'large': {'extent': 10.0, 'dx': 0.01, 'base_res': 1.0 / 120, 'islands': 80, 'vertex_spacing': 0.002},
+}
+
+# South-west corner of every synthetic domain
+ORIGIN = (110.0, 10.0)
+
+
+def _make_shapes(spec, rng):
+    """Random star-shaped coastlines: (cx, cy, r0, harmonics) per shape."""
+    lon0, lat0 = ORIGIN
+    extent = spec['extent']
+    shapes = []
+    # Mainland west of the domain, its coast crossing the western part
+    shapes.append((lon0 - 0.6 * extent, lat0 + 0.5 * extent, 0.8 * extent,
+                   [(k, 0.08 / k, rng.uniform(0, 2 * np.pi)) for k in range(2, 9)]))
+    for _ in range(spec['islands']):
+        r0 = extent * 0.02 * np.exp(rng.uniform(0, 1.6))
+        harmonics = [(k, rng.uniform(0, 0.35) / k, rng.uniform(0, 2 * np.pi)) for k in range(2, 9)]
+        shapes.append((lon0 + rng.uniform(0.1, 1.0) * extent, lat0 + rng.uniform(0.05, 0.95) * extent,
+                       r0, harmonics))
+    return shapes
+
+
+def _radius(theta, r0, harmonics):
+    r = np.ones_like(theta)
+    for k, a, phi in harmonics:
+        r += a * np.cos(k * theta + phi)
+    return r0 * r
+
+
+def write_bathymetry(fname, spec, shapes):
+    """Write a GEBCO-like NetCDF file covering the domain plus a margin."""
+    lon0, lat0 = ORIGIN
+    margin = 0.5
+    res = spec['base_res']
+    lon = np.arange(lon0 - margin, lon0 + spec['extent'] + margin + res / 2, res)
+    lat = np.arange(lat0 - margin, lat0 + spec['extent'] + margin + res / 2, res)
+
+    # s > 0 inside a shape, 0 on its coast, negative outside
+    s = np.full((lat.size, lon.size), -np.inf)
+    for cx, cy, r0, harmonics in shapes:
+        reach = 2.5 * r0
+        i0, i1 = np.searchsorted(lon, [cx - reach, cx + reach])
+        j0, j1 = np.searchsorted(lat, [cy - reach, cy + reach])
+        if i0 >= i1 or j0 >= j1:
+            continue
+        xx, yy = np.meshgrid(lon[i0:i1] - cx, lat[j0:j1] - cy)
+        rho = np.hypot(xx, yy) / _radius(np.arctan2(yy, xx), r0, harmonics)
+        np.maximum(s[j0:j1, i0:i1], 1.0 - rho, out=s[j0:j1, i0:i1])
+    s = np.maximum(s, -2.0)
+    elevation = np.where(s > 0, 10.0 + 800.0 * s, -20.0 + 3000.0 * s)
+
+    with netCDF4.Dataset(fname, 'w') as f:
+        f.createDimension('lon', lon.size)
+        f.createDimension('lat', lat.size)
+        f.createVariable('lon', 'f8', ('lon',))[:] = lon
+        f.createVariable('lat', 'f8', ('lat',))[:] = lat
+        f.createVariable('elevation', 'i2', ('lat', 'lon'))[:] = np.round(elevation).astype(np.int16)
+    return lon.size, lat.size
+
+
+def write_coastlines(fname, spec, shapes):
+    """Write a GSHHS-like coastal_bound .mat file; returns (polygons, vertices)."""
+    fields = ['x', 'y', 'n', 'level', 'west', 'east', 'south', 'north', 'height', 'width']
+    rec = np.zeros(len(shapes), dtype=[(name, object) for name in fields])
+    n_vertices = 0
+    for i, (cx, cy, r0, harmonics) in enumerate(shapes):
+        n = max(16, int(2 * np.pi * r0 / spec['vertex_spacing']))
+        theta = np.linspace(0, 2 * np.pi, n, endpoint=False)
+        r = _radius(theta, r0, harmonics)
+        # Closed polygon as in the GSHHS files (last vertex repeats the first)
+        x = np.append(cx + r * np.cos(theta), cx + r[0])
+        y = np.append(cy + r * np.sin(theta), cy)
+        rec[i] = (x.reshape(1, -1), y.reshape(1, -1), float(x.size), 1.0,
+                  float(x.min()), float(x.max()), float(y.min()), float(y.max()),
+                  float(y.max() - y.min()), float(x.max() - x.min()))
+        n_vertices += x.size
+    scipy.io.savemat(fname, {'bound': rec.reshape(1, -1)})
+    return len(shapes), n_vertices
+
+
+def make_reference_data(ref_dir, scale, seed=0):
+    """
+    Write gebco.nc and coastal_bound_full.mat for one benchmark scale.
+
+    Existing files are reused; the returned summary is stored next to them.
+
+    Parameters
+    ----------
+    ref_dir : str
+        Output directory (used as create_grid ref_dir)
+    scale : str or dict
+        Name in SCALES or a dict with the same keys
+    seed : int
+        Random seed of the coastline shapes
+
+    Returns
+    -------
+    info : dict
+        Base bathymetry size, polygon and vertex counts
+    """
+    spec = SCALES[scale] if isinstance(scale, str) else scale
+    os.makedirs(ref_dir, exist_ok=True)
+    info_file = os.path.join(ref_dir, 'synthetic_info.npz')
+    nc_file = os.path.join(ref_dir, 'gebco.nc')
+    mat_file = os.path.join(ref_dir, 'coastal_bound_full.mat')
+    key = repr((sorted(spec.items()), seed))
+    if os.path.exists(info_file) and os.path.exists(nc_file) and os.path.exists(mat_file):
+        with np.load(info_file) as data:
+            if str(data['key']) == key:
+                return {name: int(data[name]) for name in ('base_nx', 'base_ny', 'polygons', 'vertices')}
+
+    rng = np.random.default_rng(seed)
+    shapes = _make_shapes(spec, rng)
+    base_nx, base_ny = write_bathymetry(nc_file, spec, shapes)
+    polygons, vertices = write_coastlines(mat_file, spec, shapes)
+    info = {'base_nx': base_nx, 'base_ny': base_ny, 'polygons': polygons, 'vertices': vertices}
+    np.savez(info_file, key=key, **info)
+    return info
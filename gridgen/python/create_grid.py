@@ -23,23 +23,42 @@ try:
     from .grid.compute_boundary import compute_boundary
     from .grid.create_obstr import create_obstr
     from .grid.generate_grid import generate_grid
+    from .grid.generate_grid_xyz import find_xyz_source, generate_grid_xyz
+    from .grid.incremental import (STATE_SUFFIX, bound_in_box, changed_regions, fill_regions,
+                                   lattice_overlap, load_grid_state, save_grid_state,
+                                   state_signature, strip_regions)
     from .grid.remove_lake import remove_lake
     from .grid.split_boundary import split_boundary
+    from .grid.split_dateline import (BoundaryIndex, load_bound_cache, save_bound_cache,
+                                      split_bound_dateline)
+    from .io.grid_bundle import BUNDLE_SUFFIX, write_grid_bundle, write_text_files
     from .io.optional_bound import optional_bound
     from .io.write_ww3file import write_ww3file
     from .io.write_ww3meta import write_ww3meta
     from .io.write_ww3obstr import write_ww3obstr
+    from .utils.progress import Instrument, activate, deactivate
 except ImportError:
     from grid.clean_mask import clean_mask
     from grid.compute_boundary import compute_boundary
     from grid.create_obstr import create_obstr
     from grid.generate_grid import generate_grid
+    from grid.generate_grid_xyz import find_xyz_source, generate_grid_xyz
+    from grid.incremental import (STATE_SUFFIX, bound_in_box, changed_regions, fill_regions,
+                                  lattice_overlap, load_grid_state, save_grid_state,
+                                  state_signature, strip_regions)
     from grid.remove_lake import remove_lake
     from grid.split_boundary import split_boundary
+    from grid.split_dateline import (BoundaryIndex, load_bound_cache, save_bound_cache,
+                                     split_bound_dateline)
+    from utils.progress import Instrument, activate, deactivate
     import importlib
     _parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     if _parent_dir not in sys.path:
         sys.path.append(_parent_dir)
+    _grid_bundle = importlib.import_module('python.io.grid_bundle')
+    BUNDLE_SUFFIX = _grid_bundle.BUNDLE_SUFFIX
+    write_grid_bundle = _grid_bundle.write_grid_bundle
+    write_text_files = _grid_bundle.write_text_files
     optional_bound = importlib.import_module('python.io.optional_bound').optional_bound
     write_ww3file = importlib.import_module('python.io.write_ww3file').write_ww3file
     write_ww3meta = importlib.import_module('python.io.write_ww3meta').write_ww3meta
@@ -49,6 +68,121 @@ except ImportError:
 sys.stdout.reconfigure(line_buffering=True) if hasattr(sys.stdout, 'reconfigure') else None
 
 
+def read_bound_mat(boundary_file):
+    """
+    Read a GSHHS coastal_bound_<level>.mat file.
+
+    Returns the boundary polygons as a list of dicts (one per MATLAB struct
+    element) as expected by compute_boundary.
+    """
+    mat_data = scipy.io.loadmat(boundary_file)
+    bound = mat_data['bound']
+
+    # Convert MATLAB struct array to Python list of dicts
+    if isinstance(bound, np.ndarray):
+        if bound.dtype.names is not None:
+            # Structured array
+            # MATLAB struct arrays are typically (1, N) shape when loaded by scipy
+            # Use .size to get total number of elements, or flatten first
+            bound_flat = bound.flatten()
+            N = bound_flat.size
+            bound_list = []
+            for i in range(N):
+                poly = bound_flat[i]
+
+                poly_dict = {}
+                for field_name in poly.dtype.names:
+                    field_data = poly[field_name]
+                    if isinstance(field_data, np.ndarray):
+                        if field_data.size == 1:
+                            if field_name in ['n', 'level']:
+                                poly_dict[field_name] = int(field_data.item())
+                            elif field_name in ['west', 'east', 'south', 'north', 'height', 'width']:
+                                poly_dict[field_name] = float(field_data.item())
+                            else:
+                                poly_dict[field_name] = float(field_data.item())
+                        else:
+                            if field_data.dtype == object:
+                                if field_data.size > 0:
+                                    first_elem = field_data.flat[0]
+                                    if isinstance(first_elem, np.ndarray):
+                                        poly_dict[field_name] = first_elem.flatten()
+                                    else:
+                                        poly_dict[field_name] = np.array(field_data.flat).flatten()
+                                else:
+                                    poly_dict[field_name] = np.array([])
+                            else:
+                                poly_dict[field_name] = field_data.flatten()
+                    else:
+                        poly_dict[field_name] = field_data
+
+                bound_list.append(poly_dict)
+            bound = bound_list
+        else:
+            bound = bound.tolist()
+    elif isinstance(bound, list):
+        pass
+    else:
+        bound = [bound]
+    return bound
+
+
+def load_boundary(boundary_file):
+    """
+    Read GSHHS boundary polygons split at the dateline.
+
+    The split polygon set is cached per resolution as
+    coastal_bound_<level>_dateline.npz next to the .mat file and rebuilt
+    when the .mat file changes.
+    """
+    cache_file = os.path.splitext(boundary_file)[0] + '_dateline.npz'
+    bound = load_bound_cache(cache_file, boundary_file)
+    if bound is not None:
+        print(f'  Using dateline-split boundary cache: {os.path.basename(cache_file)}', flush=True)
+        return bound
+
+    bound, n_split = split_bound_dateline(read_bound_mat(boundary_file))
+    print(f'  Split {n_split} polygons at the dateline', flush=True)
+    try:
+        save_bound_cache(cache_file, bound, boundary_file)
+    except OSError as e:
+        print(f'  Warning: cannot write boundary cache {cache_file}: {e}', flush=True)
+    return bound
+
+
+def reuse_grid_state(params, lon1d, lat1d, signature):
+    """
+    Look up the state of an earlier grid for incremental regeneration.
+
+    Returns a dict with the saved state, the overlapping blocks in the new
+    ('new') and old ('old') grid and the strips to compute ('regions'), or
+    None when the state cannot be reused.
+    """
+    path = params['reuse_dir']
+    if os.path.isdir(path):
+        path = os.path.join(path, f"{params['fname']}{STATE_SUFFIX}")
+    state = load_grid_state(path, signature)
+    if state is None:
+        print(f'  Incremental mode: no matching grid state in {path}, computing the full grid', flush=True)
+        return None
+    overlap = lattice_overlap(state, lon1d, lat1d)
+    if overlap is None:
+        print('  Incremental mode: saved grid is not on the same lattice, computing the full grid', flush=True)
+        return None
+    new, old = overlap
+    # The halo covers the obstruction neighbours and cell corners of the edge cells
+    halo = max(int(params['INCR_HALO']), int(params['OBSTR_OFFSET']) + 1)
+    regions = strip_regions((lat1d.size, lon1d.size), new, halo, state['mask'].shape, old)
+    if regions is None:
+        print('  Incremental mode: overlap smaller than the halo, computing the full grid', flush=True)
+        return None
+    n_new = sum((r.stop - r.start) * (c.stop - c.start) for r, c in regions)
+    n_all = lat1d.size * lon1d.size
+    print(f'  Incremental mode: reusing {n_all - n_new} of {n_all} cells '
+          f'({100.0 * (n_all - n_new) / n_all:.1f} %) from {path}', flush=True)
+    return {'state': state, 'new': new, 'old': old, 'regions': regions, 'computed': n_new}
+
+
 def create_grid(**kwargs):
     """
     Create a grid for WAVEWATCH III based on a rectilinear grid.
@@ -70,7 +204,14 @@ def create_grid(**kwargs):
     lat_range : list
         [lat_south, lat_north] (default: [10, 30])
     ref_grid : str
-        Bathymetry source ('etopo1', 'etopo2', 'gebco') (default: 'gebco')
+        Bathymetry source ('etopo1', 'etopo2', 'gebco') (default: 'gebco').
+        Scattered XYZ soundings are used when the name is prefixed with
+        'xyz:', has an XYZ extension (.xyz/.dat/.txt/.csv/.npy), or no
+        NetCDF file of that name exists but an XYZ file does
+    XYZ_POSITIVE_DEPTH : int
+        XYZ depths are positive downwards? (default: 0, elevation like GEBCO)
+    XYZ_CHUNK : int
+        Number of XYZ soundings read per chunk (default: 2000000)
     boundary : str
         GSHHS boundary level ('full','high','inter','low','coarse') (default: 'full')
     read_boundary : int
@@ -99,6 +240,22 @@ def create_grid(**kwargs):
         Limit for splitting polygons (default: 5*max(dx,dy))
     show_plots : int
         Show visualization plots? (default: 1)
+    events_file : str
+        File receiving the stage events as JSON lines (see utils.progress)
+        (default: the GRIDGEN_EVENTS environment variable, else none)
+    reuse_dir : str
+        Directory (or <fname>_state.npz file) of an earlier grid on the same
+        lattice; its overlapping cells are reused and only the new strips
+        are computed (see grid.incremental) (default: None)
+    INCR_HALO : int
+        Cells along the old grid edges, and along new edges inside the old
+        grid, recomputed in incremental mode; at least OBSTR_OFFSET + 1
+        (default: 3)
+    write_text : int
+        Write the WW3 text files .bot/.mask/.obst? The binary bundle
+        <fname>.grid and the .meta file are always written; without text
+        files they are written later from the bundle (io.grid_bundle,
+        `gridgen.py text`) (default: 1)
     """
     # 0. Parse input arguments
     # Get the base directory (where this script is located)
@@ -138,7 +295,13 @@ def create_grid(**kwargs):
         'OBSTR_OFFSET': 1,
         'MIN_DIST': 4.0,
         'SPLIT_LIM': 0.0,  # Align with MATLAB (splitting disabled by default)
-        'show_plots': 1
+        'XYZ_POSITIVE_DEPTH': 0,
+        'XYZ_CHUNK': 2000000,
+        'show_plots': 1,
+        'events_file': None,
+        'reuse_dir': None,
+        'INCR_HALO': 3,
+        'write_text': 1,
     }
     
     # Update with provided kwargs
@@ -153,7 +316,22 @@ def create_grid(**kwargs):
         params['OFFSET'] = max([params['dx'], params['dy']])
     if params['SPLIT_LIM'] is None:
         params['SPLIT_LIM'] = 0.0
-    
+
+    # Stage events (JSON lines) for progress display and profiling
+    inst = activate(Instrument.from_env(params['events_file'], total_stages=10))
+    inst.start(fname=params['fname'], ref_grid=params['ref_grid'], dx=params['dx'], dy=params['dy'],
+               lon_range=list(params['lon_range']), lat_range=list(params['lat_range']))
+    status = 'error'
+    try:
+        _create_grid(params, inst)
+        status = 'ok'
+    finally:
+        deactivate(inst)
+        inst.close(status)
+
+
+def _create_grid(params, inst):
+    """Run the create_grid steps; each step is a stage of `inst`."""
     # 0. Initialization
     start_time = time.time()
     # Force unbuffered output for real-time logging
@@ -178,250 +356,297 @@ def create_grid(**kwargs):
         print(f'Created output directory: {params["out_dir"]}', flush=True)
     
     # 1. Define grid coordinates
-    print('Step 1: Defining grid coordinates...', flush=True)
-    # MATLAB: lon1d = params.lon_range(1):params.dx:params.lon_range(2);
-    # This creates an array from start to end with step dx, inclusive of both ends
-    lon_start = params['lon_range'][0]
-    lon_end = params['lon_range'][1]
-    lat_start = params['lat_range'][0]
-    lat_end = params['lat_range'][1]
-    
-    # Calculate number of points to match MATLAB's behavior
-    # MATLAB's colon operator includes both endpoints
-    nx = int(round((lon_end - lon_start) / params['dx'])) + 1
-    ny = int(round((lat_end - lat_start) / params['dy'])) + 1
-    
-    lon1d = np.linspace(lon_start, lon_end, nx)
-    lat1d = np.linspace(lat_start, lat_end, ny)
-    
-    lon, lat = np.meshgrid(lon1d, lat1d)
-    print(f'  Grid size: {lon.shape[1]} x {lon.shape[0]} points', flush=True)
-    print('  Done.\n', flush=True)
+    with inst.stage('coordinates') as st:
+        print('Step 1: Defining grid coordinates...', flush=True)
+        # MATLAB: lon1d = params.lon_range(1):params.dx:params.lon_range(2);
+        # This creates an array from start to end with step dx, inclusive of both ends
+        lon_start = params['lon_range'][0]
+        lon_end = params['lon_range'][1]
+        lat_start = params['lat_range'][0]
+        lat_end = params['lat_range'][1]
+
+        # Calculate number of points to match MATLAB's behavior
+        # MATLAB's colon operator includes both endpoints
+        nx = int(round((lon_end - lon_start) / params['dx'])) + 1
+        ny = int(round((lat_end - lat_start) / params['dy'])) + 1
+
+        lon1d = np.linspace(lon_start, lon_end, nx)
+        lat1d = np.linspace(lat_start, lat_end, ny)
+
+        lon, lat = np.meshgrid(lon1d, lat1d)
+        print(f'  Grid size: {lon.shape[1]} x {lon.shape[0]} points', flush=True)
+        st.count(cells=nx * ny)
+        print('  Done.\n', flush=True)
     
     # 2. Read boundary data
     if params['read_boundary']:
-        print('Step 2: Reading GSHHS boundary data...', flush=True)
-        boundary_file = os.path.join(params['ref_dir'], f"coastal_bound_{params['boundary']}.mat")
-        
-        if os.path.exists(boundary_file):
-            mat_data = scipy.io.loadmat(boundary_file)
-            bound = mat_data['bound']
-            
-            # Convert MATLAB struct array to Python list of dicts
-            if isinstance(bound, np.ndarray):
-                if bound.dtype.names is not None:
-                    # Structured array
-                    # MATLAB struct arrays are typically (1, N) shape when loaded by scipy
-                    # Use .size to get total number of elements, or flatten first
-                    bound_flat = bound.flatten()
-                    N = bound_flat.size
-                    bound_list = []
-                    for i in range(N):
-                        poly = bound_flat[i]
-                        
-                        poly_dict = {}
-                        for field_name in poly.dtype.names:
-                            field_data = poly[field_name]
-                            if isinstance(field_data, np.ndarray):
-                                if field_data.size == 1:
-                                    if field_name in ['n', 'level']:
-                                        poly_dict[field_name] = int(field_data.item())
-                                    elif field_name in ['west', 'east', 'south', 'north', 'height', 'width']:
-                                        poly_dict[field_name] = float(field_data.item())
-                                    else:
-                                        poly_dict[field_name] = float(field_data.item())
-                                else:
-                                    if field_data.dtype == object:
-                                        if field_data.size > 0:
-                                            first_elem = field_data.flat[0]
-                                            if isinstance(first_elem, np.ndarray):
-                                                poly_dict[field_name] = first_elem.flatten()
-                                            else:
-                                                poly_dict[field_name] = np.array(field_data.flat).flatten()
-                                        else:
-                                            poly_dict[field_name] = np.array([])
-                                    else:
-                                        poly_dict[field_name] = field_data.flatten()
-                            else:
-                                poly_dict[field_name] = field_data
-                        
-                        bound_list.append(poly_dict)
-                    bound = bound_list
-                else:
-                    bound = bound.tolist()
-            elif isinstance(bound, list):
-                pass
-            else:
-                bound = [bound]
-            
-            N = len(bound) if isinstance(bound, list) else 1
-            print(f'  Loaded {N} boundary polygons', flush=True)
-            
-            # Load optional polygons if requested
-            Nu = 0
-            if params['opt_poly'] == 1:
-                fname_poly = os.path.join(params['ref_dir'], params['fname_poly'])
-                if os.path.exists(fname_poly):
-                    # optional_bound expects ref_dir and the full path to the flag file
-                    bound_user, Nu = optional_bound(params['ref_dir'], fname_poly)
-                    if Nu > 0:
-                        print(f'  Loaded {Nu} user-defined polygons', flush=True)
-                        # Append user polygons to bound list
-                        if isinstance(bound_user, list) and len(bound_user) > 0 and bound_user[0] != -1:
-                            bound.extend(bound_user)
-                            N = len(bound)
-                            print(f'  Total boundary polygons after adding user polygons: {N}', flush=True)
+        with inst.stage('read_boundary') as st:
+            print('Step 2: Reading GSHHS boundary data...', flush=True)
+            boundary_file = os.path.join(params['ref_dir'], f"coastal_bound_{params['boundary']}.mat")
+
+            if os.path.exists(boundary_file):
+                bound = load_boundary(boundary_file)
+
+                N = len(bound) if isinstance(bound, list) else 1
+                print(f'  Loaded {N} boundary polygons', flush=True)
+
+                # Load optional polygons if requested
+                Nu = 0
+                if params['opt_poly'] == 1:
+                    fname_poly = os.path.join(params['ref_dir'], params['fname_poly'])
+                    if os.path.exists(fname_poly):
+                        # optional_bound expects ref_dir and the full path to the flag file
+                        bound_user, Nu = optional_bound(params['ref_dir'], fname_poly)
+                        if Nu > 0:
+                            print(f'  Loaded {Nu} user-defined polygons', flush=True)
+                            # Append user polygons to bound list
+                            if isinstance(bound_user, list) and len(bound_user) > 0 and bound_user[0] != -1:
+                                bound.extend(split_bound_dateline(bound_user)[0])
+                                N = len(bound)
+                                print(f'  Total boundary polygons after adding user polygons: {N}', flush=True)
+                        else:
+                            print('  No user-defined polygons enabled in flag file', flush=True)
+                            params['opt_poly'] = 0
                     else:
-                        print('  No user-defined polygons enabled in flag file', flush=True)
+                        print(f'  Warning: Optional polygon file not found: {fname_poly}', flush=True)
+                        print('  Continuing without optional polygons...', flush=True)
                         params['opt_poly'] = 0
-                else:
-                    print(f'  Warning: Optional polygon file not found: {fname_poly}', flush=True)
-                    print('  Continuing without optional polygons...', flush=True)
-                    params['opt_poly'] = 0
-        else:
-            print(f'  Warning: Boundary file not found: {boundary_file}', flush=True)
-            print('  Continuing without boundary data...', flush=True)
-            params['read_boundary'] = 0
-            bound = []
-        print('  Done.\n', flush=True)
+            else:
+                print(f'  Warning: Boundary file not found: {boundary_file}', flush=True)
+                print('  Continuing without boundary data...', flush=True)
+                params['read_boundary'] = 0
+                bound = []
+            st.count(polygons=len(bound))
+            print('  Done.\n', flush=True)
     else:
+        inst.skip('read_boundary', 'read_boundary = 0')
         print('Step 2: Skipping boundary data (read_boundary = 0)\n', flush=True)
         bound = []
     
     # 3. Generate bathymetry
-    print(f"Step 3: Generating bathymetry from {params['ref_grid']}...", flush=True)
-    print('  This may take a while...', flush=True)
-    try:
-        # generate_grid(type_grid, x, y, ref_dir, bathy_source, limit, cut_off, dry, xvar, yvar, zvar)
-        # Match MATLAB: generate_grid(lon, lat, params.ref_dir, params.ref_grid, ...)
-        # Python version requires type_grid as first parameter
-        # Determine variable names based on bathymetry source
-        ref_grid_lower = params['ref_grid'].lower()
-        if ref_grid_lower == 'etopo2':
-            var_x = 'x'
-            var_y = 'y'
-            var_z = 'z'
-        elif ref_grid_lower == 'etopo1':
-            var_x = 'lon'
-            var_y = 'lat'
-            var_z = 'z'
-        else:  # GEBCO and others
-            var_x = 'lon'
-            var_y = 'lat'
-            var_z = 'elevation'
-        depth = generate_grid('rect', lon, lat, params['ref_dir'], params['ref_grid'],
-                            params['LIM_BATHY'], params['CUT_OFF'], params['DRY_VAL'],
-                            var_x, var_y, var_z)
-        print('  Done.\n', flush=True)
-    except Exception as e:
-        print(f'  ERROR: Failed to generate bathymetry', flush=True)
-        print(f'  Error message: {e}', flush=True)
-        import traceback
-        traceback.print_exc()
-        raise
+    with inst.stage('generate_grid', cells=nx * ny) as st:
+        print(f"Step 3: Generating bathymetry from {params['ref_grid']}...", flush=True)
+        print('  This may take a while...', flush=True)
+        try:
+            # generate_grid(type_grid, x, y, ref_dir, bathy_source, limit, cut_off, dry, xvar, yvar, zvar)
+            # Match MATLAB: generate_grid(lon, lat, params.ref_dir, params.ref_grid, ...)
+            # Python version requires type_grid as first parameter
+            # Determine variable names based on bathymetry source
+            ref_grid_lower = params['ref_grid'].lower()
+            bathy_file = os.path.join(params['ref_dir'], f"{params['ref_grid']}.nc")
+            xyz_file = None
+            if ref_grid_lower.startswith('xyz:') or not os.path.exists(bathy_file):
+                xyz_file = find_xyz_source(params['ref_dir'], params['ref_grid'])
+
+            # Inputs of the saved grid state (for later incremental runs)
+            state_files = [xyz_file or bathy_file]
+            if params['read_boundary']:
+                state_files.append(boundary_file)
+                if params['opt_poly'] == 1:
+                    state_files.append(os.path.join(params['ref_dir'], params['fname_poly']))
+            signature = state_signature(params, state_files)
+            incr = None
+            if params['reuse_dir'] and xyz_file is None and not params['IS_GLOBAL']:
+                incr = reuse_grid_state(params, lon1d, lat1d, signature)
+            # Padding of the recomputed strips (cell corners and obstruction neighbours)
+            incr_pad = int(params['OBSTR_OFFSET']) + 1
+
+            if xyz_file is not None:
+                print(f'  Using scattered XYZ soundings: {xyz_file}', flush=True)
+                depth = generate_grid_xyz('rect', lon, lat, params['ref_dir'], params['ref_grid'],
+                                          params['LIM_BATHY'], params['CUT_OFF'], params['DRY_VAL'],
+                                          chunk_size=int(params['XYZ_CHUNK']),
+                                          positive_depth=bool(params['XYZ_POSITIVE_DEPTH']))
+            else:
+                if ref_grid_lower == 'etopo2':
+                    var_x = 'x'
+                    var_y = 'y'
+                    var_z = 'z'
+                elif ref_grid_lower == 'etopo1':
+                    var_x = 'lon'
+                    var_y = 'lat'
+                    var_z = 'z'
+                else:  # GEBCO and others
+                    var_x = 'lon'
+                    var_y = 'lat'
+                    var_z = 'elevation'
+                if incr is None:
+                    depth = generate_grid('rect', lon, lat, params['ref_dir'], params['ref_grid'],
+                                        params['LIM_BATHY'], params['CUT_OFF'], params['DRY_VAL'],
+                                        var_x, var_y, var_z)
+                else:
+                    # Overlap from the saved integer depths, strips computed
+                    depth = np.empty(lon.shape)
+                    depth[incr['new']] = incr['state']['depth'][incr['old']] / 1000.0
+                    fill_regions(depth, incr['regions'], incr_pad, lambda r, c: generate_grid(
+                        'rect', lon[r, c], lat[r, c], params['ref_dir'], params['ref_grid'],
+                        params['LIM_BATHY'], params['CUT_OFF'], params['DRY_VAL'], var_x, var_y, var_z))
+                    st.count(reused_cells=depth.size - incr['computed'])
+            print('  Done.\n', flush=True)
+        except Exception as e:
+            print(f'  ERROR: Failed to generate bathymetry', flush=True)
+            print(f'  Error message: {e}', flush=True)
+            import traceback
+            traceback.print_exc()
+            raise
     
     # 4. Compute boundaries within grid
     if params['read_boundary']:
-        print('Step 4: Computing boundaries within grid domain...', flush=True)
-        sys.stdout.flush()
-        lon_start = np.min(lon) - params['dx']
-        lon_end = np.max(lon) + params['dx']
-        lat_start = np.min(lat) - params['dy']
-        lat_end = np.max(lat) + params['dy']
-        
-        coord = [lat_start, lon_start, lat_end, lon_end]
-        b, N1 = compute_boundary(coord, bound, params['MIN_DIST'])
-        sys.stdout.flush()
-        print(f'  Found {N1} boundary segments in grid domain', flush=True)
-        print('  Done.\n', flush=True)
+        with inst.stage('compute_boundary', polygons=len(bound)) as st:
+            print('Step 4: Computing boundaries within grid domain...', flush=True)
+            sys.stdout.flush()
+            lon_start = np.min(lon) - params['dx']
+            lon_end = np.max(lon) + params['dx']
+            lat_start = np.min(lat) - params['dy']
+            lat_end = np.max(lat) + params['dy']
+
+            coord = [lat_start, lon_start, lat_end, lon_end]
+            # Candidate polygons from the dateline-aware index (wrapped domains
+            # such as 130~200 become two lookups shifted into the grid longitudes)
+            bound_domain = BoundaryIndex(bound).query(coord)
+            b, N1 = compute_boundary(coord, bound_domain, params['MIN_DIST'])
+            sys.stdout.flush()
+            print(f'  Found {N1} boundary segments in grid domain', flush=True)
+            st.count(candidates=len(bound_domain), segments=N1)
+            print('  Done.\n', flush=True)
     else:
         b = []
         N1 = 0
+        inst.skip('compute_boundary', 'read_boundary = 0')
         print('Step 4: Skipping boundary computation\n', flush=True)
     
     # 5. Create initial land-sea mask
-    print('Step 5: Creating initial land-sea mask...', flush=True)
-    m = np.ones_like(depth)
-    m[depth == params['DRY_VAL']] = 0
-    print(f'  Initial wet cells: {np.sum(m == 1)}', flush=True)
-    print(f'  Initial dry cells: {np.sum(m == 0)}', flush=True)
-    print('  Done.\n', flush=True)
+    with inst.stage('initial_mask', cells=depth.size) as st:
+        print('Step 5: Creating initial land-sea mask...', flush=True)
+        m = np.ones_like(depth)
+        m[depth == params['DRY_VAL']] = 0
+        print(f'  Initial wet cells: {np.sum(m == 1)}', flush=True)
+        print(f'  Initial dry cells: {np.sum(m == 0)}', flush=True)
+        st.count(wet_cells=np.sum(m == 1))
+        print('  Done.\n', flush=True)
     
     # 6. Split large boundary polygons (for efficiency)
     if params['read_boundary'] and N1 > 0:
-        print('Step 6: Splitting large boundary polygons...', flush=True)
-        sys.stdout.flush()
-        b_split = split_boundary(b, params['SPLIT_LIM'], params['MIN_DIST'])
-        sys.stdout.flush()
-        print('  Done.\n', flush=True)
+        with inst.stage('split_boundary', polygons=len(b)) as st:
+            print('Step 6: Splitting large boundary polygons...', flush=True)
+            sys.stdout.flush()
+            b_split = split_boundary(b, params['SPLIT_LIM'], params['MIN_DIST'])
+            sys.stdout.flush()
+            st.count(polygons_out=len(b_split))
+            print('  Done.\n', flush=True)
     else:
         b_split = b
+        inst.skip('split_boundary', 'no boundaries')
         print('Step 6: Skipping boundary splitting\n', flush=True)
     
     # 7. Clean mask using boundary polygons
     if params['read_boundary'] and N1 > 0:
-        print('Step 7: Cleaning mask using boundary polygons...', flush=True)
-        sys.stdout.flush()
-        m2 = clean_mask(lon, lat, m, b_split, params['LIM_VAL'], params['OFFSET'])
-        print(f'  Wet cells after cleaning: {np.sum(m2 == 1)}', flush=True)
-        print(f'  Dry cells after cleaning: {np.sum(m2 == 0)}', flush=True)
-        print('  Done.\n', flush=True)
+        with inst.stage('clean_mask', cells=m.size, polygons=len(b_split)) as st:
+            print('Step 7: Cleaning mask using boundary polygons...', flush=True)
+            sys.stdout.flush()
+            if incr is None:
+                m2 = clean_mask(lon, lat, m, b_split, params['LIM_VAL'], params['OFFSET'])
+            else:
+                m2 = m.copy()
+                m2[incr['new']] = incr['state']['mask_clean'][incr['old']]
+                margin = params['OFFSET'] + (incr_pad + 1) * max(params['dx'], params['dy'])
+                fill_regions(m2, incr['regions'], incr_pad, lambda r, c: clean_mask(
+                    lon[r, c], lat[r, c], m[r, c], bound_in_box(b_split, lon[r, c], lat[r, c], margin),
+                    params['LIM_VAL'], params['OFFSET']))
+                st.count(reused_cells=m2.size - incr['computed'])
+            print(f'  Wet cells after cleaning: {np.sum(m2 == 1)}', flush=True)
+            print(f'  Dry cells after cleaning: {np.sum(m2 == 0)}', flush=True)
+            st.count(wet_cells=np.sum(m2 == 1))
+            print('  Done.\n', flush=True)
     else:
         m2 = m
+        inst.skip('clean_mask', 'no boundaries')
         print('Step 7: Skipping mask cleaning (no boundaries)\n', flush=True)
     
     # 8. Remove lakes and small water bodies
-    print('Step 8: Removing lakes and small water bodies...', flush=True)
-    m4, mask_map = remove_lake(m2, params['LAKE_TOL'], params['IS_GLOBAL'])
-    print(f'  Final wet cells: {np.sum(m4 == 1)}', flush=True)
-    print(f'  Final dry cells: {np.sum(m4 == 0)}', flush=True)
-    print('  Done.\n', flush=True)
+    with inst.stage('remove_lake') as st:
+        print('Step 8: Removing lakes and small water bodies...', flush=True)
+        m4, mask_map = remove_lake(m2, params['LAKE_TOL'], params['IS_GLOBAL'])
+        print(f'  Final wet cells: {np.sum(m4 == 1)}', flush=True)
+        print(f'  Final dry cells: {np.sum(m4 == 0)}', flush=True)
+        st.count(wet_cells=np.sum(m4 == 1))
+        print('  Done.\n', flush=True)
     
     # 9. Create obstruction grids
     if params['read_boundary'] and N1 > 0:
-        print('Step 9: Creating obstruction grids...', flush=True)
-        sx1, sy1 = create_obstr(lon, lat, b, m4, params['OBSTR_OFFSET'], params['OBSTR_OFFSET'])
-        print('  Done.\n', flush=True)
+        with inst.stage('create_obstr') as st:
+            print('Step 9: Creating obstruction grids...', flush=True)
+            if incr is None:
+                sx1, sy1 = create_obstr(lon, lat, b, m4, params['OBSTR_OFFSET'], params['OBSTR_OFFSET'])
+            else:
+                # Strips plus the overlap cells whose final mask changed (lakes)
+                changed = np.zeros(m4.shape, dtype=bool)
+                changed[incr['new']] = m4[incr['new']] != incr['state']['mask'][incr['old']]
+                regions = incr['regions'] + changed_regions(changed, params['INCR_HALO'])
+                sx1 = np.zeros(m4.shape)
+                sy1 = np.zeros(m4.shape)
+                sx1[incr['new']] = incr['state']['sx'][incr['old']] / 100.0
+                sy1[incr['new']] = incr['state']['sy'][incr['old']] / 100.0
+                margin = (incr_pad + 1) * max(params['dx'], params['dy'])
+
+                def obstr_region(r, c):
+                    b_region = bound_in_box(b, lon[r, c], lat[r, c], margin)
+                    if not b_region:
+                        return np.zeros(lon[r, c].shape), np.zeros(lon[r, c].shape)
+                    return create_obstr(lon[r, c], lat[r, c], b_region, m4[r, c],
+                                        params['OBSTR_OFFSET'], params['OBSTR_OFFSET'])
+
+                fill_regions((sx1, sy1), regions, incr_pad, obstr_region)
+                st.count(reused_cells=m4.size - int(np.sum(changed)) - incr['computed'])
+            st.count(segments=N1, wet_cells=np.sum(m4 == 1))
+            print('  Done.\n', flush=True)
     else:
+        inst.skip('create_obstr', 'no boundaries')
         print('Step 9: Skipping obstruction grid creation (no boundaries)', flush=True)
         sx1 = np.zeros_like(m4)
         sy1 = np.zeros_like(m4)
         print('  Done.\n', flush=True)
     
     # 10. Write output files
-    print('Step 10: Writing WAVEWATCH III output files...', flush=True)
-    depth_scale = 1000
-    obstr_scale = 100
-    
-    # Write bathymetry file
-    d = np.round(depth * depth_scale).astype(int)
-    write_ww3file(os.path.join(params['out_dir'], f"{params['fname']}.bot"), d)
-    print(f"  Written: {params['fname']}.bot", flush=True)
-    
-    # Write mask file
-    write_ww3file(os.path.join(params['out_dir'], f"{params['fname']}.mask"), m4)
-    print(f"  Written: {params['fname']}.mask", flush=True)
-    
-    # Write obstruction file
-    # Always write obstruction file, even if no boundaries (write zeros)
-    d1 = np.round(sx1 * obstr_scale).astype(int)
-    d2 = np.round(sy1 * obstr_scale).astype(int)
-    write_ww3obstr(os.path.join(params['out_dir'], f"{params['fname']}.obst"), d1, d2)
-    if params['read_boundary'] and N1 > 0:
-        print(f"  Written: {params['fname']}.obst (with obstructions)", flush=True)
-    else:
-        print(f"  Written: {params['fname']}.obst (no obstructions, all zeros)", flush=True)
-    
-    # Write metadata file
-    meta_prefix = os.path.join(params['out_dir'], params['fname'])
-    # 统一路径分隔符，避免 Windows 反斜杠导致的编码/转义问题
-    meta_prefix = os.path.abspath(meta_prefix).replace("\\", "/")
-    # Use actual grid point spacing (calculated from lon/lat arrays) to ensure
-    # grid.meta dx/dy matches the actual grid.bot file structure
-    write_ww3meta(meta_prefix, None, 'RECT', lon, lat,
-                  1.0 / depth_scale, 1.0 / obstr_scale, 1.0)
-    print(f"  Written: {params['fname']}.meta", flush=True)
-    print('  Done.\n', flush=True)
+    with inst.stage('write_files'):
+        print('Step 10: Writing WAVEWATCH III output files...', flush=True)
+        depth_scale = 1000
+        obstr_scale = 100
+
+        # Binary bundle (memory-mapped by the readers), then the WW3 text files from it
+        d = np.round(depth * depth_scale).astype(int)
+        # Always write obstructions, even if no boundaries (write zeros)
+        d1 = np.round(sx1 * obstr_scale).astype(int)
+        d2 = np.round(sy1 * obstr_scale).astype(int)
+        bundle = os.path.join(params['out_dir'], f"{params['fname']}{BUNDLE_SUFFIX}")
+        write_grid_bundle(bundle, lon1d, lat1d, d, m4, d1, d2, 1.0 / depth_scale, 1.0 / obstr_scale)
+        print(f"  Written: {params['fname']}{BUNDLE_SUFFIX}", flush=True)
+        # State for incremental regeneration of a shifted/resized domain
+        save_grid_state(os.path.join(params['out_dir'], f"{params['fname']}{STATE_SUFFIX}"),
+                        lon1d, lat1d, signature, d, m2, m4, d1, d2)
+
+        if params['write_text']:
+            write_text_files(bundle, force=True)
+            print(f"  Written: {params['fname']}.bot", flush=True)
+            print(f"  Written: {params['fname']}.mask", flush=True)
+            if params['read_boundary'] and N1 > 0:
+                print(f"  Written: {params['fname']}.obst (with obstructions)", flush=True)
+            else:
+                print(f"  Written: {params['fname']}.obst (no obstructions, all zeros)", flush=True)
+        else:
+            print(f"  Deferred: {params['fname']}.bot/.mask/.obst "
+                  f"(python gridgen.py text {params['out_dir']})", flush=True)
+
+        # Write metadata file
+        meta_prefix = os.path.join(params['out_dir'], params['fname'])
+        # 统一路径分隔符，避免 Windows 反斜杠导致的编码/转义问题
+        meta_prefix = os.path.abspath(meta_prefix).replace("\\", "/")
+        # Use actual grid point spacing (calculated from lon/lat arrays) to ensure
+        # grid.meta dx/dy matches the actual grid.bot file structure
+        write_ww3meta(meta_prefix, None, 'RECT', lon, lat,
+                      1.0 / depth_scale, 1.0 / obstr_scale, 1.0)
+        print(f"  Written: {params['fname']}.meta", flush=True)
+        print('  Done.\n', flush=True)
     
     # Summary
     elapsed_time = time.time() - start_time
@@ -431,12 +656,14 @@ def create_grid(**kwargs):
     print('=' * 70, flush=True)
     print(f"Output directory: {params['out_dir']}", flush=True)
     print('Output files:', flush=True)
-    print(f"  - {params['fname']}.bot  (bathymetry)", flush=True)
-    print(f"  - {params['fname']}.mask (land-sea mask)", flush=True)
-    if params['read_boundary'] and N1 > 0:
-        print(f"  - {params['fname']}.obst (obstructions)", flush=True)
-    else:
-        print(f"  - {params['fname']}.obst (obstructions, all zeros)", flush=True)
+    if params['write_text']:
+        print(f"  - {params['fname']}.bot  (bathymetry)", flush=True)
+        print(f"  - {params['fname']}.mask (land-sea mask)", flush=True)
+        if params['read_boundary'] and N1 > 0:
+            print(f"  - {params['fname']}.obst (obstructions)", flush=True)
+        else:
+            print(f"  - {params['fname']}.obst (obstructions, all zeros)", flush=True)
     print(f"  - {params['fname']}.meta (metadata)", flush=True)
+    print(f"  - {params['fname']}{BUNDLE_SUFFIX} (binary bundle)", flush=True)
     print(f'Total time: {elapsed_time:.2f} seconds', flush=True)
     print('=' * 70, flush=True)
@@ -0,0 +1,262 @@
+"""
+Create Curvilinear Grid
+
+Create a curvilinear grid for WAVEWATCH III from 2D longitude/latitude
+arrays (rotated, stretched or otherwise non-rectilinear grids).
+
+Unlike create_grid_curv.m, which copies depth/mask from a NetCDF file that
+already holds the curvilinear grid, the bathymetry is generated here from
+the base bathymetry (gebco/etopo) with generate_grid('curv', ...): cell
+geometry is computed with array operations and base nodes are averaged into
+the cells through a KD-tree, so grids of several million cells are handled
+without per-cell loops.
+
+Last Update: 2025
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+try:
+    from .create_grid import load_boundary
+    from .grid.clean_mask import clean_mask
+    from .grid.compute_boundary import compute_boundary
+    from .grid.generate_grid import generate_grid
+    from .grid.remove_lake import remove_lake
+    from .grid.split_boundary import split_boundary
+    from .grid.split_dateline import BoundaryIndex
+    from .io.write_ww3file import write_ww3file
+    from .io.write_ww3meta import write_ww3meta
+    from .io.write_ww3obstr import write_ww3obstr
+    from .utils.progress import Instrument, activate, deactivate
+except ImportError:
+    from create_grid import load_boundary
+    from grid.clean_mask import clean_mask
+    from grid.compute_boundary import compute_boundary
+    from grid.generate_grid import generate_grid
+    from grid.remove_lake import remove_lake
+    from grid.split_boundary import split_boundary
+    from grid.split_dateline import BoundaryIndex
+    from utils.progress import Instrument, activate, deactivate
+    import importlib
+    _parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if _parent_dir not in sys.path:
+        sys.path.append(_parent_dir)
+    write_ww3file = importlib.import_module('python.io.write_ww3file').write_ww3file
+    write_ww3meta = importlib.import_module('python.io.write_ww3meta').write_ww3meta
+    write_ww3obstr = importlib.import_module('python.io.write_ww3obstr').write_ww3obstr
+
+# Force unbuffered output for real-time logging
+sys.stdout.reconfigure(line_buffering=True) if hasattr(sys.stdout, 'reconfigure') else None
+
+# Default variable names of the base bathymetry files
+BATHY_VARS = {
+    'etopo2': ('x', 'y', 'z'),
+    'etopo1': ('lon', 'lat', 'z'),
+}
+GEBCO_VARS = ('lon', 'lat', 'elevation')
+
+
+def create_grid_curv(lon, lat, **kwargs):
+    """
+    Create a curvilinear grid for WAVEWATCH III.
+
+    Parameters
+    ----------
+    lon : ndarray
+        2D array (Ny, Nx) of cell centre longitudes
+    lat : ndarray
+        2D array (Ny, Nx) of cell centre latitudes
+
+    Parameters (optional name-value pairs):
+    ----------
+    ref_dir : str
+        Path to reference data directory (default: '../reference_data/')
+    out_dir : str
+        Path to output directory (default: '../result/')
+    fname : str
+        Output file name prefix (default: 'grid')
+    ref_grid : str
+        Bathymetry source ('etopo1', 'etopo2', 'gebco') (default: 'gebco')
+    xvar, yvar, zvar : str
+        Variable names in the bathymetry file (default: by ref_grid)
+    boundary : str
+        GSHHS boundary level ('full','high','inter','low','coarse') (default: 'full')
+    read_boundary : int
+        Clean the mask with GSHHS polygons? (default: 0)
+    DRY_VAL : float
+        Depth value for dry cells (default: 999999)
+    CUT_OFF : float
+        Cut-off depth to distinguish wet/dry (default: 0.1)
+    LIM_BATHY : float
+        Fraction of cell that must be wet (default: 0.1)
+    LIM_VAL : float
+        Fraction for polygon masking (default: 0.5)
+    OFFSET : float
+        Buffer around boundary (default: largest cell size)
+    LAKE_TOL : float
+        Lake removal tolerance (default: -1)
+    IS_GLOBAL : int
+        Is global grid? (default: 0)
+    SPLIT_LIM : float
+        Limit for splitting polygons (default: 0, disabled)
+    events_file : str
+        File receiving the stage events as JSON lines (see utils.progress)
+        (default: the GRIDGEN_EVENTS environment variable, else none)
+    """
+    script_path = os.path.abspath(__file__)
+    base_dir = os.path.dirname(script_path)
+    base_name = os.path.basename(base_dir)
+    project_root = os.path.dirname(base_dir) if base_name in ('python', 'python_version') else base_dir
+
+    params = {
+        'ref_dir': os.path.join(project_root, 'reference_data'),
+        'out_dir': os.path.join(project_root, 'result'),
+        'fname': 'grid',
+        'ref_grid': 'gebco',
+        'xvar': None,
+        'yvar': None,
+        'zvar': None,
+        'boundary': 'full',
+        'read_boundary': 0,
+        'DRY_VAL': 999999,
+        'CUT_OFF': 0.1,
+        'LIM_BATHY': 0.1,
+        'LIM_VAL': 0.5,
+        'OFFSET': None,
+        'LAKE_TOL': -1,
+        'IS_GLOBAL': 0,
+        'MIN_DIST': 4.0,
+        'SPLIT_LIM': 0.0,
+        'events_file': None,
+    }
+    params.update(kwargs)
+    params['ref_dir'] = os.path.abspath(params['ref_dir']).replace("\\", "/")
+    params['out_dir'] = os.path.abspath(params['out_dir']).replace("\\", "/")
+
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    if lon.ndim != 2 or lon.shape != lat.shape:
+        raise ValueError(f'lon/lat must be 2D arrays of the same shape: {lon.shape} vs {lat.shape}')
+    Ny, Nx = lon.shape
+
+    default_vars = BATHY_VARS.get(params['ref_grid'].lower(), GEBCO_VARS)
+    var_x = params['xvar'] or default_vars[0]
+    var_y = params['yvar'] or default_vars[1]
+    var_z = params['zvar'] or default_vars[2]
+
+    inst = activate(Instrument.from_env(params['events_file'], total_stages=5))
+    inst.start(fname=params['fname'], ref_grid=params['ref_grid'], nx=Nx, ny=Ny)
+    status = 'error'
+    try:
+        _create_grid_curv(params, lon, lat, var_x, var_y, var_z, inst)
+        status = 'ok'
+    finally:
+        deactivate(inst)
+        inst.close(status)
+
+
+def _create_grid_curv(params, lon, lat, var_x, var_y, var_z, inst):
+    """Run the create_grid_curv steps; each step is a stage of `inst`."""
+    Ny, Nx = lon.shape
+    start_time = time.time()
+    print('=' * 70, flush=True)
+    title = 'WAVEWATCH III Curvilinear Grid Generator Python Version'
+    print(' ' * ((70 - len(title))) + title, flush=True)
+    print('=' * 70, flush=True)
+    print(f"Grid name: {params['fname']}", flush=True)
+    print(f"Bathymetry source: {params['ref_grid']}", flush=True)
+    print(f'Grid size: {Nx} x {Ny} points', flush=True)
+    print(f'Domain: [{np.min(lon):.2f}, {np.max(lon):.2f}] x [{np.min(lat):.2f}, {np.max(lat):.2f}]', flush=True)
+    print('=' * 70 + '\n', flush=True)
+
+    os.makedirs(params['out_dir'], exist_ok=True)
+
+    # 1. Generate bathymetry
+    with inst.stage('generate_grid', cells=Nx * Ny):
+        print(f"Step 1: Generating bathymetry from {params['ref_grid']}...", flush=True)
+        depth = generate_grid('curv', lon, lat, params['ref_dir'], params['ref_grid'],
+                              params['LIM_BATHY'], params['CUT_OFF'], params['DRY_VAL'],
+                              var_x, var_y, var_z)
+        print('  Done.\n', flush=True)
+
+    # 2. Create initial land-sea mask
+    with inst.stage('initial_mask', cells=Nx * Ny):
+        print('Step 2: Creating initial land-sea mask...', flush=True)
+        m = np.ones_like(depth)
+        m[depth == params['DRY_VAL']] = 0
+        print(f'  Initial wet cells: {np.sum(m == 1)}', flush=True)
+        print('  Done.\n', flush=True)
+
+    # 3. Clean mask using boundary polygons
+    N1 = 0
+    if params['read_boundary']:
+        with inst.stage('clean_mask', cells=Nx * Ny):
+            print('Step 3: Cleaning mask using GSHHS boundary polygons...', flush=True)
+            boundary_file = os.path.join(params['ref_dir'], f"coastal_bound_{params['boundary']}.mat")
+            if os.path.exists(boundary_file):
+                bound = load_boundary(boundary_file)
+                # Cell sizes bound the search margin and the polygon offset
+                dlon = np.max(np.abs(np.diff(lon, axis=1))) if Nx > 1 else 0.0
+                dlat = np.max(np.abs(np.diff(lat, axis=0))) if Ny > 1 else 0.0
+                margin = max(dlon, dlat)
+                if params['OFFSET'] is None:
+                    params['OFFSET'] = margin
+                coord = [np.min(lat) - margin, np.min(lon) - margin, np.max(lat) + margin, np.max(lon) + margin]
+                b, N1 = compute_boundary(coord, BoundaryIndex(bound).query(coord), params['MIN_DIST'])
+                print(f'  Found {N1} boundary segments in grid domain', flush=True)
+            else:
+                print(f'  Warning: Boundary file not found: {boundary_file}', flush=True)
+            if N1 > 0:
+                b_split = split_boundary(b, params['SPLIT_LIM'], params['MIN_DIST'])
+                m = clean_mask(lon, lat, m, b_split, params['LIM_VAL'], params['OFFSET'])
+                print(f'  Wet cells after cleaning: {np.sum(m == 1)}', flush=True)
+            print('  Done.\n', flush=True)
+    else:
+        inst.skip('clean_mask', 'read_boundary = 0')
+        print('Step 3: Skipping mask cleaning (read_boundary = 0)\n', flush=True)
+
+    # 4. Remove lakes and small water bodies
+    with inst.stage('remove_lake'):
+        print('Step 4: Removing lakes and small water bodies...', flush=True)
+        m4, _ = remove_lake(m, params['LAKE_TOL'], params['IS_GLOBAL'])
+        print(f'  Final wet cells: {np.sum(m4 == 1)}', flush=True)
+        print(f'  Final dry cells: {np.sum(m4 == 0)}', flush=True)
+        print('  Done.\n', flush=True)
+
+    # 5. Write output files
+    with inst.stage('write_files'):
+        print('Step 5: Writing WAVEWATCH III output files...', flush=True)
+        depth_scale = 1000
+        obstr_scale = 100
+        coord_scale = 1000000
+        prefix = os.path.join(params['out_dir'], params['fname'])
+
+        write_ww3file(f'{prefix}.bot', np.round(depth * depth_scale).astype(int))
+        write_ww3file(f'{prefix}.mask', m4)
+        # Obstructions are not computed for curvilinear grids (as in create_grid_curv.m)
+        zeros = np.zeros((Ny, Nx), dtype=int)
+        write_ww3obstr(f'{prefix}.obst', zeros, zeros)
+        # Coordinates are written as scaled integers (scale factor N3 in the .meta)
+        write_ww3file(f'{prefix}.lon', np.round(lon * coord_scale).astype(np.int64))
+        write_ww3file(f'{prefix}.lat', np.round(lat * coord_scale).astype(np.int64))
+        for ext in ('bot', 'mask', 'obst', 'lon', 'lat'):
+            print(f"  Written: {params['fname']}.{ext}", flush=True)
+
+        meta_prefix = os.path.abspath(prefix).replace("\\", "/")
+        write_ww3meta(meta_prefix, None, 'CURV', lon, lat,
+                      1.0 / depth_scale, 1.0 / obstr_scale, 1.0 / coord_scale)
+        print(f"  Written: {params['fname']}.meta", flush=True)
+        print('  Done.\n', flush=True)
+
+    elapsed_time = time.time() - start_time
+    print('=' * 70, flush=True)
+    title2 = 'Grid Generation Complete!'
+    print(' ' * ((70 - len(title2))) + title2, flush=True)
+    print('=' * 70, flush=True)
+    print(f"Output directory: {params['out_dir']}", flush=True)
+    print(f'Total time: {elapsed_time:.2f} seconds', flush=True)
+    print('=' * 70, flush=True)
@@ -6,8 +6,12 @@ from .clean_mask import clean_mask
 from .compute_boundary import compute_boundary
 from .create_obstr import create_obstr
 from .generate_grid import generate_grid
+from .generate_grid_xyz import generate_grid_xyz
+from .grid_diff import diff_grids, fill_nan_neighbours
+from .reconcile_masks import reconcile_grid_dirs, reconcile_masks
 from .remove_lake import remove_lake
 from .split_boundary import split_boundary
 
-__all__ = ['remove_lake', 'clean_mask', 'generate_grid', 'split_boundary', 'compute_boundary', 'create_obstr']
+__all__ = ['remove_lake', 'clean_mask', 'generate_grid', 'generate_grid_xyz', 'split_boundary', 'compute_boundary', 'create_obstr',
+           'reconcile_masks', 'reconcile_grid_dirs', 'diff_grids', 'fill_nan_neighbours']
 
@@ -16,8 +16,10 @@ from matplotlib.path import Path
 
 try:
     from ..utils.compute_cellcorner import compute_cellcorner
+    from ..utils.progress import report_progress
 except ImportError:
     from utils.compute_cellcorner import compute_cellcorner
+    from utils.progress import report_progress
 
 
 def clean_mask(x, y, mask, bound_ingrid, lim, offset):
@@ -122,5 +124,6 @@ def clean_mask(x, y, mask, bound_ingrid, lim, offset):
         if progress >= last_progress + 5:
             last_progress = (progress // 5) * 5
             print(f'Completed {last_progress} per cent of land sea mask clean up', flush=True)
+            report_progress(completed, N1, 'clean_mask')
     
     return mask
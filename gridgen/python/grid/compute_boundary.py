@@ -15,6 +15,11 @@ Last Update: 23-Oct-2012
 import numpy as np
 from matplotlib.path import Path
 
+try:
+    from ..utils.progress import report_progress
+except ImportError:
+    from utils.progress import report_progress
+
 
 def compute_boundary(coord, bound, min_val=None, bflg=None):
     """
@@ -843,6 +848,7 @@ def compute_boundary(coord, bound, min_val=None, bflg=None):
             import sys
             sys.stdout.flush()
             itmp_prev = itmp
+            report_progress(idx + 1, N_candidates, 'compute_boundary')
     
     Nb = in_coord
     
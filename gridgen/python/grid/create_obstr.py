@@ -23,9 +23,11 @@ import numpy as np
 from matplotlib.path import Path
 
 try:
-    from ..utils.compute_cellcorner import compute_cellcorner
+    from ..utils.compute_cellcorner import compute_cellcorners
+    from ..utils.progress import report_progress
 except ImportError:
-    from utils.compute_cellcorner import compute_cellcorner
+    from utils.compute_cellcorner import compute_cellcorners
+    from utils.progress import report_progress
 
 
 def _process_wet_cell_batch(args):
@@ -129,6 +131,164 @@ def _process_wet_cell_batch(args):
     return results
 
 
+def _expand(starts, counts):
+    """Indices starts[i] .. starts[i] + counts[i] - 1 for every i, concatenated."""
+    total = int(counts.sum())
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + np.arange(total) - offsets
+
+
+def _merge_common_boundaries(lead, trail, poly, lo, hi):
+    """
+    Move segments of a boundary crossing two neighbouring cells into one cell.
+
+    Cells are paired along `lead` (the column for x segments, the row for y
+    segments). For each pair the first boundary common to both cells (the
+    lowest polygon index, as the cell lists are ordered by polygon) is kept
+    in the cell with the longer segment, extended to the union of both
+    segments, and dropped from the other cell. Pairs are swept in
+    increasing `lead` order with all cells of one column (row) at once,
+    which reproduces the sequential cell loop of the MATLAB version.
+
+    Returns the entries ordered by (lead, trail, poly): lead, trail, lo, hi
+    of the remaining segments.
+    """
+    order = np.lexsort((poly, trail, lead))
+    lead, trail, poly = lead[order], trail[order], poly[order]
+    lo, hi = lo[order].copy(), hi[order].copy()
+    alive = np.ones(lead.size, dtype=bool)
+    n_poly = int(poly.max()) + 1 if poly.size else 1
+    key = trail.astype(np.int64) * n_poly + poly
+    n_lead = int(lead.max()) + 2 if lead.size else 1
+    starts = np.searchsorted(lead, np.arange(n_lead + 1))
+
+    for j in np.unique(lead):
+        a0, a1, b1 = starts[j], starts[j + 1], starts[j + 2]
+        if a1 == a0 or b1 == a1:
+            continue
+        ia = np.arange(a0, a1)[alive[a0:a1]]
+        ib = np.arange(a1, b1)[alive[a1:b1]]
+        common, pa, pb = np.intersect1d(key[ia], key[ib], assume_unique=True, return_indices=True)
+        if common.size == 0:
+            continue
+        # First common boundary of each cell pair
+        _, first = np.unique(common // n_poly, return_index=True)
+        ea, eb = ia[pa[first]], ib[pb[first]]
+        keep_a = (hi[ea] - lo[ea]) >= (hi[eb] - lo[eb])
+        win = np.where(keep_a, ea, eb)
+        lose = np.where(keep_a, eb, ea)
+        new_lo = np.minimum(lo[ea], lo[eb])
+        new_hi = np.maximum(hi[ea], hi[eb])
+        lo[win] = new_lo
+        hi[win] = new_hi
+        alive[lose] = False
+    return lead[alive], trail[alive], lo[alive], hi[alive]
+
+
+def _interval_union(cell, lo, hi):
+    """
+    Union of the (closed) intervals of each cell.
+
+    Intervals are sorted by (cell, lo); a new interval starts where lo
+    exceeds the cumulative maximum of the previous upper limits of the same
+    cell. Returns cell, lo, hi of the disjoint intervals ordered by cell.
+    """
+    if cell.size == 0:
+        return cell, lo, hi
+    order = np.lexsort((lo, cell))
+    cell, lo, hi = cell[order], lo[order], hi[order]
+    new_cell = np.ones(cell.size, dtype=bool)
+    new_cell[1:] = cell[1:] != cell[:-1]
+    # Cumulative maximum restarted per cell, exact on integer ranks of hi
+    values, rank = np.unique(hi, return_inverse=True)
+    base = (np.cumsum(new_cell) - 1).astype(np.int64) * values.size
+    running = values[np.maximum.accumulate(base + rank) - base]
+    start = new_cell.copy()
+    start[1:] |= lo[1:] > running[:-1]
+    first = np.flatnonzero(start)
+    return cell[first], lo[first], np.maximum.reduceat(hi, first)
+
+
+def _contained(q_cell, q_lo, q_hi, s_cell, s_lo, s_hi):
+    """
+    For every query interval, is it inside one of the intervals of the
+    same cell in the (cell-sorted) set s?
+    """
+    starts = np.searchsorted(s_cell, q_cell, 'left')
+    counts = np.searchsorted(s_cell, q_cell, 'right') - starts
+    qi = np.repeat(np.arange(q_cell.size), counts)
+    si = _expand(starts, counts)
+    inside = (s_hi[si] >= q_hi[qi]) & (s_lo[si] <= q_lo[qi])
+    return np.bincount(qi[inside], minlength=q_cell.size) > 0
+
+
+def _obstruction(cell, lo, hi, n_cells, neighbours):
+    """
+    Obstruction of each cell from its independent segments and those of
+    its neighbours.
+
+    Parameters
+    ----------
+    cell, lo, hi : ndarray
+        Disjoint segments (flat cell index, lower and upper limit as a
+        fraction of the cell side) ordered by cell
+    n_cells : int
+        Number of cells
+    neighbours : list of (shift, valid)
+        Flat index shift of each neighbour in comparison order and a
+        boolean array of the cells for which that neighbour exists
+
+    Returns
+    -------
+    s : ndarray
+        Flat obstruction array: the length of the union of the segments
+        left after removing those in the shadow of a neighbour, 0 for cells
+        whose segments are all shadowed
+    """
+    has = np.zeros(n_cells, dtype=bool)
+    has[cell] = True
+    active = has.copy()
+    b_cell, b_lo, b_hi = cell, lo, hi
+
+    for shift, valid in neighbours:
+        nb_ok = np.zeros(n_cells, dtype=bool)
+        cand = np.flatnonzero(active & valid)
+        nb_ok[cand[has[cand + shift]]] = True
+        if not np.any(nb_ok):
+            continue
+
+        # Remove segments of the cell in the shadow of the neighbour
+        q = np.flatnonzero(nb_ok[b_cell])
+        shadow = np.zeros(b_cell.size, dtype=bool)
+        shadow[q] = _contained(b_cell[q] + shift, b_lo[q], b_hi[q], cell, lo, hi)
+        b_cell, b_lo, b_hi = b_cell[~shadow], b_lo[~shadow], b_hi[~shadow]
+        left = np.zeros(n_cells, dtype=bool)
+        left[b_cell] = True
+        active &= ~nb_ok | left
+        nb_ok &= left
+
+        # Add the neighbour segments not in the shadow of the remaining ones
+        c = np.flatnonzero(nb_ok)
+        starts = np.searchsorted(cell, c + shift, 'left')
+        counts = np.searchsorted(cell, c + shift, 'right') - starts
+        ni = _expand(starts, counts)
+        n_cell = np.repeat(c, counts)
+        shadow = _contained(n_cell, lo[ni], hi[ni], b_cell, b_lo, b_hi)
+        # All neighbour segments are kept when every one is in the shadow
+        n_kept = np.bincount(n_cell[~shadow], minlength=n_cells)
+        keep = ~shadow | (n_kept[n_cell] == 0)
+        b_cell = np.concatenate([b_cell, n_cell[keep]])
+        b_lo = np.concatenate([b_lo, lo[ni][keep]])
+        b_hi = np.concatenate([b_hi, hi[ni][keep]])
+        order = np.argsort(b_cell, kind='stable')
+        b_cell, b_lo, b_hi = b_cell[order], b_lo[order], b_hi[order]
+
+    u_cell, u_lo, u_hi = _interval_union(b_cell, b_lo, b_hi)
+    s = np.bincount(u_cell, weights=u_hi - u_lo, minlength=n_cells)
+    s[~active] = 0.0
+    return np.clip(s, 0.0, 1.0)
+
+
 def create_obstr(x, y, bound, mask, offset_left, offset_right):
     """
     Generate 2D obstruction grids in x and y directions.
@@ -160,23 +320,7 @@ def create_obstr(x, y, bound, mask, offset_left, offset_right):
         2D obstruction grid of size (Ny, Nx) for obstructions in y.
         Values range from 0 for no obstruction to 1 for full obstruction
     """
-    # Initialize variables
     Ny, Nx = x.shape
-    sx = np.zeros((Ny, Nx))
-    sy = np.zeros((Ny, Nx))
-    
-    loc = np.where(mask == 0)
-    sx[loc] = 0
-    sy[loc] = 0
-    
-    # Create cell structure (list of lists of dicts)
-    cell = [[{
-        'px': None, 'py': None, 'angle': None, 'width': None, 'height': None,
-        'nx': 0, 'ny': 0, 'south_lim': [], 'north_lim': [], 'east_lim': [],
-        'west_lim': [], 'bndx': [], 'bndy': []
-    } for _ in range(Nx)] for _ in range(Ny)]
-    
-    cell_bnd = mask.copy()
     
     loc_wet = np.where(mask != 0)
     N_wet = len(loc_wet[0])
@@ -185,54 +329,24 @@ def create_obstr(x, y, bound, mask, offset_left, offset_right):
     print(f' Total Number of cells = {Nb}', flush=True)
     print(f'   Number of wet cells = {N_wet}', flush=True)
     
-    # Set up the cells
-    for j in range(1, Nx + 1):
-        for k in range(1, Ny + 1):
-            c1, c2, c3, c4, wdth, hgt = compute_cellcorner(x, y, j, k, Nx, Ny)
-            
-            cell[k - 1][j - 1]['px'] = np.array([c4[0], c1[0], c2[0], c3[0], c4[0]])
-            cell[k - 1][j - 1]['py'] = np.array([c4[1], c1[1], c2[1], c3[1], c4[1]])
-            cell[k - 1][j - 1]['angle'] = np.arctan2(c1[1] - c4[1], c1[0] - c4[0])
-            cell[k - 1][j - 1]['width'] = wdth
-            cell[k - 1][j - 1]['height'] = hgt
-            cell[k - 1][j - 1]['nx'] = 0
-            cell[k - 1][j - 1]['ny'] = 0
-            cell[k - 1][j - 1]['south_lim'] = []
-            cell[k - 1][j - 1]['north_lim'] = []
-            cell[k - 1][j - 1]['east_lim'] = []
-            cell[k - 1][j - 1]['west_lim'] = []
-            cell[k - 1][j - 1]['bndx'] = []
-            cell[k - 1][j - 1]['bndy'] = []
+    # Set up the cells: corners (c4, c1, c2, c3, c4), rotation angle and size
+    cx, cy, _, _ = compute_cellcorners(x, y)
+    all_px = np.stack([cx[3], cx[0], cx[1], cx[2], cx[3]], axis=2)  # (Ny, Nx, 5)
+    all_py = np.stack([cy[3], cy[0], cy[1], cy[2], cy[3]], axis=2)  # (Ny, Nx, 5)
+    cell_angle = np.arctan2(cy[0] - cy[3], cx[0] - cx[3])
+    cell_width = np.sqrt((cx[0] - cx[3]) ** 2 + (cy[0] - cy[3]) ** 2)
+    cell_height = np.sqrt((cx[1] - cx[0]) ** 2 + (cy[1] - cy[0]) ** 2)
     
     N = len(bound)
     
     # Preparing the boundaries
     print('Preparing the boundaries', flush=True)
-    itmp = 0
-    
-    bnd_x = []
-    bnd_y = []
-    bnd_indx = []
-    
-    for i in range(N):
-        bnd_x.extend(bound[i]['x'])
-        bnd_y.extend(bound[i]['y'])
-        bnd_indx.extend([i] * bound[i]['n'])
-        
-        itmp_prev = itmp
-        itmp = int(i / N * 100)
-        if (itmp % 10 == 0) and (itmp_prev != itmp):
-            print(f' Completed {itmp} per cent of boundaries', flush=True)
-    
-    bnd_x = np.array(bnd_x)
-    bnd_y = np.array(bnd_y)
-    bnd_indx = np.array(bnd_indx)
+    bnd_x = np.concatenate([np.asarray(b['x'], dtype=np.float64) for b in bound]) if N else np.zeros(0)
+    bnd_y = np.concatenate([np.asarray(b['y'], dtype=np.float64) for b in bound]) if N else np.zeros(0)
+    bnd_indx = np.repeat(np.arange(N), [int(b['n']) for b in bound])
     
     # Pre-compute cell bounding boxes for fast filtering (vectorized)
     print('Pre-computing cell bounding boxes for fast filtering...', flush=True)
-    # Extract all px and py arrays at once
-    all_px = np.array([[cell[k][j]['px'] for j in range(Nx)] for k in range(Ny)])  # (Ny, Nx, 5)
-    all_py = np.array([[cell[k][j]['py'] for j in range(Nx)] for k in range(Ny)])  # (Ny, Nx, 5)
     cell_bounds = np.zeros((Ny, Nx, 4))  # [min_x, max_x, min_y, max_y]
     cell_bounds[:, :, 0] = np.min(all_px, axis=2)
     cell_bounds[:, :, 1] = np.max(all_px, axis=2)
@@ -270,16 +384,13 @@ def create_obstr(x, y, bound, mask, offset_left, offset_right):
     print('  Creating cell batches...', flush=True)
     cell_batches = []
     current_batch = []
-    for indx_wet in range(N_wet):
-        k = loc_wet[0][indx_wet]
-        j = loc_wet[1][indx_wet]
-        
+    for k, j in zip(*loc_wet):
         cell_data = {
-            'angle': cell[k][j]['angle'],
-            'px': np.array(cell[k][j]['px']),
-            'py': np.array(cell[k][j]['py']),
-            'width': cell[k][j]['width'],
-            'height': cell[k][j]['height']
+            'angle': cell_angle[k, j],
+            'px': all_px[k, j],
+            'py': all_py[k, j],
+            'width': cell_width[k, j],
+            'height': cell_height[k, j]
         }
         
         current_batch.append((k, j, cell_data))
@@ -293,9 +404,13 @@ def create_obstr(x, y, bound, mask, offset_left, offset_right):
     
     print(f'  Created {len(cell_batches)} batches, starting parallel processing...', flush=True)
     
-    # Process batches in parallel
+    # Process batches in parallel; every boundary segment found in a cell
+    # becomes one row of the flat (cell, polygon, interval) arrays
     completed = 0
     last_progress = 0
+    N_bnd = 0
+    seg_k, seg_j, seg_poly = [], [], []
+    seg_s, seg_n, seg_w, seg_e = [], [], [], []
     
     executor = None
     try:
@@ -314,47 +429,23 @@ def create_obstr(x, y, bound, mask, offset_left, offset_right):
                 batch_results = future.result()
                 
                 for k, j, Nbnds, results in batch_results:
-                    cell_bnd[k, j] = Nbnds
-                    
-                    # Update cell data with results
+                    if Nbnds:
+                        N_bnd += 1
                     for result in results:
-                        indx_bnd = result['indx_bnd']
-                        south_limit = result['south_lim']
-                        north_limit = result['north_lim']
-                        west_limit = result['west_lim']
-                        east_limit = result['east_lim']
-                        
-                        # Store x-direction boundary
-                        cell[k][j]['nx'] = cell[k][j]['nx'] + 1
-                        if not isinstance(cell[k][j]['south_lim'], list):
-                            cell[k][j]['south_lim'] = []
-                        if not isinstance(cell[k][j]['north_lim'], list):
-                            cell[k][j]['north_lim'] = []
-                        if not isinstance(cell[k][j]['bndx'], list):
-                            cell[k][j]['bndx'] = []
-                        
-                        cell[k][j]['south_lim'].append(south_limit)
-                        cell[k][j]['north_lim'].append(north_limit)
-                        cell[k][j]['bndx'].append(indx_bnd)
-                        
-                        # Store y-direction boundary
-                        cell[k][j]['ny'] = cell[k][j]['ny'] + 1
-                        if not isinstance(cell[k][j]['east_lim'], list):
-                            cell[k][j]['east_lim'] = []
-                        if not isinstance(cell[k][j]['west_lim'], list):
-                            cell[k][j]['west_lim'] = []
-                        if not isinstance(cell[k][j]['bndy'], list):
-                            cell[k][j]['bndy'] = []
-                        
-                        cell[k][j]['east_lim'].append(east_limit)
-                        cell[k][j]['west_lim'].append(west_limit)
-                        cell[k][j]['bndy'].append(indx_bnd)
+                        seg_k.append(k)
+                        seg_j.append(j)
+                        seg_poly.append(result['indx_bnd'])
+                        seg_s.append(result['south_lim'])
+                        seg_n.append(result['north_lim'])
+                        seg_w.append(result['west_lim'])
+                        seg_e.append(result['east_lim'])
                     
                     completed += 1
                     progress = int(completed / N_wet * 100)
                     if progress >= last_progress + 5:
                         last_progress = (progress // 5) * 5
                         print(f' Completed {last_progress} per cent', flush=True)
+                        report_progress(completed, N_wet, 'create_obstr')
             except Exception as e:
                 print(f'  Warning: Error processing batch: {e}', flush=True)
                 import traceback
@@ -366,650 +457,44 @@ def create_obstr(x, y, bound, mask, offset_left, offset_right):
             executor.shutdown(wait=True, cancel_futures=False)
             print('  Worker processes closed.', flush=True)
     
-    
-    # Loop through all the wet cells with boundaries and move boundary segments
-    # that are part of the same boundary and cross neighboring cells
-    loc_bnd = np.where(cell_bnd != 0)
-    N_bnd = len(loc_bnd[0])
-    row_bnd = loc_bnd[0]
-    column_bnd = loc_bnd[1]
-    
     print(f'Number of wet cells enclosing boundaries = {N_bnd}', flush=True)
     
-    # First loop: Merge boundaries that cross neighboring cells
-    for indx_bnd in range(N_bnd):
-        j = column_bnd[indx_bnd]
-        k = row_bnd[indx_bnd]
-        
-        # Check neighbors in x direction
-        if j < Nx - 1:
-            jj = j + 1
-            
-            if cell[k][j]['nx'] != 0 and cell[k][jj]['nx'] != 0:
-                # Save information to temporary variables (MATLAB style)
-                set1 = {
-                    'nx': cell[k][j]['nx'],
-                    'bndx': cell[k][j]['bndx'].copy(),
-                    'north_lim': cell[k][j]['north_lim'].copy(),
-                    'south_lim': cell[k][j]['south_lim'].copy()
-                }
-                set2 = {
-                    'nx': cell[k][jj]['nx'],
-                    'bndx': cell[k][jj]['bndx'].copy(),
-                    'north_lim': cell[k][jj]['north_lim'].copy(),
-                    'south_lim': cell[k][jj]['south_lim'].copy()
-                }
-                found_common = False
-                
-                # Loop through boundary segments and move segments
-                # of common boundaries to the cell with the larger segment
-                for l in range(set1['nx']):
-                    for m in range(set2['nx']):
-                        if set1['bndx'][l] == set2['bndx'][m]:
-                            seg1_len = set1['north_lim'][l] - set1['south_lim'][l]
-                            seg2_len = set2['north_lim'][m] - set2['south_lim'][m]
-                            
-                            if seg1_len >= seg2_len:
-                                # Merge into set1
-                                set1['north_lim'][l] = max(set1['north_lim'][l], set2['north_lim'][m])
-                                set1['south_lim'][l] = min(set1['south_lim'][l], set2['south_lim'][m])
-                                # Remove from set2 by shifting elements
-                                for n in range(m + 1, set2['nx']):
-                                    set2['bndx'][n - 1] = set2['bndx'][n]
-                                    set2['north_lim'][n - 1] = set2['north_lim'][n]
-                                    set2['south_lim'][n - 1] = set2['south_lim'][n]
-                                set2['nx'] -= 1
-                            else:
-                                # Merge into set2
-                                set2['north_lim'][m] = max(set1['north_lim'][l], set2['north_lim'][m])
-                                set2['south_lim'][m] = min(set1['south_lim'][l], set2['south_lim'][m])
-                                # Remove from set1 by shifting elements
-                                for n in range(l + 1, set1['nx']):
-                                    set1['bndx'][n - 1] = set1['bndx'][n]
-                                    set1['north_lim'][n - 1] = set1['north_lim'][n]
-                                    set1['south_lim'][n - 1] = set1['south_lim'][n]
-                                set1['nx'] -= 1
-                            
-                            found_common = True
-                            break
-                    
-                    if found_common:
-                        break
-                
-                # Write cell information back from temporary variables
-                # if common boundaries were found
-                if found_common:
-                    cell[k][j]['bndx'] = set1['bndx'][:set1['nx']]
-                    cell[k][j]['north_lim'] = set1['north_lim'][:set1['nx']]
-                    cell[k][j]['south_lim'] = set1['south_lim'][:set1['nx']]
-                    cell[k][j]['nx'] = set1['nx']
-                    
-                    cell[k][jj]['bndx'] = set2['bndx'][:set2['nx']]
-                    cell[k][jj]['north_lim'] = set2['north_lim'][:set2['nx']]
-                    cell[k][jj]['south_lim'] = set2['south_lim'][:set2['nx']]
-                    cell[k][jj]['nx'] = set2['nx']
-        
-        # Check neighbors in y direction
-        if k < Ny - 1:
-            kk = k + 1
-            
-            if cell[k][j]['ny'] != 0 and cell[kk][j]['ny'] != 0:
-                # Save information to temporary variables
-                set1 = {
-                    'ny': cell[k][j]['ny'],
-                    'bndy': cell[k][j]['bndy'].copy(),
-                    'east_lim': cell[k][j]['east_lim'].copy(),
-                    'west_lim': cell[k][j]['west_lim'].copy()
-                }
-                set2 = {
-                    'ny': cell[kk][j]['ny'],
-                    'bndy': cell[kk][j]['bndy'].copy(),
-                    'east_lim': cell[kk][j]['east_lim'].copy(),
-                    'west_lim': cell[kk][j]['west_lim'].copy()
-                }
-                found_common = False
-                
-                for l in range(set1['ny']):
-                    for m in range(set2['ny']):
-                        if set1['bndy'][l] == set2['bndy'][m]:
-                            seg1_len = set1['east_lim'][l] - set1['west_lim'][l]
-                            seg2_len = set2['east_lim'][m] - set2['west_lim'][m]
-                            
-                            if seg1_len >= seg2_len:
-                                set1['east_lim'][l] = max(set1['east_lim'][l], set2['east_lim'][m])
-                                set1['west_lim'][l] = min(set1['west_lim'][l], set2['west_lim'][m])
-                                # Remove from set2 by shifting
-                                for n in range(m + 1, set2['ny']):
-                                    set2['bndy'][n - 1] = set2['bndy'][n]
-                                    set2['east_lim'][n - 1] = set2['east_lim'][n]
-                                    set2['west_lim'][n - 1] = set2['west_lim'][n]
-                                set2['ny'] -= 1
-                            else:
-                                set2['east_lim'][m] = max(set1['east_lim'][l], set2['east_lim'][m])
-                                set2['west_lim'][m] = min(set1['west_lim'][l], set2['west_lim'][m])
-                                # Remove from set1 by shifting
-                                for n in range(l + 1, set1['ny']):
-                                    set1['bndy'][n - 1] = set1['bndy'][n]
-                                    set1['east_lim'][n - 1] = set1['east_lim'][n]
-                                    set1['west_lim'][n - 1] = set1['west_lim'][n]
-                                set1['ny'] -= 1
-                            
-                            found_common = True
-                            break
-                    
-                    if found_common:
-                        break
-                
-                # Write cell information back
-                if found_common:
-                    cell[k][j]['bndy'] = set1['bndy'][:set1['ny']]
-                    cell[k][j]['east_lim'] = set1['east_lim'][:set1['ny']]
-                    cell[k][j]['west_lim'] = set1['west_lim'][:set1['ny']]
-                    cell[k][j]['ny'] = set1['ny']
-                    
-                    cell[kk][j]['bndy'] = set2['bndy'][:set2['ny']]
-                    cell[kk][j]['east_lim'] = set2['east_lim'][:set2['ny']]
-                    cell[kk][j]['west_lim'] = set2['west_lim'][:set2['ny']]
-                    cell[kk][j]['ny'] = set2['ny']
-    
-    # Second loop: Remove overlapping segments within each cell
-    for indx_bnd in range(N_bnd):
-        j = column_bnd[indx_bnd]
-        k = row_bnd[indx_bnd]
-        
-        # Process x-direction segments
-        if cell[k][j]['nx'] > 1:
-            n_segs = cell[k][j]['nx']
-            baseseg_n = cell[k][j]['north_lim'].copy()
-            baseseg_s = cell[k][j]['south_lim'].copy()
-            cell[k][j]['north_lim'] = []
-            cell[k][j]['south_lim'] = []
-            ind_segs = 0
-            indseg_n = []
-            indseg_s = []
-            
-            while n_segs > 0:
-                overlap_found = False
-                if n_segs > 1:
-                    for l in range(1, n_segs):
-                        if baseseg_n[0] >= baseseg_s[l] and baseseg_s[0] <= baseseg_n[l]:
-                            # Overlap found, merge
-                            baseseg_n[0] = max(baseseg_n[0], baseseg_n[l])
-                            baseseg_s[0] = min(baseseg_s[0], baseseg_s[l])
-                            overlap_found = True
-                            # Remove segment l
-                            if l == n_segs - 1:
-                                n_segs -= 1
-                            else:
-                                for m in range(l + 1, n_segs):
-                                    baseseg_n[m - 1] = baseseg_n[m]
-                                    baseseg_s[m - 1] = baseseg_s[m]
-                                n_segs -= 1
-                            break
-                
-                if n_segs == 1:
-                    ind_segs += 1
-                    indseg_n.append(baseseg_n[0])
-                    indseg_s.append(baseseg_s[0])
-                    n_segs = 0
-                else:
-                    if not overlap_found:
-                        ind_segs += 1
-                        indseg_n.append(baseseg_n[0])
-                        indseg_s.append(baseseg_s[0])
-                        for l in range(1, n_segs):
-                            baseseg_n[l - 1] = baseseg_n[l]
-                            baseseg_s[l - 1] = baseseg_s[l]
-                        n_segs -= 1
-            
-            cell[k][j]['nx'] = ind_segs
-            cell[k][j]['north_lim'] = indseg_n
-            cell[k][j]['south_lim'] = indseg_s
-        
-        # Process y-direction segments
-        if cell[k][j]['ny'] > 1:
-            n_segs = cell[k][j]['ny']
-            baseseg_n = cell[k][j]['east_lim'].copy()
-            baseseg_s = cell[k][j]['west_lim'].copy()
-            cell[k][j]['east_lim'] = []
-            cell[k][j]['west_lim'] = []
-            ind_segs = 0
-            indseg_n = []
-            indseg_s = []
-            
-            while n_segs > 0:
-                overlap_found = False
-                if n_segs > 1:
-                    for l in range(1, n_segs):
-                        if baseseg_n[0] >= baseseg_s[l] and baseseg_s[0] <= baseseg_n[l]:
-                            baseseg_n[0] = max(baseseg_n[0], baseseg_n[l])
-                            baseseg_s[0] = min(baseseg_s[0], baseseg_s[l])
-                            overlap_found = True
-                            if l == n_segs - 1:
-                                n_segs -= 1
-                            else:
-                                for m in range(l + 1, n_segs):
-                                    baseseg_n[m - 1] = baseseg_n[m]
-                                    baseseg_s[m - 1] = baseseg_s[m]
-                                n_segs -= 1
-                            break
-                
-                if n_segs == 1:
-                    ind_segs += 1
-                    indseg_n.append(baseseg_n[0])
-                    indseg_s.append(baseseg_s[0])
-                    n_segs = 0
-                else:
-                    if not overlap_found:
-                        ind_segs += 1
-                        indseg_n.append(baseseg_n[0])
-                        indseg_s.append(baseseg_s[0])
-                        for l in range(1, n_segs):
-                            baseseg_n[l - 1] = baseseg_n[l]
-                            baseseg_s[l - 1] = baseseg_s[l]
-                        n_segs -= 1
-            
-            cell[k][j]['ny'] = ind_segs
-            cell[k][j]['east_lim'] = indseg_n
-            cell[k][j]['west_lim'] = indseg_s
-    
-    # Final loop: Construct obstruction grids accounting for neighboring cells
-    # Track statistics before neighbor check
-    sx_before_neighbor = np.zeros((Ny, Nx))
-    sy_before_neighbor = np.zeros((Ny, Nx))
-    cells_with_sx_before = 0
-    cells_with_sy_before = 0
-    cells_with_nx_but_no_sx = 0  # Cells with nx>0 but sx=0 (no_boundary=True or shadow removal)
-    cells_with_ny_but_no_sy = 0  # Cells with ny>0 but sy=0 (no_boundary=True or shadow removal)
-    
-    for indx_bnd in range(N_bnd):
-        j = column_bnd[indx_bnd]
-        k = row_bnd[indx_bnd]
-        
-        # Computing x obstruction
-        if cell[k][j]['nx'] != 0:
-            # MATLAB: n_segs = cell(k,j).nx;
-            # MATLAB: baseseg_n = cell(k,j).north_lim;
-            # MATLAB: baseseg_s = cell(k,j).south_lim;
-            n_segs = cell[k][j]['nx']
-            baseseg_n = np.array(cell[k][j]['north_lim'])
-            baseseg_s = np.array(cell[k][j]['south_lim'])
-            
-            no_boundary = False
-            
-            # Compare with left neighbors
-            for off in range(1, offset_left + 1):
-                jj = j - off
-                if jj >= 0:
-                    if cell[k][jj]['nx'] != 0:
-                        set1 = {
-                            'nx': cell[k][jj]['nx'],
-                            'north_lim': cell[k][jj]['north_lim'].copy(),
-                            'south_lim': cell[k][jj]['south_lim'].copy()
-                        }
-                        
-                        # Remove segments in shadow of previous cell
-                        shadow_flags = np.zeros(n_segs, dtype=bool)
-                        for m in range(n_segs):
-                            for l in range(set1['nx']):
-                                if (set1['north_lim'][l] >= baseseg_n[m] and
-                                    set1['south_lim'][l] <= baseseg_s[m]):
-                                    shadow_flags[m] = True
-                                    break
-                        
-                        loc = np.where(~shadow_flags)[0]
-                        if len(loc) == 0:
-                            no_boundary = True
-                            n_segs = 0
-                            baseseg_n = np.array([])
-                            baseseg_s = np.array([])
-                        elif len(loc) < n_segs:
-                            baseseg_n = baseseg_n[loc]
-                            baseseg_s = baseseg_s[loc]
-                            n_segs = len(baseseg_n)
-                        
-                        # Remove segments from previous cell that are shadows
-                        if not no_boundary:
-                            shadow_flags2 = np.zeros(set1['nx'], dtype=bool)
-                            for m in range(set1['nx']):
-                                for l in range(n_segs):
-                                    if (set1['north_lim'][m] <= baseseg_n[l] and
-                                        set1['south_lim'][m] >= baseseg_s[l]):
-                                        shadow_flags2[m] = True
-                                        break
-                            
-                            loc2 = np.where(~shadow_flags2)[0]
-                            if len(loc2) > 0 and len(loc2) < set1['nx']:
-                                set1['north_lim'] = [set1['north_lim'][idx] for idx in loc2]
-                                set1['south_lim'] = [set1['south_lim'][idx] for idx in loc2]
-                                set1['nx'] = len(loc2)
-                            
-                            # Add remaining segments from previous cell
-                            if set1['nx'] > 0:
-                                n_segs += set1['nx']
-                                baseseg_n = np.append(baseseg_n, set1['north_lim'])
-                                baseseg_s = np.append(baseseg_s, set1['south_lim'])
-            
-            # Compare with right neighbors
-            if not no_boundary:
-                for off in range(1, offset_right + 1):
-                    jj = j + off
-                    if jj < Nx:
-                        if cell[k][jj]['nx'] != 0:
-                            set1 = {
-                                'nx': cell[k][jj]['nx'],
-                                'north_lim': cell[k][jj]['north_lim'].copy(),
-                                'south_lim': cell[k][jj]['south_lim'].copy()
-                            }
-                            
-                            shadow_flags = np.zeros(n_segs, dtype=bool)
-                            for m in range(n_segs):
-                                for l in range(set1['nx']):
-                                    if (set1['north_lim'][l] >= baseseg_n[m] and
-                                        set1['south_lim'][l] <= baseseg_s[m]):
-                                        shadow_flags[m] = True
-                                        break
-                            
-                            loc = np.where(~shadow_flags)[0]
-                            if len(loc) == 0:
-                                no_boundary = True
-                                n_segs = 0
-                                baseseg_n = np.array([])
-                                baseseg_s = np.array([])
-                            elif len(loc) < n_segs:
-                                baseseg_n = baseseg_n[loc]
-                                baseseg_s = baseseg_s[loc]
-                                n_segs = len(baseseg_n)
-                            
-                            if not no_boundary:
-                                shadow_flags2 = np.zeros(set1['nx'], dtype=bool)
-                                for m in range(set1['nx']):
-                                    for l in range(n_segs):
-                                        if (set1['north_lim'][m] <= baseseg_n[l] and
-                                            set1['south_lim'][m] >= baseseg_s[l]):
-                                            shadow_flags2[m] = True
-                                            break
-                                
-                                loc2 = np.where(~shadow_flags2)[0]
-                                if len(loc2) > 0 and len(loc2) < set1['nx']:
-                                    set1['north_lim'] = [set1['north_lim'][idx] for idx in loc2]
-                                    set1['south_lim'] = [set1['south_lim'][idx] for idx in loc2]
-                                    set1['nx'] = len(loc2)
-                                
-                                if set1['nx'] > 0:
-                                    n_segs += set1['nx']
-                                    baseseg_n = np.append(baseseg_n, set1['north_lim'])
-                                    baseseg_s = np.append(baseseg_s, set1['south_lim'])
-            
-            # Build obstruction grid from total set of segments
-            if not no_boundary:
-                # MATLAB: sx(k,j) is initialized to 0, so we start from 0
-                sx[k, j] = 0.0
-                
-                if n_segs == 1:
-                    sx[k, j] = baseseg_n[0] - baseseg_s[0]
-                else:
-                    # Remove overlapping segments
-                    ind_segs = 0
-                    indseg_n = []
-                    indseg_s = []
-                    
-                    # Convert to list for easier manipulation
-                    baseseg_n_list = baseseg_n.tolist() if isinstance(baseseg_n, np.ndarray) else list(baseseg_n)
-                    baseseg_s_list = baseseg_s.tolist() if isinstance(baseseg_s, np.ndarray) else list(baseseg_s)
-                    n_segs = len(baseseg_n_list)
-                    
-                    while n_segs > 0:
-                        overlap_found = False
-                        if n_segs > 1:
-                            for l in range(1, n_segs):
-                                if baseseg_n_list[0] >= baseseg_s_list[l] and baseseg_s_list[0] <= baseseg_n_list[l]:
-                                    # Overlap found, merge
-                                    baseseg_n_list[0] = max(baseseg_n_list[0], baseseg_n_list[l])
-                                    baseseg_s_list[0] = min(baseseg_s_list[0], baseseg_s_list[l])
-                                    overlap_found = True
-                                    # Remove segment l
-                                    if l == n_segs - 1:
-                                        n_segs -= 1
-                                    else:
-                                        for m in range(l + 1, n_segs):
-                                            baseseg_n_list[m - 1] = baseseg_n_list[m]
-                                            baseseg_s_list[m - 1] = baseseg_s_list[m]
-                                        n_segs -= 1
-                                    break
-                        
-                        if n_segs == 1:
-                            ind_segs += 1
-                            indseg_n.append(baseseg_n_list[0])
-                            indseg_s.append(baseseg_s_list[0])
-                            n_segs = 0
-                        else:
-                            if not overlap_found:
-                                ind_segs += 1
-                                indseg_n.append(baseseg_n_list[0])
-                                indseg_s.append(baseseg_s_list[0])
-                                for l in range(1, n_segs):
-                                    baseseg_n_list[l - 1] = baseseg_n_list[l]
-                                    baseseg_s_list[l - 1] = baseseg_s_list[l]
-                                n_segs -= 1
-                    
-                    # Compute obstruction values from independent segments
-                    # MATLAB: for l = 1:ind_segs, sx(k,j) = sx(k,j) + (indseg_n(l)-indseg_s(l)); end
-                    for l in range(ind_segs):
-                        sx[k, j] += (indseg_n[l] - indseg_s[l])
-                    
-                    # Clamp to [0, 1] range (MATLAB doesn't explicitly clamp, but values should be in [0,1])
-                    sx[k, j] = max(0.0, min(1.0, sx[k, j]))
-            
-            # Record value before neighbor check (regardless of no_boundary)
-            sx_before_neighbor[k, j] = sx[k, j]
-            if sx[k, j] > 0:
-                cells_with_sx_before += 1
-            elif cell[k][j]['nx'] > 0:
-                # Cell has boundary segments but sx=0 (likely due to shadow removal or no_boundary)
-                cells_with_nx_but_no_sx += 1
-        
-        # Computing y obstruction (similar to x)
-        if cell[k][j]['ny'] != 0:
-            # MATLAB: n_segs = cell(k,j).ny;
-            # MATLAB: baseseg_n = cell(k,j).east_lim;
-            # MATLAB: baseseg_s = cell(k,j).west_lim;
-            n_segs = cell[k][j]['ny']
-            baseseg_n = np.array(cell[k][j]['east_lim'])
-            baseseg_s = np.array(cell[k][j]['west_lim'])
-            
-            no_boundary = False
-            
-            # Compare with bottom neighbors
-            for off in range(1, offset_left + 1):
-                kk = k - off
-                if kk >= 0:
-                    if cell[kk][j]['ny'] != 0:
-                        set1 = {
-                            'ny': cell[kk][j]['ny'],
-                            'east_lim': cell[kk][j]['east_lim'].copy(),
-                            'west_lim': cell[kk][j]['west_lim'].copy()
-                        }
-                        
-                        shadow_flags = np.zeros(n_segs, dtype=bool)
-                        for m in range(n_segs):
-                            for l in range(set1['ny']):
-                                if (set1['east_lim'][l] >= baseseg_n[m] and
-                                    set1['west_lim'][l] <= baseseg_s[m]):
-                                    shadow_flags[m] = True
-                                    break
-                        
-                        loc = np.where(~shadow_flags)[0]
-                        if len(loc) == 0:
-                            no_boundary = True
-                            n_segs = 0
-                            baseseg_n = np.array([])
-                            baseseg_s = np.array([])
-                        elif len(loc) < n_segs:
-                            baseseg_n = baseseg_n[loc]
-                            baseseg_s = baseseg_s[loc]
-                            n_segs = len(baseseg_n)
-                        
-                        if not no_boundary:
-                            shadow_flags2 = np.zeros(set1['ny'], dtype=bool)
-                            for m in range(set1['ny']):
-                                for l in range(n_segs):
-                                    if (set1['east_lim'][m] <= baseseg_n[l] and
-                                        set1['west_lim'][m] >= baseseg_s[l]):
-                                        shadow_flags2[m] = True
-                                        break
-                            
-                            loc2 = np.where(~shadow_flags2)[0]
-                            if len(loc2) > 0 and len(loc2) < set1['ny']:
-                                set1['east_lim'] = [set1['east_lim'][idx] for idx in loc2]
-                                set1['west_lim'] = [set1['west_lim'][idx] for idx in loc2]
-                                set1['ny'] = len(loc2)
-                            
-                            if set1['ny'] > 0:
-                                n_segs += set1['ny']
-                                baseseg_n = np.append(baseseg_n, set1['east_lim'])
-                                baseseg_s = np.append(baseseg_s, set1['west_lim'])
-            
-            # Compare with top neighbors
-            if not no_boundary:
-                for off in range(1, offset_right + 1):
-                    kk = k + off
-                    if kk < Ny:
-                        if cell[kk][j]['ny'] != 0:
-                            set1 = {
-                                'ny': cell[kk][j]['ny'],
-                                'east_lim': cell[kk][j]['east_lim'].copy(),
-                                'west_lim': cell[kk][j]['west_lim'].copy()
-                            }
-                            
-                            shadow_flags = np.zeros(n_segs, dtype=bool)
-                            for m in range(n_segs):
-                                for l in range(set1['ny']):
-                                    if (set1['east_lim'][l] >= baseseg_n[m] and
-                                        set1['west_lim'][l] <= baseseg_s[m]):
-                                        shadow_flags[m] = True
-                                        break
-                            
-                            loc = np.where(~shadow_flags)[0]
-                            if len(loc) == 0:
-                                no_boundary = True
-                                n_segs = 0
-                                baseseg_n = np.array([])
-                                baseseg_s = np.array([])
-                            elif len(loc) < n_segs:
-                                baseseg_n = baseseg_n[loc]
-                                baseseg_s = baseseg_s[loc]
-                                n_segs = len(baseseg_n)
-                            
-                            if not no_boundary:
-                                shadow_flags2 = np.zeros(set1['ny'], dtype=bool)
-                                for m in range(set1['ny']):
-                                    for l in range(n_segs):
-                                        if (set1['east_lim'][m] <= baseseg_n[l] and
-                                            set1['west_lim'][m] >= baseseg_s[l]):
-                                            shadow_flags2[m] = True
-                                            break
-                                
-                                loc2 = np.where(~shadow_flags2)[0]
-                                if len(loc2) > 0 and len(loc2) < set1['ny']:
-                                    set1['east_lim'] = [set1['east_lim'][idx] for idx in loc2]
-                                    set1['west_lim'] = [set1['west_lim'][idx] for idx in loc2]
-                                    set1['ny'] = len(loc2)
-                                
-                                if set1['ny'] > 0:
-                                    n_segs += set1['ny']
-                                    baseseg_n = np.append(baseseg_n, set1['east_lim'])
-                                    baseseg_s = np.append(baseseg_s, set1['west_lim'])
-            
-            # Build obstruction grid
-            if not no_boundary:
-                # MATLAB: sy(k,j) is initialized to 0, so we start from 0
-                sy[k, j] = 0.0
-                
-                if n_segs == 1:
-                    sy[k, j] = baseseg_n[0] - baseseg_s[0]
-                else:
-                    ind_segs = 0
-                    indseg_n = []
-                    indseg_s = []
-                    
-                    # Convert to list for easier manipulation
-                    baseseg_n_list = baseseg_n.tolist() if isinstance(baseseg_n, np.ndarray) else list(baseseg_n)
-                    baseseg_s_list = baseseg_s.tolist() if isinstance(baseseg_s, np.ndarray) else list(baseseg_s)
-                    n_segs = len(baseseg_n_list)
-                    
-                    while n_segs > 0:
-                        overlap_found = False
-                        if n_segs > 1:
-                            for l in range(1, n_segs):
-                                if baseseg_n_list[0] >= baseseg_s_list[l] and baseseg_s_list[0] <= baseseg_n_list[l]:
-                                    baseseg_n_list[0] = max(baseseg_n_list[0], baseseg_n_list[l])
-                                    baseseg_s_list[0] = min(baseseg_s_list[0], baseseg_s_list[l])
-                                    overlap_found = True
-                                    if l == n_segs - 1:
-                                        n_segs -= 1
-                                    else:
-                                        for m in range(l + 1, n_segs):
-                                            baseseg_n_list[m - 1] = baseseg_n_list[m]
-                                            baseseg_s_list[m - 1] = baseseg_s_list[m]
-                                        n_segs -= 1
-                                    break
-                        
-                        if n_segs == 1:
-                            ind_segs += 1
-                            indseg_n.append(baseseg_n_list[0])
-                            indseg_s.append(baseseg_s_list[0])
-                            n_segs = 0
-                        else:
-                            if not overlap_found:
-                                ind_segs += 1
-                                indseg_n.append(baseseg_n_list[0])
-                                indseg_s.append(baseseg_s_list[0])
-                                for l in range(1, n_segs):
-                                    baseseg_n_list[l - 1] = baseseg_n_list[l]
-                                    baseseg_s_list[l - 1] = baseseg_s_list[l]
-                                n_segs -= 1
-                    
-                    # MATLAB: for l = 1:ind_segs, sy(k,j) = sy(k,j) + indseg_n(l)-indseg_s(l); end
-                    for l in range(ind_segs):
-                        sy[k, j] += (indseg_n[l] - indseg_s[l])
-                    
-                    # Clamp to [0, 1] range
-                    sy[k, j] = max(0.0, min(1.0, sy[k, j]))
-            
-            # Record value before neighbor check (regardless of no_boundary)
-            sy_before_neighbor[k, j] = sy[k, j]
-            if sy[k, j] > 0:
-                cells_with_sy_before += 1
-            elif cell[k][j]['ny'] > 0:
-                # Cell has boundary segments but sy=0 (likely due to shadow removal or no_boundary)
-                cells_with_ny_but_no_sy += 1
-        
-        # Setting the obstruction grid to zero if neighboring cells are dry
-        # MATLAB: if (j < Nx && mask(k,j+1) == 0), sx(k,j) = 0; end
-        # MATLAB: if (j > 1 && mask(k,j-1) == 0), sx(k,j) = 0; end
-        # MATLAB: if (k < Ny && mask(k+1,j) == 0), sy(k,j) = 0; end
-        # MATLAB: if (k > 1 && mask(k-1,j) == 0), sy(k,j) = 0; end
-        if j < Nx - 1 and mask[k, j + 1] == 0:
-            sx[k, j] = 0
-        if j > 0 and mask[k, j - 1] == 0:
-            sx[k, j] = 0
-        if k < Ny - 1 and mask[k + 1, j] == 0:
-            sy[k, j] = 0
-        if k > 0 and mask[k - 1, j] == 0:
-            sy[k, j] = 0
-    
-    # Debug: Print statistics about obstruction values
-    sx_nonzero = sx[sx > 0]
-    sy_nonzero = sy[sy > 0]
-    sx_before_nonzero = sx_before_neighbor[sx_before_neighbor > 0]
-    sy_before_nonzero = sy_before_neighbor[sy_before_neighbor > 0]
-    total_wet = np.sum(mask != 0)
-    total_cells = Nx * Ny
-    
-    # Count how many were zeroed by neighbor check
-    sx_zeroed_by_neighbor = np.sum((sx_before_neighbor > 0) & (sx == 0))
-    sy_zeroed_by_neighbor = np.sum((sy_before_neighbor > 0) & (sy == 0))
-    
+    seg_k = np.array(seg_k, dtype=np.int64)
+    seg_j = np.array(seg_j, dtype=np.int64)
+    seg_poly = np.array(seg_poly, dtype=np.int64)
+    
+    # Move boundary segments that are part of the same boundary and cross
+    # neighbouring cells: x segments (south/north limits) along rows,
+    # y segments (west/east limits) along columns
+    xj, xk, x_lo, x_hi = _merge_common_boundaries(seg_j, seg_k, seg_poly,
+                                                  np.array(seg_s, dtype=np.float64),
+                                                  np.array(seg_n, dtype=np.float64))
+    yk, yj, y_lo, y_hi = _merge_common_boundaries(seg_k, seg_j, seg_poly,
+                                                  np.array(seg_w, dtype=np.float64),
+                                                  np.array(seg_e, dtype=np.float64))
+    
+    # Remove overlapping segments within each cell
+    x_cell, x_lo, x_hi = _interval_union(xk * Nx + xj, x_lo, x_hi)
+    y_cell, y_lo, y_hi = _interval_union(yk * Nx + yj, y_lo, y_hi)
+    
+    # Construct obstruction grids accounting for neighboring cells
+    # (left/right neighbours in x, bottom/top neighbours in y)
+    cols = np.tile(np.arange(Nx), Ny)
+    rows = np.repeat(np.arange(Ny), Nx)
+    x_neighbours = ([(-off, cols - off >= 0) for off in range(1, offset_left + 1)] +
+                    [(off, cols + off < Nx) for off in range(1, offset_right + 1)])
+    y_neighbours = ([(-off * Nx, rows - off >= 0) for off in range(1, offset_left + 1)] +
+                    [(off * Nx, rows + off < Ny) for off in range(1, offset_right + 1)])
+    sx = _obstruction(x_cell, x_lo, x_hi, Nb, x_neighbours).reshape(Ny, Nx)
+    sy = _obstruction(y_cell, y_lo, y_hi, Nb, y_neighbours).reshape(Ny, Nx)
+    
+    # Setting the obstruction grid to zero if neighboring cells are dry
+    dry = mask == 0
+    sx[dry] = 0
+    sy[dry] = 0
+    sx[:, :-1][dry[:, 1:]] = 0
+    sx[:, 1:][dry[:, :-1]] = 0
+    sy[:-1, :][dry[1:, :]] = 0
+    sy[1:, :][dry[:-1, :]] = 0
     
     return sx, sy
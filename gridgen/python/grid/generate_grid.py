@@ -18,9 +18,16 @@ import netCDF4
 import numpy as np
 
 try:
-    from ..utils.compute_cellcorner import compute_cellcorner
+    from ..utils.cell_binning import CellStats, CurvBinner
+    from ..utils.compute_cellcorner import compute_cellcorners
+    from ..utils.progress import report_progress
 except ImportError:
-    from utils.compute_cellcorner import compute_cellcorner
+    from utils.cell_binning import CellStats, CurvBinner
+    from utils.compute_cellcorner import compute_cellcorners
+    from utils.progress import report_progress
+
+# Number of base bathymetry nodes binned at a time for curvilinear grids
+CURV_CHUNK_NODES = 4000000
 
 
 def generate_grid(type_grid, x, y, ref_dir, bathy_source, limit, cut_off, dry, *args):
@@ -115,23 +122,12 @@ def generate_grid(type_grid, x, y, ref_dir, bathy_source, limit, cut_off, dry, *
     # Compute cell corners
     Ny, Nx = x.shape
     
-    # Create cell structure (list of lists of dicts)
-    cell = [[{'px': None, 'py': None, 'width': None, 'height': None}
-             for _ in range(Nx)] for _ in range(Ny)]
-    
-    for j in range(1, Nx + 1):
-        for k in range(1, Ny + 1):
-            c1, c2, c3, c4, wdth, hgt = compute_cellcorner(x, y, j, k, Nx, Ny)
-            cell[k - 1][j - 1]['px'] = np.array([c4[0], c1[0], c2[0], c3[0], c4[0]])
-            cell[k - 1][j - 1]['py'] = np.array([c4[1], c1[1], c2[1], c3[1], c4[1]])
-            cell[k - 1][j - 1]['width'] = wdth
-            cell[k - 1][j - 1]['height'] = hgt
+    # Cell corners (4, Ny, Nx) and cell sizes, computed for all cells at once
+    cell_cx, cell_cy, cell_widths, cell_heights = compute_cellcorners(x, y)
     
     # Get maximum cell dimensions
-    all_widths = [cell[k][j]['width'] for k in range(Ny) for j in range(Nx)]
-    all_heights = [cell[k][j]['height'] for k in range(Ny) for j in range(Nx)]
-    dx = max(all_widths)
-    dy = max(all_heights)
+    dx = float(np.max(cell_widths))
+    dy = float(np.max(cell_heights))
     
     # Determine dimensions and ranges of base bathymetry coords
     fname_base = os.path.join(ref_dir, f'{bathy_input}.nc')
@@ -360,13 +356,11 @@ def generate_grid(type_grid, x, y, ref_dir, bathy_source, limit, cut_off, dry, *
         
         print('Generating grid bathymetry ....', flush=True)
         
-        # Pre-compute cell properties as numpy arrays for vectorization
-        cell_widths = np.array([[cell[k][j]['width'] for j in range(Nx)] for k in range(Ny)])
-        cell_heights = np.array([[cell[k][j]['height'] for j in range(Nx)] for k in range(Ny)])
-        cell_px_min = np.array([[np.min(cell[k][j]['px']) for j in range(Nx)] for k in range(Ny)])
-        cell_px_max = np.array([[np.max(cell[k][j]['px']) for j in range(Nx)] for k in range(Ny)])
-        cell_py_min = np.array([[np.min(cell[k][j]['py']) for j in range(Nx)] for k in range(Ny)])
-        cell_py_max = np.array([[np.max(cell[k][j]['py']) for j in range(Nx)] for k in range(Ny)])
+        # Bounding box of each cell from its corners
+        cell_px_min = cell_cx.min(axis=0)
+        cell_px_max = cell_cx.max(axis=0)
+        cell_py_min = cell_cy.min(axis=0)
+        cell_py_max = cell_cy.max(axis=0)
         
         # Pre-compute ndx and ndy for all cells
         ndx_all = np.round(cell_widths / dx_base).astype(int)
@@ -430,6 +424,7 @@ def generate_grid(type_grid, x, y, ref_dir, bathy_source, limit, cut_off, dry, *
         
         n_interp = np.sum(interp_mask)
         print(f'  Completed {n_interp} interpolation cells', flush=True)
+        report_progress(n_interp, Nb, 'generate_grid')
         
         # ============================================================
         # Process averaging cells (need loop due to variable slice sizes)
@@ -437,7 +432,31 @@ def generate_grid(type_grid, x, y, ref_dir, bathy_source, limit, cut_off, dry, *
         avg_mask = ~interp_mask
         n_avg = np.sum(avg_mask)
         
-        if n_avg > 0:
+        if n_avg > 0 and type_grid == 'curv':
+            # Curvilinear cells are not aligned with the base grid, so their
+            # bounding boxes overlap: base nodes are assigned to the nearest
+            # cell centre through a KD-tree and averaged with bincount instead
+            print(f'  Processing {n_avg} averaging cells (KD-tree)...', flush=True)
+            binner = CurvBinner(x, y, dx, dy)
+            stats = CellStats(Nb)
+            lon_grid_base = np.asarray(lon_base, dtype=np.float64)
+            rows_per_chunk = max(1, CURV_CHUNK_NODES // max(1, lon_grid_base.size))
+            for r0 in range(0, len(lat_base), rows_per_chunk):
+                lat_rows = np.asarray(lat_base[r0:r0 + rows_per_chunk], dtype=np.float64)
+                z_rows = np.ma.filled(depth_base[r0:r0 + rows_per_chunk, :].astype(np.float64), np.nan)
+                lon_nodes, lat_nodes = np.meshgrid(lon_grid_base, lat_rows)
+                valid = np.isfinite(z_rows)
+                stats.add(binner, lon_nodes[valid], lat_nodes[valid], z_rows[valid], cut_off)
+                rows_done = min(r0 + rows_per_chunk, len(lat_base))
+                print(f'Completed {int(rows_done / len(lat_base) * 100)} '
+                      f'per cent of the base rows', flush=True)
+                report_progress(n_interp + n_avg * rows_done / len(lat_base), Nb, 'generate_grid')
+            
+            # Same wet-fraction rule as the loop below
+            wet_flat = stats.wet_cells(limit) & avg_mask.ravel()
+            depth_sub[avg_mask] = dry
+            depth_sub[wet_flat.reshape(Ny, Nx)] = stats.wet_mean(wet_flat)
+        elif n_avg > 0:
             print(f'  Processing {n_avg} averaging cells...', flush=True)
             avg_k, avg_j = np.where(avg_mask)
             
@@ -480,6 +499,7 @@ def generate_grid(type_grid, x, y, ref_dir, bathy_source, limit, cut_off, dry, *
                     last_progress = (progress // 5) * 5
                     total_progress = int((n_interp + idx + 1) / Nb * 100)
                     print(f'Completed {total_progress} per cent of the cells', flush=True)
+                    report_progress(n_interp + idx + 1, Nb, 'generate_grid')
         
         print('Completed 100 per cent of the cells', flush=True)
     
@@ -0,0 +1,155 @@
+"""
+Grid Difference Statistics
+
+Compare two WAVEWATCH III grids (e.g. a Python gridgen result against a
+MATLAB reference grid) with array operations: wet/dry flips, depth errors
+on the cells wet in both grids, obstruction differences and per-tile hot
+spots. Replaces the Python 2 compare_*_glob_30m.py / read_slope.py scripts
+of the MATLAB distribution.
+
+Last Update: 2025
+"""
+
+import numpy as np
+
+
+def _rms(a):
+    return float(np.sqrt(np.mean(np.square(a)))) if a.size else 0.0
+
+
+def _coords_2d(meta):
+    """Cell centre longitudes/latitudes as 2D arrays for RECT and CURV grids."""
+    lon = np.asarray(meta['lon'], dtype=np.float64)
+    lat = np.asarray(meta['lat'], dtype=np.float64)
+    if lon.ndim == 1:
+        return np.meshgrid(lon, lat)
+    return lon, lat
+
+
+def diff_grids(a, b, tile=32, top=10):
+    """
+    Difference statistics between two grids.
+
+    Parameters
+    ----------
+    a, b : dict
+        Grids as returned by load_grid (b is compared against a)
+    tile : int
+        Size in cells of the square tiles used for the hot spot ranking
+    top : int
+        Number of hot spot tiles reported
+
+    Returns
+    -------
+    report : dict
+        JSON-serialisable report with 'mask', 'depth', 'obstruction',
+        'coordinates' and 'hot_spots' sections. When the grid dimensions
+        differ only 'shape_a'/'shape_b' and 'error' are filled in
+    """
+    shape_a = a['mask'].shape
+    shape_b = b['mask'].shape
+    report = {'shape_a': list(shape_a), 'shape_b': list(shape_b)}
+    if shape_a != shape_b:
+        report['error'] = 'grid dimensions differ'
+        return report
+    ny, nx = shape_a
+
+    meta_a = a['meta']
+    lon_a, lat_a = _coords_2d(meta_a)
+    lon_b, lat_b = _coords_2d(b['meta'])
+    report['coordinates'] = {
+        'lon_max_diff': float(np.max(np.abs(lon_b - lon_a))),
+        'lat_max_diff': float(np.max(np.abs(lat_b - lat_a))),
+    }
+
+    # Land-sea mask: every non-zero value (1 sea, 2 boundary, 3 excluded) is wet
+    wet_a = a['mask'] != 0
+    wet_b = b['mask'] != 0
+    wet_to_dry = wet_a & ~wet_b
+    dry_to_wet = ~wet_a & wet_b
+    flips = wet_to_dry | dry_to_wet
+    report['mask'] = {
+        'cells': int(nx * ny),
+        'wet_a': int(np.sum(wet_a)),
+        'wet_b': int(np.sum(wet_b)),
+        'wet_to_dry': int(np.sum(wet_to_dry)),
+        'dry_to_wet': int(np.sum(dry_to_wet)),
+        'value_changed': int(np.sum(a['mask'] != b['mask'])),
+        'flip_fraction': float(np.sum(flips)) / max(1, nx * ny),
+    }
+
+    # Depth on the cells wet in both grids
+    both = wet_a & wet_b
+    err = np.where(both, b['depth'] - a['depth'], 0.0)
+    e = err[both]
+    depth = {
+        'compared': int(e.size),
+        'rmse': _rms(e),
+        'mae': float(np.mean(np.abs(e))) if e.size else 0.0,
+        'bias': float(np.mean(e)) if e.size else 0.0,
+        'max_abs': float(np.max(np.abs(e))) if e.size else 0.0,
+    }
+    if depth['max_abs'] > 0:
+        j, i = np.unravel_index(int(np.argmax(np.abs(err))), err.shape)
+        depth['max_abs_at'] = {'row': int(j), 'col': int(i),
+                               'lon': float(lon_a[j, i]), 'lat': float(lat_a[j, i])}
+    report['depth'] = depth
+
+    if a['sx'] is not None and b['sx'] is not None:
+        report['obstruction'] = {
+            'sx_rmse': _rms(b['sx'] - a['sx']),
+            'sy_rmse': _rms(b['sy'] - a['sy']),
+            'sx_changed': int(np.sum(b['sx'] != a['sx'])),
+            'sy_changed': int(np.sum(b['sy'] != a['sy'])),
+        }
+
+    # Hot spots: flips and depth error accumulated per tile with bincount
+    tile = max(1, int(tile))
+    ntx = (nx + tile - 1) // tile
+    nty = (ny + tile - 1) // tile
+    rows, cols = np.indices((ny, nx))
+    tile_id = ((rows // tile) * ntx + cols // tile).ravel()
+    n_tiles = ntx * nty
+    tile_flips = np.bincount(tile_id, weights=flips.ravel(), minlength=n_tiles)
+    tile_sq = np.bincount(tile_id, weights=np.square(err).ravel(), minlength=n_tiles)
+    tile_n = np.bincount(tile_id, weights=both.ravel(), minlength=n_tiles)
+    tile_rmse = np.sqrt(tile_sq / np.maximum(tile_n, 1))
+
+    order = np.lexsort((-tile_rmse, -tile_flips))
+    hot_spots = []
+    for t in order[:max(0, int(top))]:
+        if tile_flips[t] == 0 and tile_rmse[t] == 0:
+            break
+        ty, tx = divmod(int(t), ntx)
+        r0, c0 = ty * tile, tx * tile
+        r1, c1 = min(r0 + tile, ny) - 1, min(c0 + tile, nx) - 1
+        jc, ic = (r0 + r1) // 2, (c0 + c1) // 2
+        hot_spots.append({
+            'rows': [r0, r1],
+            'cols': [c0, c1],
+            'lon': float(lon_a[jc, ic]),
+            'lat': float(lat_a[jc, ic]),
+            'flips': int(tile_flips[t]),
+            'depth_rmse': float(tile_rmse[t]),
+        })
+    report['hot_spots'] = hot_spots
+    return report
+
+
+def fill_nan_neighbours(a):
+    """
+    Replace NaN cells by the mean of their non-NaN 4-neighbours.
+
+    Vectorized version of the per-cell loop in read_slope.py. Cells whose
+    four neighbours are all NaN stay NaN.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    padded = np.pad(a, 1, constant_values=np.nan)
+    neighbours = np.stack([padded[:-2, 1:-1], padded[2:, 1:-1], padded[1:-1, :-2], padded[1:-1, 2:]])
+    valid = ~np.isnan(neighbours)
+    count = valid.sum(axis=0)
+    total = np.where(valid, neighbours, 0.0).sum(axis=0)
+    out = a.copy()
+    fill = np.isnan(a) & (count > 0)
+    out[fill] = total[fill] / count[fill]
+    return out
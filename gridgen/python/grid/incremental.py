@@ -0,0 +1,203 @@
+"""
+Incremental Grid Regeneration
+
+Reuse a previously generated rectilinear grid when a new grid lies on the
+same lattice (same dx/dy, origin shifted by whole cells), e.g. after the
+domain extent was nudged by a few cells. The overlapping block of depth,
+land-sea mask and obstruction arrays is copied from the saved state and
+only the newly exposed strips, plus a halo of cells along the old edges
+and along new edges that cut through the old grid, are computed again. Lake removal, which depends on the connectivity of the
+whole grid, is always rerun; obstructions are recomputed wherever the
+final mask of the overlap changed.
+
+The state of a grid is written by create_grid as <fname>_state.npz next to
+the text files, together with a signature of the inputs (reference files
+and parameters) that must match for the state to be reused.
+
+Last Update: 2025
+"""
+
+import json
+import os
+
+import numpy as np
+from scipy import ndimage
+
+STATE_SUFFIX = '_state.npz'
+STATE_VERSION = 1
+
+# Parameters that change the cell values of a grid (the extent excluded)
+SIGNATURE_PARAMS = ('ref_grid', 'boundary', 'read_boundary', 'opt_poly', 'DRY_VAL', 'CUT_OFF',
+                    'LIM_BATHY', 'LIM_VAL', 'OFFSET', 'OBSTR_OFFSET', 'MIN_DIST', 'SPLIT_LIM')
+
+
+def state_signature(params, files):
+    """
+    Signature of the grid inputs: parameters and reference file stamps.
+
+    Parameters
+    ----------
+    params : dict
+        create_grid parameters
+    files : list of str
+        Reference files used (bathymetry, boundary polygons, polygon flags)
+    """
+    sig = {k: params.get(k) for k in SIGNATURE_PARAMS}
+    stamps = []
+    for f in files:
+        if f and os.path.exists(f):
+            st = os.stat(f)
+            stamps.append([os.path.abspath(f).replace("\\", "/"), st.st_size, int(st.st_mtime)])
+    sig['files'] = stamps
+    return json.dumps(sig, sort_keys=True)
+
+
+def save_grid_state(fname, lon1d, lat1d, signature, depth, mask_clean, mask, sx, sy):
+    """
+    Write the state used for incremental regeneration.
+
+    depth, sx and sy are the scaled integers written to the .bot/.obst
+    files, mask_clean is the mask before lake removal and mask the final
+    mask, so a reused block reproduces the text files exactly.
+    """
+    depth = np.asarray(depth)
+    depth_type = np.int32 if np.max(np.abs(depth)) < 2 ** 31 else np.int64
+    np.savez(fname, version=STATE_VERSION, signature=signature, lon=lon1d, lat=lat1d,
+             depth=depth.astype(depth_type), mask_clean=np.asarray(mask_clean, dtype=np.int8),
+             mask=np.asarray(mask, dtype=np.int8), sx=np.asarray(sx, dtype=np.int16),
+             sy=np.asarray(sy, dtype=np.int16))
+
+
+def load_grid_state(fname, signature):
+    """Read a saved state; None if missing, unreadable or made from other inputs."""
+    if not os.path.exists(fname):
+        return None
+    try:
+        with np.load(fname) as data:
+            if int(data['version']) != STATE_VERSION or str(data['signature']) != signature:
+                return None
+            return {k: data[k] for k in ('lon', 'lat', 'depth', 'mask_clean', 'mask', 'sx', 'sy')}
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _axis_overlap(old, new, tol):
+    """Index ranges of the common points of two equally spaced axes."""
+    if old.size < 2 or new.size < 2:
+        return None
+    step = old[1] - old[0]
+    if abs((new[1] - new[0]) - step) > tol:
+        return None
+    shift = (new[0] - old[0]) / step
+    k = int(round(shift))
+    if abs(shift - k) * abs(step) > tol:
+        return None
+    # new[i] == old[i + k]
+    i0 = max(0, -k)
+    i1 = min(new.size, old.size - k)
+    if i1 <= i0:
+        return None
+    if np.max(np.abs(new[i0:i1] - old[i0 + k:i1 + k])) > tol:
+        return None
+    return slice(i0, i1), slice(i0 + k, i1 + k)
+
+
+def lattice_overlap(state, lon1d, lat1d, tol=1e-6):
+    """
+    Overlap of a new grid with a saved grid on the same lattice.
+
+    Returns
+    -------
+    (new_rows, new_cols), (old_rows, old_cols) : tuples of slices
+        The common block in the new and the old grid, or None when the grids
+        are not on the same lattice or do not overlap
+    """
+    cols = _axis_overlap(np.asarray(state['lon']), np.asarray(lon1d), tol)
+    rows = _axis_overlap(np.asarray(state['lat']), np.asarray(lat1d), tol)
+    if cols is None or rows is None:
+        return None
+    return (rows[0], cols[0]), (rows[1], cols[1])
+
+
+def strip_regions(shape, overlap, halo, old_shape, old_overlap):
+    """
+    Rectangles covering every cell outside the overlap shrunk by `halo`.
+
+    The overlap is shrunk along every side where it ends at an edge of
+    only one of the two grids: an old edge inside the new grid (cells
+    there miss their new neighbours) or a new edge inside the old grid
+    (cells there were interior cells, their corners and obstruction
+    neighbours change at the new edge). `halo` must therefore be at least
+    OBSTR_OFFSET + 1.
+
+    Returns a list of (rows, cols) slices (at most four strips), or None
+    when nothing of the overlap would be kept.
+    """
+    ny, nx = shape
+    old_ny, old_nx = old_shape
+    rows, cols = overlap
+    old_rows, old_cols = old_overlap
+    # Sides where the overlap ends at an edge shared by both grids are kept
+    r0 = rows.start + (0 if rows.start == 0 and old_rows.start == 0 else halo)
+    r1 = rows.stop - (0 if rows.stop == ny and old_rows.stop == old_ny else halo)
+    c0 = cols.start + (0 if cols.start == 0 and old_cols.start == 0 else halo)
+    c1 = cols.stop - (0 if cols.stop == nx and old_cols.stop == old_nx else halo)
+    if r1 <= r0 or c1 <= c0:
+        return None
+    regions = []
+    if r0 > 0:
+        regions.append((slice(0, r0), slice(0, nx)))
+    if r1 < ny:
+        regions.append((slice(r1, ny), slice(0, nx)))
+    if c0 > 0:
+        regions.append((slice(r0, r1), slice(0, c0)))
+    if c1 < nx:
+        regions.append((slice(r0, r1), slice(c1, nx)))
+    return regions
+
+
+def changed_regions(changed, halo):
+    """Bounding rectangles of the changed cells dilated by `halo`."""
+    if not np.any(changed):
+        return []
+    grown = ndimage.binary_dilation(changed, iterations=max(1, int(halo)))
+    labels, _ = ndimage.label(grown)
+    return [tuple(sl) for sl in ndimage.find_objects(labels) if sl is not None]
+
+
+def pad_region(region, shape, pad):
+    """Region grown by `pad` cells (clipped to the grid) and the slices of
+    the original region inside the grown one."""
+    rows, cols = region
+    ny, nx = shape
+    pr = slice(max(0, rows.start - pad), min(ny, rows.stop + pad))
+    pc = slice(max(0, cols.start - pad), min(nx, cols.stop + pad))
+    inner = (slice(rows.start - pr.start, rows.stop - pr.start),
+             slice(cols.start - pc.start, cols.stop - pc.start))
+    return (pr, pc), inner
+
+
+def bound_in_box(bound, lon, lat, margin):
+    """Boundary polygons whose bounding box meets the extent of lon/lat."""
+    west, east = np.min(lon) - margin, np.max(lon) + margin
+    south, north = np.min(lat) - margin, np.max(lat) + margin
+    return [b for b in bound
+            if b['east'] >= west and b['west'] <= east and b['north'] >= south and b['south'] <= north]
+
+
+def fill_regions(out, regions, pad, compute):
+    """
+    Fill `out` region by region.
+
+    compute(rows, cols) is called with the padded slices and returns the
+    array (or tuple of arrays) for the padded block; only the cells of the
+    region itself are copied into `out` (an array or tuple of arrays).
+    """
+    outs = out if isinstance(out, tuple) else (out,)
+    for region in regions:
+        (pr, pc), (ir, ic) = pad_region(region, outs[0].shape, pad)
+        res = compute(pr, pc)
+        res = res if isinstance(res, tuple) else (res,)
+        for o, r in zip(outs, res):
+            o[region] = r[ir, ic]
+    return out
@@ -0,0 +1,219 @@
+"""
+Reconcile Masks Function
+
+Python port of reconcile_masks.m for nested grids. Every cell of the grid
+with fewer points is mapped onto the overlapping grid in one pass (edge
+search for rectilinear grids, KD-tree for curvilinear grids) and cells
+where the two land-sea masks disagree are set to land in both grids, so
+that ww3_multi sees a consistent coastline in the overlap. As in the
+MATLAB loop, a cell of the larger grid that has been set to land is land
+for the cells mapped onto it afterwards.
+
+For nesting the inner grid additionally gets its wet perimeter cells
+marked as active boundary points (mask value 2). Optionally the wet outer
+cells covered by the inner grid are excluded (mask value 3); this is only
+meant for one-way nesting, two-way nesting needs them active.
+
+Last Update: 2025
+"""
+
+import os
+
+import numpy as np
+
+try:
+    from ..utils.cell_binning import make_binner
+except ImportError:
+    from utils.cell_binning import make_binner
+
+
+def _as_2d(lon, lat):
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    if lon.ndim == 1 and lat.ndim == 1:
+        return np.meshgrid(lon, lat)
+    return lon, lat
+
+
+def reconcile_masks(m1, lon1, lat1, m2, lon2, lat2):
+    """
+    Make the land-sea masks of two overlapping grids consistent.
+
+    Parameters
+    ----------
+    m1, m2 : ndarray
+        2D (Ny, Nx) masks of the two grids (0 land, 1 sea, 2 boundary)
+    lon1, lat1, lon2, lat2 : ndarray
+        Cell centre longitudes/latitudes, 1D for rectilinear grids or 2D
+        (Ny, Nx) for curvilinear grids
+
+    Returns
+    -------
+    m1_out, m2_out : ndarray
+        Reconciled copies of the masks
+    n_overlap : int
+        Number of cells of the smaller grid that lie in the other grid
+    n_changed : int
+        Number of disagreeing cell pairs that were set to land
+    """
+    m1_out = np.array(m1, copy=True)
+    m2_out = np.array(m2, copy=True)
+    x1, y1 = _as_2d(lon1, lat1)
+    x2, y2 = _as_2d(lon2, lat2)
+
+    # Points of the smaller grid (t) are looked up in the larger grid (b)
+    if m1_out.size <= m2_out.size:
+        mt, xt, yt, mb, xb, yb = m1_out, x1, y1, m2_out, x2, y2
+    else:
+        mt, xt, yt, mb, xb, yb = m2_out, x2, y2, m1_out, x1, y1
+
+    xt = xt.ravel()
+    yt = yt.ravel()
+    inside = np.ones(xt.size, dtype=bool)
+    if np.ndim(lon1) == 1 and np.ndim(lon2) == 1:
+        # As inpolygon on the corner points in the MATLAB version
+        eps = 1e-9
+        inside = ((xt >= xb.min() - eps) & (xt <= xb.max() + eps) &
+                  (yt >= yb.min() - eps) & (yt <= yb.max() + eps))
+
+    binner = make_binner(xb, yb)
+    b_idx, found = binner.cell_index(xt[inside], yt[inside])
+    t_idx = np.nonzero(inside)[0][found]
+    print(f' Found {int(round(t_idx.size * 100.0 / max(1, xt.size)))} per cent of grid overlap points', flush=True)
+
+    # Visit the cells in the order of the MATLAB loop (column-major)
+    ny_t, nx_t = mt.shape
+    order = np.argsort((t_idx % nx_t) * ny_t + t_idx // nx_t, kind='stable')
+    t_idx, b_idx = t_idx[order], b_idx[order]
+
+    mt_flat = mt.reshape(-1)
+    mb_flat = mb.reshape(-1)
+    vt = mt_flat[t_idx]
+    vb = mb_flat[b_idx]
+    conflict = (vt != vb) & (vt != 2) & (vb != 2)
+
+    # Once a larger-grid cell is set to land, the cells visited after its
+    # first conflict are compared with land, as in the sequential loop
+    k = np.arange(t_idx.size)
+    first = np.full(mb_flat.size, t_idx.size)
+    hit, pos = np.unique(b_idx[conflict], return_index=True)
+    first[hit] = k[conflict][pos]
+    changed = conflict | ((k > first[b_idx]) & (vt != 0) & (vt != 2))
+
+    mt_flat[t_idx[changed]] = 0
+    mb_flat[hit] = 0
+    return m1_out, m2_out, int(t_idx.size), int(np.sum(changed))
+
+
+def mark_nest_boundary(mask):
+    """Mark the wet perimeter cells of an inner grid as boundary points (2)."""
+    out = np.array(mask, copy=True)
+    edge = np.zeros(out.shape, dtype=bool)
+    edge[[0, -1], :] = True
+    edge[:, [0, -1]] = True
+    out[edge & (out == 1)] = 2
+    return out
+
+
+def exclude_covered(mask_outer, lon_outer, lat_outer, lon_inner, lat_inner):
+    """Mark wet outer cells whose centres lie inside the inner grid as excluded (3)."""
+    out = np.array(mask_outer, copy=True)
+    xo, yo = _as_2d(lon_outer, lat_outer)
+    _, found = make_binner(*_as_2d(lon_inner, lat_inner)).cell_index(xo.ravel(), yo.ravel())
+    covered = found.reshape(out.shape)
+    out[covered & (out == 1)] = 3
+    return out
+
+
+def _io_module(name):
+    # Imported here: the io package name is shadowed when run as a script
+    import importlib
+    try:
+        return importlib.import_module(f'..io.{name}', __package__)
+    except (ImportError, TypeError):
+        import sys
+        _parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        if _parent_dir not in sys.path:
+            sys.path.append(_parent_dir)
+        return importlib.import_module(f'python.io.{name}')
+
+
+def load_grid_mask(grid_dir, fname='grid'):
+    """
+    Read (lon, lat, mask) of a grid written by create_grid.
+
+    The binary bundle <fname>.grid is used when present; grids without one
+    (MATLAB gridgen, old caches) are read from the RECT <fname>.meta and the
+    text <fname>.mask.
+    """
+    gb = _io_module('grid_bundle')
+    bundle = gb.find_grid_bundle(grid_dir, fname)
+    if bundle is not None:
+        grid = gb.read_grid_bundle(bundle)
+        return np.array(grid['lon']), np.array(grid['lat']), grid['mask'].astype(np.int32)
+
+    with open(os.path.join(grid_dir, f'{fname}.meta'), 'r', encoding='utf-8') as f:
+        lines = [line.replace("'", ' ').split() for line in f if line.strip() and not line.lstrip().startswith('$')]
+    if lines[0][0].upper() != 'RECT':
+        raise ValueError(f'Only RECT grids can be read from text: {grid_dir}')
+    nx, ny = int(lines[1][0]), int(lines[1][1])
+    dx, dy, scale = (float(v) for v in lines[2][:3])
+    lon0, lat0, scale0 = (float(v) for v in lines[3][:3])
+    lon = lon0 / scale0 + np.arange(nx) * dx / scale
+    lat = lat0 / scale0 + np.arange(ny) * dy / scale
+    mask = np.loadtxt(os.path.join(grid_dir, f'{fname}.mask'), dtype=np.int32).reshape(ny, nx)
+    return lon, lat, mask
+
+
+def save_grid_mask(grid_dir, lon, lat, mask, fname='grid'):
+    """
+    Write the mask back: into the bundle when the grid has one (text files
+    that were current are rewritten with it), else as the WW3 text mask.
+    """
+    gb = _io_module('grid_bundle')
+    bundle = gb.find_grid_bundle(grid_dir, fname)
+    if bundle is not None:
+        gb.update_bundle_field(bundle, 'mask', mask)
+        return
+
+    _io_module('write_ww3file').write_ww3file(os.path.join(grid_dir, f'{fname}.mask'), mask)
+
+
+def reconcile_grid_dirs(outer_dir, inner_dir, fname='grid', exclude_outer=False):
+    """
+    Reconcile the masks of a nested grid pair in place.
+
+    Parameters
+    ----------
+    outer_dir, inner_dir : str
+        Output directories of the outer (coarse) and inner (fine) grids
+    fname : str
+        Grid file name prefix in both directories
+    exclude_outer : bool
+        Mark wet outer cells covered by the inner grid as excluded (3)
+
+    Returns
+    -------
+    stats : dict
+        Overlap, changed and boundary cell counts
+    """
+    lon_o, lat_o, m_o = load_grid_mask(outer_dir, fname)
+    lon_i, lat_i, m_i = load_grid_mask(inner_dir, fname)
+
+    m_o, m_i, n_overlap, n_changed = reconcile_masks(m_o, lon_o, lat_o, m_i, lon_i, lat_i)
+    m_i = mark_nest_boundary(m_i)
+    if exclude_outer:
+        m_o = exclude_covered(m_o, lon_o, lat_o, lon_i, lat_i)
+
+    save_grid_mask(outer_dir, lon_o, lat_o, m_o, fname)
+    save_grid_mask(inner_dir, lon_i, lat_i, m_i, fname)
+
+    stats = {
+        'overlap': n_overlap,
+        'changed': n_changed,
+        'inner_boundary': int(np.sum(m_i == 2)),
+        'outer_excluded': int(np.sum(m_o == 3)),
+    }
+    print(f" Set {stats['changed']} disagreeing cells to land, marked {stats['inner_boundary']} "
+          f"inner boundary cells, excluded {stats['outer_excluded']} outer cells", flush=True)
+    return stats
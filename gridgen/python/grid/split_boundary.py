@@ -13,6 +13,11 @@ Last Update: 23-Oct-2012
 
 import numpy as np
 
+try:
+    from ..utils.progress import report_progress
+except ImportError:
+    from utils.progress import report_progress
+
 
 def split_boundary(bound, lim, min_val=None):
     """
@@ -134,6 +139,7 @@ def split_boundary(bound, lim, min_val=None):
         if current_pct >= last_report_pct + 5:
             last_report_pct = (current_pct // 5) * 5
             print(f'  Completed {last_report_pct} per cent of {N} boundaries and split into {in_coord} boundaries', flush=True)
+            report_progress(i + 1, N, 'split_boundary')
             sys.stdout.flush()
     
     return bound_ingrid
@@ -0,0 +1,328 @@
+"""
+Split Dateline Function
+
+Python port of split_dateline.m. GSHHS polygons that cross the
+antimeridian are split at +/-180 degrees into pieces that each lie inside
+[-180, 180], so that compute_boundary never sees a polygon wrapping around
+the globe. The split polygon set is computed once per boundary resolution
+and cached next to the .mat file (see save_bound_cache/load_bound_cache).
+
+BoundaryIndex holds the polygon bounding boxes as arrays. Domains given in
+0~360 longitudes (or extending beyond -180) are queried as up to two
+windows inside [-180, 180]; polygons from the wrapped window are shifted by
++/-360 degrees into the longitude convention of the domain.
+
+Last Update: 2025
+"""
+
+import os
+
+import numpy as np
+
+# Version of the cache layout (bump when the split algorithm changes)
+CACHE_VERSION = 2
+
+
+def _wrap180(d):
+    """Wrap longitude differences into [-180, 180)."""
+    return (d + 180.0) % 360.0 - 180.0
+
+
+def split_dateline(x, y):
+    """
+    Split a polygon at the antimeridian.
+
+    Parameters
+    ----------
+    x : ndarray
+        Polygon longitudes (any convention, consecutive vertices less than
+        180 degrees apart)
+    y : ndarray
+        Polygon latitudes
+
+    Returns
+    -------
+    pieces : list
+        List of (x, y) arrays, each lying inside [-180, 180]. Pieces of a
+        split polygon are closed along +/-180; the arcs of a polygon that
+        crosses several times are chained into one ring per lobe, so the
+        pieces never overlap. A polygon that does not cross the dateline is
+        returned as a single piece, and one that encircles a pole
+        (Antarctica) is returned unchanged.
+    """
+    x = np.asarray(x, dtype=np.float64).ravel()
+    y = np.asarray(y, dtype=np.float64).ravel()
+    if x.size < 2:
+        return [(x, y)]
+
+    closed = x[0] == x[-1] and y[0] == y[-1]
+    if closed:
+        x, y = x[:-1], y[:-1]
+
+    # Continuous longitudes along the polygon
+    xu = x[0] + np.concatenate([[0.0], np.cumsum(_wrap180(np.diff(x)))])
+    x_close = xu[-1] + _wrap180(x[0] - x[-1])
+    if abs(x_close - xu[0]) > 180.0:
+        # Polygon around a pole: splitting would not give closed pieces
+        return [(x, y) if not closed else (np.append(x, x[0]), np.append(y, y[0]))]
+
+    # Band k covers [-180 + 360k, 180 + 360k)
+    band = np.floor((xu + 180.0) / 360.0).astype(int)
+    xs = np.append(xu, xu[0])
+    ys = np.append(y, y[0])
+    bs = np.append(band, band[0])
+    cross = np.nonzero(bs[:-1] != bs[1:])[0]
+
+    def _close(px, py):
+        return (np.append(px, px[0]), np.append(py, py[0])) if closed else (px, py)
+
+    if cross.size == 0:
+        return [_close(xu - 360.0 * band[0], y)]
+
+    # Crossing points on the line 180 + 360k between the two bands
+    x_line = 180.0 + 360.0 * np.minimum(bs[cross], bs[cross + 1])
+    t = (x_line - xs[cross]) / (xs[cross + 1] - xs[cross])
+    y_line = ys[cross] + t * (ys[cross + 1] - ys[cross])
+
+    # Insert each crossing point after its segment start and record its position
+    new_x = np.insert(xu, cross + 1, x_line)
+    new_y = np.insert(y, cross + 1, y_line)
+    cross_pos = cross + 1 + np.arange(cross.size)
+
+    # Rotate so that the vertex list starts at the first crossing, then cut
+    # it into arcs running from one crossing point to the next
+    new_x = np.roll(new_x, -cross_pos[0])
+    new_y = np.roll(new_y, -cross_pos[0])
+    cross_pos = np.append(cross_pos - cross_pos[0], new_x.size)
+    ext_x = np.append(new_x, new_x[0])
+    ext_y = np.append(new_y, new_y[0])
+    arcs = [[ext_x[s:e + 1], ext_y[s:e + 1]] for s, e in zip(cross_pos[:-1], cross_pos[1:])]
+
+    # Side (band) of each arc; arcs running along the dateline have none
+    sides = [None if np.ptp(ax) == 0 else int(np.floor((np.mean(ax) + 180.0) / 360.0)) for ax, _ in arcs]
+    arcs, sides = _merge_arcs(arcs, sides)
+    if len(arcs) == 1:
+        # Only touches the dateline
+        px, py = arcs[0]
+        return [_close((px - 360.0 * sides[0])[:-1], py[:-1])]
+
+    # Arc i starts at crossing point i and ends at crossing point i + 1.
+    # Along each dateline the polygon interior is [y1, y2], [y3, y4], ... of
+    # the sorted crossing latitudes: the pieces are closed along these
+    # intervals, chaining the arcs on one side into rings
+    n = len(arcs)
+    cx = np.array([a[0][0] for a in arcs])
+    cy = np.array([a[1][0] for a in arcs])
+    partner = np.empty(n, dtype=int)
+    for line in np.unique(cx):
+        on_line = np.nonzero(cx == line)[0]
+        order = on_line[np.argsort(cy[on_line], kind='stable')]
+        partner[order[0::2]] = order[1::2]
+        partner[order[1::2]] = order[0::2]
+
+    pieces = []
+    used = np.zeros(n, dtype=bool)
+    for first in range(n):
+        if used[first]:
+            continue
+        side = sides[first]
+        ring_x, ring_y = [], []
+        i, forward = first, True
+        while True:
+            used[i] = True
+            ax, ay = arcs[i]
+            if not forward:
+                ax, ay = ax[::-1], ay[::-1]
+            ring_x.append(ax)
+            ring_y.append(ay)
+            # Crossing point reached at the end of the arc, then its partner
+            end = (i + 1) % n if forward else i
+            q = partner[end]
+            if sides[q] == side and not used[q]:
+                i, forward = q, True
+            elif sides[(q - 1) % n] == side and not used[(q - 1) % n]:
+                i, forward = (q - 1) % n, False
+            else:
+                break
+        px = np.concatenate(ring_x)
+        py = np.concatenate(ring_y)
+        if px.size < 3:
+            continue
+        pieces.append(_close(np.clip(px - 360.0 * side, -180.0, 180.0), py))
+    return pieces
+
+
+def _merge_arcs(arcs, sides):
+    """
+    Join arcs that do not really cross the dateline: arcs running along it
+    are appended to the previous arc, and consecutive arcs on the same side
+    (the polygon touched the dateline and turned back) become one arc.
+    """
+    def join(a, b):
+        return [np.concatenate([a[0], b[0][1:]]), np.concatenate([a[1], b[1][1:]])]
+
+    if all(s is None for s in sides):
+        return arcs[:1], [int(np.floor((arcs[0][0][0] + 180.0) / 360.0))]
+    # Start on an arc with a side so that every merge has a predecessor
+    k = next(i for i, s in enumerate(sides) if s is not None)
+    arcs = arcs[k:] + arcs[:k]
+    sides = sides[k:] + sides[:k]
+    out_arcs, out_sides = [arcs[0]], [sides[0]]
+    for arc, side in zip(arcs[1:], sides[1:]):
+        if side is None or side == out_sides[-1]:
+            out_arcs[-1] = join(out_arcs[-1], arc)
+        else:
+            out_arcs.append(arc)
+            out_sides.append(side)
+    # The last arc wraps around to the first one
+    if len(out_arcs) > 1 and out_sides[-1] == out_sides[0]:
+        out_arcs[0] = join(out_arcs.pop(), out_arcs[0])
+        out_sides.pop()
+    return out_arcs, out_sides
+
+
+def _piece_dict(poly, px, py):
+    """Copy of a boundary dict with the geometry of one piece."""
+    piece = dict(poly)
+    piece['x'] = px
+    piece['y'] = py
+    piece['n'] = px.size
+    piece['west'] = float(np.min(px))
+    piece['east'] = float(np.max(px))
+    piece['south'] = float(np.min(py))
+    piece['north'] = float(np.max(py))
+    piece['width'] = piece['east'] - piece['west']
+    piece['height'] = piece['north'] - piece['south']
+    return piece
+
+
+def split_bound_dateline(bound):
+    """
+    Split every boundary polygon that crosses the antimeridian.
+
+    Parameters
+    ----------
+    bound : list
+        List of boundary dicts (keys 'x', 'y', 'n', 'west', 'east', ...)
+
+    Returns
+    -------
+    bound_split : list
+        List of boundary dicts with every polygon inside [-180, 180]
+    n_split : int
+        Number of polygons that were split
+    """
+    bound_split = []
+    n_split = 0
+    for poly in bound:
+        west = float(np.ravel(poly['west'])[0])
+        east = float(np.ravel(poly['east'])[0])
+        # Polygons inside [-180, 180] spanning less than half the globe cannot cross
+        if west >= -180.0 and east <= 180.0 and east - west < 180.0:
+            bound_split.append(poly)
+            continue
+        x = np.asarray(poly['x'], dtype=np.float64).ravel()
+        if west >= -180.0 and east <= 180.0 and not np.any(np.abs(np.diff(x)) > 180.0):
+            bound_split.append(poly)
+            continue
+        pieces = split_dateline(x, poly['y'])
+        if len(pieces) > 1:
+            n_split += 1
+        for px, py in pieces:
+            bound_split.append(_piece_dict(poly, px, py))
+    return bound_split, n_split
+
+
+class BoundaryIndex:
+    """
+    Bounding-box index over boundary polygons.
+
+    Parameters
+    ----------
+    bound : list
+        List of boundary dicts split at the dateline (split_bound_dateline)
+    """
+
+    def __init__(self, bound):
+        self.bound = bound
+        box = np.array([[float(np.ravel(p[k])[0]) for k in ('west', 'east', 'south', 'north', 'level')]
+                        for p in bound]).reshape(-1, 5)
+        self.west, self.east, self.south, self.north, self.level = box.T
+
+    def _window(self, lon_start, lon_end, lat_start, lat_end, levels):
+        hit = ((self.west <= lon_end) & (self.east >= lon_start) &
+               (self.south <= lat_end) & (self.north >= lat_start))
+        return np.nonzero(hit & np.isin(self.level, levels))[0]
+
+    def query(self, coord, bflg=1):
+        """
+        Boundary polygons overlapping a domain, in the domain's longitudes.
+
+        Parameters
+        ----------
+        coord : list
+            [lat_start, lon_start, lat_end, lon_end] as for compute_boundary.
+            Longitudes may extend beyond 180 (0~360 domains) or below -180
+        bflg : int
+            Boundary level kept together with lake margins (level 2), as in
+            compute_boundary
+
+        Returns
+        -------
+        bound_domain : list
+            Candidate boundary dicts; polygons from a wrapped window are
+            copies shifted by +/-360 degrees
+        """
+        lat_start, lon_start, lat_end, lon_end = coord
+        levels = np.array([bflg, 2], dtype=np.float64)
+        bound_domain = []
+        for shift in (-360.0, 0.0, 360.0):
+            w0 = max(lon_start - shift, -180.0)
+            w1 = min(lon_end - shift, 180.0)
+            if w0 > w1:
+                continue
+            for i in self._window(w0, w1, lat_start, lat_end, levels):
+                poly = self.bound[i]
+                if shift:
+                    x = np.asarray(poly['x'], dtype=np.float64).ravel() + shift
+                    poly = _piece_dict(poly, x, np.asarray(poly['y'], dtype=np.float64).ravel())
+                bound_domain.append(poly)
+        return bound_domain
+
+
+def save_bound_cache(cache_file, bound, source_file):
+    """Store a split boundary list as flat arrays (.npz) keyed by the source file."""
+    x = [np.asarray(p['x'], dtype=np.float64).ravel() for p in bound]
+    y = [np.asarray(p['y'], dtype=np.float64).ravel() for p in bound]
+    st = os.stat(source_file)
+    np.savez(cache_file,
+             version=CACHE_VERSION, source_mtime=st.st_mtime, source_size=st.st_size,
+             offsets=np.cumsum([0] + [len(v) for v in x]),
+             x=np.concatenate(x) if x else np.zeros(0),
+             y=np.concatenate(y) if y else np.zeros(0),
+             level=np.array([float(np.ravel(p.get('level', 0))[0]) for p in bound]))
+
+
+def load_bound_cache(cache_file, source_file):
+    """Split boundary list from the cache, or None when missing or stale."""
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        st = os.stat(source_file)
+        with np.load(cache_file) as data:
+            if (int(data['version']) != CACHE_VERSION or float(data['source_mtime']) != st.st_mtime
+                    or int(data['source_size']) != st.st_size):
+                return None
+            offsets = data['offsets']
+            x_all = data['x']
+            y_all = data['y']
+            level = data['level']
+    except (OSError, KeyError, ValueError):
+        return None
+
+    bound = []
+    for i in range(len(level)):
+        px = x_all[offsets[i]:offsets[i + 1]]
+        py = y_all[offsets[i]:offsets[i + 1]]
+        bound.append(_piece_dict({'level': int(level[i])}, px, py))
+    return bound
@@ -0,0 +1,128 @@
+"""
+GridGen Command Line Tools
+
+Subcommands:
+    diff      Compare two grids (e.g. against a MATLAB reference grid) and
+              print a compact JSON report; exits with status 1 when one of
+              the --max-* thresholds is exceeded, so it can gate CI runs
+    fill-nan  Fill NaN cells of an ASCII array (e.g. a .slope file) with the
+              mean of their valid neighbours
+    text      Write the WW3 text files (.bot/.mask/.obst) of grids from their
+              binary bundle (<fname>.grid), e.g. after create_grid(write_text=0)
+
+Usage:
+    python gridgen.py diff reference_dir/ result/grid.meta --max-flips 0 --max-rmse 0.5
+    python gridgen.py fill-nan africa_10m.slope africa_10m.slope.new
+    python gridgen.py text result/ coarse/ fine/
+
+Last Update: 2025
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+try:
+    from .grid.grid_diff import diff_grids, fill_nan_neighbours
+    from .io.grid_bundle import find_grid_bundle, write_text_files
+    from .io.read_ww3file import load_grid
+except ImportError:
+    from grid.grid_diff import diff_grids, fill_nan_neighbours
+    import importlib
+    _parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if _parent_dir not in sys.path:
+        sys.path.append(_parent_dir)
+    load_grid = importlib.import_module('python.io.read_ww3file').load_grid
+    _grid_bundle = importlib.import_module('python.io.grid_bundle')
+    find_grid_bundle = _grid_bundle.find_grid_bundle
+    write_text_files = _grid_bundle.write_text_files
+
+
+def cmd_diff(args):
+    a = load_grid(args.grid_a, args.fname)
+    b = load_grid(args.grid_b, args.fname)
+    report = diff_grids(a, b, tile=args.tile, top=args.top)
+    report['grid_a'] = os.path.abspath(args.grid_a)
+    report['grid_b'] = os.path.abspath(args.grid_b)
+
+    status = 0
+    failures = []
+    if 'error' in report:
+        status = 2
+    else:
+        n_flips = report['mask']['wet_to_dry'] + report['mask']['dry_to_wet']
+        if args.max_flips is not None and n_flips > args.max_flips:
+            failures.append(f'{n_flips} wet/dry flips > {args.max_flips}')
+        if args.max_rmse is not None and report['depth']['rmse'] > args.max_rmse:
+            failures.append(f"depth RMSE {report['depth']['rmse']:.4g} > {args.max_rmse}")
+        if failures:
+            status = 1
+    report['failures'] = failures
+
+    text = json.dumps(report, separators=(',', ':'))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    print(text, flush=True)
+    return status
+
+
+def cmd_fill_nan(args):
+    data = np.loadtxt(args.input)
+    n_nan = int(np.sum(np.isnan(data)))
+    filled = fill_nan_neighbours(data)
+    # Values are written as integers, as in read_slope.py
+    np.savetxt(args.output, np.round(filled), fmt='%i', delimiter='  ')
+    print(f'Filled {n_nan - int(np.sum(np.isnan(filled)))} of {n_nan} NaN cells', flush=True)
+    return 0
+
+
+def cmd_text(args):
+    status = 0
+    for path in args.grids:
+        bundle = find_grid_bundle(path, args.fname)
+        if bundle is None:
+            print(f'No grid bundle found: {path}', flush=True)
+            status = 1
+        elif write_text_files(bundle, force=args.force):
+            print(f'Written text files of {bundle}', flush=True)
+        else:
+            print(f'Text files of {bundle} are up to date', flush=True)
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='gridgen', description='GridGen command line tools')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('diff', help='compare two grids and print a JSON report')
+    p.add_argument('grid_a', help='reference grid (.meta file, prefix or directory)')
+    p.add_argument('grid_b', help='grid compared against the reference')
+    p.add_argument('--fname', default='grid', help='grid name used for directory arguments')
+    p.add_argument('--json', help='also write the report to this file')
+    p.add_argument('--tile', type=int, default=32, help='hot spot tile size in cells')
+    p.add_argument('--top', type=int, default=10, help='number of hot spot tiles reported')
+    p.add_argument('--max-flips', type=int, help='fail when more wet/dry cells flip')
+    p.add_argument('--max-rmse', type=float, help='fail when the depth RMSE (m) is larger')
+    p.set_defaults(func=cmd_diff)
+
+    p = sub.add_parser('fill-nan', help='fill NaN cells of an ASCII array')
+    p.add_argument('input')
+    p.add_argument('output')
+    p.set_defaults(func=cmd_fill_nan)
+
+    p = sub.add_parser('text', help='write the WW3 text files of grids from their binary bundle')
+    p.add_argument('grids', nargs='+', help='grid directories, .meta files, prefixes or bundles')
+    p.add_argument('--fname', default='grid', help='grid name used for directory arguments')
+    p.add_argument('--force', action='store_true', help='rewrite text files that are up to date')
+    p.set_defaults(func=cmd_text)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,11 +2,16 @@
 Input/Output modules for GridGen.
 """
 
+from .grid_bundle import (find_grid_bundle, read_grid_bundle, text_files_current, update_bundle_field,
+                          write_grid_bundle, write_text_files)
 from .optional_bound import optional_bound
 from .read_namelist import read_namelist
+from .read_ww3file import load_grid, read_ww3file, read_ww3meta, read_ww3obstr
 from .write_ww3file import write_ww3file
 from .write_ww3meta import write_ww3meta
 from .write_ww3obstr import write_ww3obstr
 
-__all__ = ['read_namelist', 'write_ww3file', 'write_ww3obstr', 'write_ww3meta', 'optional_bound']
+__all__ = ['read_namelist', 'write_ww3file', 'write_ww3obstr', 'write_ww3meta', 'optional_bound',
+           'read_ww3file', 'read_ww3obstr', 'read_ww3meta', 'load_grid', 'write_grid_bundle',
+           'read_grid_bundle', 'find_grid_bundle', 'update_bundle_field', 'write_text_files', 'text_files_current']
 
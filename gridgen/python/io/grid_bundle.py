@@ -0,0 +1,240 @@
+"""
+Binary Grid Bundle
+
+Binary companion of the WAVEWATCH III text files of a rectilinear grid:
+a directory <fname>.grid next to <fname>.meta holding one .npy file per
+field and a JSON header.
+
+    <fname>.grid/header.json   version, gtype, nx, ny, dx, dy, extent,
+                               depth_scale, obstr_scale, revision
+    <fname>.grid/lon.npy       cell centre longitudes (1D)
+    <fname>.grid/lat.npy       cell centre latitudes (1D)
+    <fname>.grid/depth.npy     scaled integer depth, as in <fname>.bot
+    <fname>.grid/mask.npy      land-sea mask (int8), as in <fname>.mask
+    <fname>.grid/sx.npy        scaled x obstruction (int16), as in <fname>.obst
+    <fname>.grid/sy.npy        scaled y obstruction (int16)
+
+Every field is a plain .npy file so readers can memory-map it: loading a
+grid for plotting or nesting costs a header read instead of parsing
+millions of formatted numbers. The text files needed by WW3 are written
+from the bundle (write_text_files), right away or later; the header
+revision is bumped on every change and recorded in text.json when the
+text files are written, so stale text files can be detected.
+
+Last Update: 2025
+"""
+
+import json
+import os
+
+import numpy as np
+
+from .write_ww3file import write_ww3file
+from .write_ww3obstr import write_ww3obstr
+
+BUNDLE_SUFFIX = '.grid'
+BUNDLE_VERSION = 1
+BUNDLE_FIELDS = ('lon', 'lat', 'depth', 'mask', 'sx', 'sy')
+HEADER_FILE = 'header.json'
+TEXT_STAMP_FILE = 'text.json'
+
+
+def bundle_path(grid_dir, fname='grid'):
+    """Path of the bundle of grid `fname` in `grid_dir`."""
+    return os.path.join(grid_dir, fname + BUNDLE_SUFFIX)
+
+
+def find_grid_bundle(path, fname='grid'):
+    """
+    Bundle for a grid directory, .meta file, prefix or bundle path.
+
+    Returns the bundle directory, or None when the grid has no complete
+    bundle (MATLAB gridgen, curvilinear grids, old outputs).
+    """
+    if path.endswith(BUNDLE_SUFFIX):
+        bundle = path
+    elif os.path.isdir(path):
+        bundle = bundle_path(path, fname)
+    else:
+        bundle = (path[:-len('.meta')] if path.endswith('.meta') else path) + BUNDLE_SUFFIX
+    return bundle if os.path.exists(os.path.join(bundle, HEADER_FILE)) else None
+
+
+def _write_json(fname, data):
+    tmp = fname + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp, fname)
+
+
+def _write_array(bundle, name, values):
+    # Written under a temporary name so readers never see a partial file
+    fname = os.path.join(bundle, f'{name}.npy')
+    tmp = fname + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.save(f, np.ascontiguousarray(values))
+    os.replace(tmp, fname)
+
+
+def _field_dtype(name, values):
+    if name in ('lon', 'lat'):
+        return np.float64
+    if name == 'mask':
+        return np.int8
+    if name in ('sx', 'sy'):
+        return np.int16
+    return np.int32 if np.max(np.abs(values)) < 2 ** 31 else np.int64
+
+
+def read_bundle_header(bundle):
+    """Header of a bundle as a dict, None when missing or unreadable."""
+    try:
+        with open(os.path.join(bundle, HEADER_FILE), 'r', encoding='utf-8') as f:
+            header = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return header if header.get('version') == BUNDLE_VERSION else None
+
+
+def write_grid_bundle(bundle, lon, lat, depth, mask, sx, sy, depth_scale, obstr_scale):
+    """
+    Write a rectilinear grid as a bundle.
+
+    Parameters
+    ----------
+    bundle : str
+        Bundle directory (<out_dir>/<fname>.grid), created if needed
+    lon, lat : ndarray
+        1D cell centre longitudes and latitudes
+    depth, mask, sx, sy : ndarray
+        2D (Ny, Nx) scaled integer depth, mask and scaled obstructions,
+        i.e. the values written to the .bot, .mask and .obst files
+    depth_scale, obstr_scale : float
+        Multipliers converting the stored integers to metres and fractions
+        (as in the .meta file)
+    """
+    os.makedirs(bundle, exist_ok=True)
+    old = read_bundle_header(bundle)
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    fields = {'lon': lon, 'lat': lat, 'depth': depth, 'mask': mask, 'sx': sx, 'sy': sy}
+    for name in BUNDLE_FIELDS:
+        values = np.asarray(fields[name])
+        _write_array(bundle, name, values.astype(_field_dtype(name, values)))
+
+    # The header is written last: a bundle with a header is complete
+    header = {
+        'version': BUNDLE_VERSION,
+        'gtype': 'RECT',
+        'nx': int(lon.size),
+        'ny': int(lat.size),
+        'dx': float(lon[1] - lon[0]) if lon.size > 1 else 0.0,
+        'dy': float(lat[1] - lat[0]) if lat.size > 1 else 0.0,
+        'lon_range': [float(lon[0]), float(lon[-1])],
+        'lat_range': [float(lat[0]), float(lat[-1])],
+        'depth_scale': float(depth_scale),
+        'obstr_scale': float(obstr_scale),
+        'revision': (old['revision'] + 1) if old else 1,
+    }
+    _write_json(os.path.join(bundle, HEADER_FILE), header)
+    return header
+
+
+def read_grid_bundle(bundle, mmap=True):
+    """
+    Read a bundle.
+
+    Returns
+    -------
+    grid : dict
+        The header entries plus lon, lat, depth, mask, sx and sy as stored
+        (scaled integers), memory-mapped read-only when `mmap` is True
+    """
+    header = read_bundle_header(bundle)
+    if header is None:
+        raise ValueError(f'Not a grid bundle: {bundle}')
+    grid = dict(header)
+    for name in BUNDLE_FIELDS:
+        grid[name] = np.load(os.path.join(bundle, f'{name}.npy'), mmap_mode='r' if mmap else None)
+    if grid['depth'].shape != (header['ny'], header['nx']):
+        raise ValueError(f"{bundle}: depth shape {grid['depth'].shape} does not match "
+                         f"{header['ny']} x {header['nx']}")
+    return grid
+
+
+def _text_prefix(bundle):
+    return bundle[:-len(BUNDLE_SUFFIX)] if bundle.endswith(BUNDLE_SUFFIX) else bundle
+
+
+def _replace_text(fname, writer, *arrays):
+    messg, errno = writer(fname + '.tmp', *arrays)
+    if errno:
+        raise OSError(messg)
+    os.replace(fname + '.tmp', fname)
+
+
+def _write_text(bundle, grid, names):
+    prefix = _text_prefix(bundle)
+    if 'depth' in names:
+        _replace_text(f'{prefix}.bot', write_ww3file, grid['depth'])
+    if 'mask' in names:
+        _replace_text(f'{prefix}.mask', write_ww3file, grid['mask'])
+    if 'sx' in names or 'sy' in names:
+        _replace_text(f'{prefix}.obst', write_ww3obstr, grid['sx'], grid['sy'])
+
+
+def text_files_current(bundle):
+    """True when the .bot/.mask/.obst files were written from the current bundle."""
+    header = read_bundle_header(bundle)
+    if header is None:
+        return False
+    prefix = _text_prefix(bundle)
+    if not all(os.path.exists(f'{prefix}.{ext}') for ext in ('bot', 'mask', 'obst')):
+        return False
+    try:
+        with open(os.path.join(bundle, TEXT_STAMP_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f).get('revision') == header['revision']
+    except (OSError, ValueError):
+        return False
+
+
+def write_text_files(bundle, force=False):
+    """
+    Write the WW3 text files <fname>.bot, .mask and .obst of a bundle.
+
+    The files are written next to the bundle under temporary names and
+    renamed, so WW3 or a copy never sees a partial file. Nothing is written
+    when they are already current, unless `force`.
+
+    Returns
+    -------
+    written : bool
+        False when the text files were already current
+    """
+    if not force and text_files_current(bundle):
+        return False
+    grid = read_grid_bundle(bundle)
+    _write_text(bundle, grid, ('depth', 'mask', 'sx'))
+    _write_json(os.path.join(bundle, TEXT_STAMP_FILE), {'revision': grid['revision']})
+    return True
+
+
+def update_bundle_field(bundle, name, values):
+    """
+    Replace one field of a bundle (e.g. the reconciled mask of a nested grid).
+
+    Text files that were current are rewritten for this field and stay
+    current; otherwise they are left to write_text_files.
+    """
+    header = read_bundle_header(bundle)
+    if header is None:
+        raise ValueError(f'Not a grid bundle: {bundle}')
+    was_current = text_files_current(bundle)
+    values = np.asarray(values)
+    _write_array(bundle, name, values.astype(_field_dtype(name, values)))
+    header['revision'] += 1
+    _write_json(os.path.join(bundle, HEADER_FILE), header)
+    if was_current:
+        _write_text(bundle, read_grid_bundle(bundle), (name,))
+        _write_json(os.path.join(bundle, TEXT_STAMP_FILE), {'revision': header['revision']})
+    return header
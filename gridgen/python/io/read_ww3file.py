@@ -0,0 +1,178 @@
+"""
+Read WAVEWATCH III grid files.
+
+Readers for the ASCII files written by write_ww3file, write_ww3obstr and
+write_ww3meta. The whole file is parsed in one call to np.fromstring, which
+is an order of magnitude faster than np.loadtxt on large grids. Grids with
+a binary bundle (see grid_bundle.py) are loaded from the bundle instead.
+"""
+
+import os
+
+import numpy as np
+
+from .grid_bundle import BUNDLE_SUFFIX, find_grid_bundle, read_grid_bundle
+
+
+def _read_numbers(fname, dtype=np.float64):
+    with open(fname, 'r') as fid:
+        return np.fromstring(fid.read(), dtype=dtype, sep=' ')
+
+
+def read_ww3file(fname, Nx=None, Ny=None, dtype=np.float64):
+    """
+    Read a 2D array written by write_ww3file (.bot, .mask, .lon, .lat).
+
+    Parameters
+    ----------
+    fname : str
+        Input file name
+    Nx, Ny : int, optional
+        Grid dimensions. When omitted the number of columns is taken from
+        the first line
+    dtype : numpy dtype
+        Data type of the returned array
+
+    Returns
+    -------
+    d : ndarray
+        2D array of dimensions (Ny, Nx)
+    """
+    if Nx is None:
+        with open(fname, 'r') as fid:
+            Nx = len(fid.readline().split())
+    d = _read_numbers(fname, dtype)
+    if Ny is None:
+        Ny = d.size // max(1, Nx)
+    if d.size != Nx * Ny:
+        raise ValueError(f'{fname}: expected {Ny} x {Nx} values, found {d.size}')
+    return d.reshape(Ny, Nx)
+
+
+def read_ww3obstr(fname, Nx, Ny, dtype=np.float64):
+    """
+    Read the x and y obstruction arrays written by write_ww3obstr.
+
+    Returns
+    -------
+    d1, d2 : ndarray
+        2D arrays of dimensions (Ny, Nx) with the x and y obstructions
+    """
+    d = _read_numbers(fname, dtype)
+    if d.size != 2 * Nx * Ny:
+        raise ValueError(f'{fname}: expected 2 x {Ny} x {Nx} values, found {d.size}')
+    d = d.reshape(2, Ny, Nx)
+    return d[0], d[1]
+
+
+def _resolve(meta_dir, path):
+    """Grid file named in the .meta, preferring a file of that name next to the .meta."""
+    local = os.path.join(meta_dir, os.path.basename(path))
+    return local if os.path.exists(local) or not os.path.isabs(path) else path
+
+
+def read_ww3meta(fname):
+    """
+    Read the grid definition from a .meta file written by write_ww3meta.
+
+    Returns
+    -------
+    meta : dict
+        gtype ('RECT' or 'CURV'), nx, ny, lon and lat (1D for RECT, 2D for
+        CURV), depth_scale, obstr_scale and files (paths of the 'bot',
+        'obst', 'mask' and, for CURV grids, 'lon'/'lat' files)
+    """
+    meta_dir = os.path.dirname(os.path.abspath(fname))
+    with open(fname, 'r', encoding='utf-8') as fid:
+        lines = [line.strip() for line in fid
+                 if line.strip() and not line.lstrip().startswith('$')]
+
+    def tokens(line):
+        return line.replace("'", ' ').split()
+
+    gtype = tokens(lines[0])[0].upper()
+    nx, ny = (int(float(v)) for v in tokens(lines[1])[:2])
+    meta = {'gtype': gtype, 'nx': nx, 'ny': ny, 'files': {}}
+
+    if gtype == 'RECT':
+        dx, dy, scale = (float(v) for v in tokens(lines[2])[:3])
+        lon0, lat0, scale0 = (float(v) for v in tokens(lines[3])[:3])
+        meta['lon'] = lon0 / scale0 + np.arange(nx) * dx / scale
+        meta['lat'] = lat0 / scale0 + np.arange(ny) * dy / scale
+        file_lines = lines[4:]
+    elif gtype == 'CURV':
+        coord = {}
+        for line, key in ((lines[2], 'lon'), (lines[3], 'lat')):
+            t = tokens(line)
+            path = _resolve(meta_dir, t[-1])
+            meta['files'][key] = path
+            coord[key] = read_ww3file(path, nx, ny) * float(t[1])
+        meta['lon'] = coord['lon']
+        meta['lat'] = coord['lat']
+        file_lines = lines[4:]
+    else:
+        raise ValueError(f'Unrecognized grid type in {fname}: {gtype}')
+
+    # Depth, obstruction and mask lines: the file name is the last token
+    for line, key in zip(file_lines[:3], ('bot', 'obst', 'mask')):
+        t = tokens(line)
+        meta['files'][key] = _resolve(meta_dir, t[-1])
+        if key == 'bot':
+            meta['depth_scale'] = float(t[3])
+        elif key == 'obst':
+            meta['obstr_scale'] = float(t[1])
+    return meta
+
+
+def _load_bundle(bundle, meta_file):
+    """load_grid from a binary bundle; the arrays are memory-mapped."""
+    b = read_grid_bundle(bundle)
+    prefix = meta_file[:-len('.meta')]
+    meta = {'gtype': b['gtype'], 'nx': b['nx'], 'ny': b['ny'], 'lon': np.array(b['lon']),
+            'lat': np.array(b['lat']), 'depth_scale': b['depth_scale'], 'obstr_scale': b['obstr_scale'],
+            'files': {key: f'{prefix}.{key}' for key in ('bot', 'obst', 'mask')}}
+    return {'meta': meta, 'depth': b['depth'] * b['depth_scale'], 'mask': b['mask'].astype(np.int32),
+            'sx': b['sx'] * b['obstr_scale'], 'sy': b['sy'] * b['obstr_scale']}
+
+
+def load_grid(path, fname='grid'):
+    """
+    Load a complete grid: definition, depth, mask and obstructions.
+
+    Parameters
+    ----------
+    path : str
+        A .meta file, a grid prefix, a bundle or a directory holding
+        <fname>.meta; the binary bundle is used when the grid has one
+    fname : str
+        Grid name used when `path` is a directory
+
+    Returns
+    -------
+    grid : dict
+        meta (see read_ww3meta), depth (m, dry cells keep DRY_VAL), mask
+        (int), sx and sy (obstruction fractions, None without .obst)
+    """
+    if os.path.isdir(path) and not path.endswith(BUNDLE_SUFFIX):
+        meta_file = os.path.join(path, f'{fname}.meta')
+    elif path.endswith('.meta'):
+        meta_file = path
+    else:
+        meta_file = f"{path[:-len(BUNDLE_SUFFIX)] if path.endswith(BUNDLE_SUFFIX) else path}.meta"
+
+    bundle = find_grid_bundle(path, fname)
+    if bundle is not None:
+        return _load_bundle(bundle, meta_file)
+
+    meta = read_ww3meta(meta_file)
+    nx, ny = meta['nx'], meta['ny']
+    files = meta['files']
+
+    grid = {'meta': meta, 'sx': None, 'sy': None}
+    grid['depth'] = read_ww3file(files['bot'], nx, ny) * meta['depth_scale']
+    grid['mask'] = read_ww3file(files['mask'], nx, ny, dtype=np.int64).astype(np.int32)
+    if os.path.exists(files.get('obst', '')):
+        sx, sy = read_ww3obstr(files['obst'], nx, ny)
+        grid['sx'] = sx * meta['obstr_scale']
+        grid['sy'] = sy * meta['obstr_scale']
+    return grid
@@ -0,0 +1,84 @@
+"""
+Regression tests for reconcile_masks against a loop port of reconcile_masks.m.
+
+Run from gridgen/python:
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+import numpy as np
+
+_python_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _python_dir not in sys.path:
+    sys.path.insert(0, _python_dir)
+
+from grid.reconcile_masks import reconcile_masks
+
+
+def _reconcile_loop(m1, lon1, lat1, m2, lon2, lat2):
+    """Cell-by-cell port of reconcile_masks.m (rectilinear grids)."""
+    m1 = np.array(m1, copy=True)
+    m2 = np.array(m2, copy=True)
+    if m1.size <= m2.size:
+        mt, lont, latt, mb, lonb, latb = m1, lon1, lat1, m2, lon2, lat2
+    else:
+        mt, lont, latt, mb, lonb, latb = m2, lon2, lat2, m1, lon1, lat1
+    # find() on the (Ny, Nx) meshgrid walks down the latitudes first
+    for i in range(lont.size):
+        for j in range(latt.size):
+            lon, lat = lont[i], latt[j]
+            if not (lonb[0] <= lon <= lonb[-1] and latb[0] <= lat <= latb[-1]):
+                continue
+            jpos = np.argmin(np.abs(lon - lonb))
+            ipos = np.argmin(np.abs(lat - latb))
+            if mt[j, i] != mb[ipos, jpos] and mt[j, i] != 2 and mb[ipos, jpos] != 2:
+                mt[j, i] = 0
+                mb[ipos, jpos] = 0
+    return m1, m2
+
+
+def _random_mask(rng, shape, boundary=True):
+    mask = (rng.random(shape) < 0.6).astype(np.int32)
+    if boundary:
+        mask[0, :] = np.where(mask[0, :] == 1, 2, 0)
+    return mask
+
+
+def test_nested_matches_loop():
+    rng = np.random.default_rng(0)
+    # 0.1 deg outer grid (40401 cells) and an offset 0.02 deg nest (2601 cells)
+    lon_o = np.round(np.linspace(100.0, 120.0, 201), 6)
+    lat_o = np.round(np.linspace(0.0, 20.0, 201), 6)
+    lon_i = np.round(110.003 + 0.02 * np.arange(51), 6)
+    lat_i = np.round(10.003 + 0.02 * np.arange(51), 6)
+    for _ in range(5):
+        m_o = _random_mask(rng, (lat_o.size, lon_o.size), boundary=False)
+        m_i = _random_mask(rng, (lat_i.size, lon_i.size))
+
+        exp_o, exp_i = _reconcile_loop(m_o, lon_o, lat_o, m_i, lon_i, lat_i)
+        got_o, got_i, n_overlap, _ = reconcile_masks(m_o, lon_o, lat_o, m_i, lon_i, lat_i)
+        assert n_overlap == m_i.size
+        assert np.array_equal(got_o, exp_o)
+        assert np.array_equal(got_i, exp_i)
+
+        # Argument order does not matter: the smaller grid is looked up in the larger
+        got_i2, got_o2, _, _ = reconcile_masks(m_i, lon_i, lat_i, m_o, lon_o, lat_o)
+        assert np.array_equal(got_o2, exp_o)
+        assert np.array_equal(got_i2, exp_i)
+
+
+def test_partial_overlap_matches_loop():
+    rng = np.random.default_rng(1)
+    lon_a = np.round(np.linspace(0.0, 5.0, 26), 6)
+    lat_a = np.round(np.linspace(0.0, 5.0, 26), 6)
+    lon_b = np.round(3.01 + 0.05 * np.arange(60), 6)
+    lat_b = np.round(-1.01 + 0.05 * np.arange(60), 6)
+    m_a = _random_mask(rng, (lat_a.size, lon_a.size), boundary=False)
+    m_b = _random_mask(rng, (lat_b.size, lon_b.size))
+
+    exp_a, exp_b = _reconcile_loop(m_a, lon_a, lat_a, m_b, lon_b, lat_b)
+    got_a, got_b, _, _ = reconcile_masks(m_a, lon_a, lat_a, m_b, lon_b, lat_b)
+    assert np.array_equal(got_a, exp_a)
+    assert np.array_equal(got_b, exp_b)
@@ -0,0 +1,76 @@
+"""
+Regression tests for split_dateline: the pieces of a polygon split at the
+antimeridian must cover exactly the polygon, without overlapping.
+
+Run from gridgen/python:
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+import numpy as np
+from matplotlib.path import Path
+
+_python_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _python_dir not in sys.path:
+    sys.path.insert(0, _python_dir)
+
+from grid.split_dateline import split_dateline
+
+
+def _coverage(pieces, px, py):
+    """Number of pieces containing each point (longitudes in -180~180)."""
+    pts = np.c_[(np.asarray(px) + 180.0) % 360.0 - 180.0, py]
+    count = np.zeros(len(pts), dtype=int)
+    for x, y in pieces:
+        assert np.all((x >= -180.0) & (x <= 180.0))
+        count += Path(np.c_[x, y]).contains_points(pts)
+    return count
+
+
+def test_multi_crossing_polygon():
+    # Crosses 180 four times: two lobes east of the dateline, water between them
+    x = np.array([170, 179, 179, 185, 185, 179, 179, 185, 185, 179, 179, 170], dtype=float)
+    y = np.array([0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5], dtype=float)
+    pieces = split_dateline(x, y)
+    assert len(pieces) == 3
+
+    # Water between the lobes and inside the bay west of the dateline
+    assert list(_coverage(pieces, [179.5, 182.0, 182.0], [2.5, 2.5, 0.5])) == [0, 0, 0]
+    # Land: main body west of 180 and both lobes
+    assert list(_coverage(pieces, [175.0, 179.5, 182.0, 182.0], [2.5, 1.5, 1.5, 3.5])) == [1, 1, 1, 1]
+
+    rng = np.random.default_rng(0)
+    px = rng.uniform(169.0, 186.0, 5000)
+    py = rng.uniform(-0.5, 5.5, 5000)
+    inside = Path(np.c_[x, y]).contains_points(np.c_[px, py])
+    assert np.array_equal(_coverage(pieces, px, py), inside.astype(int))
+
+
+def test_random_polygons_match_original():
+    rng = np.random.default_rng(1)
+    for trial in range(200):
+        n = rng.integers(5, 60)
+        ang = np.sort(rng.uniform(0.0, 2.0 * np.pi, n))
+        r = rng.uniform(1.0, 8.0, n)
+        cx, cy = 180.0 + rng.uniform(-3.0, 3.0), rng.uniform(-40.0, 40.0)
+        x = cx + r * np.cos(ang)
+        y = cy + r * np.sin(ang)
+        # Star-shaped around (cx, cy), so the polygon is simple
+        if trial % 2:
+            x = (x + 180.0) % 360.0 - 180.0
+        pieces = split_dateline(x, y)
+
+        px = rng.uniform(cx - 9.0, cx + 9.0, 2000)
+        py = rng.uniform(cy - 9.0, cy + 9.0, 2000)
+        inside = Path(np.c_[np.where(x < 0.0, x + 360.0, x), y]).contains_points(np.c_[px, py])
+        assert np.array_equal(_coverage(pieces, px, py), inside.astype(int)), trial
+
+
+def test_polygon_not_crossing():
+    x = np.array([10.0, 20.0, 20.0, 10.0])
+    y = np.array([0.0, 0.0, 5.0, 5.0])
+    pieces = split_dateline(x, y)
+    assert len(pieces) == 1
+    assert np.array_equal(pieces[0][0], x)
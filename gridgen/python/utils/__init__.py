@@ -2,7 +2,8 @@
 Utility functions for GridGen.
 """
 
-from .compute_cellcorner import compute_cellcorner
-
-__all__ = ['compute_cellcorner']
+from .cell_binning import CellStats, make_binner
+from .compute_cellcorner import compute_cellcorner, compute_cellcorners
+from .progress import Instrument, report_progress
 
+__all__ = ['compute_cellcorner', 'compute_cellcorners', 'CellStats', 'make_binner', 'Instrument', 'report_progress']
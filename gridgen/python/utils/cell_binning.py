@@ -0,0 +1,123 @@
+"""
+Cell Binning Utilities
+
+Assign scattered points (XYZ soundings, base bathymetry nodes) to the cells
+of a target grid and accumulate per-cell statistics with np.bincount.
+
+- Rectilinear grids: searchsorted on the cell edges of the 1D axes.
+- Curvilinear grids: nearest cell centre through a KD-tree, limited to half
+  the cell diagonal so points outside the grid are dropped.
+"""
+
+import numpy as np
+
+try:
+    from .compute_cellcorner import compute_cellcorners
+except ImportError:
+    from compute_cellcorner import compute_cellcorners
+
+
+def _cell_edges(centers):
+    """Cell edges (len N+1, ascending) around ascending 1D cell centres."""
+    if centers.size == 1:
+        return np.array([centers[0] - 0.5, centers[0] + 0.5])
+    mid = 0.5 * (centers[1:] + centers[:-1])
+    return np.concatenate([[centers[0] - (mid[0] - centers[0])], mid,
+                           [centers[-1] + (centers[-1] - mid[-1])]])
+
+
+def separable_axes(x, y):
+    """1D lon (per column) and lat (per row) when the grid is rectilinear, else None."""
+    lon1d = x[0, :]
+    lat1d = y[:, 0]
+    if np.allclose(x, lon1d[np.newaxis, :]) and np.allclose(y, lat1d[:, np.newaxis]):
+        return lon1d, lat1d
+    return None
+
+
+class RectBinner:
+    """Map points to cell indices of a rectilinear grid by searchsorted on the cell edges."""
+
+    def __init__(self, lon1d, lat1d):
+        self.nx = lon1d.size
+        self.ny = lat1d.size
+        self.lon_flip = lon1d.size > 1 and lon1d[-1] < lon1d[0]
+        self.lat_flip = lat1d.size > 1 and lat1d[-1] < lat1d[0]
+        self.lon_edges = _cell_edges(lon1d[::-1] if self.lon_flip else lon1d)
+        self.lat_edges = _cell_edges(lat1d[::-1] if self.lat_flip else lat1d)
+        self.bounds = (self.lon_edges[0], self.lon_edges[-1], self.lat_edges[0], self.lat_edges[-1])
+
+    def cell_index(self, lon, lat):
+        """Flat cell index of each point inside the grid, and the boolean 'inside' mask."""
+        i = np.searchsorted(self.lon_edges, lon, side='right') - 1
+        j = np.searchsorted(self.lat_edges, lat, side='right') - 1
+        inside = (i >= 0) & (i < self.nx) & (j >= 0) & (j < self.ny)
+        i, j = i[inside], j[inside]
+        if self.lon_flip:
+            i = self.nx - 1 - i
+        if self.lat_flip:
+            j = self.ny - 1 - j
+        return j * self.nx + i, inside
+
+
+class CurvBinner:
+    """Map points to the nearest cell centre of a curvilinear grid (KD-tree index)."""
+
+    def __init__(self, x, y, max_width, max_height):
+        from scipy.spatial import cKDTree
+
+        self.tree = cKDTree(np.column_stack([x.ravel(), y.ravel()]))
+        # Points farther than half the largest cell diagonal belong to no cell
+        self.max_dist = 0.5 * np.hypot(max_width, max_height)
+        self.bounds = (np.min(x) - max_width, np.max(x) + max_width,
+                       np.min(y) - max_height, np.max(y) + max_height)
+
+    def cell_index(self, lon, lat):
+        """Flat cell index of each point inside the grid, and the boolean 'inside' mask."""
+        dist, idx = self.tree.query(np.column_stack([lon, lat]), distance_upper_bound=self.max_dist)
+        inside = np.isfinite(dist)
+        return idx[inside], inside
+
+
+def make_binner(x, y, wdth=None, hgt=None):
+    """
+    Binner for the 2D grid (x, y): RectBinner when the grid is rectilinear,
+    otherwise CurvBinner. Cell widths/heights are computed when not given.
+    """
+    axes = separable_axes(x, y)
+    if axes is not None:
+        return RectBinner(*axes)
+    if wdth is None or hgt is None:
+        _, _, wdth, hgt = compute_cellcorners(x, y)
+    return CurvBinner(x, y, float(np.max(wdth)), float(np.max(hgt)))
+
+
+class CellStats:
+    """Per-cell counts and sums of all and of wet (z <= cut_off) points."""
+
+    def __init__(self, n_cells):
+        self.n_cells = n_cells
+        self.count_all = np.zeros(n_cells, dtype=np.int64)
+        self.count_wet = np.zeros(n_cells, dtype=np.int64)
+        self.sum_all = np.zeros(n_cells, dtype=np.float64)
+        self.sum_wet = np.zeros(n_cells, dtype=np.float64)
+
+    def add(self, binner, lon, lat, z, cut_off):
+        """Bin one chunk of points; returns the number of points that fell inside the grid."""
+        cells, inside = binner.cell_index(lon, lat)
+        z = z[inside]
+        wet = z <= cut_off
+        n = self.n_cells
+        self.count_all += np.bincount(cells, minlength=n)
+        self.sum_all += np.bincount(cells, weights=z, minlength=n)
+        self.count_wet += np.bincount(cells[wet], minlength=n)
+        self.sum_wet += np.bincount(cells[wet], weights=z[wet], minlength=n)
+        return z.size
+
+    def wet_cells(self, limit):
+        """Cells where more than `limit` of the points are wet (generate_grid averaging rule)."""
+        return (self.count_wet > 0) & (self.count_wet > limit * self.count_all)
+
+    def wet_mean(self, cells):
+        """Mean of the wet points in the selected cells."""
+        return self.sum_wet[cells] / self.count_wet[cells]
@@ -275,3 +275,68 @@ def compute_cellcorner(x, y, j, k, Nx, Ny):
     
     return c1, c2, c3, c4, wdth, hgt
 
+
+
+def _half_way(xt, yt, x0, y0):
+    """Midpoints between (x0, y0) and (xt, yt), with longitude wrap-around."""
+    xt = np.where(np.abs(xt - x0) > 270, xt - 360 * np.sign(xt - x0), xt)
+    return 0.5 * (xt + x0), 0.5 * (yt + y0)
+
+
+def compute_cellcorners(x, y):
+    """
+    Compute the corners of all grid cells at once.
+
+    Array version of compute_cellcorner: interior cells are computed with
+    array operations and the (few) boundary cells fall back to the scalar
+    routine, so the result is identical cell by cell.
+
+    Parameters
+    ----------
+    x : ndarray
+        2D array specifying the longitudes of each cell
+    y : ndarray
+        2D array specifying the latitudes of each cell
+
+    Returns
+    -------
+    cx, cy : ndarray
+        Arrays of shape (4, Ny, Nx) with the x and y coordinates of the
+        corners c1 (bottom-right), c2 (top-right), c3 (top-left) and
+        c4 (bottom-left) of each cell
+    wdth : ndarray
+        (Ny, Nx) cell widths
+    hgt : ndarray
+        (Ny, Nx) cell heights
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    Ny, Nx = x.shape
+    cx = np.empty((4, Ny, Nx))
+    cy = np.empty((4, Ny, Nx))
+
+    if Nx > 2 and Ny > 2:
+        x0 = x[1:-1, 1:-1]
+        y0 = y[1:-1, 1:-1]
+        neighbours = (
+            (slice(None, -2), slice(2, None)),    # c1: (k-1, j+1)
+            (slice(2, None), slice(2, None)),     # c2: (k+1, j+1)
+            (slice(2, None), slice(None, -2)),    # c3: (k+1, j-1)
+            (slice(None, -2), slice(None, -2)),   # c4: (k-1, j-1)
+        )
+        for n, (rows, cols) in enumerate(neighbours):
+            cx[n, 1:-1, 1:-1], cy[n, 1:-1, 1:-1] = _half_way(x[rows, cols], y[rows, cols], x0, y0)
+
+    # Boundary cells: first/last row and column
+    edge = np.zeros((Ny, Nx), dtype=bool)
+    edge[[0, -1], :] = True
+    edge[:, [0, -1]] = True
+    for k, j in zip(*np.nonzero(edge)):
+        corners = compute_cellcorner(x, y, j + 1, k + 1, Nx, Ny)[:4]
+        for n, c in enumerate(corners):
+            cx[n, k, j] = c[0]
+            cy[n, k, j] = c[1]
+
+    wdth = np.hypot(cx[0] - cx[3], cy[0] - cy[3])
+    hgt = np.hypot(cx[1] - cx[0], cy[1] - cy[0])
+    return cx, cy, wdth, hgt
@@ -0,0 +1,276 @@
+"""
+Stage Instrumentation
+
+Structured progress and profiling events for the grid generation steps.
+Each stage emits an 'enter' event, throttled 'progress' events with the
+fraction done (and the overall fraction when the number of stages is
+known) and an 'exit' event with wall-clock time, CPU time, peak resident
+memory and item counts. Events are written as JSON lines to a side
+channel (a file, usually named by the GRIDGEN_EVENTS environment
+variable), so callers no longer need to parse the printed log.
+
+Library code reports through the module functions (report_progress,
+set_counts), which go to the active Instrument and do nothing when none
+is active.
+
+Last Update: 2025
+"""
+
+import json
+import os
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    # Windows: no getrusage
+    resource = None
+
+# Environment variable naming the JSON lines event file
+EVENTS_ENV = 'GRIDGEN_EVENTS'
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def rss_bytes():
+    """Current resident set size, None where /proc is not available."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def cpu_seconds():
+    """User + system time of this process and its reaped children (this
+    process only where getrusage is not available)."""
+    if resource is None:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+class Stage:
+    """An open stage; use Instrument.stage() to create one."""
+
+    def __init__(self, instrument, name, index, depth, counts):
+        self.instrument = instrument
+        self.name = name
+        self.index = index
+        self.depth = depth
+        self.counts = {k: int(v) for k, v in counts.items()}
+        self.fraction = 0.0
+        self._peak = [0]
+        self._stop = None
+        self._sampler = None
+
+    def count(self, **counts):
+        """Add or update item counts reported on exit."""
+        self.counts.update({k: int(v) for k, v in counts.items()})
+
+    def progress(self, done, total):
+        """Report `done` of `total` items; events are throttled to 1 % steps."""
+        fraction = min(1.0, done / total) if total else 1.0
+        if fraction < self.fraction + 0.01 and fraction < 1.0:
+            return
+        self.fraction = fraction
+        event = {'event': 'progress', 'stage': self.name, 'fraction': round(fraction, 4),
+                 'done': int(done), 'total': int(total)}
+        overall = self.instrument.overall(self)
+        if overall is not None:
+            event['overall'] = overall
+        self.instrument.emit(event)
+
+    def __enter__(self):
+        inst = self.instrument
+        inst.stack.append(self)
+        self._rss0 = rss_bytes()
+        self._peak = [self._rss0 or 0]
+        if inst.sample_interval and self._rss0 is not None:
+            self._stop = threading.Event()
+            self._sampler = threading.Thread(target=self._sample, daemon=True)
+            self._sampler.start()
+        self._cpu0 = cpu_seconds()
+        self._t0 = time.perf_counter()
+        event = {'event': 'enter', 'stage': self.name, 'index': self.index, 'depth': self.depth}
+        if self.counts:
+            event['counts'] = dict(self.counts)
+        inst.emit(event)
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.instrument.sample_interval):
+            rss = rss_bytes()
+            if rss is not None and rss > self._peak[0]:
+                self._peak[0] = rss
+
+    def __exit__(self, exc_type, exc, tb):
+        inst = self.instrument
+        duration = time.perf_counter() - self._t0
+        cpu = cpu_seconds() - self._cpu0
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+        rss1 = rss_bytes()
+        if rss1 is None and resource is not None:
+            # Process lifetime peak; ru_maxrss is in kilobytes on Linux
+            peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+        elif rss1 is None:
+            # Neither /proc nor getrusage (Windows): memory is not measured
+            peak_mb = 0.0
+        else:
+            peak_mb = max(self._peak[0], rss1) / 2.0 ** 20
+        record = {
+            'event': 'exit',
+            'stage': self.name,
+            'index': self.index,
+            'depth': self.depth,
+            'status': 'ok' if exc_type is None else 'error',
+            'duration_s': round(duration, 4),
+            'cpu_s': round(cpu, 4),
+            'peak_rss_mb': round(peak_mb, 1),
+            'rss_delta_mb': round(((rss1 or 0) - (self._rss0 or 0)) / 2.0 ** 20, 1),
+            'counts': dict(self.counts),
+        }
+        if exc_type is not None:
+            record['error'] = f'{exc_type.__name__}: {exc}'
+        inst.stack.pop()
+        inst.records.append(record)
+        inst.emit(record)
+        return False
+
+
+class Instrument:
+    """
+    Collect stage events and write them to a side channel.
+
+    Parameters
+    ----------
+    sink : str, file-like, callable or None
+        Event file path (truncated), an open text stream, a function called
+        with every event dict, or None to only keep the records in memory
+    total_stages : int, optional
+        Number of top-level stages, used for the 'overall' progress fraction
+    sample_interval : float
+        Period (s) of the peak memory sampling thread, 0 disables sampling
+    """
+
+    def __init__(self, sink=None, total_stages=None, sample_interval=0.05):
+        self.total_stages = total_stages
+        self.sample_interval = sample_interval
+        self.records = []
+        self.stack = []
+        self._top_index = 0
+        self._t0 = time.perf_counter()
+        self._file = None
+        self._stream = None
+        self._callback = None
+        if isinstance(sink, str):
+            self._file = self._stream = open(sink, 'w', encoding='utf-8')
+        elif hasattr(sink, 'write'):
+            self._stream = sink
+        elif callable(sink):
+            self._callback = sink
+
+    @classmethod
+    def from_env(cls, path=None, **kwargs):
+        """Instrument writing to `path` or to the file named by GRIDGEN_EVENTS."""
+        return cls(path or os.environ.get(EVENTS_ENV) or None, **kwargs)
+
+    def emit(self, event):
+        event['t'] = round(time.perf_counter() - self._t0, 4)
+        if self._callback is not None:
+            self._callback(event)
+        if self._stream is not None:
+            try:
+                self._stream.write(json.dumps(event, separators=(',', ':')) + '\n')
+                self._stream.flush()
+            except (OSError, ValueError):
+                # A broken side channel must not stop the grid generation
+                self._stream = None
+
+    def overall(self, stage):
+        """Overall fraction done while `stage` is at its current fraction."""
+        if not self.total_stages or not self.stack:
+            return None
+        top = self.stack[0]
+        fraction = stage.fraction if top is stage else top.fraction
+        return round(min(1.0, (top.index - 1 + fraction) / self.total_stages), 4)
+
+    def start(self, **info):
+        """Emit the 'start' event with run information (parameters, grid size)."""
+        self.emit(dict({'event': 'start', 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                        'pid': os.getpid(), 'total_stages': self.total_stages}, **info))
+
+    def stage(self, name, **counts):
+        """Context manager timing one stage; nested stages are allowed."""
+        depth = len(self.stack)
+        if depth == 0:
+            self._top_index += 1
+            index = self._top_index
+        else:
+            index = self.stack[-1].index
+        return Stage(self, name, index, depth, counts)
+
+    def skip(self, name, reason=''):
+        """Record a top-level stage that is not run."""
+        self._top_index += 1
+        self.emit({'event': 'skip', 'stage': name, 'index': self._top_index, 'reason': reason})
+
+    def progress(self, done, total, stage=None):
+        """Progress of the innermost stage; ignored when its name is not `stage`."""
+        if self.stack and (stage is None or self.stack[-1].name == stage):
+            self.stack[-1].progress(done, total)
+
+    def close(self, status='ok'):
+        """Emit the 'end' event with the stage summary and close the event file."""
+        self.emit({'event': 'end', 'status': status,
+                   'duration_s': round(time.perf_counter() - self._t0, 4),
+                   'stages': [{'stage': r['stage'], 'duration_s': r['duration_s'],
+                               'peak_rss_mb': r['peak_rss_mb']}
+                              for r in self.records if r['depth'] == 0]})
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._stream = None
+
+
+_active = []
+
+
+def activate(instrument):
+    """Make `instrument` receive the module level reports until deactivate()."""
+    _active.append(instrument)
+    return instrument
+
+
+def deactivate(instrument):
+    if instrument in _active:
+        _active.remove(instrument)
+
+
+def current():
+    """The active Instrument or None."""
+    return _active[-1] if _active else None
+
+
+def report_progress(done, total, stage=None):
+    """
+    Report progress of the current stage of the active Instrument.
+
+    `stage` names the stage the caller belongs to; the report is dropped
+    when another stage is innermost (e.g. compute_boundary running inside
+    split_boundary).
+    """
+    if _active:
+        _active[-1].progress(done, total, stage)
+
+
+def set_counts(stage=None, **counts):
+    """Attach item counts to the current stage of the active Instrument."""
+    if _active and _active[-1].stack:
+        st = _active[-1].stack[-1]
+        if stage is None or st.name == stage:
+            st.count(**counts)
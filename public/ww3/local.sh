@@ -1,66 +1,209 @@
 #!/bin/bash
 set -e  # 遇到错误立即退出
 
-# 执行 ww3_prnc 的函数，处理多个强迫场文件
-run_prnc_with_fields() {
-    # 检查是否存在多个强迫场文件
-    if [ -f "ww3_prnc_current.nml" ] || [ -f "ww3_prnc_level.nml" ] || [ -f "ww3_prnc_ice.nml" ] || [ -f "ww3_prnc_ice1.nml" ]; then
-        # 存在多个强迫场文件，需要依次处理
-        
-        # 1. 先执行一次 ww3_prnc（使用默认的 ww3_prnc.nml，通常是风场）
-        ww3_prnc
-        
-        # 2. 把 ww3_prnc.nml 改名为 ww3_prnc_wind.nml
-        mv ww3_prnc.nml ww3_prnc_wind.nml
-        
-        # 3. 依次处理其他强迫场文件
-        if [ -f "ww3_prnc_current.nml" ]; then
-            mv ww3_prnc_current.nml ww3_prnc.nml
-            ww3_prnc
-            mv ww3_prnc.nml ww3_prnc_current.nml
+# 后台执行一个预处理步骤：输出写入 <名称>.log，退出码和耗时写入 <名称>.status
+prep_start_step() {
+    local step_root="$1" name="$2" dir="$3"
+    shift 3
+    (
+        t0=$(date +%s)
+        if cd "$dir"; then
+            "$@" > "$step_root/$name.log" 2>&1 && rc=0 || rc=$?
+        else
+            rc=1
         fi
-        
-        if [ -f "ww3_prnc_level.nml" ]; then
-            mv ww3_prnc_level.nml ww3_prnc.nml
-            ww3_prnc
-            mv ww3_prnc.nml ww3_prnc_level.nml
+        echo "$rc $(( $(date +%s) - t0 ))" > "$step_root/$name.status.tmp"
+        mv -f "$step_root/$name.status.tmp" "$step_root/$name.status"
+        exit $rc
+    ) &
+}
+
+# 把步骤输出追加到日志并报告耗时，累计到 PREP_SERIAL，返回步骤的退出码
+prep_report_step() {
+    local step_root="$1" name="$2" rc=1 elapsed=0
+    if [ -f "$step_root/$name.status" ]; then
+        read rc elapsed < "$step_root/$name.status"
+    fi
+    echo "=== $name output ==="
+    cat "$step_root/$name.log" 2>/dev/null || true
+    PREP_SERIAL=$(( PREP_SERIAL + elapsed ))
+    if [ "$rc" -ne 0 ]; then
+        echo "=== $name FAILED: exit $rc after ${elapsed}s ==="
+        return $rc
+    fi
+    echo "=== $name done in ${elapsed}s ==="
+    return 0
+}
+
+# 在临时目录中执行一个强迫场的 ww3_prnc（链接 mod_def.ww3 和输入文件），成功后把生成的 *.ww3 移回当前目录
+prnc_field_step() {
+    local field="$1" work_dir=".prnc_work/$1" entry
+    rm -rf "$work_dir"
+    mkdir -p "$work_dir"
+    for entry in *; do
+        case "$entry" in
+            ww3_prnc*.nml) continue ;;
+            mod_def.ww3) ;;
+            *.ww3) continue ;;
+        esac
+        if [ -f "$entry" ]; then
+            ln -s "$PWD/$entry" "$work_dir/$entry"
         fi
-        
-        if [ -f "ww3_prnc_ice.nml" ]; then
-            mv ww3_prnc_ice.nml ww3_prnc.nml
-            ww3_prnc
-            mv ww3_prnc.nml ww3_prnc_ice.nml
+    done
+    if [ "$field" = "wind" ]; then
+        cp ww3_prnc.nml "$work_dir/ww3_prnc.nml" || return 1
+    else
+        cp "ww3_prnc_${field}.nml" "$work_dir/ww3_prnc.nml" || return 1
+    fi
+    (cd "$work_dir" && ww3_prnc) || return $?
+    for entry in "$work_dir"/*.ww3; do
+        if [ -f "$entry" ] && [ ! -L "$entry" ]; then
+            mv -f "$entry" . || return 1
         fi
+    done
+    rm -rf "$work_dir"
+}
 
-        if [ -f "ww3_prnc_ice1.nml" ]; then
-            mv ww3_prnc_ice1.nml ww3_prnc.nml
-            ww3_prnc
-            mv ww3_prnc.nml ww3_prnc_ice1.nml
+# 执行 ww3_prnc 的函数，处理多个强迫场文件
+# 多个强迫场时每个场在独立的临时目录中并行执行，完成后把 *.ww3 合并回当前目录
+run_prnc_with_fields() {
+    local fields="wind" field failed=""
+    for field in current level ice ice1; do
+        if [ -f "ww3_prnc_${field}.nml" ]; then
+            fields="$fields $field"
         fi
-        
-        # 4. 最后把 ww3_prnc_wind.nml 改回 ww3_prnc.nml
-        mv ww3_prnc_wind.nml ww3_prnc.nml
-    else
+    done
+
+    if [ "$fields" = "wind" ]; then
         # 只有一个 ww3_prnc.nml，直接执行
+        echo "=== Running ww3_prnc ==="
         ww3_prnc
+        return $?
+    fi
+
+    local step_root="$PWD/.prnc_work"
+    rm -rf "$step_root"
+    mkdir -p "$step_root"
+    local t_start=$(date +%s)
+    PREP_SERIAL=0
+    for field in $fields; do
+        echo "=== Running ww3_prnc ($field, parallel) ==="
+        prep_start_step "$step_root" "prnc.$field" . prnc_field_step "$field"
+    done
+    wait || true
+
+    # 按固定顺序汇总日志，逐场报告结果
+    for field in $fields; do
+        prep_report_step "$step_root" "prnc.$field" || failed="$failed $field"
+    done
+    local t_wall=$(( $(date +%s) - t_start ))
+    echo "=== ww3_prnc parallel: ${t_wall}s wall, ${PREP_SERIAL}s sequential, saved $(( PREP_SERIAL - t_wall ))s ==="
+    if [ -n "$failed" ]; then
+        echo "=== ww3_prnc failed fields:$failed (logs kept in $step_root) ==="
+        return 1
+    fi
+    rm -rf "$step_root"
+    return 0
+}
+
+# 嵌套网格预处理依赖图：用法 run_nested_preprocess <最大并行数> <网格目录>...
+# 每个网格 ww3_grid → 各强迫场 ww3_prnc 和 ww3_strt，不同网格之间互不依赖；
+# 依赖失败的步骤跳过，全部成功才返回 0
+run_nested_preprocess() {
+    local max_jobs="$1"
+    shift
+    local step_root="$PWD/.preprocess_steps" grid field i dep running=0 pending failed=0 progress
+    local names=() dirs=() deps=() cmds=() state=()
+    rm -rf "$step_root"
+    mkdir -p "$step_root"
+
+    # 1. 步骤表：名称、目录、依赖步骤下标、命令
+    for grid in "$@"; do
+        dep=${#names[@]}
+        names+=("grid.$grid"); dirs+=("$grid"); deps+=(-1); cmds+=("ww3_grid")
+        for field in wind current level ice ice1; do
+            if { [ "$field" = "wind" ] && [ -f "$grid/ww3_prnc.nml" ]; } || [ -f "$grid/ww3_prnc_${field}.nml" ]; then
+                names+=("prnc.$grid.$field"); dirs+=("$grid"); deps+=($dep); cmds+=("prnc_field_step $field")
+            fi
+        done
+        names+=("strt.$grid"); dirs+=("$grid"); deps+=($dep); cmds+=("ww3_strt")
+    done
+    for ((i = 0; i < ${#names[@]}; i++)); do
+        state[i]=pending
+    done
+
+    # 2. 调度：收集已结束的步骤，启动依赖已完成的步骤，直到没有待执行和执行中的步骤
+    local t_start=$(date +%s)
+    PREP_SERIAL=0
+    while true; do
+        progress=0
+        for ((i = 0; i < ${#names[@]}; i++)); do
+            if [ "${state[i]}" = running ] && [ -f "$step_root/${names[i]}.status" ]; then
+                if prep_report_step "$step_root" "${names[i]}"; then
+                    state[i]=done
+                else
+                    state[i]=failed
+                    failed=1
+                fi
+                running=$(( running - 1 ))
+                progress=1
+            fi
+        done
+
+        pending=0
+        for ((i = 0; i < ${#names[@]}; i++)); do
+            [ "${state[i]}" = pending ] || continue
+            dep=${deps[i]}
+            if [ "$dep" -ge 0 ] && { [ "${state[dep]}" = failed ] || [ "${state[dep]}" = skipped ]; }; then
+                state[i]=skipped
+                echo "=== ${names[i]} skipped: ${names[dep]} did not succeed ==="
+                progress=1
+                continue
+            fi
+            if [ "$dep" -ge 0 ] && [ "${state[dep]}" != done ]; then
+                pending=$(( pending + 1 ))
+                continue
+            fi
+            if [ "$running" -ge "$max_jobs" ]; then
+                pending=$(( pending + 1 ))
+                continue
+            fi
+            echo "=== Running ${names[i]} ==="
+            prep_start_step "$step_root" "${names[i]}" "${dirs[i]}" ${cmds[i]}
+            state[i]=running
+            running=$(( running + 1 ))
+            progress=1
+        done
+
+        if [ "$running" -eq 0 ] && [ "$pending" -eq 0 ]; then
+            break
+        fi
+        if [ "$progress" -eq 0 ]; then
+            wait -n 2>/dev/null || sleep 1
+        fi
+    done
+
+    local t_wall=$(( $(date +%s) - t_start ))
+    echo "=== nested preprocess: ${t_wall}s wall, ${PREP_SERIAL}s sequential, saved $(( PREP_SERIAL - t_wall ))s (max $max_jobs parallel) ==="
+    if [ "$failed" -ne 0 ]; then
+        echo "=== nested preprocess failed (logs kept in $step_root) ==="
+        return 1
     fi
+    rm -rf "$step_root"
+    for grid in "$@"; do
+        rmdir "$grid/.prnc_work" 2>/dev/null || true
+    done
+    return 0
 }
 
 # 检测嵌套网格模式
 if [ -d "coarse" ] && [ -d "fine" ]; then
     # 嵌套网格模式
-    cd coarse
-    ww3_grid
-    run_prnc_with_fields
-    ww3_strt
-    cd ..
-    
-    cd fine
-    ww3_grid
-    run_prnc_with_fields
-    ww3_strt
-    cd ..
-    
+    # 预处理：各网格的 ww3_grid、ww3_prnc、ww3_strt 按依赖关系并行执行，全部成功后再运行 ww3_multi
+    if ! run_nested_preprocess 4 coarse fine; then
+        exit 1
+    fi
+
     # Coarse 网格处理
     [ -f coarse/mod_def.ww3 ] && mv coarse/mod_def.ww3 mod_def.coarse
     [ -f coarse/restart.ww3 ] && mv coarse/restart.ww3 restart.coarse
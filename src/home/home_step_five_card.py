@@ -16,9 +16,14 @@ from qfluentwidgets import PrimaryPushButton, TableWidget, LineEdit
 from setting.language_manager import tr
 from setting.config import SERVER_HOST, SERVER_PORT, SERVER_USER, SERVER_PASSWORD, load_config
 from .utils import create_header_card
+from .ssh_session import SSHSessionMixin, SSHNotConnected, PRIORITY_HIGH, PRIORITY_LOW
 
 
-class HomeStepFiveCard:
+# 后台监控（CPU 排行、squeue）同一查询的最小间隔（秒），间隔内的轮询复用上次结果
+MONITOR_MIN_INTERVAL = 5.0
+
+
+class HomeStepFiveCard(SSHSessionMixin):
     """第五步：连接服务器 Mixin"""
     
     def create_step_5_server_card(self, content_widget, content_layout):
@@ -716,22 +721,8 @@ class HomeStepFiveCard:
                 try:
                     self.log(tr("step5_connecting_server", "🔄 正在连接服务器 {host}:{port}...").format(host=host, port=port))
                     
-                    # 创建 SSH 客户端
-                    ssh = paramiko.SSHClient()
-                    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                    
-                    # 连接服务器
-                    ssh.connect(
-                        hostname=host,
-                        port=port,
-                        username=username,
-                        password=password,
-                        timeout=10
-                    )
-                    
-                    # 保存连接
-                    self.ssh = ssh
-                    self._last_conn_args = (host, port, username, password)
+                    # 连接服务器（连接由 ssh_manager 统一管理，所有服务器操作共用）
+                    self.ssh_manager.connect(host, port, username, password, timeout=10)
                     
                     # 更新状态
                     self.status_signal.emit(tr("connected", "已连接"))
@@ -850,6 +841,8 @@ class HomeStepFiveCard:
                 self.queue_button.setEnabled(True)
             if hasattr(self, 'upload_button'):
                 self.upload_button.setEnabled(True)
+            if hasattr(self, 'sync_button'):
+                self.sync_button.setEnabled(True)
             if hasattr(self, 'exec_button'):
                 self.exec_button.setEnabled(True)
             if hasattr(self, 'check_button'):
@@ -858,6 +851,8 @@ class HomeStepFiveCard:
                 self.clear_folder_button.setEnabled(True)
             if hasattr(self, 'download_button'):
                 self.download_button.setEnabled(True)
+            if hasattr(self, 'download_subset_button'):
+                self.download_subset_button.setEnabled(True)
             if hasattr(self, 'download_log_button'):
                 self.download_log_button.setEnabled(True)
             
@@ -865,20 +860,8 @@ class HomeStepFiveCard:
             try:
                 def start_monitoring():
                     if not self.ssh and self._last_conn_args:
-                        host, port_i, user, pwd = self._last_conn_args
                         try:
-                            self.ssh = paramiko.SSHClient()
-                            self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                            self.ssh.connect(
-                                hostname=host,
-                                port=port_i,
-                                username=user,
-                                password=pwd,
-                                look_for_keys=False,
-                                allow_agent=False,
-                                timeout=15,
-                                banner_timeout=200
-                            )
+                            self.ssh_manager.ensure_connected(wait=False)
                         except Exception:
                             QtCore.QTimer.singleShot(1000, start_monitoring)
                             return
@@ -898,6 +881,8 @@ class HomeStepFiveCard:
                 self.queue_button.setEnabled(False)
             if hasattr(self, 'upload_button'):
                 self.upload_button.setEnabled(False)
+            if hasattr(self, 'sync_button'):
+                self.sync_button.setEnabled(False)
             if hasattr(self, 'exec_button'):
                 self.exec_button.setEnabled(False)
             if hasattr(self, 'check_button'):
@@ -906,6 +891,8 @@ class HomeStepFiveCard:
                 self.clear_folder_button.setEnabled(False)
             if hasattr(self, 'download_button'):
                 self.download_button.setEnabled(False)
+            if hasattr(self, 'download_subset_button'):
+                self.download_subset_button.setEnabled(False)
             if hasattr(self, 'download_log_button'):
                 self.download_log_button.setEnabled(False)
         except Exception:
@@ -934,16 +921,16 @@ class HomeStepFiveCard:
                 try:
                     self.log_signal.emit(tr("step5_canceling_job", "🔄 正在取消任务 {jobid}...").format(jobid=jobid))
                     
-                    # 执行 scancel 命令
-                    stdin, stdout, stderr = self.ssh.exec_command(f"scancel {jobid}")
-                    exit_status = stdout.channel.recv_exit_status()
+                    # 执行 scancel 命令（用户操作，优先分配通道）
+                    result = self.ssh_manager.run(f"scancel {jobid}", priority=PRIORITY_HIGH, timeout=None)
+                    exit_status = result.exit_status
                     
                     if exit_status == 0:
                         self.log_signal.emit(tr("step5_cancel_success", "✅ 已成功取消任务 {jobid}").format(jobid=jobid))
                         # 清空输入框
                         QtCore.QTimer.singleShot(0, lambda: self.cancel_jobid_edit.clear())
                     else:
-                        error_msg = stderr.read().decode('utf-8', errors='ignore').strip()
+                        error_msg = result.stderr.strip()
                         if error_msg:
                             self.log_signal.emit(tr("step5_cancel_failed", "❌ 取消任务失败：{error}").format(error=error_msg))
                         else:
@@ -1022,15 +1009,35 @@ class HomeStepFiveCard:
                     self.status_signal.emit(tr("step6_not_connected", "未连接"))
                     self._hide_cpu_and_queue()
                     self._show_connect_button()
+                self._start_background_reconnect()
             else:
                 if getattr(self, "_connection_lost", False):
                     self._connection_lost = False
                     self.status_signal.emit(tr("connected", "已连接"))
                     self._update_cpu_and_queue()
                     self._hide_connect_button()
+                    self._enable_server_buttons()
         except Exception:
             pass
 
+    def _start_background_reconnect(self):
+        """连接断开后在后台按退避间隔尝试重连（不阻塞界面，同一时间只有一个重连线程）"""
+        if not self._last_conn_args:
+            return
+        thread = getattr(self, "_reconnect_thread", None)
+        if thread is not None and thread.is_alive():
+            return
+
+        def _worker():
+            try:
+                self.ssh_manager.ensure_connected(wait=False)
+                self.log_signal.emit(tr("ssh_auto_reconnected", "✅ 已自动重新连接服务器"))
+            except Exception:
+                pass
+
+        self._reconnect_thread = threading.Thread(target=_worker, daemon=True)
+        self._reconnect_thread.start()
+
     def _update_cpu_and_queue(self):
         """拉取 CPU 排行和任务队列，并更新 UI"""
         if getattr(self, "_queue_running", False):
@@ -1066,9 +1073,9 @@ class HomeStepFiveCard:
                 return
             try:
                 cmd = "ps -eo pid,user,pcpu --sort=-pcpu | head -n 6"
-                stdin, stdout, stderr = self.ssh.exec_command(cmd, timeout=5)
-                out = stdout.read().decode('utf-8', errors='ignore')
-                err = stderr.read().decode('utf-8', errors='ignore')
+                result = self.ssh_manager.run(cmd, priority=PRIORITY_LOW, timeout=5, coalesce="ps_cpu",
+                                              min_interval=MONITOR_MIN_INTERVAL, reconnect=False)
+                out, err = result.stdout, result.stderr
 
                 if not self._queue_running:
                     return
@@ -1089,7 +1096,7 @@ class HomeStepFiveCard:
             except (paramiko.ssh_exception.ChannelException,
                     paramiko.ssh_exception.SSHException,
                     paramiko.ssh_exception.NoValidConnectionsError,
-                    EOFError, OSError, socket.error, socket.timeout) as e:
+                    SSHNotConnected, EOFError, OSError, socket.error, socket.timeout) as e:
                 if not self._connection_lost:
                     self._connection_lost = True
                     err_msg = str(e)
@@ -1130,13 +1137,17 @@ class HomeStepFiveCard:
             if not self.ssh or not self._queue_running:
                 return
             try:
-                stdin, stdout, stderr = self.ssh.exec_command(
+                result = self.ssh_manager.run(
                     "squeue -o '%i %P %j %T %M %D %R' -h",
+                    priority=PRIORITY_LOW,
                     get_pty=True,
-                    timeout=5
+                    timeout=5,
+                    coalesce="squeue",
+                    min_interval=MONITOR_MIN_INTERVAL,
+                    reconnect=False
                 )
-                stdout_text = stdout.read().decode("utf-8", errors="ignore")
-                stderr_text = stderr.read().decode("utf-8", errors="ignore")
+                stdout_text = result.stdout
+                stderr_text = result.stderr
 
                 if not self._queue_running:
                     return
@@ -1174,7 +1185,7 @@ class HomeStepFiveCard:
             except (paramiko.ssh_exception.ChannelException,
                     paramiko.ssh_exception.SSHException,
                     paramiko.ssh_exception.NoValidConnectionsError,
-                    EOFError, OSError, socket.error, socket.timeout) as e:
+                    SSHNotConnected, EOFError, OSError, socket.error, socket.timeout) as e:
                 if not self._connection_lost:
                     self._connection_lost = True
                     err_msg = str(e)
@@ -1262,9 +1273,10 @@ class HomeStepFiveCard:
         """获取远程 CPU 排行数据，返回 [[pid, user, cpu], ...]"""
         try:
             cmd = "ps -eo pid,user,%cpu --sort=-%cpu | head -n 6"
-            stdin, stdout, stderr = self.ssh.exec_command(cmd, get_pty=True, timeout=10)
-            output = stdout.read().decode("utf-8", errors="ignore").strip()
-            err = stderr.read().decode("utf-8", errors="ignore").strip()
+            result = self.ssh_manager.run(cmd, priority=PRIORITY_LOW, get_pty=True, timeout=10, coalesce="ps_cpu",
+                                          min_interval=MONITOR_MIN_INTERVAL, reconnect=False)
+            output = result.stdout.strip()
+            err = result.stderr.strip()
             if err:
                 return []
             lines = [line for line in output.splitlines() if line.strip()]
@@ -1287,9 +1299,10 @@ class HomeStepFiveCard:
         try:
             # 使用稳定的格式输出，避免表格对齐导致解析异常
             cmd = "squeue -o '%i %P %j %T %M %D %R' -h"
-            stdin, stdout, stderr = self.ssh.exec_command(cmd, get_pty=True, timeout=10)
-            output = stdout.read().decode("utf-8", errors="ignore").strip()
-            err = stderr.read().decode("utf-8", errors="ignore").strip()
+            result = self.ssh_manager.run(cmd, priority=PRIORITY_LOW, get_pty=True, timeout=10, coalesce="squeue",
+                                          min_interval=MONITOR_MIN_INTERVAL, reconnect=False)
+            output = result.stdout.strip()
+            err = result.stderr.strip()
             if err or not output:
                 return []
             lines = [line.strip() for line in output.splitlines() if line.strip()]
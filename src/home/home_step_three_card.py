@@ -163,7 +163,24 @@ class HomeStepThreeCard:
         """读取指定目录下的grid.meta文件并返回经纬度范围"""
         if not target_dir or not isinstance(target_dir, str):
             return None
-        
+
+        # 优先读取二进制网格包的头文件（grid.grid/header.json）
+        header_path = os.path.join(target_dir, "grid.grid", "header.json")
+        if os.path.exists(header_path):
+            try:
+                with open(header_path, "r", encoding="utf-8") as f:
+                    header = json.load(f)
+                return {
+                    'lon_min': min(header['lon_range']),
+                    'lon_max': max(header['lon_range']),
+                    'lat_min': min(header['lat_range']),
+                    'lat_max': max(header['lat_range']),
+                    'dx': abs(header['dx']),
+                    'dy': abs(header['dy'])
+                }
+            except (OSError, ValueError, KeyError):
+                pass
+
         meta_path = os.path.join(target_dir, "grid.meta")
         if not os.path.exists(meta_path):
             return None
@@ -57,6 +57,7 @@ QButtonGroup = QtWidgets.QButtonGroup
 QSpinBox = QtWidgets.QSpinBox
 from setting.config import *
 from setting.language_manager import tr
+from .preprocess_script import update_run_script, DEFAULT_PREPROCESS_JOBS
 from plot.workers import _match_ww3_jason3_worker, _run_jason3_swh_worker, _make_wave_maps_worker
 
 class ModifyWW3NML:
@@ -736,9 +737,17 @@ class ModifyWW3NML:
                     new_lines.append(line)
                 i += 1
 
+            # 重新生成预处理阶段（多个强迫场并行或依次执行 ww3_prnc，嵌套网格按依赖关系并行预处理）
+            prnc_parallel = bool(current_config.get("PRNC_PARALLEL", True))
+            try:
+                preprocess_jobs = max(1, int(current_config.get("PREPROCESS_MAX_JOBS", DEFAULT_PREPROCESS_JOBS)))
+            except (TypeError, ValueError):
+                preprocess_jobs = DEFAULT_PREPROCESS_JOBS
+            content, prnc_replaced = update_run_script(''.join(new_lines).replace('\r', ''), log_file=True,
+                                                       parallel=prnc_parallel, max_jobs=preprocess_jobs)
+
             # 写回文件时使用二进制模式，确保使用 \n 而不是 \r\n
             with open(workdir_server_sh, 'wb') as f:
-                content = ''.join(new_lines)
                 content_bytes = content.encode('utf-8').replace(b'\r\n', b'\n').replace(b'\r', b'\n')
                 f.write(content_bytes)
 
@@ -747,6 +756,11 @@ class ModifyWW3NML:
             )
 
             self.log(log_msg)
+            if prnc_replaced:
+                self.log(tr("step4_server_sh_prnc_mode", "✅ server.sh 的 ww3_prnc 阶段：{mode}").format(
+                    mode=tr("step4_prnc_parallel", "多个强迫场并行执行") if prnc_parallel else tr("step4_prnc_sequential", "多个强迫场依次执行")
+                ))
+                self.log(tr("step4_server_sh_nested_preprocess", "✅ server.sh 嵌套网格预处理：最多 {jobs} 个步骤并行").format(jobs=preprocess_jobs))
 
         except Exception as e:
             self.log(tr("server_sh_modify_error", "❌ 修改 server.sh 出错: {error}").format(error=e))
@@ -769,6 +783,9 @@ class ModifyWW3NML:
         if not target_dir or not isinstance(target_dir, str):
             return
 
+        # ww3_grid 读取文本网格文件：后台尚未写完或已过期时在此等待/补写
+        self._ensure_grid_text_files(target_dir)
+
         meta_path = os.path.join(target_dir, "grid.meta")
         nml_path = os.path.join(target_dir, "ww3_grid.nml")
 
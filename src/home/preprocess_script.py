@@ -0,0 +1,312 @@
+"""
+运行脚本中的预处理阶段
+生成 server.sh / local.sh 里的预处理函数：
+- run_prnc_with_fields：多个强迫场（风、流、水位、海冰）时每个场在独立的临时目录中并行执行 ww3_prnc，
+  临时目录链接 mod_def.ww3 和输入文件，完成后把生成的 *.ww3 合并回网格目录
+- run_nested_preprocess：嵌套网格的预处理依赖图，各网格的 ww3_grid → 每个强迫场的 ww3_prnc / ww3_strt
+  按依赖关系并行执行（限制同时执行的步骤数），全部成功后才运行 ww3_multi
+每个步骤的输出、退出码和耗时写入日志，并记录相对依次执行节省的时间
+"""
+import re
+
+
+# 除 ww3_prnc.nml（风场）外可能存在的强迫场 namelist：ww3_prnc_<field>.nml
+PRNC_EXTRA_FIELDS = ("current", "level", "ice", "ice1")
+
+# ww3_prnc 临时目录（位于网格目录下）
+PRNC_WORK_DIR = ".prnc_work"
+
+# 嵌套网格预处理步骤的日志和状态目录（位于工作目录下）
+PREPROCESS_STEP_DIR = ".preprocess_steps"
+
+DEFAULT_PREPROCESS_JOBS = 4
+
+# 生成的函数名，用于在已有脚本中定位需要替换的函数
+_FUNCTION_NAMES = ("prep_start_step", "prep_report_step", "prnc_field_step",
+                   "run_prnc_with_fields", "run_nested_preprocess")
+
+_FUNCTION_BLOCK = r"(?:^#[^\n]*\n)*^(?:{names})\(\)\s*\{{\n.*?^\}}[ \t]*\n".format(names="|".join(_FUNCTION_NAMES))
+
+# 连续的一组生成函数（含各自紧邻的注释行）
+_FUNCTIONS_RE = re.compile(r"{block}(?:\n*{block})*".format(block=_FUNCTION_BLOCK), re.MULTILINE | re.DOTALL)
+
+# 嵌套网格分支中 ww3_multi 之前的预处理部分
+_NESTED_RE = re.compile(r"^[ \t]*# 嵌套网格模式\n.*?(?=^[ \t]*# Coarse 网格处理)", re.MULTILINE | re.DOTALL)
+
+
+_HELPERS_TEMPLATE = """\
+# 后台执行一个预处理步骤：输出写入 <名称>.log，退出码和耗时写入 <名称>.status
+prep_start_step() {
+    local step_root="$1" name="$2" dir="$3"
+    shift 3
+    (
+        t0=$(date +%s)
+        if cd "$dir"; then
+            "$@" > "$step_root/$name.log" 2>&1 && rc=0 || rc=$?
+        else
+            rc=1
+        fi
+        echo "$rc $(( $(date +%s) - t0 ))" > "$step_root/$name.status.tmp"
+        mv -f "$step_root/$name.status.tmp" "$step_root/$name.status"
+        exit $rc
+    ) &
+}
+
+# 把步骤输出追加到日志并报告耗时，累计到 PREP_SERIAL，返回步骤的退出码
+prep_report_step() {
+    local step_root="$1" name="$2" rc=1 elapsed=0
+    if [ -f "$step_root/$name.status" ]; then
+        read rc elapsed < "$step_root/$name.status"
+    fi
+    echo "=== $name output ==="__LOG__
+    cat "$step_root/$name.log"__LOG__ 2>/dev/null || true
+    PREP_SERIAL=$(( PREP_SERIAL + elapsed ))
+    if [ "$rc" -ne 0 ]; then
+        echo "=== $name FAILED: exit $rc after ${elapsed}s ==="__LOG__
+        return $rc
+    fi
+    echo "=== $name done in ${elapsed}s ==="__LOG__
+    return 0
+}
+
+# 在临时目录中执行一个强迫场的 ww3_prnc（链接 mod_def.ww3 和输入文件），成功后把生成的 *.ww3 移回当前目录
+prnc_field_step() {
+    local field="$1" work_dir="__WORK__/$1" entry
+    rm -rf "$work_dir"
+    mkdir -p "$work_dir"
+    for entry in *; do
+        case "$entry" in
+            ww3_prnc*.nml) continue ;;
+            mod_def.ww3) ;;
+            *.ww3) continue ;;
+        esac
+        if [ -f "$entry" ]; then
+            ln -s "$PWD/$entry" "$work_dir/$entry"
+        fi
+    done
+    if [ "$field" = "wind" ]; then
+        cp ww3_prnc.nml "$work_dir/ww3_prnc.nml" || return 1
+    else
+        cp "ww3_prnc_${field}.nml" "$work_dir/ww3_prnc.nml" || return 1
+    fi
+    (cd "$work_dir" && ww3_prnc) || return $?
+    for entry in "$work_dir"/*.ww3; do
+        if [ -f "$entry" ] && [ ! -L "$entry" ]; then
+            mv -f "$entry" . || return 1
+        fi
+    done
+    rm -rf "$work_dir"
+}
+"""
+
+
+_PARALLEL_PRNC_TEMPLATE = """\
+# 执行 ww3_prnc 的函数，处理多个强迫场文件
+# 多个强迫场时每个场在独立的临时目录中并行执行，完成后把 *.ww3 合并回当前目录
+run_prnc_with_fields() {
+    local fields="wind" field failed=""
+    for field in __FIELDS__; do
+        if [ -f "ww3_prnc_${field}.nml" ]; then
+            fields="$fields $field"
+        fi
+    done
+
+    if [ "$fields" = "wind" ]; then
+        # 只有一个 ww3_prnc.nml，直接执行
+        echo "=== Running ww3_prnc ==="__LOG__
+        ww3_prnc__OUT__
+        return $?
+    fi
+
+    local step_root="$PWD/__WORK__"
+    rm -rf "$step_root"
+    mkdir -p "$step_root"
+    local t_start=$(date +%s)
+    PREP_SERIAL=0
+    for field in $fields; do
+        echo "=== Running ww3_prnc ($field, parallel) ==="__LOG__
+        prep_start_step "$step_root" "prnc.$field" . prnc_field_step "$field"
+    done
+    wait || true
+
+    # 按固定顺序汇总日志，逐场报告结果
+    for field in $fields; do
+        prep_report_step "$step_root" "prnc.$field" || failed="$failed $field"
+    done
+    local t_wall=$(( $(date +%s) - t_start ))
+    echo "=== ww3_prnc parallel: ${t_wall}s wall, ${PREP_SERIAL}s sequential, saved $(( PREP_SERIAL - t_wall ))s ==="__LOG__
+    if [ -n "$failed" ]; then
+        echo "=== ww3_prnc failed fields:$failed (logs kept in $step_root) ==="__LOG__
+        return 1
+    fi
+    rm -rf "$step_root"
+    return 0
+}
+"""
+
+
+_SEQUENTIAL_PRNC_TEMPLATE = """\
+# 执行 ww3_prnc 的函数，处理多个强迫场文件
+run_prnc_with_fields() {
+    local field
+    # 1. 先执行一次 ww3_prnc（使用默认的 ww3_prnc.nml，通常是风场）
+    echo "=== Running ww3_prnc (wind) ==="__LOG__
+    ww3_prnc__OUT__
+
+    # 2. 依次把其他强迫场的 namelist 换成 ww3_prnc.nml 执行，最后恢复风场的 namelist
+    for field in __FIELDS__; do
+        if [ -f "ww3_prnc_${field}.nml" ]; then
+            echo "=== Running ww3_prnc ($field) ==="__LOG__
+            mv ww3_prnc.nml ww3_prnc_wind.nml
+            mv "ww3_prnc_${field}.nml" ww3_prnc.nml
+            ww3_prnc__OUT__
+            mv ww3_prnc.nml "ww3_prnc_${field}.nml"
+            mv ww3_prnc_wind.nml ww3_prnc.nml
+        fi
+    done
+}
+"""
+
+
+_NESTED_FUNCTION_TEMPLATE = """\
+# 嵌套网格预处理依赖图：用法 run_nested_preprocess <最大并行数> <网格目录>...
+# 每个网格 ww3_grid → 各强迫场 ww3_prnc 和 ww3_strt，不同网格之间互不依赖；
+# 依赖失败的步骤跳过，全部成功才返回 0
+run_nested_preprocess() {
+    local max_jobs="$1"
+    shift
+    local step_root="$PWD/__STEPS__" grid field i dep running=0 pending failed=0 progress
+    local names=() dirs=() deps=() cmds=() state=()
+    rm -rf "$step_root"
+    mkdir -p "$step_root"
+
+    # 1. 步骤表：名称、目录、依赖步骤下标、命令
+    for grid in "$@"; do
+        dep=${#names[@]}
+        names+=("grid.$grid"); dirs+=("$grid"); deps+=(-1); cmds+=("ww3_grid")
+        for field in wind __FIELDS__; do
+            if { [ "$field" = "wind" ] && [ -f "$grid/ww3_prnc.nml" ]; } || [ -f "$grid/ww3_prnc_${field}.nml" ]; then
+                names+=("prnc.$grid.$field"); dirs+=("$grid"); deps+=($dep); cmds+=("prnc_field_step $field")
+            fi
+        done
+        names+=("strt.$grid"); dirs+=("$grid"); deps+=($dep); cmds+=("ww3_strt")
+    done
+    for ((i = 0; i < ${#names[@]}; i++)); do
+        state[i]=pending
+    done
+
+    # 2. 调度：收集已结束的步骤，启动依赖已完成的步骤，直到没有待执行和执行中的步骤
+    local t_start=$(date +%s)
+    PREP_SERIAL=0
+    while true; do
+        progress=0
+        for ((i = 0; i < ${#names[@]}; i++)); do
+            if [ "${state[i]}" = running ] && [ -f "$step_root/${names[i]}.status" ]; then
+                if prep_report_step "$step_root" "${names[i]}"; then
+                    state[i]=done
+                else
+                    state[i]=failed
+                    failed=1
+                fi
+                running=$(( running - 1 ))
+                progress=1
+            fi
+        done
+
+        pending=0
+        for ((i = 0; i < ${#names[@]}; i++)); do
+            [ "${state[i]}" = pending ] || continue
+            dep=${deps[i]}
+            if [ "$dep" -ge 0 ] && { [ "${state[dep]}" = failed ] || [ "${state[dep]}" = skipped ]; }; then
+                state[i]=skipped
+                echo "=== ${names[i]} skipped: ${names[dep]} did not succeed ==="__LOG__
+                progress=1
+                continue
+            fi
+            if [ "$dep" -ge 0 ] && [ "${state[dep]}" != done ]; then
+                pending=$(( pending + 1 ))
+                continue
+            fi
+            if [ "$running" -ge "$max_jobs" ]; then
+                pending=$(( pending + 1 ))
+                continue
+            fi
+            echo "=== Running ${names[i]} ==="__LOG__
+            prep_start_step "$step_root" "${names[i]}" "${dirs[i]}" ${cmds[i]}
+            state[i]=running
+            running=$(( running + 1 ))
+            progress=1
+        done
+
+        if [ "$running" -eq 0 ] && [ "$pending" -eq 0 ]; then
+            break
+        fi
+        if [ "$progress" -eq 0 ]; then
+            wait -n 2>/dev/null || sleep 1
+        fi
+    done
+
+    local t_wall=$(( $(date +%s) - t_start ))
+    echo "=== nested preprocess: ${t_wall}s wall, ${PREP_SERIAL}s sequential, saved $(( PREP_SERIAL - t_wall ))s (max $max_jobs parallel) ==="__LOG__
+    if [ "$failed" -ne 0 ]; then
+        echo "=== nested preprocess failed (logs kept in $step_root) ==="__LOG__
+        return 1
+    fi
+    rm -rf "$step_root"
+    for grid in "$@"; do
+        rmdir "$grid/__WORK__" 2>/dev/null || true
+    done
+    return 0
+}
+"""
+
+
+_NESTED_BLOCK_TEMPLATE = """\
+    # 嵌套网格模式
+    # 预处理：各网格的 ww3_grid、ww3_prnc、ww3_strt 按依赖关系并行执行，全部成功后再运行 ww3_multi
+    if ! run_nested_preprocess __JOBS__ coarse fine; then
+__FAIL__        exit 1
+    fi
+
+"""
+
+
+def _fill(template, log_file):
+    return (template
+            .replace("__FIELDS__", " ".join(PRNC_EXTRA_FIELDS))
+            .replace("__WORK__", PRNC_WORK_DIR)
+            .replace("__STEPS__", PREPROCESS_STEP_DIR)
+            .replace("__LOG__", ' >> "$ALL_LOG"' if log_file else "")
+            .replace("__OUT__", ' >> "$ALL_LOG" 2>&1' if log_file else ""))
+
+
+def render_preprocess_functions(log_file=True, parallel=True):
+    """生成脚本中的预处理函数文本
+
+    log_file: True 时输出追加到 $ALL_LOG（server.sh），False 时直接输出到终端（local.sh）
+    parallel: False 时 run_prnc_with_fields 依次执行各强迫场
+    """
+    prnc_template = _PARALLEL_PRNC_TEMPLATE if parallel else _SEQUENTIAL_PRNC_TEMPLATE
+    return "\n".join(_fill(t, log_file) for t in (_HELPERS_TEMPLATE, prnc_template, _NESTED_FUNCTION_TEMPLATE))
+
+
+def render_nested_preprocess(log_file=True, max_jobs=DEFAULT_PREPROCESS_JOBS):
+    """生成嵌套网格分支中 ww3_multi 之前的预处理部分"""
+    fail = '        cat "$ALL_LOG" > "$FAIL_LOG"\n' if log_file else ""
+    return (_fill(_NESTED_BLOCK_TEMPLATE, log_file)
+            .replace("__JOBS__", str(max(1, int(max_jobs))))
+            .replace("__FAIL__", fail))
+
+
+def update_run_script(content, log_file=True, parallel=True, max_jobs=DEFAULT_PREPROCESS_JOBS):
+    """把脚本内容中的预处理函数和嵌套网格预处理部分替换为生成的版本
+
+    返回 (新内容, 是否找到并替换)；脚本中没有 run_prnc_with_fields 函数（自定义脚本）时原样返回
+    """
+    functions_text = render_preprocess_functions(log_file, parallel)
+    content, count = _FUNCTIONS_RE.subn(lambda _m: functions_text, content, count=1)
+    if not count:
+        return content, False
+    nested_text = render_nested_preprocess(log_file, max_jobs)
+    content = _NESTED_RE.sub(lambda _m: nested_text, content, count=1)
+    return content, True
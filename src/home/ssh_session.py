@@ -0,0 +1,434 @@
+"""
+SSH 会话管理
+所有服务器操作（心跳、CPU 排行、squeue 轮询、远程命令、SFTP 传输）共用一个连接：
+有限的命令通道池按优先级分配，同一查询在轮询间隔内合并为一次，断线后按指数退避重连
+"""
+import time
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+
+import paramiko
+
+
+# 通道优先级（数值越小越优先）
+PRIORITY_HIGH = 0      # 用户操作：提交、取消任务、清空目录
+PRIORITY_NORMAL = 1    # 查看文件列表、下载等
+PRIORITY_LOW = 2       # 后台监控：CPU 排行、队列轮询
+
+# 同时打开的命令通道数；SFTP 传输另开通道，两者合计不超过 OpenSSH 默认 MaxSessions (10)
+DEFAULT_MAX_CHANNELS = 6
+
+# 重连退避：1, 2, 4 ... 秒，最长 30 秒
+RECONNECT_BASE_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+RECONNECT_ATTEMPTS = 4
+
+# 连接保活间隔（秒）
+KEEPALIVE_INTERVAL = 30
+
+class SSHNotConnected(Exception):
+    """没有可用连接（未连接、缺少连接信息或重连失败）"""
+
+
+class CommandResult:
+    """远程命令执行结果"""
+
+    __slots__ = ('exit_status', 'stdout', 'stderr', 'finished_at')
+
+    def __init__(self, exit_status, stdout, stderr):
+        self.exit_status = exit_status
+        self.stdout = stdout
+        self.stderr = stderr
+        self.finished_at = time.monotonic()
+
+
+class _ChannelGate:
+    """按优先级分配有限的通道名额，同优先级先到先得"""
+
+    def __init__(self, slots):
+        self._capacity = slots
+        self._slots = slots
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._seq = itertools.count()
+        self.peak_depth = 0
+
+    @property
+    def depth(self):
+        with self._cond:
+            return len(self._waiting)
+
+    @property
+    def in_use(self):
+        with self._cond:
+            return self._capacity - self._slots
+
+    def acquire(self, priority, timeout=None):
+        entry = (priority, next(self._seq))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            self.peak_depth = max(self.peak_depth, len(self._waiting))
+            while not (self._slots > 0 and self._waiting[0] == entry):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                    raise TimeoutError("waiting for SSH channel timed out")
+                self._cond.wait(remaining)
+            heapq.heappop(self._waiting)
+            self._slots -= 1
+            self._cond.notify_all()
+
+    def release(self):
+        with self._cond:
+            self._slots += 1
+            self._cond.notify_all()
+
+
+class _InFlight:
+    """正在执行的可合并请求"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _LatencyStats:
+    __slots__ = ('count', 'errors', 'coalesced', 'total', 'max', 'last')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.coalesced = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+
+class SSHSessionManager:
+    """共享 SSH 连接
+
+    connect() 建立连接并记住连接信息；之后 run()/command()/open_sftp() 在连接断开时
+    自动按指数退避重连（同一时间只有一个线程在重连，其余线程等待结果）。
+    """
+
+    def __init__(self, max_channels=DEFAULT_MAX_CHANNELS):
+        self.client = None
+        self.conn_args = None
+        self._lock = threading.RLock()
+        self._reconnect_lock = threading.Lock()
+        self._gate = _ChannelGate(max_channels)
+        self._coalesce_lock = threading.Lock()
+        self._in_flight = {}
+        self._cache = {}
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        self._reconnects = 0
+        self._next_reconnect = 0.0
+        self._failures = 0
+        self._listeners = []
+
+    # ------------------------------------------------------------------
+    # 连接
+    # ------------------------------------------------------------------
+
+    def add_listener(self, callback):
+        """连接状态变化回调 callback(connected: bool)，在调用线程中执行"""
+        self._listeners.append(callback)
+
+    def _notify(self, connected):
+        for callback in list(self._listeners):
+            try:
+                callback(connected)
+            except Exception:
+                pass
+
+    def _open_client(self, host, port, user, password, timeout=15):
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.connect(
+            hostname=host,
+            port=port,
+            username=user,
+            password=password,
+            look_for_keys=False,
+            allow_agent=False,
+            timeout=timeout,
+            banner_timeout=200
+        )
+        transport = client.get_transport()
+        if transport is not None:
+            transport.set_keepalive(KEEPALIVE_INTERVAL)
+        return client
+
+    def connect(self, host, port, user, password, timeout=15):
+        """建立新连接（替换旧连接），失败时抛出异常"""
+        client = self._open_client(host, port, user, password, timeout)
+        with self._lock:
+            old, self.client = self.client, client
+            self.conn_args = (host, port, user, password)
+            self._failures = 0
+            self._next_reconnect = 0.0
+            self._cache.clear()
+        if old is not None and old is not client:
+            try:
+                old.close()
+            except Exception:
+                pass
+        self._notify(True)
+        return client
+
+    def adopt(self, client):
+        """接管外部创建的 SSHClient"""
+        with self._lock:
+            old, self.client = self.client, client
+            self._cache.clear()
+        if old is not None and old is not client:
+            try:
+                old.close()
+            except Exception:
+                pass
+
+    def close(self):
+        """关闭连接（保留连接信息，之后仍可重连）"""
+        with self._lock:
+            client, self.client = self.client, None
+            self._cache.clear()
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+            self._notify(False)
+
+    def is_alive(self):
+        client = self.client
+        if client is None:
+            return False
+        try:
+            transport = client.get_transport()
+            return transport is not None and transport.is_active()
+        except Exception:
+            return False
+
+    def ensure_connected(self, wait=True):
+        """返回可用的 SSHClient；连接断开时按指数退避重连
+
+        wait 为 False 时（后台轮询）处于退避等待期则直接抛出 SSHNotConnected，不阻塞。
+        """
+        if self.is_alive():
+            return self.client
+        if self.conn_args is None:
+            raise SSHNotConnected("no connection info")
+
+        with self._reconnect_lock:
+            # 其他线程可能已经重连成功
+            if self.is_alive():
+                return self.client
+            last_error = None
+            for _ in range(RECONNECT_ATTEMPTS):
+                delay = self._next_reconnect - time.monotonic()
+                if delay > 0:
+                    if not wait:
+                        raise SSHNotConnected("reconnect backoff")
+                    time.sleep(delay)
+                try:
+                    host, port, user, password = self.conn_args
+                    client = self._open_client(host, port, user, password)
+                except Exception as e:
+                    last_error = e
+                    self._failures += 1
+                    backoff = min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * (2 ** (self._failures - 1)))
+                    self._next_reconnect = time.monotonic() + backoff
+                    if not wait:
+                        break
+                    continue
+                with self._lock:
+                    old, self.client = self.client, client
+                    self._failures = 0
+                    self._next_reconnect = 0.0
+                    self._reconnects += 1
+                    self._cache.clear()
+                if old is not None:
+                    try:
+                        old.close()
+                    except Exception:
+                        pass
+                self._notify(True)
+                return client
+        self._notify(False)
+        raise SSHNotConnected(str(last_error) if last_error else "reconnect failed")
+
+    def transport(self):
+        return self.ensure_connected().get_transport()
+
+    def open_sftp(self):
+        return self.ensure_connected().open_sftp()
+
+    # ------------------------------------------------------------------
+    # 命令
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def command(self, cmd, priority=PRIORITY_NORMAL, get_pty=False, timeout=None,
+                wait_timeout=None, reconnect=True, label=None):
+        """在通道池中执行命令，产出 (stdin, stdout, stderr)；退出上下文时释放通道
+
+        适合需要逐行读取输出的长命令；一般查询用 run()。
+        reconnect 为 False 时（后台轮询）连接断开直接抛出 SSHNotConnected，不重连。
+        """
+        if label is None:
+            label = cmd.split(None, 1)[0] if cmd.strip() else "exec"
+        self._gate.acquire(priority, wait_timeout)
+        started = time.monotonic()
+        ok = False
+        try:
+            if reconnect:
+                client = self.ensure_connected()
+            elif self.is_alive():
+                client = self.client
+            else:
+                raise SSHNotConnected("not connected")
+            streams = client.exec_command(cmd, get_pty=get_pty, timeout=timeout)
+            try:
+                yield streams
+                ok = True
+            finally:
+                try:
+                    streams[1].channel.close()
+                except Exception:
+                    pass
+        finally:
+            self._gate.release()
+            self._record(label, time.monotonic() - started, ok)
+
+    def run(self, cmd, priority=PRIORITY_NORMAL, get_pty=False, timeout=10, coalesce=None,
+            min_interval=0.0, wait_timeout=None, reconnect=True, label=None):
+        """执行命令并返回 CommandResult
+
+        coalesce: 合并键；同一键、同一命令已有请求在执行时直接等待并共用其结果，
+            且 min_interval 秒内的上次结果直接复用（后台轮询每个间隔只发一次 squeue）。
+            命令或 pty 设置不同的请求即使合并键相同也分别执行，合并键同时用作统计标签
+        """
+        if coalesce is None:
+            return self._run(cmd, priority, get_pty, timeout, wait_timeout, reconnect, label)
+
+        key = (coalesce, cmd, bool(get_pty))
+        with self._coalesce_lock:
+            cached = self._cache.get(key)
+            if cached is not None and min_interval and time.monotonic() - cached.finished_at < min_interval:
+                self._record(coalesce, 0.0, True, coalesced=True)
+                return cached
+            pending = self._in_flight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._in_flight[key] = _InFlight()
+
+        if not owner:
+            pending.event.wait()
+            self._record(coalesce, 0.0, pending.error is None, coalesced=True)
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+
+        try:
+            pending.result = self._run(cmd, priority, get_pty, timeout, wait_timeout, reconnect, label or coalesce)
+            with self._coalesce_lock:
+                self._cache[key] = pending.result
+            return pending.result
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._coalesce_lock:
+                self._in_flight.pop(key, None)
+            pending.event.set()
+
+    def _run(self, cmd, priority, get_pty, timeout, wait_timeout, reconnect, label):
+        with self.command(cmd, priority=priority, get_pty=get_pty, timeout=timeout,
+                          wait_timeout=wait_timeout, reconnect=reconnect, label=label) as (stdin, stdout, stderr):
+            out = stdout.read().decode('utf-8', errors='ignore')
+            err = stderr.read().decode('utf-8', errors='ignore')
+            exit_status = stdout.channel.recv_exit_status()
+        return CommandResult(exit_status, out, err)
+
+    # ------------------------------------------------------------------
+    # 统计
+    # ------------------------------------------------------------------
+
+    def _record(self, label, seconds, ok, coalesced=False):
+        with self._stats_lock:
+            stats = self._stats.get(label)
+            if stats is None:
+                stats = self._stats[label] = _LatencyStats()
+            if coalesced:
+                stats.coalesced += 1
+                return
+            stats.count += 1
+            if not ok:
+                stats.errors += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.last = seconds
+
+    def metrics(self):
+        """连接状态、通道占用、排队深度和各类命令的延迟统计"""
+        with self._stats_lock:
+            commands = {
+                label: {
+                    'count': s.count,
+                    'errors': s.errors,
+                    'coalesced': s.coalesced,
+                    'avg_ms': s.total / s.count * 1000 if s.count else 0.0,
+                    'max_ms': s.max * 1000,
+                    'last_ms': s.last * 1000,
+                }
+                for label, s in self._stats.items()
+            }
+        return {
+            'connected': self.is_alive(),
+            'reconnects': self._reconnects,
+            'channels_in_use': self._gate.in_use,
+            'queue_depth': self._gate.depth,
+            'peak_queue_depth': self._gate.peak_depth,
+            'commands': commands,
+        }
+
+
+class SSHSessionMixin:
+    """主窗口共享的 SSH 会话
+
+    self.ssh 始终指向 ssh_manager 当前的 SSHClient：
+    赋值 None 关闭连接，赋值 SSHClient 则交给管理器接管。
+    """
+
+    @property
+    def ssh_manager(self):
+        manager = self.__dict__.get('_ssh_manager')
+        if manager is None:
+            manager = self.__dict__['_ssh_manager'] = SSHSessionManager()
+        return manager
+
+    @property
+    def ssh(self):
+        return self.ssh_manager.client
+
+    @ssh.setter
+    def ssh(self, client):
+        if client is None:
+            self.ssh_manager.close()
+        else:
+            self.ssh_manager.adopt(client)
+
+    @property
+    def _last_conn_args(self):
+        return self.ssh_manager.conn_args
+
+    @_last_conn_args.setter
+    def _last_conn_args(self, conn_args):
+        self.ssh_manager.conn_args = conn_args
@@ -7,6 +7,7 @@ import sys
 import json
 import glob
 import shutil
+import re
 import subprocess
 import threading
 import platform
@@ -29,6 +30,12 @@ from setting.language_manager import tr
 from setting.config import DX, DY, LONGITUDE_WEST, LONGITUDE_EAST, LATITUDE_SORTH, LATITUDE_NORTH, MATLAB_PATH, load_config
 
 
+# gridgen 各模块输出的 “Completed N per cent” 百分比行
+GRIDGEN_PERCENT_LINE = re.compile(r'^\s*Completed \d+ per cent')
+# gridgen 写出的二进制网格包（header.json + 各字段 .npy，可内存映射读取）
+GRID_BUNDLE_NAME = 'grid.grid'
+
+
 class StepTwoServiceMixin:
     """第二步相关的业务逻辑 Mixin"""
     
@@ -484,8 +491,42 @@ class StepTwoServiceMixin:
             required_files = ['grid.bot', 'grid.obst', 'grid.meta', 'grid.mask']
             if all(os.path.exists(os.path.join(cache_path, f)) for f in required_files):
                 return cache_path
+            # 只有二进制网格包的缓存（文本文件尚未在后台写完时保存）同样可用
+            if (os.path.exists(os.path.join(cache_path, 'grid.meta'))
+                    and os.path.exists(os.path.join(cache_path, GRID_BUNDLE_NAME, 'header.json'))):
+                return cache_path
         return None
 
+    def _find_incremental_grid_cache(self, dx_value, dy_value, lon_west, lon_east, lat_south, lat_north, ref_dir, bathymetry, coastline_precision):
+        """查找可增量复用的缓存网格：分辨率与数据源相同、范围与当前网格重叠面积最大（需含 grid_state.npz）"""
+        cache_dir = self._get_grid_cache_dir()
+        ref_dir_norm = os.path.normpath(os.path.abspath(ref_dir)).replace("\\", "/")
+        lon_lo, lon_hi = sorted((float(lon_west), float(lon_east)))
+        lat_lo, lat_hi = sorted((float(lat_south), float(lat_north)))
+        best_path, best_area = None, 0.0
+        for name in os.listdir(cache_dir):
+            cache_path = os.path.join(cache_dir, name)
+            params_file = os.path.join(cache_path, 'params.json')
+            if not os.path.exists(os.path.join(cache_path, 'grid_state.npz')) or not os.path.exists(params_file):
+                continue
+            try:
+                with open(params_file, 'r', encoding='utf-8') as pf:
+                    cached = json.load(pf).get('parameters') or {}
+                if (abs(float(cached['dx']) - float(dx_value)) > 1e-9 or abs(float(cached['dy']) - float(dy_value)) > 1e-9
+                        or os.path.normpath(os.path.abspath(cached['ref_dir'])).replace("\\", "/") != ref_dir_norm
+                        or str(cached.get('bathymetry')) != str(bathymetry)
+                        or str(cached.get('coastline_precision')) != str(coastline_precision)):
+                    continue
+                c_lon_lo, c_lon_hi = sorted(float(v) for v in cached['lon_range'])
+                c_lat_lo, c_lat_hi = sorted(float(v) for v in cached['lat_range'])
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+            # 网格点是否在同一格点上由 gridgen 判断，这里只按重叠面积挑选
+            area = max(0.0, min(lon_hi, c_lon_hi) - max(lon_lo, c_lon_lo)) * max(0.0, min(lat_hi, c_lat_hi) - max(lat_lo, c_lat_lo))
+            if area > best_area:
+                best_path, best_area = cache_path, area
+        return best_path
+
     def _save_grid_to_cache(self, cache_key, source_dir, dx_value=None, dy_value=None,
                            lon_west=None, lon_east=None, lat_south=None, lat_north=None, ref_dir=None, bathymetry=None, coastline_precision=None):
         """将生成的网格保存到缓存"""
@@ -499,8 +540,13 @@ class StepTwoServiceMixin:
         # 创建缓存目录
         os.makedirs(cache_path, exist_ok=True)
 
-        # 复制网格文件到缓存
-        grid_files = ['grid.bot', 'grid.obst', 'grid.meta', 'grid.mask']
+        # 复制网格文件到缓存：先复制二进制网格包，再复制文本文件
+        # （后台写出文本文件时，包内的 text.json 记录晚于文本文件写完，保证缓存中的记录不会指向缺失的文本）
+        bundle_src = os.path.join(source_dir, GRID_BUNDLE_NAME)
+        if os.path.exists(os.path.join(bundle_src, 'header.json')):
+            shutil.copytree(bundle_src, os.path.join(cache_path, GRID_BUNDLE_NAME),
+                            ignore=shutil.ignore_patterns('*.tmp'))
+        grid_files = ['grid.bot', 'grid.obst', 'grid.meta', 'grid.mask', 'grid_state.npz']
         for f in grid_files:
             src = os.path.join(source_dir, f)
             if os.path.exists(src):
@@ -527,13 +573,99 @@ class StepTwoServiceMixin:
 
     def _load_grid_from_cache(self, cache_path, output_dir):
         """从缓存加载网格文件到输出目录"""
-        grid_files = ['grid.bot', 'grid.obst', 'grid.meta', 'grid.mask']
+        # 输出目录中旧的二进制网格包总是删除，否则读取时会优先使用它
+        bundle_dst = os.path.join(output_dir, GRID_BUNDLE_NAME)
+        if os.path.exists(bundle_dst):
+            shutil.rmtree(bundle_dst)
+        bundle_src = os.path.join(cache_path, GRID_BUNDLE_NAME)
+        if os.path.exists(os.path.join(bundle_src, 'header.json')):
+            shutil.copytree(bundle_src, bundle_dst)
+        grid_files = ['grid.bot', 'grid.obst', 'grid.meta', 'grid.mask', 'grid_state.npz']
         for f in grid_files:
             src = os.path.join(cache_path, f)
             if os.path.exists(src):
                 dst = os.path.join(output_dir, f)
                 shutil.copy2(src, dst)
 
+    def _read_grid_bundle(self, grid_dir):
+        """读取 gridgen 写出的二进制网格包 grid.grid（各字段内存映射，按需读取），无网格包时返回 None"""
+        bundle = os.path.join(grid_dir, GRID_BUNDLE_NAME)
+        try:
+            with open(os.path.join(bundle, 'header.json'), 'r', encoding='utf-8') as f:
+                grid = json.load(f)
+            if grid.get('version') != 1:
+                return None
+            for name in ('lon', 'lat', 'depth', 'mask', 'sx', 'sy'):
+                grid[name] = np.load(os.path.join(bundle, f'{name}.npy'), mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        return grid
+
+    def _grid_text_files_current(self, grid_dir):
+        """WW3 文本网格文件（grid.bot/.mask/.obst）是否由当前的二进制网格包写出"""
+        bundle = os.path.join(grid_dir, GRID_BUNDLE_NAME)
+        if not all(os.path.exists(os.path.join(grid_dir, f)) for f in ('grid.bot', 'grid.mask', 'grid.obst')):
+            return False
+        try:
+            with open(os.path.join(bundle, 'header.json'), 'r', encoding='utf-8') as f:
+                revision = json.load(f).get('revision')
+            with open(os.path.join(bundle, 'text.json'), 'r', encoding='utf-8') as f:
+                return json.load(f).get('revision') == revision
+        except (OSError, ValueError):
+            return False
+
+    def _grid_text_command(self, grid_dir):
+        """由二进制网格包写出 WW3 文本网格文件的命令（gridgen.py text）"""
+        python_dir = os.path.normpath(os.path.join(self._get_gridgen_path(), "python"))
+        return [sys.executable, '-u', os.path.join(python_dir, 'gridgen.py'), 'text', os.path.abspath(grid_dir)], python_dir
+
+    def _start_grid_text_files(self, grid_dir):
+        """在后台进程中写出 WW3 文本网格文件；绘图、嵌套协调等直接读取二进制网格包，无需等待"""
+        if not os.path.exists(os.path.join(grid_dir, GRID_BUNDLE_NAME, 'header.json')) or self._grid_text_files_current(grid_dir):
+            return
+        self._wait_grid_text_files(grid_dir)
+        cmd, cwd = self._grid_text_command(grid_dir)
+        try:
+            proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            self.log_signal.emit(tr("step2_grid_text_failed", "⚠️ 写出 WW3 网格文本文件失败: {error}").format(error=e))
+            return
+        if not hasattr(self, '_grid_text_jobs'):
+            self._grid_text_jobs = {}
+        self._grid_text_jobs[os.path.normcase(os.path.abspath(grid_dir))] = proc
+        self.log_signal.emit(tr("step2_grid_text_background", "📝 WW3 网格文本文件（grid.bot/.mask/.obst）正在后台写出"))
+
+    def _wait_grid_text_files(self, grid_dir):
+        """等待该目录的后台文本写出进程结束（重新生成或修改网格包之前调用）"""
+        jobs = getattr(self, '_grid_text_jobs', {})
+        proc = jobs.pop(os.path.normcase(os.path.abspath(grid_dir)), None)
+        if proc is not None and proc.poll() is None:
+            self.log_signal.emit(tr("step2_grid_text_waiting", "⏳ 等待后台写出 WW3 网格文本文件..."))
+            proc.wait()
+
+    def _ensure_grid_text_files(self, grid_dir):
+        """确保 WW3 需要的文本网格文件已写出：等待后台进程，缺失或已过期时同步写出"""
+        if not os.path.exists(os.path.join(grid_dir, GRID_BUNDLE_NAME, 'header.json')):
+            # 无二进制网格包（MATLAB 版或旧网格），文本文件就是网格本身
+            return True
+        self._wait_grid_text_files(grid_dir)
+        if self._grid_text_files_current(grid_dir):
+            return True
+        self.log_signal.emit(tr("step2_grid_text_writing", "📝 正在由二进制网格包写出 WW3 网格文本文件..."))
+        cmd, cwd = self._grid_text_command(grid_dir)
+        try:
+            proc = subprocess.run(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        except OSError as e:
+            self.log_signal.emit(tr("step2_grid_text_failed", "⚠️ 写出 WW3 网格文本文件失败: {error}").format(error=e))
+            return False
+        if proc.returncode != 0:
+            for line in proc.stdout.splitlines():
+                if line.strip():
+                    self.log_signal.emit(line.rstrip())
+            self.log_signal.emit(tr("step2_grid_text_failed", "⚠️ 写出 WW3 网格文本文件失败: {error}").format(error=proc.returncode))
+            return False
+        return True
+
 
     def _scale_grid(self, lon_w, lon_e, lat_s, lat_n, dx, dy, scale=1, grid_type='outer'):
         """
@@ -1002,6 +1134,11 @@ class StepTwoServiceMixin:
                 self.log_signal.emit(tr("step2_inner_grid_failed", "❌ 内网格生成失败！"))
                 return
 
+            # 协调内外网格重叠区的陆海掩膜，并标记内网格边界点
+            if load_config().get("NESTED_RECONCILE_MASKS", True):
+                self.log_signal.emit("=" * 70)
+                self._reconcile_nested_masks(coarse_dir, fine_dir)
+
             self.log_signal.emit("=" * 70)
             self.log_signal.emit(tr("step2_nested_complete", "✅ 嵌套网格生成完毕！"))
             return
@@ -1050,6 +1187,70 @@ class StepTwoServiceMixin:
         if not success:
             self.log_signal.emit(tr("step2_grid_create_failed", "错误：网格创建失败"))
 
+    def _reconcile_nested_masks(self, coarse_dir, fine_dir):
+        """调用 gridgen 的 reconcile_masks 协调嵌套网格掩膜（直接读取二进制网格包，无需解析文本）"""
+        self.log_signal.emit(tr("step2_reconcile_masks_start", "🔄 正在协调内外网格的陆海掩膜..."))
+        # 掩膜写回网格包前等待后台文本写出结束，协调后按新掩膜重新写出
+        self._wait_grid_text_files(coarse_dir)
+        self._wait_grid_text_files(fine_dir)
+        python_version_path = os.path.normpath(os.path.join(self._get_gridgen_path(), "python"))
+        python_script = f'''
+import sys
+sys.path.insert(0, {repr(python_version_path)})
+from grid.reconcile_masks import reconcile_grid_dirs
+reconcile_grid_dirs({repr(os.path.abspath(coarse_dir))}, {repr(os.path.abspath(fine_dir))})
+'''
+        try:
+            proc = subprocess.run(
+                [sys.executable, '-u', '-c', python_script],
+                cwd=python_version_path,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True
+            )
+        except Exception as e:
+            self.log_signal.emit(tr("step2_reconcile_masks_failed", "⚠️ 协调嵌套网格掩膜失败: {error}").format(error=e))
+            return False
+        for line in proc.stdout.splitlines():
+            if line.strip():
+                self.log_signal.emit(line.rstrip())
+        if proc.returncode != 0:
+            self.log_signal.emit(tr("step2_reconcile_masks_failed", "⚠️ 协调嵌套网格掩膜失败: {error}").format(error=proc.returncode))
+            return False
+        self.log_signal.emit(tr("step2_reconcile_masks_done", "✅ 内外网格掩膜已协调"))
+        self._start_grid_text_files(coarse_dir)
+        self._start_grid_text_files(fine_dir)
+        return True
+
+    def _show_gridgen_event(self, event, state):
+        """显示 gridgen 阶段事件：进度行原地更新，阶段结束输出耗时，全部结束输出耗时表"""
+        kind = event.get('event')
+        if kind == 'start':
+            state['active'] = True
+        elif kind == 'progress':
+            overall = event.get('overall', event.get('fraction', 0))
+            text = tr("step2_stage_progress", "⏳ {stage}: {percent}%（总进度 {overall}%）").format(
+                stage=event.get('stage', ''), percent=int(event.get('fraction', 0) * 100), overall=int(overall * 100))
+            if state.get('progress_line'):
+                self.log_update_last_line_signal.emit(text)
+            else:
+                self.log_signal.emit(text)
+                state['progress_line'] = True
+        elif kind == 'exit' and event.get('depth', 0) == 0:
+            text = tr("step2_stage_done", "✅ {stage} 完成，用时 {duration:.2f} 秒，峰值内存 {memory:.0f} MB").format(
+                stage=event.get('stage', ''), duration=event.get('duration_s', 0), memory=event.get('peak_rss_mb', 0))
+            if state.get('progress_line'):
+                self.log_update_last_line_signal.emit(text)
+            else:
+                self.log_signal.emit(text)
+            state['progress_line'] = False
+        elif kind == 'end':
+            self.log_signal.emit(tr("step2_stage_summary", "📊 各阶段耗时（总计 {duration:.2f} 秒）：").format(
+                duration=event.get('duration_s', 0)))
+            for st in event.get('stages', []):
+                self.log_signal.emit(f"   {st['stage']:<18}{st['duration_s']:>10.2f} s{st['peak_rss_mb']:>10.0f} MB")
+            state['progress_line'] = False
+
     def _generate_single_grid(self, output_dir, dx_value, dy_value, lon_west, lon_east, lat_south, lat_north):
         """生成单个网格的辅助函数（带缓存机制）"""
         try:
@@ -1059,6 +1260,8 @@ class StepTwoServiceMixin:
 
             # 确保输出目录存在
             os.makedirs(output_dir, exist_ok=True)
+            # 该目录上一次生成的文本文件可能仍在后台写出，先等待其结束
+            self._wait_grid_text_files(output_dir)
 
             if gridgen_version == "Python":
                 # Python 版本
@@ -1120,10 +1323,26 @@ class StepTwoServiceMixin:
             if cache_path:
                 self.log_signal.emit(tr("step2_cache_found", "✅ 找到匹配的网格缓存，直接使用缓存的网格"))
                 self._load_grid_from_cache(cache_path, output_dir_norm)
+                self._start_grid_text_files(output_dir_norm)
                 return True
 
             self.log_signal.emit(tr("step2_cache_not_found", "🔄 未找到匹配的缓存，开始生成新网格..."))
 
+            # 增量生成：复用范围重叠的缓存网格，只计算新增区域
+            reuse_dir = None
+            if gridgen_version == "Python" and current_config.get("GRID_INCREMENTAL", True):
+                try:
+                    reuse_dir = self._find_incremental_grid_cache(dx_value, dy_value, lon_west, lon_east, lat_south, lat_north,
+                                                                  ref_dir, bathymetry_config, coastline_precision_config)
+                except OSError:
+                    reuse_dir = None
+                if reuse_dir:
+                    self.log_signal.emit(tr("step2_cache_incremental", "♻️ 复用重叠的缓存网格（{key}...），仅计算新增区域").format(
+                        key=os.path.basename(reuse_dir)[:8]))
+
+            # WW3 文本网格文件在后台写出，读取网格时使用二进制网格包
+            text_background = current_config.get("GRID_TEXT_BACKGROUND", True)
+
             if gridgen_version == "Python":
                 # 确保 lat_south < lat_north（对于南纬，需要交换）
                 lat_start = min(lat_south, lat_north)
@@ -1143,12 +1362,19 @@ create_grid(
             ref_dir={repr(ref_dir)},
             ref_grid={repr(ref_grid)},
             boundary={repr(boundary)},
+            reuse_dir={repr(reuse_dir)},
+            write_text={not text_background},
         )                
         '''
                 
                 try:
                     env = os.environ.copy()
                     env['PYTHONUNBUFFERED'] = '1'
+                    # 阶段事件（JSON 行）写入旁路文件，用于显示进度和各阶段耗时
+                    events_path = os.path.join(output_dir_norm, 'grid_events.jsonl')
+                    if os.path.exists(events_path):
+                        os.remove(events_path)
+                    env['GRIDGEN_EVENTS'] = events_path
                     
                     proc = subprocess.Popen(
                         [sys.executable, '-u', '-c', python_script],
@@ -1163,6 +1389,7 @@ create_grid(
                     from queue import Queue, Empty
                     output_queue = Queue()
                     read_finished = threading.Event()
+                    events_finished = threading.Event()
                     
                     def read_output_thread():
                         try:
@@ -1178,17 +1405,52 @@ create_grid(
                         finally:
                             read_finished.set()
                     
+                    def read_events_thread():
+                        # 跟踪事件文件，解析出的事件（dict）与输出行放入同一队列
+                        pos = 0
+                        pending = ''
+                        try:
+                            while True:
+                                done = read_finished.is_set()
+                                try:
+                                    with open(events_path, 'r', encoding='utf-8') as f:
+                                        f.seek(pos)
+                                        pending += f.read()
+                                        pos = f.tell()
+                                except OSError:
+                                    pass
+                                *lines, pending = pending.split('\n')
+                                for l in lines:
+                                    try:
+                                        output_queue.put(json.loads(l))
+                                    except ValueError:
+                                        pass
+                                if done:
+                                    break
+                                read_finished.wait(0.2)
+                        finally:
+                            events_finished.set()
+                    
                     reader_thread = threading.Thread(target=read_output_thread, daemon=True)
                     reader_thread.start()
+                    events_thread = threading.Thread(target=read_events_thread, daemon=True)
+                    events_thread.start()
                     
-                    while not read_finished.is_set() or not output_queue.empty():
+                    event_state = {}
+                    while not (read_finished.is_set() and events_finished.is_set()) or not output_queue.empty():
                         try:
-                            line = output_queue.get(timeout=0.05)
-                            self.log_signal.emit(line)
+                            item = output_queue.get(timeout=0.05)
                         except Empty:
-                            pass
+                            continue
+                        if isinstance(item, dict):
+                            self._show_gridgen_event(item, event_state)
+                        elif not (event_state.get('active') and GRIDGEN_PERCENT_LINE.match(item)):
+                            # 有事件时百分比输出由进度行代替
+                            self.log_signal.emit(item)
+                            event_state['progress_line'] = False
                     
                     reader_thread.join(timeout=2)
+                    events_thread.join(timeout=2)
                     proc.wait()
                     ret = proc.returncode
                     
@@ -1214,6 +1476,7 @@ create_grid(
                             self.log_signal.emit(tr("step2_cache_saved", "✅ 已保存网格到缓存（{key}...）").format(key=cache_key[:8]))
                         except Exception as cache_error:
                             self.log_signal.emit(tr("step2_cache_save_failed", "⚠️ 保存缓存失败: {error}").format(error=cache_error))
+                        self._start_grid_text_files(output_dir_norm)
                         return True
                     else:
                         self.log_signal.emit(tr("step2_python_failed", "❌ Python 版 gridgen 执行失败，返回码: {code}").format(code=ret))
@@ -1413,7 +1676,9 @@ create_grid(
             'obst': os.path.join(grid_dir, 'grid.obst')
         }
 
-        missing_files = [name for name, path in grid_files.items() if not os.path.exists(path)]
+        # 有二进制网格包时直接内存映射读取，不解析文本文件（文本文件可能仍在后台写出）
+        bundle = self._read_grid_bundle(grid_dir)
+        missing_files = [] if bundle is not None else [name for name, path in grid_files.items() if not os.path.exists(path)]
         if missing_files:
             missing_files_str = ', '.join([f'grid.{name}' for name in missing_files])
             self.log(tr("step2_grid_missing_files", "❌ {grid_name}缺少必要的网格文件: {missing_files}").format(grid_name=grid_name, missing_files=missing_files_str))
@@ -1422,7 +1687,10 @@ create_grid(
 
         try:
             # 1. 读取 meta 文件获取经纬度信息
-            lon, lat = self._read_ww3meta(grid_files['meta'])
+            if bundle is not None:
+                lon, lat = np.meshgrid(bundle['lon'], bundle['lat'])
+            else:
+                lon, lat = self._read_ww3meta(grid_files['meta'])
             if lon is None or lat is None:
                 self.log(tr("step2_read_meta_failed", "❌ 读取 grid.meta 文件失败"))
                 return
@@ -1431,7 +1699,7 @@ create_grid(
 
             # 2. 读取并可视化各个文件（参考 MATLAB create_grid.m 的实现）
             # 2.1 先读取 mask（用于标记陆地位置）
-            mask = self._read_ww3file(grid_files['mask'], Nx, Ny)
+            mask = bundle['mask'] if bundle is not None else self._read_ww3file(grid_files['mask'], Nx, Ny)
             if mask is None:
                 self.log(tr("step2_cannot_read_mask", "   ⚠️ 警告: 无法读取 mask 文件，将跳过陆地标记"))
                 loc = None
@@ -1440,7 +1708,7 @@ create_grid(
 
             # 2.2 可视化 bathymetry (grid.bot)
             # 参考 MATLAB: figure(1); loc = m4 == 0; d2 = depth; d2(loc) = NaN; pcolor(...); shading interp;
-            depth = self._read_ww3file(grid_files['bot'], Nx, Ny)
+            depth = bundle['depth'] if bundle is not None else self._read_ww3file(grid_files['bot'], Nx, Ny)
             if depth is not None:
                 # 转换为实际深度（除以 scale = 1000）
                 depth = depth.astype(float) / 1000.0
@@ -1472,7 +1740,10 @@ create_grid(
 
             # 2.4 可视化 obstruction (grid.obst)
             # 参考 MATLAB: figure(3/4); d2 = sx1/sy1; d2(loc) = NaN; pcolor(...); shading flat;
-            sx, sy = self._read_ww3obstr(grid_files['obst'], Nx, Ny)
+            if bundle is not None:
+                sx, sy = bundle['sx'], bundle['sy']
+            else:
+                sx, sy = self._read_ww3obstr(grid_files['obst'], Nx, Ny)
             if sx is not None and sy is not None:
                 sx = sx.astype(float) / 100.0  # 转换为实际值（除以 scale）
                 sy = sy.astype(float) / 100.0
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+WW3 结果文件子集提取（在服务器上运行）
+按变量、时间步长和经纬度范围裁剪 ww3.*.nc，可选 zlib 压缩，只依赖 netCDF4 和 numpy。
+本文件由第六步上传到服务器执行，不依赖本项目的其它模块。
+
+用法：
+    python3 remote_subset.py IN.nc OUT.nc --vars hs,t02 --stride 6 --bbox 110,130,10,30 --deflate 4
+"""
+import sys
+import json
+import argparse
+
+import numpy as np
+
+try:
+    import netCDF4
+except ImportError:
+    sys.stderr.write("netCDF4 not available\n")
+    sys.exit(3)
+
+
+TIME_NAMES = ("time",)
+LON_NAMES = ("longitude", "lon", "x")
+LAT_NAMES = ("latitude", "lat", "y")
+
+
+def _find_dim(dataset, names):
+    for name in names:
+        if name in dataset.dimensions:
+            return name
+    return None
+
+
+def _index_range(values, low, high):
+    """坐标落在 [low, high] 内的连续下标范围（切片）"""
+    inside = np.where((values >= min(low, high)) & (values <= max(low, high)))[0]
+    if inside.size == 0:
+        return None
+    return slice(int(inside[0]), int(inside[-1]) + 1)
+
+
+def subset(src_path, dst_path, variables=None, stride=1, bbox=None, deflate=0):
+    with netCDF4.Dataset(src_path) as src:
+        time_dim = _find_dim(src, TIME_NAMES)
+        lon_dim = _find_dim(src, LON_NAMES)
+        lat_dim = _find_dim(src, LAT_NAMES)
+
+        slices = {}
+        if time_dim and stride > 1:
+            slices[time_dim] = slice(0, None, stride)
+        if bbox is not None:
+            if not (lon_dim and lat_dim and lon_dim in src.variables and lat_dim in src.variables):
+                sys.stderr.write("bbox ignored: no 1-D longitude/latitude coordinates\n")
+            else:
+                lon_slice = _index_range(src.variables[lon_dim][:], bbox[0], bbox[1])
+                lat_slice = _index_range(src.variables[lat_dim][:], bbox[2], bbox[3])
+                if lon_slice is None or lat_slice is None:
+                    sys.stderr.write("bbox does not intersect the grid\n")
+                    return 2
+                slices[lon_dim] = lon_slice
+                slices[lat_dim] = lat_slice
+
+        # 要保留的变量：请求的变量 + 它们用到的坐标变量
+        if variables:
+            missing = [name for name in variables if name not in src.variables]
+            if missing:
+                sys.stderr.write("variables not found: %s\n" % ",".join(missing))
+                return 2
+            keep = list(variables)
+        else:
+            keep = list(src.variables)
+        used_dims = set()
+        for name in keep:
+            used_dims.update(src.variables[name].dimensions)
+        for name in src.variables:
+            var = src.variables[name]
+            if name not in keep and var.dimensions == (name,) and name in used_dims:
+                keep.insert(0, name)
+
+        with netCDF4.Dataset(dst_path, "w", format="NETCDF4" if deflate else src.data_model) as dst:
+            dst.setncatts({k: src.getncattr(k) for k in src.ncattrs()})
+            dst.setncattr("ww3tool_subset", json.dumps({
+                "source": src_path.rsplit("/", 1)[-1],
+                "variables": variables or [],
+                "time_stride": stride,
+                "bbox": list(bbox) if bbox is not None else None,
+                "deflate": deflate,
+            }))
+            for name, dim in src.dimensions.items():
+                if name not in used_dims:
+                    continue
+                size = None if dim.isunlimited() else len(range(*slices.get(name, slice(None)).indices(len(dim))))
+                dst.createDimension(name, size)
+
+            for name in keep:
+                var = src.variables[name]
+                fill = var.getncattr("_FillValue") if "_FillValue" in var.ncattrs() else None
+                kwargs = {"fill_value": fill}
+                if deflate and var.dimensions:
+                    kwargs.update(zlib=True, complevel=int(deflate), shuffle=True)
+                out = dst.createVariable(name, var.datatype, var.dimensions, **kwargs)
+                out.setncatts({k: var.getncattr(k) for k in var.ncattrs() if k != "_FillValue"})
+                var.set_auto_maskandscale(False)
+                out.set_auto_maskandscale(False)
+                index = tuple(slices.get(d, slice(None)) for d in var.dimensions)
+                if time_dim in var.dimensions and var.dimensions[0] == time_dim and len(var.dimensions) > 1:
+                    # 逐个时间步复制，避免一次读入整个变量
+                    steps = range(*index[0].indices(src.dimensions[time_dim].size))
+                    for k, t in enumerate(steps):
+                        out[k] = var[(t,) + index[1:]]
+                elif not var.dimensions:
+                    out.assignValue(var.getValue())
+                else:
+                    out[:] = var[index]
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Subset a WW3 NetCDF output file")
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    parser.add_argument("--vars", default="")
+    parser.add_argument("--stride", type=int, default=1)
+    parser.add_argument("--bbox", default="")
+    parser.add_argument("--deflate", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    variables = [v.strip() for v in args.vars.split(",") if v.strip()]
+    bbox = [float(v) for v in args.bbox.split(",")] if args.bbox else None
+    if bbox is not None and len(bbox) != 4:
+        parser.error("--bbox expects lon_min,lon_max,lat_min,lat_max")
+    return subset(args.src, args.dst, variables, max(1, args.stride), bbox, args.deflate)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+第六步：结果文件服务器端子集
+描述要保留的变量、时间步长和经纬度范围，生成服务器上的 ncks / Python 子集命令，
+下载后在本地写入同名 .subset.json 供绘图页识别
+"""
+import os
+import json
+
+from .sftp_transfer import shell_quote
+
+
+# 随第六步上传到服务器的子集脚本
+REMOTE_SUBSET_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "remote_subset.py")
+
+# 服务器上存放子集脚本和临时输出的目录（位于结果目录下）
+REMOTE_WORK_DIR = ".ww3tool_subset"
+
+SUBSET_SUFFIX = "_subset"
+SIDECAR_SUFFIX = ".subset.json"
+
+# 绘图页（波高图、波高场查看、Jason-3 对比）需要的变量
+PLOT_VARIABLES = ("hs",)
+
+
+class SubsetSpec:
+    """结果文件子集参数
+
+    variables: 保留的变量名列表（空表示全部）
+    time_stride: 时间步长（每 N 个时次取 1 个）
+    bbox: (lon_min, lon_max, lat_min, lat_max) 或 None
+    deflate: zlib 压缩级别（0 表示不压缩）
+    """
+
+    def __init__(self, variables=None, time_stride=1, bbox=None, deflate=0):
+        self.variables = [v for v in (variables or []) if v]
+        self.time_stride = max(1, int(time_stride or 1))
+        self.bbox = tuple(float(v) for v in bbox) if bbox else None
+        self.deflate = max(0, min(9, int(deflate or 0)))
+
+    @classmethod
+    def parse(cls, variables_text, stride_text, bbox_text, compress):
+        """从界面输入解析；格式错误时抛出 ValueError"""
+        variables = [v.strip() for v in variables_text.replace(" ", ",").split(",") if v.strip()]
+        stride = int(stride_text) if stride_text.strip() else 1
+        if stride < 1:
+            raise ValueError(stride_text)
+        bbox = None
+        if bbox_text.strip():
+            bbox = [float(v) for v in bbox_text.replace(" ", ",").split(",") if v.strip()]
+            if len(bbox) != 4:
+                raise ValueError(bbox_text)
+        return cls(variables, stride, bbox, 4 if compress else 0)
+
+    def is_empty(self):
+        return not self.variables and self.time_stride == 1 and self.bbox is None and not self.deflate
+
+    def output_name(self, name):
+        stem, ext = os.path.splitext(name)
+        return f"{stem}{SUBSET_SUFFIX}{ext}"
+
+    def ncks_command(self, src, dst):
+        """NCO ncks 命令；坐标写成带小数点的数值，ncks 按坐标值而非下标裁剪"""
+        parts = ["ncks", "-O"]
+        if self.deflate:
+            parts += ["-4", "-L", str(self.deflate)]
+        if self.variables:
+            parts += ["-v", ",".join(self.variables)]
+        if self.time_stride > 1:
+            parts += ["-d", f"time,,,{self.time_stride}"]
+        if self.bbox is not None:
+            lon_min, lon_max, lat_min, lat_max = self.bbox
+            parts += ["-d", f"longitude,{min(lon_min, lon_max):.6f},{max(lon_min, lon_max):.6f}",
+                      "-d", f"latitude,{min(lat_min, lat_max):.6f},{max(lat_min, lat_max):.6f}"]
+        return " ".join(shell_quote(p) for p in parts + [src, dst])
+
+    def python_command(self, script, src, dst):
+        """服务器 python3 + netCDF4 执行随附脚本"""
+        parts = ["python3", script, src, dst, "--stride", str(self.time_stride), "--deflate", str(self.deflate)]
+        if self.variables:
+            parts += ["--vars", ",".join(self.variables)]
+        if self.bbox is not None:
+            parts += ["--bbox", ",".join(f"{v:g}" for v in self.bbox)]
+        return " ".join(shell_quote(p) for p in parts)
+
+    def to_dict(self):
+        return {
+            'variables': self.variables,
+            'time_stride': self.time_stride,
+            'bbox': list(self.bbox) if self.bbox is not None else None,
+            'deflate': self.deflate,
+        }
+
+    def describe(self):
+        parts = [",".join(self.variables) if self.variables else "*"]
+        if self.time_stride > 1:
+            parts.append(f"1/{self.time_stride}")
+        if self.bbox is not None:
+            parts.append("[{:g}, {:g}] x [{:g}, {:g}]".format(*self.bbox))
+        return " | ".join(parts)
+
+
+def write_subset_info(nc_path, spec, source, tool):
+    """下载完成后在本地写入子集说明"""
+    info = dict(spec.to_dict(), source=source, tool=tool)
+    with open(nc_path + SIDECAR_SUFFIX, 'w', encoding='utf-8') as f:
+        json.dump(info, f, ensure_ascii=False, indent=1)
+    return info
+
+
+def read_subset_info(nc_path):
+    """读取结果文件的子集说明，不是子集文件时返回 None"""
+    try:
+        with open(nc_path + SIDECAR_SUFFIX, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def missing_plot_variables(info):
+    """子集说明中缺少的绘图变量（未限定变量时为空列表）"""
+    variables = info.get('variables') or []
+    if not variables:
+        return []
+    return [name for name in PLOT_VARIABLES if name not in variables]
@@ -0,0 +1,391 @@
+"""
+第六步：SFTP 并行传输引擎
+在同一个 paramiko Transport 上开多个 SFTP 通道并行传输，
+按大小/修改时间（可选校验和）跳过未变化文件，中断的传输写入带修改时间的 .part 文件并按偏移续传
+"""
+import os
+import stat
+import time
+import queue
+import hashlib
+import threading
+import posixpath
+
+import paramiko
+
+
+# 默认并行 SFTP 通道数
+DEFAULT_CHANNELS = 4
+
+# 单次读写块大小
+CHUNK_SIZE = 1024 * 1024
+
+# 未完成传输的临时文件后缀
+PART_SUFFIX = ".part"
+
+# 进度回调最小间隔（秒）
+PROGRESS_INTERVAL = 0.5
+
+# 连接断开类异常：出现后停止所有通道
+CONNECTION_ERRORS = (paramiko.ssh_exception.SSHException, EOFError, ConnectionError)
+
+
+class TransferTask:
+    """单个文件传输任务
+
+    upload 时 source 为本地文件（可以是清理过换行符的临时文件），
+    mtime 为写入远程的修改时间（默认取 source 的修改时间），用于下次跳过判断。
+    """
+
+    __slots__ = ('source', 'target', 'size', 'mtime', 'name')
+
+    def __init__(self, source, target, size=None, mtime=None, name=None):
+        self.source = source
+        self.target = target
+        self.size = size
+        self.mtime = mtime
+        self.name = name or posixpath.basename(target.replace("\\", "/"))
+
+    def __repr__(self):
+        return f"TransferTask({self.source!r} -> {self.target!r}, size={self.size})"
+
+
+def local_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def shell_quote(path):
+    return "'" + path.replace("'", "'\"'\"'") + "'"
+
+
+def remote_sha256(transport, remote_path, timeout=600):
+    """在服务器上执行 sha256sum 计算远程文件校验和，失败返回 None"""
+    channel = transport.open_session(timeout=30)
+    try:
+        channel.settimeout(timeout)
+        channel.exec_command(f"sha256sum {shell_quote(remote_path)}")
+        output = b''
+        while True:
+            data = channel.recv(65536)
+            if not data:
+                break
+            output += data
+        if channel.recv_exit_status() != 0:
+            return None
+        parts = output.decode('utf-8', errors='ignore').split()
+        return parts[0] if parts else None
+    finally:
+        channel.close()
+
+
+def part_path(target, mtime):
+    """未完成传输的临时文件路径，文件名带源文件修改时间，源文件变化后不会误续传"""
+    return f"{target}.{int(mtime)}{PART_SUFFIX}"
+
+
+def same_mtime(a, b):
+    """SFTP 修改时间只精确到秒"""
+    return a is not None and b is not None and int(a) == int(b)
+
+
+class SFTPTransferEngine:
+    """多通道 SFTP 传输引擎
+
+    transport: 已认证的 paramiko.Transport（如 ssh.get_transport()），
+        每个工作线程在其上打开一个独立的 SFTP 通道，因此也可以指向本地 SSH 服务器测试。
+    channels: 并行通道数
+    verify_checksum: 大小一致时再比较 sha256（远程用 sha256sum），
+        修改时间不同但内容相同的文件只修正修改时间，不重新传输
+    on_file(event, task, info): 单个文件事件回调，event 为
+        'skipped' / 'done' / 'failed'，info 为统计信息或错误
+    on_progress(done_bytes, total_bytes, rate): 汇总进度回调（字节/秒），在工作线程中调用
+    """
+
+    def __init__(self, transport, channels=DEFAULT_CHANNELS, verify_checksum=False,
+                 on_file=None, on_progress=None):
+        self.transport = transport
+        self.channels = max(1, int(channels))
+        self.verify_checksum = verify_checksum
+        self.on_file = on_file
+        self.on_progress = on_progress
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.stats = {
+            'files': 0,
+            'transferred': 0,
+            'skipped': 0,
+            'resumed': 0,
+            'failed': 0,
+            'total_bytes': 0,
+            'bytes': 0,
+            'seconds': 0.0,
+            'rate': 0.0,
+            'channels': 0,
+        }
+        self.errors = []
+        self._done_bytes = 0
+        self._last_progress = 0.0
+        self._started = time.monotonic()
+
+    def cancel(self):
+        """停止分配新任务，正在传输的块写完后退出"""
+        self._stop.set()
+
+    # ------------------------------------------------------------------
+    # 对外接口
+    # ------------------------------------------------------------------
+
+    def upload(self, tasks):
+        """并行上传，tasks 为 TransferTask 列表（target 为远程路径），返回统计信息"""
+        for task in tasks:
+            st = os.stat(task.source)
+            if task.size is None:
+                task.size = st.st_size
+            if task.mtime is None:
+                task.mtime = st.st_mtime
+        return self._run(tasks, self._upload_one)
+
+    def download(self, tasks):
+        """并行下载，tasks 为 TransferTask 列表（source 为远程路径），size/mtime 未给出时在通道内 stat"""
+        return self._run(tasks, self._download_one)
+
+    # ------------------------------------------------------------------
+    # 调度
+    # ------------------------------------------------------------------
+
+    def _run(self, tasks, handler):
+        self._reset_stats()
+        self._stop.clear()
+        tasks = list(tasks)
+        self.stats['files'] = len(tasks)
+        self.stats['total_bytes'] = sum(t.size or 0 for t in tasks)
+        if not tasks:
+            return dict(self.stats)
+
+        # 大文件优先，减少最后只剩一个通道在传大文件的情况
+        pending = queue.Queue()
+        for task in sorted(tasks, key=lambda t: t.size or 0, reverse=True):
+            pending.put(task)
+
+        # 逐个打开通道；服务器限制会话数时用已打开的通道继续
+        clients = []
+        for _ in range(min(self.channels, len(tasks))):
+            try:
+                clients.append(paramiko.SFTPClient.from_transport(self.transport))
+            except Exception:
+                if not clients:
+                    raise
+                break
+
+        connection_error = []
+        workers = []
+        for sftp in clients:
+            worker = threading.Thread(target=self._worker, args=(sftp, pending, handler, connection_error), daemon=True)
+            worker.start()
+            workers.append(worker)
+        for worker in workers:
+            worker.join()
+
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        self.stats['seconds'] = elapsed
+        self.stats['rate'] = self.stats['bytes'] / elapsed
+        self.stats['channels'] = len(clients)
+        if connection_error:
+            raise connection_error[0]
+        return dict(self.stats)
+
+    def _worker(self, sftp, pending, handler, connection_error):
+        try:
+            while not self._stop.is_set():
+                try:
+                    task = pending.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    info = handler(sftp, task)
+                    self._emit_file(info.pop('event'), task, info)
+                except CONNECTION_ERRORS as e:
+                    with self._lock:
+                        self.stats['failed'] += 1
+                        self.errors.append((task, e))
+                        if not connection_error:
+                            connection_error.append(e)
+                    self._stop.set()
+                    self._emit_file('failed', task, e)
+                except Exception as e:
+                    with self._lock:
+                        self.stats['failed'] += 1
+                        self.errors.append((task, e))
+                    self._emit_file('failed', task, e)
+        finally:
+            try:
+                sftp.close()
+            except Exception:
+                pass
+
+    def _emit_file(self, event, task, info):
+        if self.on_file:
+            try:
+                self.on_file(event, task, info)
+            except Exception:
+                pass
+
+    def _add_bytes(self, count, final=False):
+        with self._lock:
+            self._done_bytes += count
+            now = time.monotonic()
+            if not self.on_progress or (not final and now - self._last_progress < PROGRESS_INTERVAL):
+                return
+            self._last_progress = now
+            done = self._done_bytes
+            rate = self.stats['bytes'] / max(now - self._started, 1e-6)
+        try:
+            self.on_progress(done, self.stats['total_bytes'], rate)
+        except Exception:
+            pass
+
+    def _finish(self, event, task, transferred=0, resumed=False):
+        with self._lock:
+            if event == 'skipped':
+                self.stats['skipped'] += 1
+            else:
+                self.stats['transferred'] += 1
+                if resumed:
+                    self.stats['resumed'] += 1
+        return {'event': event, 'bytes': transferred, 'resumed': resumed}
+
+    # ------------------------------------------------------------------
+    # 上传
+    # ------------------------------------------------------------------
+
+    def _remote_stat(self, sftp, path):
+        try:
+            return sftp.stat(path)
+        except IOError:
+            return None
+
+    def _upload_one(self, sftp, task):
+        remote = task.target
+        attrs = self._remote_stat(sftp, remote)
+        if attrs is not None and stat.S_ISREG(attrs.st_mode or 0) and attrs.st_size == task.size:
+            if same_mtime(attrs.st_mtime, task.mtime):
+                if not self.verify_checksum or remote_sha256(self.transport, remote) == local_sha256(task.source):
+                    self._add_bytes(task.size)
+                    return self._finish('skipped', task)
+            elif self.verify_checksum and remote_sha256(self.transport, remote) == local_sha256(task.source):
+                # 内容相同只是修改时间不同：修正修改时间，下次按大小/时间即可跳过
+                sftp.utime(remote, (time.time(), task.mtime))
+                self._add_bytes(task.size)
+                return self._finish('skipped', task)
+
+        part = part_path(remote, task.mtime)
+        offset = 0
+        part_attrs = self._remote_stat(sftp, part)
+        if part_attrs is not None and 0 < part_attrs.st_size <= task.size:
+            offset = part_attrs.st_size
+        resumed = offset > 0
+        self._add_bytes(offset)
+
+        with open(task.source, 'rb') as local_file:
+            local_file.seek(offset)
+            with sftp.open(part, 'r+b' if resumed else 'wb') as remote_file:
+                remote_file.seek(offset)
+                remote_file.set_pipelined(True)
+                transferred = 0
+                while True:
+                    if self._stop.is_set():
+                        raise InterruptedError(task.name)
+                    block = local_file.read(CHUNK_SIZE)
+                    if not block:
+                        break
+                    remote_file.write(block)
+                    transferred += len(block)
+                    with self._lock:
+                        self.stats['bytes'] += len(block)
+                    self._add_bytes(len(block))
+
+        # 写完后再设置时间，避免关闭文件时被服务器改写
+        sftp.utime(part, (time.time(), task.mtime))
+        self._replace_remote(sftp, part, remote)
+        self._add_bytes(0, final=True)
+        return self._finish('done', task, transferred, resumed)
+
+    def _replace_remote(self, sftp, src, dst):
+        try:
+            sftp.posix_rename(src, dst)
+        except IOError:
+            # 服务器不支持 posix-rename 扩展：先删除目标再重命名
+            try:
+                sftp.remove(dst)
+            except IOError:
+                pass
+            sftp.rename(src, dst)
+
+    # ------------------------------------------------------------------
+    # 下载
+    # ------------------------------------------------------------------
+
+    def _download_one(self, sftp, task):
+        remote = task.source
+        if task.size is None or task.mtime is None:
+            attrs = sftp.stat(remote)
+            if task.size is None:
+                with self._lock:
+                    self.stats['total_bytes'] += attrs.st_size
+            task.size = attrs.st_size
+            task.mtime = attrs.st_mtime
+
+        local = task.target
+        if os.path.isfile(local):
+            st = os.stat(local)
+            if st.st_size == task.size:
+                if same_mtime(st.st_mtime, task.mtime):
+                    if not self.verify_checksum or remote_sha256(self.transport, remote) == local_sha256(local):
+                        self._add_bytes(task.size)
+                        return self._finish('skipped', task)
+                elif self.verify_checksum and remote_sha256(self.transport, remote) == local_sha256(local):
+                    os.utime(local, (time.time(), task.mtime))
+                    self._add_bytes(task.size)
+                    return self._finish('skipped', task)
+
+        part = part_path(local, task.mtime)
+        offset = 0
+        if os.path.isfile(part) and 0 < os.path.getsize(part) <= task.size:
+            offset = os.path.getsize(part)
+        resumed = offset > 0
+        self._add_bytes(offset)
+
+        with sftp.open(remote, 'rb') as remote_file:
+            remote_file.seek(offset)
+            if task.size > offset:
+                remote_file.prefetch(task.size)
+            with open(part, 'r+b' if resumed else 'wb') as local_file:
+                local_file.seek(offset)
+                transferred = 0
+                remaining = task.size - offset
+                while remaining > 0:
+                    if self._stop.is_set():
+                        raise InterruptedError(task.name)
+                    block = remote_file.read(min(CHUNK_SIZE, remaining))
+                    if not block:
+                        break
+                    local_file.write(block)
+                    transferred += len(block)
+                    remaining -= len(block)
+                    with self._lock:
+                        self.stats['bytes'] += len(block)
+                    self._add_bytes(len(block))
+                if remaining > 0:
+                    raise EOFError(f"{task.name}: remote file shorter than expected")
+
+        os.replace(part, local)
+        os.utime(local, (time.time(), task.mtime))
+        self._add_bytes(0, final=True)
+        return self._finish('done', task, transferred, resumed)
@@ -3,12 +3,18 @@
 包含所有业务逻辑函数（从 ui.py 拆分出来）
 """
 import os
+import time
 import threading
 import paramiko
 from PyQt6 import QtCore, QtWidgets
 from qfluentwidgets import InfoBar, MessageBox
 from setting.language_manager import tr
 from setting.config import load_config
+from .sftp_transfer import SFTPTransferEngine, TransferTask, PART_SUFFIX, DEFAULT_CHANNELS, same_mtime
+from .sync_manifest import SyncManifest, list_remote_tree, plan_sync
+from .result_subset import (SubsetSpec, REMOTE_SUBSET_SCRIPT, REMOTE_WORK_DIR, SUBSET_SUFFIX,
+                            write_subset_info, read_subset_info, missing_plot_variables)
+from ..ssh_session import PRIORITY_HIGH, PRIORITY_NORMAL
 
 
 class StepSixFunctionsMixin:
@@ -26,6 +32,30 @@ class StepSixFunctionsMixin:
         except Exception:
             return False
 
+    def _create_transfer_engine(self, on_file=None, on_progress=None):
+        """在当前 SSH 连接上创建多通道 SFTP 传输引擎（通道数和校验方式取自配置）"""
+        config = load_config()
+        try:
+            channels = int(config.get("SFTP_CHANNELS", DEFAULT_CHANNELS))
+        except (TypeError, ValueError):
+            channels = DEFAULT_CHANNELS
+        return SFTPTransferEngine(
+            self.ssh_manager.transport(),
+            channels=channels,
+            verify_checksum=bool(config.get("SFTP_VERIFY_CHECKSUM", False)),
+            on_file=on_file,
+            on_progress=on_progress,
+        )
+
+    def _log_transfer_stats(self, stats):
+        """输出一次传输的汇总：传输/跳过/续传/失败文件数和平均速率"""
+        self.log_signal.emit(tr("sftp_transfer_summary",
+                                "📊 传输 {transferred} 个，跳过未变化 {skipped} 个，续传 {resumed} 个，失败 {failed} 个；"
+                                "{mb:.1f} MB，用时 {seconds:.1f} 秒，{rate:.2f} MB/s（{channels} 个通道）").format(
+            transferred=stats['transferred'], skipped=stats['skipped'], resumed=stats['resumed'],
+            failed=stats['failed'], mb=stats['bytes'] / 1024 / 1024, seconds=stats['seconds'],
+            rate=stats['rate'] / 1024 / 1024, channels=stats['channels']))
+
     def execute_remote_script(self, mode: str = "submit"):
         """复用全局 SSH 连接执行远程脚本（server.sh 或 export.sh）"""
         if self.ssh is None or not self._is_ssh_alive(self.ssh):
@@ -35,18 +65,7 @@ class StepSixFunctionsMixin:
                     self.log("❌ 无法重新连接：缺少连接信息")
                     return
                 host, port, user, pwd = self._last_conn_args
-                self.ssh = paramiko.SSHClient()
-                self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                self.ssh.connect(
-                    hostname=host,
-                    port=port,
-                    username=user,
-                    password=pwd,
-                    look_for_keys=False,
-                    allow_agent=False,
-                    timeout=15,
-                    banner_timeout=200
-                )
+                self.ssh_manager.ensure_connected()
                 self.log(f"✅ 已重新连接服务器 {host}:{port}")
             except Exception as e:
                 self.log(f"❌ 无法重新连接服务器: {e}")
@@ -79,22 +98,22 @@ class StepSixFunctionsMixin:
         def _run():
             try:
                 self.log_signal.emit(f"开始远程执行：{cmd}")
-                stdin, stdout, stderr = self.ssh.exec_command(cmd, get_pty=True)
-
-                # 实时输出标准输出
-                for line in iter(stdout.readline, ''):
-                    if not line:
-                        break
-                    self.log_signal.emit(line.rstrip())
-
-                # 捕获错误输出
-                err = stderr.read().decode('utf-8', errors='ignore')
-                if err.strip():
-                    for l in err.splitlines():
-                        self.log_signal.emit(l)
-
-                # 等待结束状态
-                exit_status = stdout.channel.recv_exit_status()
+                with self.ssh_manager.command(cmd, priority=PRIORITY_HIGH, get_pty=True,
+                                              label=script_file) as (stdin, stdout, stderr):
+                    # 实时输出标准输出
+                    for line in iter(stdout.readline, ''):
+                        if not line:
+                            break
+                        self.log_signal.emit(line.rstrip())
+
+                    # 捕获错误输出
+                    err = stderr.read().decode('utf-8', errors='ignore')
+                    if err.strip():
+                        for l in err.splitlines():
+                            self.log_signal.emit(l)
+
+                    # 等待结束状态
+                    exit_status = stdout.channel.recv_exit_status()
                 if exit_status == 0:
                     self.log_signal.emit(tr("remote_script_completed", "✅ 远程脚本执行完成"))
                 else:
@@ -119,9 +138,9 @@ class StepSixFunctionsMixin:
 
         def _worker():
             try:
-                stdin, stdout, stderr = self.ssh.exec_command(f"ls -lh {remote_dir}", timeout=10)
-                files = stdout.read().decode("utf-8", errors="ignore").strip()
-                err = stderr.read().decode("utf-8", errors="ignore").strip()
+                result = self.ssh_manager.run(f"ls -lh {remote_dir}", priority=PRIORITY_NORMAL, timeout=10)
+                files = result.stdout.strip()
+                err = result.stderr.strip()
 
                 if err:
                     self.log_signal.emit(tr("directory_read_error", "❌ 目录读取错误：{error}").format(error=err))
@@ -231,18 +250,7 @@ class StepSixFunctionsMixin:
                             self.log_signal.emit(tr("clear_folder_reconnect_failed", "❌ 无法重新连接：缺少连接信息"))
                             return
                         host, port, user, pwd = self._last_conn_args
-                        self.ssh = paramiko.SSHClient()
-                        self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                        self.ssh.connect(
-                            hostname=host,
-                            port=port,
-                            username=user,
-                            password=pwd,
-                            look_for_keys=False,
-                            allow_agent=False,
-                            timeout=15,
-                            banner_timeout=200
-                        )
+                        self.ssh_manager.ensure_connected()
                         self.log_signal.emit(tr("reconnect_success", "已重新连接服务器 {host}:{port}").format(host=host, port=port))
                     except Exception as e:
                         self.log_signal.emit(tr("reconnect_failed", "无法重新连接服务器: {error}").format(error=str(e)))
@@ -254,14 +262,12 @@ class StepSixFunctionsMixin:
                 cmd = f"cd '{remote_dir}' && sh -c 'rm -rf * .[!.]*' 2>&1 || true"
                 self.log_signal.emit(tr("clear_folder_start", "🔄 开始清空远程文件夹：{path}").format(path=remote_dir))
                 
-                stdin, stdout, stderr = self.ssh.exec_command(cmd, get_pty=True, timeout=30)
+                result = self.ssh_manager.run(cmd, priority=PRIORITY_HIGH, get_pty=True, timeout=30)
                 
                 # 读取输出
-                stdout_text = stdout.read().decode("utf-8", errors="ignore").strip()
-                stderr_text = stderr.read().decode("utf-8", errors="ignore").strip()
-                
-                # 等待命令完成
-                exit_status = stdout.channel.recv_exit_status()
+                stdout_text = result.stdout.strip()
+                stderr_text = result.stderr.strip()
+                exit_status = result.exit_status
                 
                 if exit_status == 0 or "No such file" not in stderr_text:
                     self.log_signal.emit(tr("clear_folder_success", "✅ 已清空远程文件夹：{path}").format(path=remote_dir))
@@ -288,9 +294,9 @@ class StepSixFunctionsMixin:
 
         def _worker():
             try:
-                stdin, stdout, stderr = self.ssh.exec_command("squeue -l", get_pty=True, timeout=10)
-                queue_output = stdout.read().decode("utf-8", errors="ignore").strip()
-                err = stderr.read().decode("utf-8", errors="ignore").strip()
+                result = self.ssh_manager.run("squeue -l", priority=PRIORITY_NORMAL, get_pty=True, timeout=10)
+                queue_output = result.stdout.strip()
+                err = result.stderr.strip()
 
                 if err:
                     self.log_signal.emit(tr("queue_query_error", "❌ 任务队列查询错误：{error}").format(error=err))
@@ -303,6 +309,21 @@ class StepSixFunctionsMixin:
 
         threading.Thread(target=_worker, daemon=True).start()
 
+    def show_ssh_metrics(self):
+        """输出共享 SSH 连接的状态：通道占用、排队深度、重连次数和各类命令的延迟"""
+        metrics = self.ssh_manager.metrics()
+        lines = [tr("ssh_metrics_header",
+                    "📶 SSH 连接：{state}，重连 {reconnects} 次，占用通道 {in_use}，排队 {depth}（峰值 {peak}）").format(
+            state=tr("connected", "已连接") if metrics['connected'] else tr("step6_not_connected", "未连接"),
+            reconnects=metrics['reconnects'], in_use=metrics['channels_in_use'],
+            depth=metrics['queue_depth'], peak=metrics['peak_queue_depth'])]
+        for label, item in sorted(metrics['commands'].items(), key=lambda kv: -kv[1]['count']):
+            lines.append(tr("ssh_metrics_command",
+                            "  {label}: {count} 次（合并 {coalesced}，失败 {errors}），平均 {avg:.0f} ms，最大 {max:.0f} ms，最近 {last:.0f} ms").format(
+                label=label, count=item['count'], coalesced=item['coalesced'], errors=item['errors'],
+                avg=item['avg_ms'], max=item['max_ms'], last=item['last_ms']))
+        self.log("\n".join(lines))
+
     def check_remote_completion(self):
         """检查服务器目录是否存在 success.log 或 fail.log 来判断计算状态"""
         if not self.ssh:
@@ -326,7 +347,7 @@ class StepSixFunctionsMixin:
 
         def _worker():
             try:
-                sftp = self.ssh.open_sftp()
+                sftp = self.ssh_manager.open_sftp()
                 try:
                     files = sftp.listdir(remote_dir)
                 except IOError as e:
@@ -354,8 +375,59 @@ class StepSixFunctionsMixin:
         threading.Thread(target=_worker, daemon=True).start()
 
 
+    def _result_dirs(self, remote_dir):
+        """结果文件所在的远程目录和本地保存目录（嵌套模式为 fine 子目录）"""
+        grid_type = getattr(self, 'grid_type_var', tr("step2_grid_type_normal", "普通网格"))
+        nested_text = tr("step2_grid_type_nested", "嵌套网格")
+        is_nested = (grid_type == nested_text or grid_type == "嵌套网格")
+        if is_nested:
+            # 嵌套模式：从 fine 目录下载到本地 fine 目录
+            search_dir = os.path.join(remote_dir, "fine").replace("\\", "/")
+            local_download_dir = os.path.join(self.selected_folder, "fine")
+            os.makedirs(local_download_dir, exist_ok=True)
+        else:
+            # 普通模式：主目录
+            search_dir = remote_dir
+            local_download_dir = self.selected_folder
+        return search_dir, local_download_dir
+
+    def _download_tasks(self, tasks):
+        """多通道并行下载：已下载且未变化的文件跳过，未完成的文件续传；返回统计信息"""
+        total_mb = sum(t.size for t in tasks) / 1024 / 1024
+        self.log_signal.emit(tr("sftp_download_start", "开始下载 {count} 个文件 ({mb:.1f} MB)").format(
+            count=len(tasks), mb=total_mb))
+        self.log_signal.emit("")
+        log_lock = threading.Lock()
+
+        def on_progress(done, total, rate):
+            percent = int(done / total * 100) if total else 100
+            with log_lock:
+                self.log_update_last_line_signal.emit(tr(
+                    "sftp_download_progress", "下载 {done:.1f}/{total:.1f} MB ... {percent}% ({rate:.2f} MB/s)").format(
+                    done=done / 1024 / 1024, total=total / 1024 / 1024, percent=percent, rate=rate / 1024 / 1024))
+
+        def on_file(event, task, info):
+            if event == 'done':
+                message = f"✅ 下载完成 {task.name}"
+            elif event == 'skipped':
+                message = tr("sftp_file_unchanged", "⏭️ {file} 未变化，跳过").format(file=task.name)
+            elif isinstance(info, InterruptedError):
+                return
+            else:
+                message = f"❌ 下载 {task.name} 失败: {info}"
+            # 完成信息替换当前进度行，再另起一行继续显示进度
+            with log_lock:
+                self.log_update_last_line_signal.emit(message)
+                self.log_signal.emit("")
+
+        engine = self._create_transfer_engine(on_file=on_file, on_progress=on_progress)
+        stats = engine.download(tasks)
+        self._log_transfer_stats(stats)
+        stats['failed_targets'] = [task.target for task, _ in engine.errors]
+        return stats
+
     def download_remote_nc(self):
-        """从远程目录下载 ww3*.nc 文件到本地选中目录，显示每1%下载进度"""
+        """从远程目录下载 ww3*.nc 文件到本地选中目录，显示汇总下载进度"""
         if not self.selected_folder:
             self.log("❌ 本地未选择有效的目标文件夹。")
             return
@@ -373,20 +445,8 @@ class StepSixFunctionsMixin:
 
         def _run():
             try:
-                sftp = self.ssh.open_sftp()
-
-                # 检查是否是嵌套模式
-                grid_type = getattr(self, 'grid_type_var', tr("step2_grid_type_normal", "普通网格"))
-                nested_text = tr("step2_grid_type_nested", "嵌套网格")
-                is_nested = (grid_type == nested_text or grid_type == "嵌套网格")
-
-                # 根据模式确定要搜索的目录
-                if is_nested:
-                    # 嵌套模式：从 fine 目录下载
-                    search_dir = os.path.join(remote_dir, "fine").replace("\\", "/")
-                else:
-                    # 普通模式：从主目录下载
-                    search_dir = remote_dir
+                sftp = self.ssh_manager.open_sftp()
+                search_dir, local_download_dir = self._result_dirs(remote_dir)
 
                 try:
                     files = sftp.listdir(search_dir)
@@ -402,52 +462,170 @@ class StepSixFunctionsMixin:
                     sftp.close()
                     return
 
-                # 根据模式确定本地保存目录
-                if is_nested:
-                    # 嵌套模式：下载到 fine 目录
-                    local_download_dir = os.path.join(self.selected_folder, "fine")
-                    os.makedirs(local_download_dir, exist_ok=True)
-                else:
-                    # 普通模式：下载到主工作目录
-                    local_download_dir = self.selected_folder
-
-                # 串行下载所有文件（先普通结果文件，再 spec 文件）
+                tasks = []
                 for name in matched:
                     rpath = f"{search_dir.rstrip('/')}/{name}"
-                    lpath = os.path.join(local_download_dir, name)
                     try:
-                        filesize = sftp.stat(rpath).st_size
-                        last_percent = [0]  # 使用列表可在回调中修改
-                        is_first_progress = [True]  # 标记是否是第一次进度更新
-
-                        def progress(transferred, total=filesize):
-                            percent = int(transferred / total * 100)
-                            if percent > last_percent[0]:
-                                last_percent[0] = percent
-                                # 第一次进度更新时，先添加一行
-                                if is_first_progress[0]:
-                                    is_first_progress[0] = False
-                                    self.log_signal.emit(f"开始下载 {name} ({filesize/1024:.1f} KB)")
-                                # 后续更新使用更新最后一行
-                                self.log_update_last_line_signal.emit(f"下载 {name} ... {percent}%")
-
-                        self.log_signal.emit(f"开始下载 {name} ({filesize/1024:.1f} KB)")
-                        sftp.get(rpath, lpath, callback=progress)
-                        # 下载完成后，更新最后一行显示完成信息
-                        self.log_update_last_line_signal.emit(f"✅ 下载完成 {name}")
-                        # 然后添加新行，确保后续日志在新行显示
-                        self.log_signal.emit("")
-
-                    except Exception as e:
+                        attrs = sftp.stat(rpath)
+                    except (IOError, OSError) as e:
                         self.log_signal.emit(f"❌ 下载 {name} 失败: {e}")
-
+                        continue
+                    tasks.append(TransferTask(rpath, os.path.join(local_download_dir, name),
+                                              size=attrs.st_size, mtime=attrs.st_mtime, name=name))
                 sftp.close()
 
+                self._download_tasks(tasks)
+
+            except Exception as e:
+                self.log_signal.emit(f"❌ 下载失败：{e}")
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    def download_remote_subset(self):
+        """在服务器上按变量、时间步长和范围裁剪 ww3*.nc（优先 ncks，否则随附 Python 脚本），只下载裁剪后的文件"""
+        if not self.selected_folder:
+            self.log("❌ 本地未选择有效的目标文件夹。")
+            return
+
+        if not self.ssh:
+            self.log("❌ 请先连接服务器。")
+            return
+
+        remote_dir = self.ssh_dest_edit.text().strip()
+        if not remote_dir:
+            self.log("❌ 请填写服务器路径")
+            return
+
+        try:
+            spec = SubsetSpec.parse(self.subset_vars_edit.text(), self.subset_stride_edit.text(),
+                                    self.subset_bbox_edit.text(), self.subset_compress_check.isChecked())
+        except ValueError:
+            self.log(tr("subset_invalid_params", "❌ 子集参数格式错误：时间步长为正整数，范围为 经度最小,经度最大,纬度最小,纬度最大"))
+            return
+        if spec.is_empty():
+            self.download_remote_nc()
+            return
+
+        os.makedirs(self.selected_folder, exist_ok=True)
+
+        def _run():
+            try:
+                sftp = self.ssh_manager.open_sftp()
+                search_dir, local_download_dir = self._result_dirs(remote_dir)
+                search_dir = search_dir.rstrip('/')
+                try:
+                    files = sftp.listdir(search_dir)
+                except (IOError, OSError) as e:
+                    self.log_signal.emit(f"❌ 无法列出远程目录: {search_dir} -> {e}")
+                    sftp.close()
+                    return
+
+                # 谱文件是站点数据，不按经纬度裁剪
+                matched = sorted(f for f in files if f.startswith("ww3") and f.endswith(".nc")
+                                 and "spec" not in f.lower() and SUBSET_SUFFIX not in f)
+                if not matched:
+                    self.log_signal.emit("⚠️ 远程目录未找到匹配的 ww3*.nc 文件。")
+                    sftp.close()
+                    return
+
+                # 上传子集脚本（ncks 不可用时使用）
+                work_dir = f"{search_dir}/{REMOTE_WORK_DIR}"
+                try:
+                    sftp.mkdir(work_dir)
+                except IOError:
+                    pass
+                script_path = f"{work_dir}/remote_subset.py"
+                outputs = []
+                try:
+                    sftp.put(REMOTE_SUBSET_SCRIPT, script_path)
+
+                    has_ncks = self.ssh_manager.run("command -v ncks", timeout=10).exit_status == 0
+                    self.log_signal.emit(tr("subset_start", "✂️ 在服务器上提取子集（{spec}），工具：{tool}").format(
+                        spec=spec.describe(), tool="ncks" if has_ncks else "python3"))
+
+                    tasks, infos = [], {}
+                    for name in matched:
+                        src = f"{search_dir}/{name}"
+                        out_name = spec.output_name(name)
+                        dst = f"{work_dir}/{out_name}"
+                        outputs.append(dst)
+                        result, tool = None, None
+                        if has_ncks:
+                            result = self.ssh_manager.run(spec.ncks_command(src, dst), timeout=None, label="ncks")
+                            tool = "ncks"
+                        if result is None or result.exit_status != 0:
+                            if result is not None:
+                                self.log_signal.emit(tr("subset_ncks_failed", "⚠️ ncks 处理 {file} 失败，改用 Python 脚本：{error}").format(
+                                    file=name, error=result.stderr.strip() or result.exit_status))
+                            result = self.ssh_manager.run(spec.python_command(script_path, src, dst), timeout=None,
+                                                          label="remote_subset")
+                            tool = "python3"
+                        if result.exit_status != 0:
+                            self.log_signal.emit(tr("subset_failed", "❌ 提取 {file} 子集失败：{error}").format(
+                                file=name, error=result.stderr.strip() or result.exit_status))
+                            continue
+                        attrs = sftp.stat(dst)
+                        source_size = sftp.stat(src).st_size
+                        self.log_signal.emit(tr("subset_file_ready", "✅ {file}：{src_mb:.1f} MB → {dst_mb:.1f} MB").format(
+                            file=out_name, src_mb=source_size / 1024 / 1024, dst_mb=attrs.st_size / 1024 / 1024))
+                        local_path = os.path.join(local_download_dir, out_name)
+                        tasks.append(TransferTask(dst, local_path, size=attrs.st_size, mtime=attrs.st_mtime, name=out_name))
+                        infos[local_path] = (name, tool)
+
+                    stats = self._download_tasks(tasks) if tasks else {}
+                finally:
+                    # 清理服务器上的临时子集文件、子集脚本和工作目录
+                    for path in outputs + [script_path]:
+                        try:
+                            sftp.remove(path)
+                        except IOError:
+                            pass
+                    try:
+                        sftp.rmdir(work_dir)
+                    except IOError:
+                        pass
+                    sftp.close()
+
+                failed = set(stats.get('failed_targets', []))
+                downloaded = []
+                for local_path, (source, tool) in infos.items():
+                    if local_path in failed or not os.path.exists(local_path):
+                        continue
+                    write_subset_info(local_path, spec, source, tool)
+                    downloaded.append(local_path)
+
+                if downloaded:
+                    # 通知绘图页使用下载的子集文件
+                    self._pending_subset_file = downloaded[0]
+                    QtCore.QMetaObject.invokeMethod(self, "_apply_downloaded_subset",
+                                                    QtCore.Qt.ConnectionType.QueuedConnection)
             except Exception as e:
                 self.log_signal.emit(f"❌ 下载失败：{e}")
 
         threading.Thread(target=_run, daemon=True).start()
 
+    @QtCore.pyqtSlot()
+    def _apply_downloaded_subset(self):
+        """绘图页切换到刚下载的子集文件，并说明其中包含的内容"""
+        path = getattr(self, '_pending_subset_file', None)
+        info = read_subset_info(path) if path else None
+        if not info:
+            return
+        missing = missing_plot_variables(info)
+        if missing:
+            # 子集不含波高等绘图变量：不切换，避免绘图时才报错
+            self.log(tr("subset_missing_plot_vars", "⚠️ 子集文件 {file} 不含绘图所需的变量 {vars}，绘图页仍使用原来的文件").format(
+                file=os.path.basename(path), vars=", ".join(missing)))
+            return
+        self.selected_wave_height_file = path
+        if hasattr(self, '_update_wave_height_file_buttons'):
+            self._update_wave_height_file_buttons()
+        if hasattr(self, '_update_jason3_file_buttons'):
+            self._update_jason3_file_buttons()
+        spec = SubsetSpec(info.get('variables'), info.get('time_stride'), info.get('bbox'), info.get('deflate'))
+        self.log(tr("subset_plot_file_selected", "📈 绘图页已切换到子集文件 {file}（{spec}）").format(
+            file=os.path.basename(path), spec=spec.describe()))
+
     def download_remote_log(self):
         """从远程目录下载 success.log 或 fail.log 文件到本地选中目录"""
         if not self.selected_folder:
@@ -467,7 +645,7 @@ class StepSixFunctionsMixin:
 
         def _run():
             try:
-                sftp = self.ssh.open_sftp()
+                sftp = self.ssh_manager.open_sftp()
 
                 # 检查 success.log 和 fail.log 是否存在
                 success_log_path = f"{remote_dir.rstrip('/')}/success.log"
@@ -512,8 +690,12 @@ class StepSixFunctionsMixin:
 
         threading.Thread(target=_run, daemon=True).start()
 
-    def upload_folder(self):
-        """上传整个文件夹到远程服务器"""
+    def upload_folder(self, sync=False):
+        """上传整个文件夹到远程服务器
+
+        sync 为 True 时按上传清单增量同步：只上传新增或修改的文件，
+        配置 SYNC_DELETE_STALE 为 True 时删除本地已删除的已上传文件
+        """
         if not self.selected_folder or not os.path.exists(self.selected_folder):
             self.log(tr("upload_local_folder_invalid", "❌ 未选择有效的本地文件夹！"))
             return
@@ -523,7 +705,7 @@ class StepSixFunctionsMixin:
             remote_folder = None
 
         def _worker():
-            nonlocal remote_folder  # 声明使用外部作用域的变量
+            nonlocal remote_folder, sync  # 声明使用外部作用域的变量
             # 检查连接
             if self.ssh is None or not self._is_ssh_alive(self.ssh):
                 self.log_signal.emit(tr("ssh_reconnect_start", "⚠️ SSH 连接不存在或已断开，正在尝试重新连接..."))
@@ -532,18 +714,7 @@ class StepSixFunctionsMixin:
                         self.log_signal.emit(tr("reconnect_missing_info", "❌ 无法重新连接：缺少连接信息"))
                         return
                     host, port, user, pwd = self._last_conn_args
-                    self.ssh = paramiko.SSHClient()
-                    self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                    self.ssh.connect(
-                        hostname=host,
-                        port=port,
-                        username=user,
-                        password=pwd,
-                        look_for_keys=False,
-                        allow_agent=False,
-                        timeout=15,
-                        banner_timeout=200
-                    )
+                    self.ssh_manager.ensure_connected()
                     self.log_signal.emit(tr("reconnect_success", "✅ 已重新连接服务器 {host}:{port}").format(host=host, port=port))
                 except Exception as e:
                     self.log_signal.emit(tr("reconnect_failed", "❌ 无法重新连接服务器: {error}").format(error=e))
@@ -551,24 +722,16 @@ class StepSixFunctionsMixin:
 
             # 确保 SFTP 可用
             try:
-                sftp = self.ssh.open_sftp()
+                sftp = self.ssh_manager.open_sftp()
             except Exception as e:
                 self.log_signal.emit(tr("sftp_open_failed_retry", "⚠️ 打开 SFTP 通道失败: {error}，尝试重新建立 SSH...").format(error=e))
                 try:
                     if not self._last_conn_args:
                         self.log_signal.emit(tr("reconnect_missing_info", "❌ 无法重新连接：缺少连接信息"))
                         return
-                    host, port, user, pwd = self._last_conn_args
-                    if self.ssh:
-                        try:
-                            self.ssh.close()
-                        except:
-                            pass
-                    self.ssh = paramiko.SSHClient()
-                    self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                    self.ssh.connect(hostname=host, port=port, username=user, password=pwd,
-                                   look_for_keys=False, allow_agent=False, timeout=15, banner_timeout=200)
-                    sftp = self.ssh.open_sftp()
+                    # 关闭失效的连接后由 ssh_manager 重连
+                    self.ssh = None
+                    sftp = self.ssh_manager.open_sftp()
                 except Exception as e2:
                     self.log_signal.emit(tr("sftp_open_failed", "❌ SFTP 通道建立失败: {error}").format(error=e2))
                     return
@@ -611,78 +774,114 @@ class StepSixFunctionsMixin:
                 sftp.close()
                 return
 
-            # 上传整个文件夹
+            # 增量同步：一次列出远程文件，与上传清单比较
+            remote_files, remote_dirs = {}, None
+            manifest = SyncManifest(host, port, username, remote_folder)
+            if sync:
+                try:
+                    remote_files, remote_dirs = list_remote_tree(self.ssh_manager.transport(), sftp, remote_folder)
+                except (paramiko.ssh_exception.SSHException, EOFError):
+                    raise
+                except Exception as e:
+                    self.log_signal.emit(tr("sync_remote_list_failed", "⚠️ 无法列出远程文件，改为完整上传: {error}").format(error=e))
+                    sync = False
+
+            # 创建远程目录并收集上传任务
+            tasks = {}
+            tmp_paths = []
             try:
                 for root_dir, dirs, files in os.walk(self.selected_folder):
                     rel_path = os.path.relpath(root_dir, self.selected_folder)
+                    rel_dir = "" if rel_path == "." else rel_path.replace("\\", "/")
                     remote_path = os.path.join(remote_folder, rel_path).replace("\\", "/")
-                    try:
-                        ensure_remote_dir(sftp, remote_path)
-                    except Exception as e:
-                       
-                        self.log_signal.emit(tr("cannot_create_remote_dir", "⚠️ 无法创建远程目录 {path}: {error}").format(path=remote_path, error=str(e)))
-                        continue
+                    if rel_dir and (remote_dirs is None or rel_dir not in remote_dirs):
+                        try:
+                            ensure_remote_dir(sftp, remote_path)
+                        except Exception as e:
+                           
+                            self.log_signal.emit(tr("cannot_create_remote_dir", "⚠️ 无法创建远程目录 {path}: {error}").format(path=remote_path, error=str(e)))
+                            continue
 
                     for file in files:
                         local_file = os.path.join(root_dir, file)
                         remote_file = os.path.join(remote_path, file).replace("\\", "/")
-                       
+                        rel_file = f"{rel_dir}/{file}" if rel_dir else file
+                        if file.endswith(PART_SUFFIX):
+                            continue
                         try:
+                            source = local_file
                             # 检查是否是 server.sh 或 ww3.slurm，如果是则移除 \r
                             if file in ("server.sh", "ww3.slurm"):
-                                # 读取文件内容
                                 with open(local_file, 'rb') as f:
                                     content = f.read()
-                                # 检查是否包含 \r
                                 if b'\r' in content:
-                                    # 移除所有 \r
-                                    content = content.replace(b'\r', b'')
-                                    # 创建临时文件
+                                    # 上传清理后的临时文件，远程修改时间仍取原文件的，下次未修改时可跳过
                                     import tempfile
                                     with tempfile.NamedTemporaryFile(mode='wb', delete=False) as tmp_file:
-                                        tmp_file.write(content)
-                                        tmp_path = tmp_file.name
-                                    try:
-                                        # 上传清理后的文件
-                                        sftp.put(tmp_path, remote_file)
-                                    finally:
-                                        # 删除临时文件
-                                        try:
-                                            os.unlink(tmp_path)
-                                        except:
-                                            pass
-                                else:
-                                    # 没有 \r，直接上传
-                                    sftp.put(local_file, remote_file)
-                            else:
-                                # 其他文件直接上传
-                                sftp.put(local_file, remote_file)
-                            # 上传成功后显示日志
-                            self.log_signal.emit(tr("upload_file_success", "上传 {file} 文件成功").format(file=file))
-                        except (IOError, paramiko.ssh_exception.SSHException, EOFError, OSError) as e:
-                           
+                                        tmp_file.write(content.replace(b'\r', b''))
+                                        source = tmp_file.name
+                                    tmp_paths.append(source)
+                            tasks[rel_file] = TransferTask(source, remote_file, size=os.path.getsize(source),
+                                                           mtime=os.path.getmtime(local_file), name=file)
+                        except OSError as e:
                             self.log_signal.emit(tr("cannot_upload_file", "⚠️ 无法上传 {file}: {error}").format(file=file, error=str(e)))
-                            # 检查连接是否断开
-                            if isinstance(e, (paramiko.ssh_exception.SSHException, EOFError)):
-                                self.log_signal.emit(tr("upload_connection_lost_interrupted", "⚠️ 服务器连接已断开，上传中断"))
-                                try:
-                                    sftp.close()
-                                except:
-                                    pass
-                                # 关闭SSH连接
-                                if hasattr(self, 'ssh') and self.ssh:
-                                    try:
-                                        self.ssh.close()
-                                    except:
-                                        pass
-                                    self.ssh = None
-                                # 更新连接状态
-                               
-                                self.status_signal.emit(tr("not_connected_disconnected", "未连接(连接断开)"))
-                                return
-                            continue
+
+                if sync:
+                    plan = plan_sync(tasks, manifest, remote_files)
+                    self.log_signal.emit(tr("sync_plan_summary",
+                                            "🔍 增量同步：{upload} 个文件需要上传，{unchanged} 个未变化，{stale} 个已在本地删除").format(
+                        upload=len(plan.upload), unchanged=len(plan.unchanged) + len(plan.touch), stale=len(plan.stale)))
+                    # 内容未变、只是修改时间变化的文件：只更新远程修改时间
+                    for rel_file in plan.touch:
+                        task = tasks[rel_file]
+                        sftp.utime(task.target, (time.time(), task.mtime))
+                    if plan.stale and load_config().get("SYNC_DELETE_STALE", False):
+                        for rel_file in plan.stale:
+                            try:
+                                sftp.remove(f"{remote_folder.rstrip('/')}/{rel_file}")
+                                manifest.forget(rel_file)
+                                self.log_signal.emit(tr("sync_remote_deleted", "🗑️ 已删除远程文件 {file}").format(file=rel_file))
+                            except IOError as e:
+                                self.log_signal.emit(tr("sync_remote_delete_failed", "⚠️ 无法删除远程文件 {file}: {error}").format(file=rel_file, error=e))
+                    to_upload = plan.upload
+                    hashes = plan.hashes
+                else:
+                    to_upload = list(tasks)
+                    hashes = {}
 
                 sftp.close()
+
+                # 多通道并行上传（跳过未变化文件，续传未完成文件）
+                def on_file(event, task, info):
+                    if event == 'done':
+                        self.log_signal.emit(tr("upload_file_success", "上传 {file} 文件成功").format(file=task.name))
+                    elif event == 'failed' and not isinstance(info, InterruptedError):
+                        self.log_signal.emit(tr("cannot_upload_file", "⚠️ 无法上传 {file}: {error}").format(file=task.name, error=str(info)))
+
+                engine = self._create_transfer_engine(on_file=on_file)
+                try:
+                    stats = engine.upload([tasks[rel_file] for rel_file in to_upload])
+                    # 记录本次上传后的远程状态，供下次增量同步比较
+                    failed = {id(task) for task, _ in engine.errors}
+                    for rel_file, task in tasks.items():
+                        if id(task) in failed:
+                            manifest.forget(rel_file)
+                        elif sync:
+                            # 哈希未知时记为 None，下次同步时由 plan_sync 按需计算，不在上传后重读文件
+                            manifest.record(rel_file, task.size, task.mtime, hashes.get(rel_file))
+                        else:
+                            known = manifest.files.get(rel_file, {})
+                            same = known.get('size') == task.size and same_mtime(known.get('mtime'), task.mtime)
+                            manifest.record(rel_file, task.size, task.mtime, known.get('sha256') if same else None)
+                    manifest.save()
+                finally:
+                    for tmp_path in tmp_paths:
+                        try:
+                            os.unlink(tmp_path)
+                        except OSError:
+                            pass
+                if stats['files']:
+                    self._log_transfer_stats(stats)
                
                 self.log_signal.emit(tr("upload_folder_complete", "✅ 文件夹上传完成: {path}").format(path=remote_folder))
             except (paramiko.ssh_exception.SSHException, EOFError, OSError) as e:
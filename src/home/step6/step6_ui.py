@@ -4,7 +4,7 @@
 """
 import os
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel
-from qfluentwidgets import PrimaryPushButton, LineEdit
+from qfluentwidgets import PrimaryPushButton, LineEdit, CheckBox
 from setting.language_manager import tr
 from setting.config import SERVER_PATH
 from .step6_service import StepSixFunctionsMixin
@@ -67,6 +67,13 @@ class HomeStepSixCard(StepSixFunctionsMixin):
         self.upload_button.clicked.connect(lambda: self.upload_folder())
         step6_card_layout.addWidget(self.upload_button)
 
+        # 增量同步按钮：只上传新增或修改的文件
+        self.sync_button = PrimaryPushButton(tr("step7_sync", "同步修改到服务器（增量上传）"))
+        self.sync_button.setStyleSheet(button_style)
+        self.sync_button.setEnabled(False)  # 默认禁用，连接后启用
+        self.sync_button.clicked.connect(lambda: self.upload_folder(sync=True))
+        step6_card_layout.addWidget(self.sync_button)
+
         # 提交计算任务按钮
         self.exec_button = PrimaryPushButton(tr("step7_submit", "提交计算任务"))
         self.exec_button.setStyleSheet(button_style)
@@ -95,6 +102,45 @@ class HomeStepSixCard(StepSixFunctionsMixin):
         self.download_button.clicked.connect(lambda: self.download_remote_nc())
         step6_card_layout.addWidget(self.download_button)
 
+        # 结果子集参数：变量、时间步长、经纬度范围、压缩
+        subset_frame = QWidget()
+        subset_layout = QHBoxLayout(subset_frame)
+        subset_layout.setContentsMargins(0, 0, 0, 0)
+        subset_layout.setSpacing(5)
+        subset_layout.addWidget(QLabel(tr("step7_subset_vars", "变量:")))
+        self.subset_vars_edit = LineEdit()
+        self.subset_vars_edit.setText("hs")
+        self.subset_vars_edit.setStyleSheet(input_style)
+        subset_layout.addWidget(self.subset_vars_edit)
+        subset_layout.addWidget(QLabel(tr("step7_subset_stride", "时间步长:")))
+        self.subset_stride_edit = LineEdit()
+        self.subset_stride_edit.setText("1")
+        self.subset_stride_edit.setFixedWidth(50)
+        self.subset_stride_edit.setStyleSheet(input_style)
+        subset_layout.addWidget(self.subset_stride_edit)
+        step6_card_layout.addWidget(subset_frame)
+
+        subset_bbox_frame = QWidget()
+        subset_bbox_layout = QHBoxLayout(subset_bbox_frame)
+        subset_bbox_layout.setContentsMargins(0, 0, 0, 0)
+        subset_bbox_layout.setSpacing(5)
+        subset_bbox_layout.addWidget(QLabel(tr("step7_subset_bbox", "范围:")))
+        self.subset_bbox_edit = LineEdit()
+        self.subset_bbox_edit.setPlaceholderText(tr("step7_subset_bbox_placeholder", "经度最小,经度最大,纬度最小,纬度最大（留空为全部）"))
+        self.subset_bbox_edit.setStyleSheet(input_style)
+        subset_bbox_layout.addWidget(self.subset_bbox_edit)
+        self.subset_compress_check = CheckBox(tr("step7_subset_compress", "压缩"))
+        self.subset_compress_check.setChecked(True)
+        subset_bbox_layout.addWidget(self.subset_compress_check)
+        step6_card_layout.addWidget(subset_bbox_frame)
+
+        # 下载结果子集按钮（服务器端裁剪后再下载）
+        self.download_subset_button = PrimaryPushButton(tr("step7_download_subset", "提取子集并下载"))
+        self.download_subset_button.setStyleSheet(button_style)
+        self.download_subset_button.setEnabled(False)  # 默认禁用，连接后启用
+        self.download_subset_button.clicked.connect(lambda: self.download_remote_subset())
+        step6_card_layout.addWidget(self.download_subset_button)
+
         # 下载 log 文件按钮（单独一行）
         self.download_log_button = PrimaryPushButton(tr("step7_download_log", "下载 log 文件"))
         self.download_log_button.setStyleSheet(button_style)
@@ -102,6 +148,12 @@ class HomeStepSixCard(StepSixFunctionsMixin):
         self.download_log_button.clicked.connect(lambda: self.download_remote_log())
         step6_card_layout.addWidget(self.download_log_button)
 
+        # SSH 连接统计按钮（单独一行）
+        self.ssh_metrics_button = PrimaryPushButton(tr("step7_ssh_metrics", "查看连接统计"))
+        self.ssh_metrics_button.setStyleSheet(button_style)
+        self.ssh_metrics_button.clicked.connect(lambda: self.show_ssh_metrics())
+        step6_card_layout.addWidget(self.ssh_metrics_button)
+
         # 设置内容区内边距
         step6_card.viewLayout.setContentsMargins(11, 10, 11, 12)
         step6_card.viewLayout.addLayout(step6_card_layout)
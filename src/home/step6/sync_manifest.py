@@ -0,0 +1,150 @@
+"""
+第六步：工作目录增量同步
+本地清单记录每个远程路径上次上传的文件（大小、修改时间、sha256），
+与一次远程 find 列表比较，只上传新增或修改的文件，可选删除本地已不存在的已上传文件
+"""
+import os
+import json
+import stat
+import hashlib
+import posixpath
+
+from setting.config import PUBLIC_DIR
+from .sftp_transfer import local_sha256, same_mtime, shell_quote
+
+
+# 同步清单目录
+MANIFEST_DIR = os.path.join(PUBLIC_DIR, "cache", "sync_manifest")
+
+MANIFEST_VERSION = 1
+
+
+class SyncManifest:
+    """某个服务器路径的上传清单：{相对路径: {size, mtime, sha256}}"""
+
+    def __init__(self, host, port, user, remote_root):
+        self.remote_root = remote_root.rstrip('/') or '/'
+        key = json.dumps([host, str(port), user, self.remote_root], separators=(',', ':'))
+        self.path = os.path.join(MANIFEST_DIR, hashlib.sha256(key.encode('utf-8')).hexdigest()[:32] + ".json")
+        self.files = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION and data.get('remote_root') == self.remote_root:
+                self.files = data.get('files', {})
+        except (OSError, ValueError):
+            self.files = {}
+
+    def save(self):
+        os.makedirs(MANIFEST_DIR, exist_ok=True)
+        data = {'version': MANIFEST_VERSION, 'remote_root': self.remote_root, 'files': self.files}
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def record(self, rel_path, size, mtime, sha256):
+        self.files[rel_path] = {'size': size, 'mtime': int(mtime), 'sha256': sha256}
+
+    def forget(self, rel_path):
+        self.files.pop(rel_path, None)
+
+
+def list_remote_tree(transport, sftp, remote_root):
+    """远程目录下所有文件和目录：返回 (files {相对路径: (size, mtime)}, dirs set)
+
+    优先在服务器上执行一次 find（GNU find -printf），不可用时退回 SFTP 逐目录列出。
+    远程目录不存在时返回空结果。
+    """
+    files, dirs = {}, set()
+    channel = transport.open_session(timeout=30)
+    try:
+        channel.exec_command(f"find {shell_quote(remote_root)} -mindepth 1 -printf '%y %s %T@ %P\\0'")
+        output = bytearray()
+        while True:
+            data = channel.recv(65536)
+            if not data:
+                break
+            output += data
+        exit_status = channel.recv_exit_status()
+    finally:
+        channel.close()
+
+    if exit_status == 0:
+        for record in bytes(output).split(b'\0'):
+            if not record:
+                continue
+            kind, size, mtime, rel_path = record.decode('utf-8', errors='surrogateescape').split(' ', 3)
+            if kind == 'd':
+                dirs.add(rel_path)
+            elif kind == 'f':
+                files[rel_path] = (int(size), float(mtime))
+        return files, dirs
+
+    # find 不可用（或目录不存在）：用 SFTP 遍历
+    try:
+        sftp.stat(remote_root)
+    except IOError:
+        return files, dirs
+    stack = ['']
+    while stack:
+        rel_dir = stack.pop()
+        for attrs in sftp.listdir_attr(posixpath.join(remote_root, rel_dir) if rel_dir else remote_root):
+            rel_path = posixpath.join(rel_dir, attrs.filename) if rel_dir else attrs.filename
+            if stat.S_ISDIR(attrs.st_mode or 0):
+                dirs.add(rel_path)
+                stack.append(rel_path)
+            elif stat.S_ISREG(attrs.st_mode or 0):
+                files[rel_path] = (attrs.st_size, attrs.st_mtime)
+    return files, dirs
+
+
+class SyncPlan:
+    """一次同步的比较结果（均为相对路径）"""
+
+    def __init__(self):
+        self.upload = []      # 新增或修改，需要上传
+        self.touch = []       # 内容与上次上传相同，只更新远程修改时间
+        self.unchanged = []   # 无需处理
+        self.stale = []       # 上次上传过、本地已删除、远程仍存在
+        self.hashes = {}      # 本次计算或沿用的本地 sha256
+
+
+def plan_sync(local_tasks, manifest, remote_files):
+    """比较本地文件、上传清单和远程列表
+
+    local_tasks: {相对路径: TransferTask}（size/mtime 已填写，source 为实际上传的本地文件）
+    """
+    plan = SyncPlan()
+    for rel_path, task in local_tasks.items():
+        entry = manifest.files.get(rel_path)
+        remote = remote_files.get(rel_path)
+        if entry and entry.get('size') == task.size and same_mtime(entry.get('mtime'), task.mtime):
+            plan.hashes[rel_path] = entry.get('sha256')
+
+        if remote is None or remote[0] != task.size:
+            plan.upload.append(rel_path)
+        elif same_mtime(remote[1], task.mtime):
+            plan.unchanged.append(rel_path)
+            if rel_path in plan.hashes and plan.hashes[rel_path] is None:
+                # 上传后未记录哈希：本地仍是上传的版本，此时补算，供以后只改了修改时间时比较
+                plan.hashes[rel_path] = local_sha256(task.source)
+        elif (entry and entry.get('sha256') and entry.get('size') == remote[0]
+              and same_mtime(entry.get('mtime'), remote[1])):
+            # 远程仍是上次上传的版本，本地只是修改时间变了：内容相同则不重传
+            digest = local_sha256(task.source)
+            plan.hashes[rel_path] = digest
+            if digest == entry['sha256']:
+                plan.touch.append(rel_path)
+            else:
+                plan.upload.append(rel_path)
+        else:
+            plan.upload.append(rel_path)
+
+    for rel_path in manifest.files:
+        if rel_path not in local_tasks and rel_path in remote_files:
+            plan.stale.append(rel_path)
+    return plan
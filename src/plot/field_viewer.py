@@ -0,0 +1,578 @@
+"""
+波高场交互式查看模块
+按时间步懒加载 ww3.*.nc，按需构建多分辨率金字塔，只渲染可见瓦片（LRU 缓存）
+读取时间步和渲染瓦片在后台线程进行，界面线程只绘制已缓存的瓦片
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import netCDF4 as nc
+from netCDF4 import num2date
+from datetime import datetime, timedelta
+from matplotlib import cm
+
+from PyQt6 import QtWidgets, QtCore, QtGui
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QVBoxLayout, QHBoxLayout, QLabel, QSlider
+from qfluentwidgets import ComboBox
+
+from setting.language_manager import tr
+
+
+# 瓦片边长（网格单元数）
+TILE_SIZE = 256
+
+# 可交互查看的波高变量及其说明
+FIELD_VARIABLES = {
+    'hs': 'Total Hs (m)',
+    'phs0': 'Wind Sea Hs (m)',
+    'phs1': 'Swell Hs (m)',
+}
+
+
+def _downsample_nanmean(field):
+    """2x2 块平均降采样（忽略 NaN，奇数边补 NaN）"""
+    h, w = field.shape
+    pad_h, pad_w = h % 2, w % 2
+    if pad_h or pad_w:
+        field = np.pad(field, ((0, pad_h), (0, pad_w)), constant_values=np.nan)
+    blocks = field.reshape(field.shape[0] // 2, 2, field.shape[1] // 2, 2)
+    valid = np.isfinite(blocks)
+    total = np.where(valid, blocks, 0.0).sum(axis=(1, 3))
+    count = valid.sum(axis=(1, 3))
+    out = np.full(total.shape, np.nan, dtype=np.float32)
+    np.divide(total, count, out=out, where=count > 0)
+    return out
+
+
+class _LRUCache:
+    """线程安全的 LRU 缓存"""
+
+    def __init__(self, max_items):
+        self.max_items = max(1, int(max_items))
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class WaveFieldTileSource:
+    """波高场瓦片数据源
+
+    只在需要时读取单个时间步，按需逐级构建 2x2 平均的多分辨率金字塔，
+    瓦片按 (时间步, 层级, 列, 行) 缓存为 RGBA 数组。
+    层级 0 为原始分辨率，行 0 对应最北端。
+
+    读取和渲染（level / tile / estimate_vmax）由 _TileLoader 的后台线程调用，
+    界面线程只通过 cached_tile / value_at 读取缓存，不会等待文件读取。
+    """
+
+    def __init__(self, nc_file, var_name='hs', clim_pct=99.0, max_tiles=512, max_frames=4):
+        self.nc_file = nc_file
+        self.var_name = var_name
+        self._io_lock = threading.Lock()
+        self.ds = nc.Dataset(nc_file)
+        try:
+            self._open_variable(var_name)
+        except Exception:
+            self.ds.close()
+            raise
+
+        self._frames = _LRUCache(max_frames)
+        self._tiles = _LRUCache(max_tiles)
+        self._lut = (cm.turbo(np.linspace(0.0, 1.0, 256)) * 255).astype(np.uint8)
+
+        self.clim_pct = clim_pct
+        self.vmin = 0.0
+        # 颜色上限由后台线程估计（estimate_vmax），估计完成前不渲染瓦片
+        self.vmax = None
+
+    def _open_variable(self, var_name):
+        """解析经纬度、时间和变量的维度顺序（只读元数据）"""
+        if var_name not in self.ds.variables:
+            available = ', '.join(self.ds.variables.keys())
+            raise KeyError(tr("plotting_viewer_missing_variable", "文件中没有 '{var}' 变量。可用变量: {vars}").format(var=var_name, vars=available))
+
+        lon = np.array(self.ds.variables['longitude'][:], dtype=float)
+        lat = np.array(self.ds.variables['latitude'][:], dtype=float)
+        if lon.ndim != 1 or lat.ndim != 1:
+            raise ValueError(tr("plotting_viewer_regular_grid_only", "交互式查看仅支持规则经纬度网格"))
+
+        time_var = self.ds.variables['time']
+        try:
+            times = num2date(time_var[:], time_var.units)
+            self.times = [datetime(t.year, t.month, t.day, t.hour, t.minute, t.second) for t in times]
+        except Exception:
+            ref = datetime(1990, 1, 1)
+            self.times = [ref + timedelta(days=float(t)) for t in time_var[:]]
+
+        var = self.ds.variables[var_name]
+        var.set_auto_mask(False)
+        dims = list(var.dimensions)
+        sizes = list(var.shape)
+        if len(dims) != 3:
+            raise ValueError(tr("plotting_viewer_regular_grid_only", "交互式查看仅支持规则经纬度网格"))
+
+        # 优先按维度名匹配，否则按长度匹配
+        time_dim = time_var.dimensions[0] if time_var.dimensions else None
+        self._time_axis = dims.index(time_dim) if time_dim in dims else sizes.index(len(self.times))
+        rest = [i for i in range(3) if i != self._time_axis]
+        if sizes[rest[0]] == len(lat) and sizes[rest[1]] == len(lon):
+            self._lat_axis, self._lon_axis = rest
+        else:
+            self._lon_axis, self._lat_axis = rest
+
+        self.var = var
+        self.fill_value = getattr(var, '_FillValue', None)
+        self.lon = lon
+        self.lat = lat
+        # 行 0 为最北端
+        self.flip_lat = lat[0] < lat[-1]
+        self.height, self.width = len(lat), len(lon)
+
+        # 金字塔层数：最粗一级不超过一个瓦片
+        self.n_levels = 1
+        h, w = self.height, self.width
+        while max(h, w) > TILE_SIZE:
+            h, w = (h + 1) // 2, (w + 1) // 2
+            self.n_levels += 1
+
+    def close(self):
+        """关闭文件并清空缓存"""
+        self._frames.clear()
+        self._tiles.clear()
+        with self._io_lock:
+            try:
+                self.ds.close()
+            except Exception:
+                pass
+
+    @property
+    def n_times(self):
+        return len(self.times)
+
+    def read_frame(self, itime):
+        """读取单个时间步，返回 (lat, lon) 的 float32 数组，无效值为 NaN"""
+        index = [slice(None)] * 3
+        index[self._time_axis] = int(itime)
+        with self._io_lock:
+            raw = np.asarray(self.var[tuple(index)])
+        if self._lat_axis > self._lon_axis:
+            raw = raw.T
+        frame = raw.astype(np.float32)
+        invalid = ~np.isfinite(frame) | (frame > 1e10)
+        if self.fill_value is not None:
+            invalid |= frame == np.float32(self.fill_value)
+        frame[invalid] = np.nan
+        if self.flip_lat:
+            frame = frame[::-1, :]
+        return np.ascontiguousarray(frame)
+
+    def level(self, itime, level):
+        """返回时间步 itime 在给定层级的数组（按需逐级构建并缓存）"""
+        pyramid = self._frames.get(itime)
+        if pyramid is None:
+            pyramid = [self.read_frame(itime)]
+            self._frames.put(itime, pyramid)
+        while len(pyramid) <= level:
+            pyramid.append(_downsample_nanmean(pyramid[-1]))
+        return pyramid[level]
+
+    def level_shape(self, level):
+        """层级的 (高, 宽)"""
+        h, w = self.height, self.width
+        for _ in range(level):
+            h, w = (h + 1) // 2, (w + 1) // 2
+        return h, w
+
+    def estimate_vmax(self, max_samples=8):
+        """用少量时间步的粗层级估计颜色上限（百分位），结果保存在 vmax"""
+        if self.vmax is None:
+            self.vmax = self._estimate_vmax(self.clim_pct, max_samples)
+        return self.vmax
+
+    def _estimate_vmax(self, clim_pct, max_samples):
+        if self.n_times == 0:
+            return 1.0
+        sample_ids = np.unique(np.linspace(0, self.n_times - 1, min(max_samples, self.n_times)).astype(int))
+        coarse = min(self.n_levels - 1, 2)
+        values = []
+        for itime in sample_ids:
+            data = self.level(int(itime), coarse)
+            values.append(data[np.isfinite(data)])
+        values = np.concatenate(values) if values else np.array([])
+        if values.size == 0:
+            return 1.0
+        vmax = float(np.percentile(values, clim_pct))
+        return vmax if vmax > 0 else 1.0
+
+    def cached_tile(self, itime, level, tx, ty):
+        """已渲染的瓦片，尚未渲染时返回 None（不读取文件）"""
+        return self._tiles.get((itime, level, tx, ty))
+
+    def tile(self, itime, level, tx, ty):
+        """返回瓦片的 RGBA 数组 (h, w, 4)，NaN 为透明；超出范围返回 None"""
+        key = (itime, level, tx, ty)
+        cached = self._tiles.get(key)
+        if cached is not None:
+            return cached
+
+        self.estimate_vmax()
+        data = self.level(itime, level)
+        y0, x0 = ty * TILE_SIZE, tx * TILE_SIZE
+        block = data[y0:y0 + TILE_SIZE, x0:x0 + TILE_SIZE]
+        if block.size == 0:
+            return None
+
+        scale = 255.0 / max(self.vmax - self.vmin, 1e-12)
+        valid = np.isfinite(block)
+        idx = np.clip((np.where(valid, block, self.vmin) - self.vmin) * scale, 0, 255).astype(np.uint8)
+        rgba = self._lut[idx]
+        rgba[..., 3] = np.where(valid, 255, 0)
+        rgba = np.ascontiguousarray(rgba)
+        self._tiles.put(key, rgba)
+        return rgba
+
+    def value_at(self, itime, row, col):
+        """层级 0 上 (行, 列) 的经纬度与数值；时间步尚未读取时数值为 None"""
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            return None
+        pyramid = self._frames.get(itime)
+        value = float(pyramid[0][row, col]) if pyramid is not None else None
+        lat_idx = self.height - 1 - row if self.flip_lat else row
+        return float(self.lon[col]), float(self.lat[lat_idx]), value
+
+
+class _TileLoader(QtCore.QObject):
+    """后台线程：估计颜色范围、读取时间步并渲染瓦片，完成后通知界面重绘
+
+    只保留最近一次请求的瓦片（平移、缩放或切换时间步后旧请求不再需要）。
+    """
+
+    tiles_ready = QtCore.pyqtSignal()
+    clim_ready = QtCore.pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cond = threading.Condition()
+        self._source = None
+        self._pending = []
+        self._stopped = False
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def request(self, source, keys):
+        """替换待渲染的瓦片列表 [(时间步, 层级, 列, 行), ...]"""
+        with self._cond:
+            self._source = source
+            self._pending = list(keys)
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._source = None
+            self._pending = []
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and (self._source is None or
+                                             (not self._pending and self._source.vmax is not None)):
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                source = self._source
+                key = self._pending.pop(0) if self._pending else None
+            try:
+                if source.vmax is None:
+                    source.estimate_vmax()
+                    self.clim_ready.emit(source)
+                if key is not None:
+                    source.tile(*key)
+                    self.tiles_ready.emit()
+            except Exception:
+                # 文件已关闭（切换变量或关闭窗口）或读取失败：跳过该瓦片，
+                # 颜色范围无法估计时放弃该数据源，直到下次请求
+                if source.vmax is None:
+                    with self._cond:
+                        if self._source is source:
+                            self._source = None
+
+
+class WaveFieldCanvas(QtWidgets.QWidget):
+    """瓦片地图画布：滚轮缩放、拖拽平移，只绘制可见瓦片"""
+
+    hover_changed = QtCore.pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.source = None
+        self.itime = 0
+        self.scale = 1.0  # 屏幕像素 / 层级 0 网格单元
+        self.offset = QtCore.QPointF(0, 0)  # 层级 0 网格 (0, 0) 左上角的屏幕位置
+        self._drag_pos = None
+        self.loader = _TileLoader(self)
+        self.loader.tiles_ready.connect(self.update)
+        self.setMouseTracking(True)
+        self.setMinimumSize(400, 300)
+        self.setSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Expanding)
+
+    def set_source(self, source):
+        self.source = source
+        self.itime = 0
+        self.loader.request(source, [])
+        self.fit_to_view()
+
+    def set_time_index(self, itime):
+        self.itime = int(itime)
+        self.update()
+
+    def fit_to_view(self):
+        """缩放到显示整个网格"""
+        if self.source is None:
+            return
+        w, h = max(self.width(), 1), max(self.height(), 1)
+        self.scale = min(w / self.source.width, h / self.source.height)
+        self.offset = QtCore.QPointF((w - self.source.width * self.scale) / 2.0,
+                                     (h - self.source.height * self.scale) / 2.0)
+        self.update()
+
+    def _current_level(self):
+        """选择屏幕上一个层级单元约占 1 个像素的层级"""
+        if self.scale >= 1.0:
+            return 0
+        level = int(math.floor(math.log2(1.0 / self.scale)))
+        return max(0, min(level, self.source.n_levels - 1))
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtGui.QColor("#e6e6e6"))
+        if self.source is None or self.source.n_times == 0:
+            painter.end()
+            return
+
+        level = self._current_level()
+        cells = 2 ** level  # 一个层级单元对应的层级 0 单元数
+        tile_px = TILE_SIZE * cells * self.scale
+        level_h, level_w = self.source.level_shape(level)
+        n_tx = (level_w + TILE_SIZE - 1) // TILE_SIZE
+        n_ty = (level_h + TILE_SIZE - 1) // TILE_SIZE
+
+        # 可见瓦片范围
+        tx0 = max(0, int(math.floor(-self.offset.x() / tile_px)))
+        ty0 = max(0, int(math.floor(-self.offset.y() / tile_px)))
+        tx1 = min(n_tx - 1, int(math.floor((self.width() - self.offset.x()) / tile_px)))
+        ty1 = min(n_ty - 1, int(math.floor((self.height() - self.offset.y()) / tile_px)))
+
+        # 放大时保持网格单元边界清晰
+        painter.setRenderHint(QtGui.QPainter.RenderHint.SmoothPixmapTransform, level > 0)
+        cell_px = cells * self.scale
+        missing = []
+        for ty in range(ty0, ty1 + 1):
+            for tx in range(tx0, tx1 + 1):
+                rgba = self.source.cached_tile(self.itime, level, tx, ty)
+                th = min(TILE_SIZE, level_h - ty * TILE_SIZE)
+                tw = min(TILE_SIZE, level_w - tx * TILE_SIZE)
+                target = QtCore.QRectF(self.offset.x() + tx * tile_px,
+                                       self.offset.y() + ty * tile_px,
+                                       tw * cell_px, th * cell_px)
+                if rgba is not None:
+                    painter.drawImage(target, self._to_image(rgba))
+                    continue
+                # 尚未渲染：先画已缓存的较粗层级，没有则画占位色，瓦片就绪后重绘
+                missing.append((self.itime, level, tx, ty))
+                if not self._draw_coarser(painter, target, level, tx, ty, tw, th):
+                    painter.fillRect(target, QtGui.QColor("#d0d0d0"))
+        painter.end()
+        self.loader.request(self.source, missing)
+
+    @staticmethod
+    def _to_image(rgba):
+        th, tw = rgba.shape[:2]
+        return QtGui.QImage(rgba.data, tw, th, tw * 4, QtGui.QImage.Format.Format_RGBA8888)
+
+    def _draw_coarser(self, painter, target, level, tx, ty, tw, th):
+        """用已缓存的较粗层级瓦片中对应的部分代替 (level, tx, ty) 瓦片"""
+        for coarse in range(level + 1, self.source.n_levels):
+            k = 2 ** (coarse - level)
+            ctx, cty = tx // k, ty // k
+            rgba = self.source.cached_tile(self.itime, coarse, ctx, cty)
+            if rgba is None:
+                continue
+            # 较粗层级的一个单元对应本层级 k x k 个单元
+            source_rect = QtCore.QRectF(tx * TILE_SIZE / k - ctx * TILE_SIZE,
+                                        ty * TILE_SIZE / k - cty * TILE_SIZE,
+                                        tw / k, th / k)
+            painter.drawImage(target, self._to_image(rgba), source_rect)
+            return True
+        return False
+
+    def wheelEvent(self, event):
+        if self.source is None:
+            return
+        factor = 1.25 ** (event.angleDelta().y() / 120.0)
+        max_scale = 64.0
+        min_scale = 0.5 * min(self.width() / self.source.width, self.height() / self.source.height)
+        new_scale = min(max(self.scale * factor, min_scale), max_scale)
+        # 以鼠标位置为中心缩放
+        pos = event.position()
+        ratio = new_scale / self.scale
+        self.offset = QtCore.QPointF(pos.x() - (pos.x() - self.offset.x()) * ratio,
+                                     pos.y() - (pos.y() - self.offset.y()) * ratio)
+        self.scale = new_scale
+        self.update()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._drag_pos = event.position()
+
+    def mouseReleaseEvent(self, event):
+        self._drag_pos = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.fit_to_view()
+
+    def mouseMoveEvent(self, event):
+        pos = event.position()
+        if self._drag_pos is not None:
+            self.offset += pos - self._drag_pos
+            self._drag_pos = pos
+            self.update()
+        if self.source is None:
+            return
+        col = int(math.floor((pos.x() - self.offset.x()) / self.scale))
+        row = int(math.floor((pos.y() - self.offset.y()) / self.scale))
+        info = self.source.value_at(self.itime, row, col)
+        if info is None:
+            self.hover_changed.emit("")
+            return
+        lon, lat, value = info
+        if value is None:
+            value_text = "..."
+        else:
+            value_text = f"{value:.3f}" if np.isfinite(value) else "NaN"
+        self.hover_changed.emit(f"Lon: {lon:.3f}°, Lat: {lat:.3f}°, {self.source.var_name}: {value_text}")
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.source is not None and event.oldSize().width() <= 0:
+            self.fit_to_view()
+
+
+class WaveFieldViewerDialog(QtWidgets.QDialog):
+    """波高场交互式查看窗口：时间滑块 + 瓦片地图"""
+
+    def __init__(self, nc_file, parent=None, var_name=None, clim_pct=99.0):
+        super().__init__(parent)
+        self.nc_file = nc_file
+        self.clim_pct = clim_pct
+        self.source = None
+        self.setWindowTitle(tr("plotting_viewer_title", "波高场交互式查看"))
+        self.resize(1100, 820)
+
+        with nc.Dataset(nc_file) as ds:
+            self.available_vars = [name for name in FIELD_VARIABLES if name in ds.variables]
+        if not self.available_vars:
+            raise KeyError(tr("plotting_viewer_no_field", "文件中没有可查看的波高变量（hs/phs0/phs1）"))
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(6)
+
+        top_row = QHBoxLayout()
+        self.var_combo = ComboBox()
+        self.var_combo.addItems(self.available_vars)
+        top_row.addWidget(self.var_combo)
+        self.time_label = QLabel("")
+        top_row.addWidget(self.time_label, 1)
+        self.clim_label = QLabel("")
+        top_row.addWidget(self.clim_label)
+        layout.addLayout(top_row)
+
+        self.canvas = WaveFieldCanvas(self)
+        layout.addWidget(self.canvas, 1)
+
+        self.time_slider = QSlider(Qt.Orientation.Horizontal)
+        self.time_slider.setMinimum(0)
+        layout.addWidget(self.time_slider)
+
+        self.hover_label = QLabel(tr("plotting_viewer_hint", "滚轮缩放，拖拽平移，双击复位"))
+        layout.addWidget(self.hover_label)
+
+        # 拖动时间滑块时合并连续变化，只加载停留的时间步
+        self._time_timer = QtCore.QTimer(self)
+        self._time_timer.setSingleShot(True)
+        self._time_timer.setInterval(60)
+        self._time_timer.timeout.connect(self._apply_time_index)
+        self.time_slider.valueChanged.connect(self._on_slider_changed)
+        self.canvas.hover_changed.connect(self._on_hover_changed)
+        self.canvas.loader.clim_ready.connect(self._on_clim_ready)
+        self.var_combo.currentTextChanged.connect(self._load_variable)
+
+        if var_name in self.available_vars:
+            self.var_combo.setCurrentText(var_name)
+        self._load_variable(self.var_combo.currentText())
+
+    def _load_variable(self, var_name):
+        if not var_name:
+            return
+        if self.source is not None:
+            self.source.close()
+        self.source = WaveFieldTileSource(self.nc_file, var_name, clim_pct=self.clim_pct)
+        self.time_slider.blockSignals(True)
+        self.time_slider.setMaximum(max(0, self.source.n_times - 1))
+        self.time_slider.setValue(0)
+        self.time_slider.blockSignals(False)
+        self.canvas.set_source(self.source)
+        self.clim_label.setText(tr("plotting_viewer_clim_pending", "{var}: 正在估计色标范围…").format(
+            var=FIELD_VARIABLES.get(var_name, var_name)))
+        self._update_time_label(0)
+
+    def _on_clim_ready(self, source):
+        if source is not self.source:
+            return
+        self.clim_label.setText(f"{FIELD_VARIABLES.get(source.var_name, source.var_name)}: "
+                                f"{source.vmin:.2f} ~ {source.vmax:.2f}")
+
+    def _on_slider_changed(self, value):
+        self._update_time_label(value)
+        self._time_timer.start()
+
+    def _apply_time_index(self):
+        self.canvas.set_time_index(self.time_slider.value())
+
+    def _update_time_label(self, itime):
+        if self.source is None or self.source.n_times == 0:
+            self.time_label.setText("")
+            return
+        self.time_label.setText(self.source.times[itime].strftime("%Y-%m-%d %H:%M:%S"))
+
+    def _on_hover_changed(self, text):
+        self.hover_label.setText(text or tr("plotting_viewer_hint", "滚轮缩放，拖拽平移，双击复位"))
+
+    def closeEvent(self, event):
+        self.canvas.loader.stop()
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+        super().closeEvent(event)
@@ -0,0 +1,321 @@
+"""
+图片抽屉模块
+磁盘缩略图缓存（按路径、修改时间和宽度索引，线程池生成）+ 虚拟化列表，
+列表只为可见行解码缩略图，点击时才打开原图
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+from PyQt6.QtCore import Qt
+
+from setting.config import PUBLIC_DIR
+
+
+# 缩略图缓存目录
+THUMBNAIL_CACHE_DIR = os.path.join(PUBLIC_DIR, "cache", "thumbnails")
+
+# 缩略图宽度按该步长向上取整，窗口微调大小时复用已有缩略图
+THUMBNAIL_WIDTH_STEP = 128
+
+
+def _thumbnail_width(width):
+    """缩略图宽度（按步长向上取整）"""
+    width = max(int(width), 1)
+    return ((width + THUMBNAIL_WIDTH_STEP - 1) // THUMBNAIL_WIDTH_STEP) * THUMBNAIL_WIDTH_STEP
+
+
+def thumbnail_cache_path(image_path, width):
+    """缩略图缓存文件路径（键：图片绝对路径、修改时间、宽度）"""
+    stat = os.stat(image_path)
+    params = {
+        'path': os.path.normpath(os.path.abspath(image_path)).replace("\\", "/"),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'width': int(width),
+    }
+    params_str = json.dumps(params, sort_keys=True, separators=(',', ':'))
+    cache_key = hashlib.sha256(params_str.encode('utf-8')).hexdigest()
+    return os.path.join(THUMBNAIL_CACHE_DIR, cache_key[:2], cache_key + ".png")
+
+
+def get_or_create_thumbnail(image_path, width):
+    """返回缩略图路径，不存在时生成（只缩小，不放大）"""
+    width = _thumbnail_width(width)
+    cache_path = thumbnail_cache_path(image_path, width)
+    if os.path.exists(cache_path):
+        return cache_path
+
+    from PIL import Image
+
+    with Image.open(image_path) as img:
+        # reducing_gap 先用整数倍缩小再精细重采样，大图生成更快
+        img.thumbnail((width, width * 16), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # 先写临时文件再替换，避免并发读取到半个文件
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        img.save(tmp_path, format="PNG")
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+def read_image_size(image_path):
+    """只读取文件头获取图片尺寸"""
+    from PIL import Image
+    with Image.open(image_path) as img:
+        return img.size
+
+
+class ThumbnailLoader(QtCore.QObject):
+    """缩略图生成线程池
+
+    最近请求的图片（可见行）优先生成；其余图片在后台按顺序预生成。
+    """
+
+    thumbnail_ready = QtCore.pyqtSignal(str, str)  # (image_path, thumbnail_path)
+    thumbnail_failed = QtCore.pyqtSignal(str, str)  # (image_path, error)
+    all_finished = QtCore.pyqtSignal()
+
+    def __init__(self, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self._queued = set()
+        self._active = 0
+        self._width = 0
+        self._generation = 0
+
+    def reset(self, width):
+        """清空待生成队列并设置缩略图宽度（切换图片列表时调用）"""
+        with self._lock:
+            self._pending.clear()
+            self._queued.clear()
+            self._width = width
+            self._generation += 1
+
+    def request(self, image_path, urgent=False):
+        """请求生成缩略图；urgent 为 True 时插入队首"""
+        with self._lock:
+            if image_path in self._queued:
+                if urgent:
+                    try:
+                        self._pending.remove(image_path)
+                        self._pending.appendleft(image_path)
+                    except ValueError:
+                        pass  # 已在生成中
+                return
+            self._queued.add(image_path)
+            if urgent:
+                self._pending.appendleft(image_path)
+            else:
+                self._pending.append(image_path)
+            start_worker = self._active < self.max_workers
+            if start_worker:
+                self._active += 1
+        if start_worker:
+            self._executor.submit(self._drain)
+
+    def _drain(self):
+        """工作线程：持续取出待生成的图片直到队列为空"""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._active -= 1
+                    finished = self._active == 0
+                    break
+                image_path = self._pending.popleft()
+                width = self._width
+                generation = self._generation
+            try:
+                thumb_path = get_or_create_thumbnail(image_path, width)
+                error = None
+            except Exception as e:
+                thumb_path, error = None, str(e)
+            with self._lock:
+                current = generation == self._generation
+                if current:
+                    self._queued.discard(image_path)
+            if not current:
+                continue
+            if error is None:
+                self.thumbnail_ready.emit(image_path, thumb_path)
+            else:
+                self.thumbnail_failed.emit(image_path, error)
+        if finished:
+            self.all_finished.emit()
+
+    def shutdown(self):
+        with self._lock:
+            self._pending.clear()
+        self._executor.shutdown(wait=False)
+
+
+class DrawerImageModel(QtCore.QAbstractListModel):
+    """图片列表模型：只为视图请求的（可见）行解码缩略图，已解码的缩略图保存在 LRU 中"""
+
+    ImagePathRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, loader, max_pixmaps=48, parent=None):
+        super().__init__(parent)
+        self.loader = loader
+        self.max_pixmaps = max_pixmaps
+        self._paths = []
+        self._rows = {}
+        self._thumb_paths = {}
+        self._pixmaps = OrderedDict()
+        self.thumb_width = 0
+        self.loader.thumbnail_ready.connect(self._on_thumbnail_ready)
+
+    def set_images(self, image_paths, thumb_width):
+        self.beginResetModel()
+        self._paths = list(image_paths)
+        self._rows = {path: row for row, path in enumerate(self._paths)}
+        self._thumb_paths.clear()
+        self._pixmaps.clear()
+        self.thumb_width = thumb_width
+        self.loader.reset(thumb_width)
+        self.endResetModel()
+        # 后台按顺序预生成磁盘缩略图（不解码到内存）
+        for path in self._paths:
+            self.loader.request(path)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._paths)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._paths):
+            return None
+        path = self._paths[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return os.path.basename(path)
+        if role == self.ImagePathRole:
+            return path
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._pixmap(path)
+        return None
+
+    def _pixmap(self, path):
+        """可见行的缩略图：已解码直接返回，否则从磁盘缓存解码或请求生成"""
+        pixmap = self._pixmaps.get(path)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(path)
+            return pixmap
+        thumb_path = self._thumb_paths.get(path)
+        if thumb_path is None:
+            self.loader.request(path, urgent=True)
+            return None
+        pixmap = QtGui.QPixmap(thumb_path)
+        if pixmap.isNull():
+            return None
+        self._pixmaps[path] = pixmap
+        while len(self._pixmaps) > self.max_pixmaps:
+            self._pixmaps.popitem(last=False)
+        return pixmap
+
+    def _on_thumbnail_ready(self, image_path, thumb_path):
+        row = self._rows.get(image_path)
+        if row is None:
+            return
+        self._thumb_paths[image_path] = thumb_path
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+
+class DrawerImageDelegate(QtWidgets.QStyledItemDelegate):
+    """绘制带圆角边框的缩略图卡片（图片 + 文件名）"""
+
+    MARGIN_LEFT = 15
+    MARGIN = 8
+    SPACING = 5
+    NAME_HEIGHT = 20
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.item_width = 600
+        self.aspect_ratio = 0.75
+
+    def set_geometry(self, item_width, aspect_ratio):
+        self.item_width = item_width
+        self.aspect_ratio = aspect_ratio
+
+    def image_width(self):
+        """卡片内图片区域宽度"""
+        return max(1, self.item_width - self.MARGIN_LEFT - self.MARGIN)
+
+    def sizeHint(self, option, index):
+        image_height = int(self.image_width() * self.aspect_ratio)
+        height = self.MARGIN * 2 + image_height + self.SPACING + self.NAME_HEIGHT
+        return QtCore.QSize(self.item_width, height)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing, True)
+        painter.setRenderHint(QtGui.QPainter.RenderHint.SmoothPixmapTransform, True)
+
+        card = QtCore.QRectF(option.rect).adjusted(0.5, 0.5, -0.5, -0.5)
+        painter.setPen(QtGui.QPen(QtGui.QColor("#ccc"), 1))
+        painter.setBrush(QtGui.QColor("white"))
+        painter.drawRoundedRect(card, 4, 4)
+
+        image_rect = QtCore.QRect(option.rect.left() + self.MARGIN_LEFT,
+                                  option.rect.top() + self.MARGIN,
+                                  option.rect.width() - self.MARGIN_LEFT - self.MARGIN,
+                                  option.rect.height() - self.MARGIN * 2 - self.SPACING - self.NAME_HEIGHT)
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if isinstance(pixmap, QtGui.QPixmap) and not pixmap.isNull():
+            scaled = pixmap.size().scaled(image_rect.size(), Qt.AspectRatioMode.KeepAspectRatio)
+            target = QtCore.QRect(0, 0, scaled.width(), scaled.height())
+            target.moveCenter(image_rect.center())
+            painter.drawPixmap(target, pixmap)
+        else:
+            # 缩略图生成中：占位
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QtGui.QColor("#eeeeee"))
+            painter.drawRect(image_rect)
+
+        name_rect = QtCore.QRect(option.rect.left() + self.MARGIN,
+                                 image_rect.bottom() + self.SPACING,
+                                 option.rect.width() - self.MARGIN * 2,
+                                 self.NAME_HEIGHT)
+        font = QtGui.QFont(option.font)
+        font.setPixelSize(12)
+        painter.setFont(font)
+        painter.setPen(QtGui.QColor("#666"))
+        name = option.fontMetrics.elidedText(index.data(Qt.ItemDataRole.DisplayRole) or "",
+                                             Qt.TextElideMode.ElideMiddle, name_rect.width())
+        painter.drawText(name_rect, Qt.AlignmentFlag.AlignCenter, name)
+        painter.restore()
+
+
+class DrawerImageListView(QtWidgets.QListView):
+    """虚拟化图片列表：统一行高，视图只为可见行请求数据"""
+
+    image_clicked = QtCore.pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setUniformItemSizes(True)
+        self.setSpacing(10)
+        self.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setFrameShape(QtWidgets.QFrame.Shape.NoFrame)
+        self.setStyleSheet("QListView { background-color: transparent; border: none; }")
+        self.viewport().setCursor(Qt.CursorShape.PointingHandCursor)
+        self.clicked.connect(self._on_clicked)
+
+    def _on_clicked(self, index):
+        path = index.data(DrawerImageModel.ImagePathRole)
+        if path:
+            self.image_clicked.emit(path)
@@ -0,0 +1,400 @@
+"""
+Jason-3 数据模块
+Jason-3 文件目录的持久化索引（文件时间范围与经纬度范围），以及沿轨数据的读取：
+一次读取所有相关文件，按时间排序为列数组，时间窗口查询用 searchsorted 切片
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+from datetime import datetime
+
+import numpy as np
+from netCDF4 import Dataset
+
+
+# Jason-3 文件名前缀（GDR / IGDR）和文件名中的时间范围
+JASON3_PREFIXES = ("JA3_GPN_", "JA3_IPN_")
+JASON3_TIME_PATTERN = re.compile(r'(\d{8}_\d{6})_(\d{8}_\d{6})')
+
+# Jason-3 时间变量的参考时刻（秒）
+JASON3_EPOCH = datetime(2000, 1, 1)
+
+# 无效值（填充值）
+_JASON3_INVALID_VALUES = [0, 32767, 9999, 65535]
+
+
+def is_jason3_file(name):
+    """是否为 Jason-3 沿轨 NetCDF 文件名"""
+    return name.startswith(JASON3_PREFIXES) and name.endswith(".nc")
+
+
+def parse_jason3_time_range(name):
+    """从文件名解析 (开始时间, 结束时间)，无法解析时返回 None"""
+    match = JASON3_TIME_PATTERN.search(name)
+    if not match:
+        return None
+    try:
+        return (datetime.strptime(match.group(1), '%Y%m%d_%H%M%S'),
+                datetime.strptime(match.group(2), '%Y%m%d_%H%M%S'))
+    except ValueError:
+        return None
+
+
+def list_jason3_files(folder, start_dt=None, end_dt=None):
+    """列出文件名时间范围与 [start_dt, end_dt] 重叠的 Jason-3 文件
+
+    返回:
+        [(文件名, 开始时间, 结束时间), ...]，按文件名排序
+    """
+    if not os.path.isdir(folder):
+        return []
+    entries = []
+    for name in os.listdir(folder):
+        if not is_jason3_file(name):
+            continue
+        time_range = parse_jason3_time_range(name)
+        if time_range is None:
+            continue
+        file_start, file_end = time_range
+        if start_dt is not None and file_end < start_dt:
+            continue
+        if end_dt is not None and file_start > end_dt:
+            continue
+        entries.append((name, file_start, file_end))
+    entries.sort()
+    return entries
+
+
+# 目录索引保存在 public/cache/jason3 下（每个 Jason-3 目录一个文件）。
+# 不写入数据目录本身：数据目录可能只读，且写入会改变目录修改时间
+_CATALOG_TIME_FORMAT = '%Y%m%d_%H%M%S'
+
+
+class Jason3Catalog:
+    """Jason-3 目录的持久化文件索引（SQLite）
+
+    记录每个文件的大小、修改时间、文件名中的起止时间，以及（按需计算的）经纬度范围和是否为有效 NetCDF。
+    目录修改时间不变时不再列目录；文件的大小或修改时间变化时才重新索引该文件。
+    """
+
+    def __init__(self, folder):
+        self.folder = os.path.abspath(folder)
+        self.path = self._catalog_path(self.folder)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                name TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                start_time TEXT NOT NULL,
+                end_time TEXT NOT NULL,
+                lon_min REAL, lon_max REAL, lat_min REAL, lat_max REAL,
+                valid INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS files_time ON files (start_time, end_time);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+
+    @staticmethod
+    def _catalog_path(folder):
+        """目录对应的索引文件路径"""
+        from setting.config import PUBLIC_DIR
+        cache_dir = os.path.join(PUBLIC_DIR, "cache", "jason3")
+        os.makedirs(cache_dir, exist_ok=True)
+        key = hashlib.sha256(os.path.normcase(folder).replace("\\", "/").encode('utf-8')).hexdigest()
+        return os.path.join(cache_dir, key + ".sqlite")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def refresh(self, with_bbox=False, force=False, start_dt=None, end_dt=None):
+        """增量更新索引
+
+        参数:
+            with_bbox: 是否为尚未计算经纬度范围的文件读取经纬度（只读取一次并保存）
+            force: 忽略目录修改时间，重新检查每个文件的大小和修改时间（覆盖写入同名文件后使用）
+            start_dt, end_dt: 只为与该时间范围重叠的文件读取经纬度（默认全部）
+
+        返回:
+            (新增或更新的文件数, 删除的文件数)
+        """
+        added = removed = 0
+        dir_stat = os.stat(self.folder)
+        dir_mtime = str(dir_stat.st_mtime_ns)
+        if force or self._get_meta('dir_mtime_ns') != dir_mtime:
+            known = {name: (size, mtime_ns) for name, size, mtime_ns in
+                     self.conn.execute("SELECT name, size, mtime_ns FROM files")}
+            seen = set()
+            rows = []
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if not is_jason3_file(entry.name):
+                        continue
+                    time_range = parse_jason3_time_range(entry.name)
+                    if time_range is None:
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    seen.add(entry.name)
+                    if known.get(entry.name) == (stat.st_size, stat.st_mtime_ns):
+                        continue
+                    rows.append((entry.name, stat.st_size, stat.st_mtime_ns,
+                                 time_range[0].strftime(_CATALOG_TIME_FORMAT),
+                                 time_range[1].strftime(_CATALOG_TIME_FORMAT)))
+            stale = [(name,) for name in known if name not in seen]
+            with self.conn:
+                # 新文件或内容变化的文件：经纬度范围需要重新计算
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO files (name, size, mtime_ns, start_time, end_time) VALUES (?, ?, ?, ?, ?)",
+                    rows)
+                self.conn.executemany("DELETE FROM files WHERE name = ?", stale)
+                # 目录刚被修改时（文件系统时间精度可能只有秒级）不记录，下次重新检查
+                if time.time() - dir_stat.st_mtime > 2.0:
+                    self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('dir_mtime_ns', ?)", (dir_mtime,))
+                else:
+                    self.conn.execute("DELETE FROM meta WHERE key = 'dir_mtime_ns'")
+            added, removed = len(rows), len(stale)
+
+        if with_bbox:
+            self._fill_bbox(start_dt, end_dt)
+        return added, removed
+
+    @staticmethod
+    def _time_filter(start_dt, end_dt):
+        """与时间范围重叠的 SQL 条件和参数"""
+        sql = ""
+        params = []
+        if start_dt is not None:
+            sql += " AND end_time >= ?"
+            params.append(start_dt.strftime(_CATALOG_TIME_FORMAT))
+        if end_dt is not None:
+            sql += " AND start_time <= ?"
+            params.append(end_dt.strftime(_CATALOG_TIME_FORMAT))
+        return sql, params
+
+    def _fill_bbox(self, start_dt=None, end_dt=None):
+        """读取时间范围内尚未索引经纬度范围的文件"""
+        time_sql, params = self._time_filter(start_dt, end_dt)
+        pending = [row[0] for row in self.conn.execute("SELECT name FROM files WHERE valid IS NULL" + time_sql, params)]
+        updates = []
+        for name in pending:
+            try:
+                with Dataset(os.path.join(self.folder, name), 'r') as ds:
+                    data_group = ds.groups['data_01']
+                    longitude = np.ma.compressed(data_group.variables['longitude'][:].astype(float))
+                    latitude = np.ma.compressed(data_group.variables['latitude'][:].astype(float))
+            except Exception:
+                # 不是有效的 NetCDF（例如下载到的 HTML 页面）
+                updates.append((None, None, None, None, 0, name))
+                continue
+            if longitude.size == 0 or latitude.size == 0:
+                updates.append((None, None, None, None, 1, name))
+                continue
+            longitude = ((longitude + 180.0) % 360.0) - 180.0
+            updates.append((float(longitude.min()), float(longitude.max()),
+                            float(latitude.min()), float(latitude.max()), 1, name))
+        if updates:
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE files SET lon_min = ?, lon_max = ?, lat_min = ?, lat_max = ?, valid = ? WHERE name = ?",
+                    updates)
+
+    def query(self, start_dt=None, end_dt=None, lon_lat=None, include_invalid=False):
+        """查询与时间范围（以及可选的经纬度范围）重叠的文件
+
+        参数:
+            lon_lat: [lon_min, lon_max, lat_min, lat_max]；经纬度范围未知的文件视为重叠
+            include_invalid: 是否包含已确认无效的文件
+
+        返回:
+            [(文件名, 开始时间, 结束时间), ...]，按文件名排序
+        """
+        time_sql, params = self._time_filter(start_dt, end_dt)
+        sql = "SELECT name, start_time, end_time FROM files WHERE 1 = 1" + time_sql
+        if not include_invalid:
+            sql += " AND (valid IS NULL OR valid = 1)"
+        if lon_lat is not None:
+            sql += (" AND (lon_min IS NULL OR (lon_max >= ? AND lon_min <= ?"
+                    " AND lat_max >= ? AND lat_min <= ?))")
+            params.extend([lon_lat[0], lon_lat[1], lon_lat[2], lon_lat[3]])
+        sql += " ORDER BY name"
+        return [(name, datetime.strptime(start, _CATALOG_TIME_FORMAT), datetime.strptime(end, _CATALOG_TIME_FORMAT))
+                for name, start, end in self.conn.execute(sql, params)]
+
+    def invalid_files(self, start_dt=None, end_dt=None):
+        """已确认不是有效 NetCDF 的文件名"""
+        entries = self.query(start_dt, end_dt, include_invalid=True)
+        valid = {name for name, _, _ in self.query(start_dt, end_dt)}
+        return [name for name, _, _ in entries if name not in valid]
+
+
+def query_jason3_files(folder, start_dt=None, end_dt=None, lon_lat=None, with_bbox=False):
+    """通过目录索引查询 Jason-3 文件；索引不可用时退回到直接列目录
+
+    返回:
+        [(文件名, 开始时间, 结束时间), ...]，按文件名排序
+    """
+    if not os.path.isdir(folder):
+        return []
+    try:
+        with Jason3Catalog(folder) as catalog:
+            catalog.refresh(with_bbox=with_bbox or lon_lat is not None, start_dt=start_dt, end_dt=end_dt)
+            return catalog.query(start_dt, end_dt, lon_lat=lon_lat)
+    except (sqlite3.Error, OSError):
+        return list_jason3_files(folder, start_dt, end_dt)
+
+
+def _to_jason3_days(dt):
+    """datetime 转换为自 2000-01-01 起的天数"""
+    return (dt - JASON3_EPOCH).total_seconds() / (24 * 60 * 60)
+
+
+class Jason3TrackStore:
+    """Jason-3 沿轨数据的列式存储
+
+    每个文件只读取一次，经过区域和有效值筛选后按时间排序（稳定排序，同一时刻保持文件顺序），
+    时间窗口查询为 searchsorted 切片。
+    """
+
+    COLUMNS = ('time', 'longitude', 'latitude', 'wind', 'swh')
+
+    def __init__(self, time_days, longitude, latitude, wind, swh, file_count=0):
+        order = np.argsort(time_days, kind='stable')
+        self.time = np.asarray(time_days, dtype=float)[order]
+        self.longitude = np.asarray(longitude, dtype=float)[order]
+        self.latitude = np.asarray(latitude, dtype=float)[order]
+        self.wind = np.asarray(wind, dtype=float)[order]
+        self.swh = np.asarray(swh, dtype=float)[order]
+        self.file_count = file_count
+
+    def __len__(self):
+        return len(self.time)
+
+    @classmethod
+    def empty(cls):
+        return cls(*(np.array([]) for _ in cls.COLUMNS))
+
+    @classmethod
+    def load(cls, folder, lon_lat, start_dt, end_dt, files=None):
+        """读取时间范围内与区域内的所有有效 Jason-3 沿轨点
+
+        参数:
+            folder: Jason-3 文件目录
+            lon_lat: [lon_min, lon_max, lat_min, lat_max]（经度为 -180~180）
+            start_dt, end_dt: 时间范围（闭区间）
+            files: 可选的文件名列表，默认扫描目录
+        """
+        if files is None:
+            files = [name for name, _, _ in query_jason3_files(folder, start_dt, end_dt, lon_lat=lon_lat)]
+        start_days = _to_jason3_days(start_dt)
+        end_days = _to_jason3_days(end_dt)
+
+        columns = {name: [] for name in cls.COLUMNS}
+        file_count = 0
+        for name in sorted(set(files)):
+            try:
+                with Dataset(os.path.join(folder, name), 'r') as ds:
+                    data_group = ds.groups['data_01']
+                    latitude = data_group.variables['latitude'][:].astype(float)
+                    longitude = data_group.variables['longitude'][:].astype(float)
+                    time_days = data_group.variables['time'][:].astype(float) / (24 * 60 * 60)
+                    wind = data_group.variables['wind_speed_alt_mle3'][:].astype(float)
+                    swh = data_group.groups['ku'].variables['swh_ocean'][:].astype(float)
+            except Exception:
+                # 无效文件（例如下载到的 HTML 页面）直接跳过
+                continue
+            file_count += 1
+
+            longitude = ((longitude + 180.0) % 360.0) - 180.0
+            mask = ((longitude >= lon_lat[0]) & (longitude <= lon_lat[1]) &
+                    (latitude >= lon_lat[2]) & (latitude <= lon_lat[3]) &
+                    (time_days >= start_days) & (time_days <= end_days) &
+                    ~np.isnan(swh) & ~np.isnan(wind) &
+                    ~np.isin(swh, _JASON3_INVALID_VALUES) &
+                    ~np.isin(wind, _JASON3_INVALID_VALUES))
+            mask = np.ma.filled(mask, False)
+            if not mask.any():
+                continue
+            for column, values in zip(cls.COLUMNS, (time_days, longitude, latitude, wind, swh)):
+                columns[column].append(np.ma.getdata(values)[mask])
+
+        if not columns['time']:
+            store = cls.empty()
+            store.file_count = file_count
+            return store
+        return cls(*(np.concatenate(columns[name]) for name in cls.COLUMNS), file_count=file_count)
+
+    def window(self, start_dt, end_dt):
+        """返回时间窗口 [start_dt, end_dt] 内的数据（各列的视图）"""
+        lo = np.searchsorted(self.time, _to_jason3_days(start_dt), side='left')
+        hi = np.searchsorted(self.time, _to_jason3_days(end_dt), side='right')
+        return {
+            'time': self.time[lo:hi],
+            'longitude': self.longitude[lo:hi],
+            'latitude': self.latitude[lo:hi],
+            'wind': self.wind[lo:hi],
+            'swh': self.swh[lo:hi],
+        }
+
+
+# 沿轨网格化支持的统计量
+GRID_STATISTICS = ('mean', 'max', 'std', 'count')
+
+
+def grid_along_track(longitude, latitude, values, lon_grid, lat_grid):
+    """把沿轨观测分配到规则网格，一次计算每个网格的样本数、均值、最大值和标准差
+
+    网格索引与 np.searchsorted(lon_grid, longitude) 一致（超出末端的归入最后一格）。
+    不依赖数据来源，多颗卫星或长时间段的观测拼接后一次传入即可。
+
+    返回:
+        {'count', 'mean', 'max', 'std'}，形状为 (len(lat_grid), len(lon_grid))；
+        没有样本的网格为 NaN（count 为 0）
+    """
+    shape = (len(lat_grid), len(lon_grid))
+    n_cells = shape[0] * shape[1]
+    values = np.asarray(values, dtype=float)
+
+    lon_idx = np.minimum(np.searchsorted(lon_grid, longitude), shape[1] - 1)
+    lat_idx = np.minimum(np.searchsorted(lat_grid, latitude), shape[0] - 1)
+    flat = lat_idx * shape[1] + lon_idx
+
+    count = np.bincount(flat, minlength=n_cells)
+    has_data = count > 0
+    total = np.bincount(flat, weights=values, minlength=n_cells)
+
+    mean = np.full(n_cells, np.nan)
+    mean[has_data] = total[has_data] / count[has_data]
+
+    # 两遍法计算标准差（总体标准差），避免平方和相减的精度损失
+    squared = np.bincount(flat, weights=(values - mean[flat]) ** 2, minlength=n_cells)
+    std = np.full(n_cells, np.nan)
+    std[has_data] = np.sqrt(squared[has_data] / count[has_data])
+
+    maximum = np.full(n_cells, -np.inf)
+    np.maximum.at(maximum, flat, values)
+    maximum[~has_data] = np.nan
+
+    return {
+        'count': count.reshape(shape),
+        'mean': mean.reshape(shape),
+        'max': maximum.reshape(shape),
+        'std': std.reshape(shape),
+    }
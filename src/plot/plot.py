@@ -9,7 +9,6 @@ import glob
 import subprocess
 import platform
 import re
-import threading
 import multiprocessing
 from multiprocessing import Process, Queue
 from datetime import datetime, timedelta
@@ -23,7 +22,6 @@ from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib import cm
 from netCDF4 import Dataset, num2date
 import netCDF4 as nc
-from PIL import Image
 
 from PyQt6 import QtWidgets, QtCore
 from PyQt6.QtCore import QEvent, Qt
@@ -35,7 +33,6 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel,
     QTableWidgetItem, QHeaderView, QScrollArea, QDialog, QSizePolicy, QFileDialog
 )
-from PyQt6.QtGui import QPixmap
 
 from setting.config import *
 from setting.language_manager import tr
@@ -217,29 +214,22 @@ class PlotMixin(SpectrumPlotMixin, WindFieldPlotMixin, WaveHeightPlotMixin, Jaso
         drawer_layout.setContentsMargins(15, 0, 0, 0)  # 增大左侧边距，移除上下和右侧边距
         drawer_layout.setSpacing(0)
         
-        # 创建滚动区域用于显示图片列表（隐藏滚动条，透明背景）
-        scroll_area = QtWidgets.QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarPolicy.ScrollBarAlwaysOff)  # 隐藏垂直滚动条
-        scroll_area.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarPolicy.ScrollBarAlwaysOff)  # 隐藏水平滚动条
-        scroll_area.setStyleSheet("QScrollArea { background-color: transparent; }")
-        
-        # 创建图片容器（单列显示，宽度固定，无背景）
-        self.drawer_image_container = QWidget()
-        self.drawer_image_container.setStyleSheet("background-color: transparent;")
-        self.drawer_image_layout = QVBoxLayout(self.drawer_image_container)
-        self.drawer_image_layout.setContentsMargins(0, 10, 0, 20)
-        self.drawer_image_layout.setSpacing(20)
-        self.drawer_image_layout.addStretch()  # 底部弹性空间
-        
-        # 设置容器大小策略，防止横向扩展
-        self.drawer_image_container.setSizePolicy(
-            QtWidgets.QSizePolicy.Policy.Fixed,
-            QtWidgets.QSizePolicy.Policy.Minimum
+        # 创建虚拟化图片列表（单列显示，隐藏滚动条，透明背景）
+        # 只为可见行解码缩略图，缩略图由线程池生成并缓存到磁盘
+        from .image_drawer import ThumbnailLoader, DrawerImageModel, DrawerImageDelegate, DrawerImageListView
+        self.drawer_thumbnail_loader = ThumbnailLoader(parent=self.test_drawer)
+        self.drawer_thumbnail_loader.thumbnail_failed.connect(
+            lambda path, error: self.log(tr("plotting_load_image_failed", "❌ 加载图片失败 {file}: {error}").format(file=os.path.basename(path), error=error)),
+            Qt.ConnectionType.QueuedConnection
         )
-        
-        scroll_area.setWidget(self.drawer_image_container)
-        drawer_layout.addWidget(scroll_area)
+        self.drawer_image_model = DrawerImageModel(self.drawer_thumbnail_loader, parent=self.test_drawer)
+        self.drawer_image_delegate = DrawerImageDelegate(self.test_drawer)
+        self.drawer_image_list = DrawerImageListView()
+        self.drawer_image_list.setItemDelegate(self.drawer_image_delegate)
+        self.drawer_image_list.setModel(self.drawer_image_model)
+        # 点击缩略图时才打开原图
+        self.drawer_image_list.image_clicked.connect(self.open_image_file)
+        drawer_layout.addWidget(self.drawer_image_list)
         
         # 初始状态：隐藏在右侧外部
         self.test_drawer.setVisible(False)
@@ -336,146 +326,37 @@ class PlotMixin(SpectrumPlotMixin, WindFieldPlotMixin, WaveHeightPlotMixin, Jaso
         self.test_drawer.setGeometry(parent_width - drawer_width, 0, drawer_width, parent_height)
 
     def _show_images_in_drawer(self, image_paths):
-        """在抽屉中显示图片列表（单列显示）- 使用子线程加载图片以避免卡顿"""
-        if not hasattr(self, 'drawer_image_layout'):
+        """在抽屉中显示图片列表（单列显示）- 缩略图在线程池中生成，列表只解码可见行"""
+        if not hasattr(self, 'drawer_image_list'):
             self.log(tr("drawer_not_initialized", "❌ 抽屉功能未初始化"))
             return
 
-        # 清除现有内容（保留底部弹性空间）
-        while self.drawer_image_layout.count() > 1:  # 保留最后的 stretch
-            item = self.drawer_image_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        
         # 先打开抽屉
         if not self.test_drawer_is_open:
             self._toggle_test_drawer()
         
-        # 更新容器宽度以匹配抽屉宽度（防止横向滚动）
+        # 列表宽度匹配抽屉宽度（防止横向滚动）
         parent = self.test_drawer.parent()
         if parent:
             drawer_actual_width = parent.width() // 2 - 30  # 减去滚动条和边距
-            self.drawer_image_container.setFixedWidth(drawer_actual_width)
         else:
             drawer_actual_width = 600  # 默认值
-        
-        # 保存抽屉宽度供子线程使用
         self._drawer_actual_width = drawer_actual_width
         
-        # 在子线程中加载图片（避免主线程卡顿）
-        def _load_images_worker():
-            """在子线程中加载和缩放图片"""
-            from PIL import Image
-            
-            # 获取抽屉宽度（从实例变量中获取）
-            drawer_width = getattr(self, '_drawer_actual_width', 600)
-            
-            for img_path in image_paths:
-                try:
-                    # 加载并缩放图片
-                    pil_img = Image.open(img_path)
-                    
-                    # 计算缩放后的尺寸（保持宽高比，宽度完全匹配抽屉宽度）
-                    container_padding = 16  # 左右各8px
-                    image_max_width = drawer_width - container_padding
-                    
-                    # 图片宽度完全匹配容器宽度
-                    if pil_img.width != image_max_width:
-                        scale = image_max_width / pil_img.width
-                        new_width = image_max_width
-                        new_height = int(pil_img.height * scale)
-                    else:
-                        new_width = pil_img.width
-                        new_height = pil_img.height
-                    
-                    pil_img = pil_img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                    
-                    # 通过信号传递图片路径和缩放后的尺寸
-                    # 注意：QPixmap 不能在线程间传递，所以我们在主线程中重新加载
-                    self.add_image_to_drawer_signal.emit(img_path, new_width, new_height)
-                    
-                except Exception as e:
-                        self.log_signal.emit(tr("plotting_load_image_failed", "❌ 加载图片失败 {file}: {error}").format(file=os.path.basename(img_path), error=e))
-                        continue
-
-            # 所有图片加载完成
-            self.images_loading_complete_signal.emit()
+        # 行高统一：按第一张可读图片的宽高比计算（只读文件头）
+        from .image_drawer import read_image_size
+        image_paths = [p for p in image_paths if os.path.isfile(p)]
+        aspect_ratio = 0.75
+        for img_path in image_paths:
+            try:
+                width, height = read_image_size(img_path)
+                if width > 0:
+                    aspect_ratio = height / width
+                    break
+            except Exception as e:
+                self.log(tr("plotting_load_image_failed", "❌ 加载图片失败 {file}: {error}").format(file=os.path.basename(img_path), error=e))
         
-        # 启动子线程
-        load_thread = threading.Thread(target=_load_images_worker, daemon=True)
-        load_thread.start()
-
-    def _add_single_image_to_drawer(self, img_path, img_width, img_height):
-        """在主线程中添加单张图片到抽屉（由信号触发）"""
-        try:
-            # 创建带圆角边框的容器
-            from PyQt6.QtWidgets import QFrame
-            container = QFrame()
-            container.setStyleSheet("""
-                QFrame {
-                    border: 1px solid #ccc;
-                    border-radius: 4px;
-                    background-color: white;
-                }
-            """)
-            container_layout = QVBoxLayout(container)
-            container_layout.setContentsMargins(15, 8, 8, 8)  # 左侧15px，其他边8px以保护圆角
-            container_layout.setSpacing(5)
-            
-            # 在主线程中加载图片（从文件路径）
-            from PyQt6.QtGui import QPixmap
-            from PIL import Image
-            from PIL.ImageQt import ImageQt
-            
-            # 重新加载并缩放图片（在主线程中进行，确保线程安全）
-            pil_img = Image.open(img_path)
-            container_padding = 16
-            image_max_width = self._drawer_actual_width - container_padding
-            
-            if pil_img.width != image_max_width:
-                scale = image_max_width / pil_img.width
-                new_width = image_max_width
-                new_height = int(pil_img.height * scale)
-            else:
-                new_width = pil_img.width
-                new_height = pil_img.height
-            
-            pil_img = pil_img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            # 转换为 QPixmap
-            qimg = ImageQt(pil_img)
-            pixmap = QPixmap.fromImage(qimg)
-            
-            # 创建图片标签（无边框，透明背景）
-            img_label = QLabel()
-            img_label.setPixmap(pixmap)
-            img_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-            img_label.setCursor(QtCore.Qt.CursorShape.PointingHandCursor)
-            img_label.setStyleSheet("border: none; background: transparent;")
-            
-            # 点击图片打开原图
-            def open_image(path=img_path):
-                self.open_image_file(path)
-            
-            img_label.mousePressEvent = lambda e, path=img_path: open_image(path)
-            
-            # 添加文件名标签
-            filename = os.path.basename(img_path)
-            name_label = QLabel(filename)
-            name_label.setStyleSheet("font-size: 12px; color: #666; border: none; background: transparent;")
-            name_label.setWordWrap(True)
-            name_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-            
-            container_layout.addWidget(img_label)
-            container_layout.addWidget(name_label)
-            
-            # 添加到抽屉布局（使用容器而不是 image_widget）
-            self.drawer_image_layout.insertWidget(self.drawer_image_layout.count() - 1, container)
-
-        except Exception as e:
-            self.log(tr("plotting_add_image_to_drawer_failed", "❌ 添加图片到抽屉失败 {file}: {error}").format(file=os.path.basename(img_path), error=e))
-
-    def _on_images_loading_complete(self):
-        """图片加载完成后的处理"""
-        # 可以在这里添加加载完成的提示
-        pass
+        self.drawer_image_delegate.set_geometry(drawer_actual_width, aspect_ratio)
+        thumb_width = self.drawer_image_delegate.image_width()
+        self.drawer_image_model.set_images(image_paths, thumb_width)
+        self.drawer_image_list.scrollToTop()
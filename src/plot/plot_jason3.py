@@ -23,7 +23,7 @@ from PIL import Image
 from PyQt6 import QtWidgets, QtCore
 from PyQt6.QtCore import QEvent, Qt
 from qfluentwidgets import (
-    PrimaryPushButton, LineEdit, HeaderCardWidget, InfoBar
+    PrimaryPushButton, LineEdit, HeaderCardWidget, InfoBar, ComboBox
 )
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QFileDialog, QDialog, QScrollArea, QSizePolicy
@@ -33,6 +33,7 @@ from PyQt6.QtGui import QPixmap
 from setting.config import load_config, JASON_PATH
 from setting.language_manager import tr
 from .workers import _run_jason3_swh_worker, _match_ww3_jason3_worker
+from .jason3_data import GRID_STATISTICS
 
 
 class Jason3PlotMixin:
@@ -237,6 +238,22 @@ class Jason3PlotMixin:
         wave_button_row.addWidget(load_from_ww3_button, 1)
         step9_card_layout.addLayout(wave_button_row)
 
+        # 卫星观测图的网格统计量（同一网格内有多个沿轨观测时）
+        if not hasattr(self, 'jason3_stat_combo'):
+            self.jason3_stat_combo = ComboBox()
+            self.jason3_stat_combo.addItems([
+                tr("plotting_jason_stat_mean", "平均值"),
+                tr("plotting_jason_stat_max", "最大值"),
+                tr("plotting_jason_stat_std", "标准差"),
+                tr("plotting_jason_stat_count", "样本数"),
+            ])
+        self.jason3_stat_combo.setStyleSheet(input_style)
+        stat_row = QHBoxLayout()
+        stat_row.setSpacing(10)
+        stat_row.addWidget(QLabel(tr("plotting_jason_stat", "网格统计量:")))
+        stat_row.addWidget(self.jason3_stat_combo, 1)
+        step9_card_layout.addLayout(stat_row)
+
         # 查看卫星观测图按钮
         if not hasattr(self, 'btn_view_satellite'):
             self.btn_view_satellite = PrimaryPushButton(tr("plotting_view_satellite", "查看卫星观测图"))
@@ -431,6 +448,12 @@ class Jason3PlotMixin:
         lon_lat = [lon_west, lon_east, lat_south, lat_north]
         time_range = [start_str, end_str]
 
+        # 网格统计量（下拉框顺序与 GRID_STATISTICS 一致）
+        statistic = "mean"
+        if hasattr(self, 'jason3_stat_combo'):
+            statistic = GRID_STATISTICS[max(0, self.jason3_stat_combo.currentIndex())]
+        self._jason3_statistic = statistic
+
         # 禁用按钮，防止重复点击
         self.btn_view_satellite.setEnabled(False)
         self.btn_view_satellite.setText(tr("step8_generating", "生成中..."))
@@ -447,7 +470,8 @@ class Jason3PlotMixin:
         # 启动子进程
         process = Process(
             target=_run_jason3_swh_worker,
-            args=(lon_lat, time_range, jason_folder, self.selected_folder, log_queue, result_queue)
+            args=(lon_lat, time_range, jason_folder, self.selected_folder, log_queue, result_queue),
+            kwargs={'statistic': getattr(self, '_jason3_statistic', "mean")}
         )
         process.start()
 
@@ -119,6 +119,13 @@ class WaveHeightPlotMixin:
             self.generate_video_button.clicked.connect(lambda: self.make_wave_maps(generate_video=True))
         step8_card_layout.addWidget(self.generate_video_button)
 
+        # 交互式查看波高场按钮
+        if not hasattr(self, 'open_field_viewer_button'):
+            self.open_field_viewer_button = PrimaryPushButton(tr("plotting_open_field_viewer", "交互式查看波高场"))
+            self.open_field_viewer_button.setStyleSheet(button_style)
+            self.open_field_viewer_button.clicked.connect(lambda: self.open_wave_field_viewer())
+        step8_card_layout.addWidget(self.open_field_viewer_button)
+
         # 查看结果图片按钮
         if not hasattr(self, 'view_image_button'):
             self.view_image_button = PrimaryPushButton(tr("step8_view_images", "查看结果图片"))
@@ -577,6 +584,40 @@ class WaveHeightPlotMixin:
             self.generate_contour_button.setEnabled(True)
             self.generate_contour_button.setText(tr("plotting_generate_contour", "生成等高线图"))
 
+    def open_wave_field_viewer(self):
+        """打开波高场交互式查看窗口（按时间步懒加载，瓦片按需渲染）"""
+        if not self.selected_folder:
+            self.log(tr("workdir_not_exists", "❌ 当前工作目录不存在！"))
+            return
+
+        # 嵌套网格从 fine 文件夹读取数据
+        grid_type = getattr(self, 'grid_type_var', tr("step2_grid_type_normal", "普通网格"))
+        is_nested_grid = grid_type == tr("step2_grid_type_nested", "嵌套网格")
+        data_folder = self.selected_folder
+        if is_nested_grid and os.path.isdir(os.path.join(self.selected_folder, "fine")):
+            data_folder = os.path.join(self.selected_folder, "fine")
+
+        # 获取选择的波高文件（如果存在），否则自动查找 ww3*.nc（排除 spec）
+        wave_height_file = None
+        if hasattr(self, 'selected_wave_height_file') and self.selected_wave_height_file and os.path.exists(self.selected_wave_height_file):
+            wave_height_file = self.selected_wave_height_file
+        else:
+            wave_files = glob.glob(os.path.join(data_folder, "ww3*.nc"))
+            wave_files = [f for f in wave_files if "spec" not in os.path.basename(f).lower()]
+            if wave_files:
+                wave_height_file = wave_files[0]
+
+        if not wave_height_file:
+            self.log(tr("step8_no_wave_file", "❌ 文件夹中没有找到波高文件（已排除谱文件）"))
+            return
+
+        try:
+            from .field_viewer import WaveFieldViewerDialog
+            self.wave_field_viewer = WaveFieldViewerDialog(wave_height_file, parent=self)
+            self.wave_field_viewer.show()
+        except Exception as e:
+            self.log(tr("plotting_open_field_viewer_failed", "❌ 打开波高场查看窗口失败：{error}").format(error=e))
+
     def show_wave_images(self):
         """显示波浪图片结果 - 使用抽屉显示（与风场图和网格可视化一致）"""
         if not self.selected_folder:
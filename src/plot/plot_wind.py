@@ -5,16 +5,7 @@
 
 import os
 import glob
-import threading
-import platform
-from datetime import timedelta
-import numpy as np
-import matplotlib
-matplotlib.use('QtAgg')
-import matplotlib.pyplot as plt
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
-from netCDF4 import Dataset, num2date
+from multiprocessing import Process, Queue
 from PyQt6 import QtWidgets, QtCore
 from PyQt6.QtCore import Qt
 from qfluentwidgets import (
@@ -26,6 +17,7 @@ from PyQt6.QtWidgets import (
 
 from setting.config import WIND_FIELD_TIME_STEP
 from setting.language_manager import tr
+from .workers import _make_wind_field_maps_worker
 
 
 class WindFieldPlotMixin:
@@ -270,274 +262,62 @@ class WindFieldPlotMixin:
             else:
                 density_step = 10
         
-        # 将 time_step_hours、flag_type、density_step 作为参数传递给内部函数
-        def _worker(step_hours=time_step_hours, flag=flag_type, density=density_step):
-            # 在后台线程中使用非 GUI 后端，避免警告
-            original_backend = matplotlib.get_backend()
-            matplotlib.use('Agg')  # 使用非 GUI 后端
-            try:
-                system = platform.system()
-                if system == 'Linux':
-                    plt.rcParams['font.sans-serif'] = [
-                        'DejaVu Sans', 'Liberation Sans', 'Noto Sans', 'Arial', 'Droid Sans Fallback'
-                    ]
-                    plt.rcParams['axes.unicode_minus'] = False
-            except Exception:
-                pass
+        # 标志类型映射为与语言无关的绘制模式
+        if flag_type == tr("plotting_wind_flag_arrow", "箭头"):
+            flag_mode = "arrow"
+        elif flag_type == tr("plotting_wind_flag_flag", "风旗"):
+            flag_mode = "barbs"
+        else:
+            flag_mode = "none"
+
+        output_dir = os.path.join(self.selected_folder, "photo", "field")
+
+        # 在子进程中绘图（进程内再按时间步并行），避免阻塞界面
+        log_queue = Queue()
+        result_queue = Queue()
+        process = Process(
+            target=_make_wind_field_maps_worker,
+            args=(data_nc_path, output_dir, time_step_hours, log_queue, result_queue, flag_mode, density_step)
+        )
+        process.start()
+
+        def _drain_logs():
+            """转发队列中的日志，收到完成标记时返回 True"""
+            while True:
+                try:
+                    msg = log_queue.get_nowait()
+                except Exception:
+                    return False
+                if msg == "__DONE__":
+                    return True
+                self.log_signal.emit(msg)
+
+        def _poll_logs():
             try:
-                with Dataset(data_nc_path, "r") as ds:
-                    def _pick_var_name(candidates):
-                        for name in candidates:
-                            if name in ds.variables:
-                                return name
-                        return None
-
-                    # 支持更多变量名变体，包括 CFSR 和 CCMP 格式
-                    lon_name = _pick_var_name(["longitude", "lon", "LONGITUDE", "LON", "Longitude", "longitude"])
-                    lat_name = _pick_var_name(["latitude", "lat", "LATITUDE", "LAT", "Latitude", "latitude"])
-                    time_name = _pick_var_name(["valid_time", "time", "Time", "TIME", "t", "MT", "mt", "time"])
-
-                    if not lon_name or not lat_name or not time_name:
-                        missing = []
-                        if not lon_name:
-                            missing.append(tr("longitude", "经度"))
-                        if not lat_name:
-                            missing.append(tr("latitude", "纬度"))
-                        if not time_name:
-                            missing.append(tr("time", "时间"))
-                        raise KeyError(tr("missing_variables", "缺少变量：{vars}").format(vars=', '.join(missing)))
-
-                    longitude = np.array(ds.variables[lon_name][:])
-                    latitude = np.array(ds.variables[lat_name][:])
-                    time_var = ds.variables[time_name]
-                    time_values = np.array(time_var[:])
-                    
-                    # 支持多种格式的风场变量名：
-                    # - 标准格式：u10/v10
-                    # - CFSR 格式：wndewd/wndnwd
-                    # - CCMP 格式：uwnd/vwnd, uwnd10m/vwnd10m
-                    u10_name = _pick_var_name(["u10", "U10", "wndewd", "WNDEWD", "eastward_wind", "u", "uwnd", "UWND", "uwnd10m", "UWND10M"])
-                    v10_name = _pick_var_name(["v10", "V10", "wndnwd", "WNDNWD", "northward_wind", "v", "vwnd", "VWND", "vwnd10m", "VWND10M"])
-                    
-                    if not u10_name:
-                        raise KeyError(tr("missing_eastward_wind", "缺少东向风变量（u10/wndewd/uwnd）"))
-                    if not v10_name:
-                        raise KeyError(tr("missing_northward_wind", "缺少北向风变量（v10/wndnwd/vwnd）"))
-                    
-                    u10 = np.array(ds.variables[u10_name][:])
-                    v10 = np.array(ds.variables[v10_name][:])
-
-                    if time_values.size == 0:
-                        self.log_signal.emit(tr("wind_time_dimension_empty", "⚠️ 时间维度为空，无法生成风场图"))
-                        return
-
-                    times_dt = None
-                    try:
-                        units = getattr(time_var, "units", None)
-                        calendar = getattr(time_var, "calendar", "standard")
-                        if units:
-                            times_dt = num2date(time_values, units, calendar=calendar)
-                    except Exception as e:
-                        self.log_signal.emit(tr("wind_time_parse_failed", "⚠️ 时间解析失败，改用索引：{error}").format(error=e))
-                        times_dt = None
-
-                    indices = []
-                    if times_dt is not None and len(times_dt) > 0:
-                        last = None
-                        for i, t in enumerate(times_dt):
-                            if last is None or (t - last) >= timedelta(hours=step_hours) - timedelta(seconds=1):
-                                indices.append(i)
-                                last = t
-                    else:
-                        step_guess = 1
-                        if len(time_values) > 1:
-                            try:
-                                dt_seconds = float(time_values[1] - time_values[0])
-                                if dt_seconds > 0:
-                                    step_guess = max(1, int(round((step_hours * 3600) / dt_seconds)))
-                            except Exception:
-                                step_guess = 1
-                        indices = list(range(0, len(time_values), step_guess))
-
-                    if not indices:
-                        indices = [0]
-
-                    output_dir = os.path.join(self.selected_folder, "photo", "field")
-                    # 清空旧文件，再创建目录
-                    try:
-                        if os.path.exists(output_dir):
-                            for f in glob.glob(os.path.join(output_dir, "*")):
-                                try:
-                                    os.remove(f)
-                                except Exception:
-                                    pass
-                        os.makedirs(output_dir, exist_ok=True)
-                    except Exception as e:
-                        self.log_signal.emit(tr("wind_clean_output_dir_failed", "❌ 清理输出目录失败: {error}").format(error=e))
-                        QtCore.QTimer.singleShot(0, self._restore_wind_field_button)
-                        return
-
-                    lon_min, lon_max = float(np.min(longitude)), float(np.max(longitude))
-                    lat_min, lat_max = float(np.min(latitude)), float(np.max(latitude))
-                    # 不添加边距，只显示数据范围
-                    extent = [lon_min, lon_max, lat_min, lat_max]
-
-                    lon2d, lat2d = np.meshgrid(longitude, latitude)
-                    # 计算箭头/风旗密度（步长）
-                    if density is not None:
-                        q_step = max(1, int(density))
-                    else:
-                        grid_size = max(len(longitude), len(latitude))
-                        if grid_size > 300:
-                            q_step = max(1, int(grid_size / 400))
-                        elif grid_size > 150:
-                            q_step = max(1, int(grid_size / 350))
-                        elif grid_size > 80:
-                            q_step = max(1, int(grid_size / 300))
-                        else:
-                            q_step = max(1, int(grid_size / 250))
-                        q_step = max(q_step, 3)
-
-                    saved_paths = []
-                    # 上采样因子，提高背景风速图的精度
-                    UPSAMPLE_FACTOR = 3
-                    
-                    for idx in indices:
-                        u = u10[idx]
-                        v = v10[idx]
-                        speed = np.sqrt(u ** 2 + v ** 2)
-
-                        # 对风速数据进行上采样，提高显示精度
-                        if UPSAMPLE_FACTOR > 1:
-                            try:
-                                import cv2
-                                # 使用 cv2 进行双线性插值上采样
-                                speed_upsampled = cv2.resize(
-                                    speed, 
-                                    (len(longitude) * UPSAMPLE_FACTOR, len(latitude) * UPSAMPLE_FACTOR),
-                                    interpolation=cv2.INTER_LINEAR
-                                )
-                                # 对经纬度网格也进行上采样
-                                lon_upsampled = np.linspace(longitude.min(), longitude.max(), len(longitude) * UPSAMPLE_FACTOR)
-                                lat_upsampled = np.linspace(latitude.min(), latitude.max(), len(latitude) * UPSAMPLE_FACTOR)
-                                lon2d_upsampled, lat2d_upsampled = np.meshgrid(lon_upsampled, lat_upsampled)
-                                speed_plot = speed_upsampled
-                                lon2d_plot = lon2d_upsampled
-                                lat2d_plot = lat2d_upsampled
-                            except ImportError:
-                                # 如果没有 cv2，使用原始数据
-                                speed_plot = speed
-                                lon2d_plot = lon2d
-                                lat2d_plot = lat2d
-                        else:
-                            speed_plot = speed
-                            lon2d_plot = lon2d
-                            lat2d_plot = lat2d
-
-                        fig = plt.figure(figsize=(10, 8), dpi=150, facecolor='white')
-                        ax = plt.axes(projection=ccrs.PlateCarree())
-                        # 只显示风场数据覆盖的区域，不显示范围外的地图
-                        ax.set_extent(extent, crs=ccrs.PlateCarree())
-                        # 设置背景颜色为白色
-                        ax.set_facecolor('white')
-                        # 移除坐标轴，避免显示范围外的内容
-                        ax.set_axis_off()
-                        # 只添加数据范围内的海岸线
-                        ax.coastlines(resolution="50m", linewidth=0.5)
-                        # 只添加数据范围内的陆地和海洋特征
-                        # 注意：cartopy 的 add_feature 会自动裁剪到 extent 范围
-                        ax.add_feature(cfeature.OCEAN, facecolor="#a4d6ff")
-                        ax.add_feature(cfeature.LAND, facecolor="#e6e6e6")
-
-                        # 绘制等速色块图（等速图色块）
-                        from matplotlib import cm
-                        try:
-                            speed_min = float(np.nanmin(speed_plot))
-                            speed_max = float(np.nanmax(speed_plot))
-                        except Exception:
-                            speed_min, speed_max = 0.0, 0.0
-                        if speed_max <= speed_min:
-                            speed_max = speed_min + 1.0
-                        levels = np.linspace(speed_min, speed_max, 10)
-                        filled = ax.contourf(
-                            lon2d_plot,
-                            lat2d_plot,
-                            speed_plot,
-                            levels=levels,
-                            cmap=cm.get_cmap("RdBu_r"),
-                            transform=ccrs.PlateCarree()
-                        )
-                        # 叠加细的等值线便于识别梯度（可读性更好）
-                        contour_lines = ax.contour(
-                            lon2d_plot,
-                            lat2d_plot,
-                            speed_plot,
-                            levels=levels,
-                            colors="black",
-                            linewidths=0.4,
-                            alpha=0.5,
-                            transform=ccrs.PlateCarree()
-                        )
-                        ax.clabel(contour_lines, inline=True, fontsize=7, fmt="%.1f")
-
-                        # 根据标志类型选择绘制方式
-                        arrow_text = tr("plotting_wind_flag_arrow", "箭头")
-                        flag_text = tr("plotting_wind_flag_flag", "风旗")
-                        if flag == arrow_text or flag == tr("plotting_wind_flag_arrow", "箭头"):
-                            # 箭头使用黑色
-                            ax.quiver(
-                                lon2d[::q_step, ::q_step], lat2d[::q_step, ::q_step],
-                                u[::q_step, ::q_step], v[::q_step, ::q_step],
-                                color="black", scale=400, transform=ccrs.PlateCarree()
-                            )
-                        elif flag == flag_text or flag == tr("plotting_wind_flag_flag", "风旗"):
-                            # 风旗（风羽）使用 barbs
-                            ax.barbs(
-                                lon2d[::q_step, ::q_step], lat2d[::q_step, ::q_step],
-                                u[::q_step, ::q_step], v[::q_step, ::q_step],
-                                length=5, transform=ccrs.PlateCarree()
-                            )
-                        # 如果选择"无"，则不绘制任何标志
-
-                        cbar = fig.colorbar(filled, ax=ax, orientation="vertical", fraction=0.046, pad=0.04)
-                        cbar.set_label("Wind speed (m/s)")
-
-                        if times_dt is not None and len(times_dt) > idx:
-                            ts_label = times_dt[idx].strftime("%Y%m%d_%H%M%S")
-                            title_time = times_dt[idx].strftime("%Y-%m-%d %H:%M")
-                        else:
-                            ts_label = f"idx{idx:03d}"
-                            title_time = f"Index {idx}"
-
-                        ax.set_title(f"10m Wind Field ({title_time})")
-                        # 调整布局，确保只显示数据范围
-                        fig.subplots_adjust(left=0, right=1, top=0.95, bottom=0)
-                        # 使用 tight_layout 和 bbox_inches='tight' 来裁剪图片，只保留数据范围内的内容
-                        fig.tight_layout(pad=0.1)
-                        
-                        # 使用 bbox_inches='tight' 裁剪图片，只保留数据范围内的内容
-                        out_path = os.path.join(output_dir, f"wind_{ts_label}.png")
-                        fig.savefig(out_path, dpi=250, bbox_inches='tight', pad_inches=0.05, facecolor='white', edgecolor='none')
-                        saved_paths.append(out_path)
-                        plt.close(fig)
-
-                    if saved_paths:
-                        self.log_signal.emit(tr("plotting_wind_field_generated", "✅ 已生成 {count} 张风场图，保存在 {path}").format(count=len(saved_paths), path=output_dir))
-                        last_path = saved_paths[-1]
-                        QtCore.QTimer.singleShot(0, lambda path=last_path: self.open_image_file(path))
-                    else:
-                        self.log_signal.emit(tr("wind_no_images_generated", "⚠️ 未生成风场图，检查数据是否为空"))
-            except Exception as e:
-                self.log_signal.emit(tr("wind_generation_failed", "❌ 生成风场图失败: {error}").format(error=e))
-            finally:
-                # 恢复原来的后端（如果需要）
+                done = _drain_logs()
+                if not done and process.is_alive():
+                    QtCore.QTimer.singleShot(100, _poll_logs)
+                    return
+                if not done:
+                    _drain_logs()
+                process.join(timeout=5)
+
                 try:
-                    matplotlib.use(original_backend)
-                except:
-                    pass
-                QtCore.QTimer.singleShot(0, self._restore_wind_field_button)
+                    saved_paths = result_queue.get(timeout=2)
+                except Exception as e:
+                    saved_paths = None
+                    self.log_signal.emit(tr("plotting_get_result_failed", "❌ 获取结果失败：{error}").format(error=e))
+
+                if saved_paths:
+                    self.log_signal.emit(tr("plotting_wind_field_generated", "✅ 已生成 {count} 张风场图，保存在 {path}").format(count=len(saved_paths), path=output_dir))
+                    self.open_image_file(saved_paths[-1])
+                elif saved_paths is not None:
+                    self.log_signal.emit(tr("wind_no_images_generated", "⚠️ 未生成风场图，检查数据是否为空"))
+            except Exception as e:
+                self.log_signal.emit(tr("plotting_listen_process_failed", "❌ 监听子进程失败：{error}").format(error=e))
+            self._restore_wind_field_button()
 
-        threading.Thread(target=_worker, daemon=True).start()
+        QtCore.QTimer.singleShot(100, _poll_logs)
 
     def view_wind_field_images(self):
         """查看已生成的风场图（在右侧抽屉中显示）"""
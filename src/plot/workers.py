@@ -1,6 +1,8 @@
 import os
 import re
 import glob
+import time
+import platform
 import numpy as np
 import matplotlib
 import matplotlib.pyplot as plt
@@ -11,8 +13,12 @@ from matplotlib import cm
 from netCDF4 import Dataset, num2date
 import netCDF4 as nc
 from datetime import datetime, timedelta
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import cv2
 from setting.language_manager import tr
+from .jason3_data import Jason3TrackStore, Jason3Catalog, list_jason3_files, grid_along_track, GRID_STATISTICS
 try:
     import wavespectra
     from wavespectra import SpecArray
@@ -76,6 +82,130 @@ def _decode_station_names(station_name_var, n_station):
     except Exception:
         return None
 
+
+# 二维谱绘图的高分辨率方向（0.5 度间隔）
+_SPECTRUM_THETA_DEG = np.linspace(0, 360, 721)
+
+
+def _interp_spectrum_directions(efth_block, dir_orig, theta_deg=None):
+    """沿方向轴对二维谱做周期 PCHIP 插值（批量）
+
+    参数:
+        efth_block: 谱数据，形状 (..., frequency, direction)，前导维可以是时间、站点等任意批量维
+        dir_orig: 原始方向数组（度）
+        theta_deg: 插值目标方向（度），默认 0~360 每 0.5 度
+
+    返回:
+        E_interp: 形状 (..., theta, frequency)，与逐频率构造 PchipInterpolator 的结果一致
+    """
+    from scipy.interpolate import PchipInterpolator
+
+    if theta_deg is None:
+        theta_deg = _SPECTRUM_THETA_DEG
+
+    # 方向维标准化（排序与周期闭合只做一次）
+    dir0 = np.mod(np.array(dir_orig), 360)
+    idx = np.argsort(dir0)
+    dir_sort = dir0[idx]
+    dir_ext = np.concatenate([dir_sort, [dir_sort[0] + 360]])
+
+    E_sort = np.asarray(efth_block)[..., idx]
+    E_ext = np.concatenate([E_sort, E_sort[..., :1]], axis=-1)
+
+    # 所有频率/站点/时间在一次调用中沿方向轴插值（PCHIP 的斜率按列独立计算）
+    interp_func = PchipInterpolator(dir_ext, E_ext, axis=-1, extrapolate=False)
+    E_interp = np.asarray(interp_func(theta_deg), dtype=float)
+    return np.swapaxes(E_interp, -1, -2)
+
+
+def _spectrum_polar_xy(freq, theta_deg=None):
+    """极坐标（方向, 频率）→ 笛卡尔坐标，返回形状 (frequency, theta) 的 X, Y"""
+    if theta_deg is None:
+        theta_deg = _SPECTRUM_THETA_DEG
+    theta_rad = np.deg2rad(90 - theta_deg)
+    Theta, R = np.meshgrid(theta_rad, freq)
+    X = R * np.cos(Theta)
+    Y = R * np.sin(Theta)
+    return X, Y
+
+
+# 地球半径（km）与每度距离（km），与匹配结果中的“度”距离定义一致
+_EARTH_RADIUS_KM = 6371.0
+_KM_PER_DEG = 111.0
+
+
+def _haversine_deg(lat1, lon1, lat2, lon2):
+    """计算两点间的大圆距离（以 111 km 为 1 度）"""
+    lat1_rad = np.radians(lat1)
+    lon1_rad = np.radians(lon1)
+    lat2_rad = np.radians(lat2)
+    lon2_rad = np.radians(lon2)
+    dlat = lat2_rad - lat1_rad
+    dlon = lon2_rad - lon1_rad
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arcsin(np.sqrt(a))
+    return _EARTH_RADIUS_KM * c / _KM_PER_DEG
+
+
+def _lonlat_to_xyz(lon, lat):
+    """经纬度（度）转换为单位球面三维坐标，弦长与大圆距离单调对应"""
+    lon_rad = np.radians(np.asarray(lon, dtype=float))
+    lat_rad = np.radians(np.asarray(lat, dtype=float))
+    cos_lat = np.cos(lat_rad)
+    return np.column_stack((cos_lat * np.cos(lon_rad), cos_lat * np.sin(lon_rad), np.sin(lat_rad)))
+
+
+class _GridCollocator:
+    """WW3 网格点与测高点的最近邻匹配
+
+    网格点的 KD 树只建立一次；每个时间窗口先用测高点查询半径内的候选网格点，
+    再为候选网格点在测高点 KD 树中找最近点，最后用精确的大圆距离应用阈值。
+    结果与逐网格点计算全部距离后取最小值相同。
+    """
+
+    def __init__(self, lon, lat, max_dist_deg):
+        from scipy.spatial import cKDTree
+
+        self.lon = np.asarray(lon, dtype=float)
+        self.lat = np.asarray(lat, dtype=float)
+        self.max_dist_deg = float(max_dist_deg)
+        angle = min(np.pi, self.max_dist_deg * _KM_PER_DEG / _EARTH_RADIUS_KM)
+        # 弦长阈值略微放大，边界上的点交给精确距离判断
+        self.chord = 2.0 * np.sin(angle / 2.0) * (1.0 + 1e-9)
+        self.grid_tree = cKDTree(_lonlat_to_xyz(self.lon, self.lat))
+
+    def match(self, valid_mask, point_lon, point_lat):
+        """匹配一个时间窗口内的测高点
+
+        参数:
+            valid_mask: 网格点有效掩码（一维，与网格点展开顺序一致）
+            point_lon, point_lat: 测高点经纬度
+
+        返回:
+            (cell_indices, point_indices)，按网格点索引升序
+        """
+        from scipy.spatial import cKDTree
+
+        empty = np.array([], dtype=np.intp)
+        if len(point_lon) == 0:
+            return empty, empty
+
+        points_xyz = _lonlat_to_xyz(point_lon, point_lat)
+        neighbours = self.grid_tree.query_ball_point(points_xyz, self.chord, return_sorted=False)
+        candidates = [np.asarray(c, dtype=np.intp) for c in neighbours if len(c)]
+        if not candidates:
+            return empty, empty
+        cells = np.unique(np.concatenate(candidates))
+        cells = cells[valid_mask[cells]]
+        if len(cells) == 0:
+            return empty, empty
+
+        _, nearest = cKDTree(points_xyz).query(_lonlat_to_xyz(self.lon[cells], self.lat[cells]), k=1)
+        distances = _haversine_deg(self.lat[cells], self.lon[cells], point_lat[nearest], point_lon[nearest])
+        keep = distances < self.max_dist_deg
+        return cells[keep], nearest[keep]
+
+
 def _match_ww3_jason3_worker(ww3_file, jason3_path, out_folder, log_queue, result_queue, max_dist_deg=0.125, time_window_hours=0.5):
     """在子进程中执行匹配计算的独立函数"""
     try:
@@ -168,6 +298,9 @@ def _match_ww3_jason3_worker(ww3_file, jason3_path, out_folder, log_queue, resul
         lon_lat = [ww3_lon.min(), ww3_lon.max(), ww3_lat.min(), ww3_lat.max()]
         log(f"Matching region: lon[{lon_lat[0]}, {lon_lat[1]}], lat[{lon_lat[2]}, {lon_lat[3]}]")
 
+        # 网格点空间索引（所有时间步共用）
+        collocator = _GridCollocator(lon1, lat1, max_dist_deg)
+
         swh_jason3 = []
         swh_ww3 = []
         
@@ -181,169 +314,20 @@ def _match_ww3_jason3_worker(ww3_file, jason3_path, out_folder, log_queue, resul
         elif update_interval > 50:
             update_interval = 50
         
-        # 导入必要的函数（在子进程中重新导入）
-        from pathlib import Path
-        
-        def haversine_distance(lat1, lon1, lat2, lon2):
-            """计算两点间的距离（度）"""
-            lat1_rad = np.radians(lat1)
-            lon1_rad = np.radians(lon1)
-            lat2_rad = np.radians(lat2)
-            lon2_rad = np.radians(lon2)
-            dlat = lat2_rad - lat1_rad
-            dlon = lon2_rad - lon1_rad
-            a = np.sin(dlat / 2) ** 2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2) ** 2
-            c = 2 * np.arcsin(np.sqrt(a))
-            R = 6371.0
-            distance_km = R * c
-            distance_deg = distance_km / 111.0
-            return distance_deg
-        
-        def read_jason3_chen(lon_lat, timeinput, jasonpath):
-            """读取 Jason-3 数据（Chen 方法）- 子进程版本"""
-            jasonpath = Path(jasonpath)
-            timeinput = np.array(timeinput)
-            if timeinput.ndim == 2:
-                start_dt = datetime(*timeinput[0, :6].astype(int))
-                end_dt = datetime(*timeinput[1, :6].astype(int))
-            else:
-                start_dt = datetime(int(timeinput[0]), int(timeinput[1]), int(timeinput[2]), 0, 0, 0)
-                end_dt = start_dt + timedelta(days=1)
-
-            if not jasonpath.exists():
-                return {
-                    'ja_time': np.array([]),
-                    'longitude': np.array([]),
-                    'latitude': np.array([]),
-                    'wind': np.array([]),
-                    'swh': np.array([])
-                }
-
-            ncfiles = []
-            if timeinput.ndim == 1:
-                year = f"{int(timeinput[0]):04d}"
-                month = f"{int(timeinput[1]):02d}"
-                day = f"{int(timeinput[2]):02d}"
-                # 支持 JA3_GPN_ 和 JA3_IPN_ 两种格式
-                pattern_gpn = f"JA3_GPN_*{year}{month}{day}_*.nc"
-                pattern_ipn = f"JA3_IPN_*{year}{month}{day}_*.nc"
-                ncfiles = list(jasonpath.glob(pattern_gpn)) + list(jasonpath.glob(pattern_ipn))
-            else:
-                # 支持 JA3_GPN_ 和 JA3_IPN_ 两种格式
-                all_files = list(jasonpath.glob('JA3_GPN_*.nc')) + list(jasonpath.glob('JA3_IPN_*.nc'))
-                pattern = re.compile(r'(\d{8}_\d{6})_(\d{8}_\d{6})')
-                start_dt = datetime(*timeinput[0, :6].astype(int))
-                end_dt = datetime(*timeinput[1, :6].astype(int))
-                for filepath in all_files:
-                    fname = filepath.name
-                    match = pattern.search(fname)
-                    if not match:
-                        continue
-                    file_start = datetime.strptime(match.group(1), '%Y%m%d_%H%M%S')
-                    file_end = datetime.strptime(match.group(2), '%Y%m%d_%H%M%S')
-                    if file_end >= start_dt and file_start <= end_dt:
-                        ncfiles.append(filepath)
-
-            if not ncfiles:
-                return {
-                    'ja_time': np.array([]),
-                    'longitude': np.array([]),
-                    'latitude': np.array([]),
-                    'wind': np.array([]),
-                    'swh': np.array([])
-                }
-
-            ncfiles = list(set(ncfiles))
-            ncfiles.sort()
-
-            longitude_list = []
-            latitude_list = []
-            wind_list = []
-            swh_list = []
-            time_list = []
-
-            for filepath in ncfiles:
-                try:
-                    with Dataset(filepath, 'r') as nc:
-                        data_group = nc.groups['data_01']
-                        latitude_tmp = data_group.variables['latitude'][:].astype(float)
-                        longitude_tmp = data_group.variables['longitude'][:].astype(float)
-                        time_tmp = data_group.variables['time'][:].astype(float)
-                        wind_tmp = data_group.variables['wind_speed_alt_mle3'][:].astype(float)
-                        ku_group = data_group.groups['ku']
-                        swh_tmp = ku_group.variables['swh_ocean'][:].astype(float)
-                        longitude_tmp = ((longitude_tmp + 180.0) % 360.0) - 180.0
-                        idx_spatial = ((longitude_tmp >= lon_lat[0]) & (longitude_tmp <= lon_lat[1]) &
-                                       (latitude_tmp >= lon_lat[2]) & (latitude_tmp <= lon_lat[3]))
-                        if np.sum(idx_spatial) == 0:
-                            continue
-                        latitude_tmp = latitude_tmp[idx_spatial]
-                        longitude_tmp = longitude_tmp[idx_spatial]
-                        wind_tmp = wind_tmp[idx_spatial]
-                        swh_tmp = swh_tmp[idx_spatial]
-                        time_tmp = time_tmp[idx_spatial]
-                        time_tmp = time_tmp / (24 * 60 * 60)
-                        ref_date = datetime(2000, 1, 1)
-                        start_days = (start_dt - ref_date).total_seconds() / (24 * 60 * 60)
-                        end_days = (end_dt - ref_date).total_seconds() / (24 * 60 * 60)
-                        idx_time = (time_tmp >= start_days) & (time_tmp <= end_days)
-                        if np.sum(idx_time) == 0:
-                            continue
-                        latitude_tmp = latitude_tmp[idx_time]
-                        longitude_tmp = longitude_tmp[idx_time]
-                        wind_tmp = wind_tmp[idx_time]
-                        swh_tmp = swh_tmp[idx_time]
-                        time_tmp = time_tmp[idx_time]
-                        invalid_values = [0, 32767, 9999, 65535]
-                        valid_idx = (~np.isnan(swh_tmp) &
-                                     ~np.isnan(wind_tmp) &
-                                     ~np.isin(swh_tmp, invalid_values) &
-                                     ~np.isin(wind_tmp, invalid_values))
-                        if np.sum(valid_idx) == 0:
-                            continue
-                        latitude_tmp = latitude_tmp[valid_idx]
-                        longitude_tmp = longitude_tmp[valid_idx]
-                        wind_tmp = wind_tmp[valid_idx]
-                        swh_tmp = swh_tmp[valid_idx]
-                        time_tmp = time_tmp[valid_idx]
-                        if len(latitude_tmp) > 0:
-                            latitude_list.append(latitude_tmp)
-                            longitude_list.append(longitude_tmp)
-                            wind_list.append(wind_tmp)
-                            swh_list.append(swh_tmp)
-                            time_list.append(time_tmp)
-                except Exception:
-                    continue
+        # 每个 WW3 时间步的匹配时间窗口（整点 ± time_window_hours）
+        windows = []
+        for t_str in T:
+            center = datetime(int(t_str[0:4]), int(t_str[4:6]), int(t_str[6:8]), int(t_str[8:10]), 0, 0)
+            windows.append((center - timedelta(hours=time_window_hours), center + timedelta(hours=time_window_hours)))
+
+        # Jason-3 沿轨数据只读取一次，之后每个窗口为按时间的切片
+        if windows:
+            track_store = Jason3TrackStore.load(jason3_path, lon_lat,
+                                                min(w[0] for w in windows), max(w[1] for w in windows))
+        else:
+            track_store = Jason3TrackStore.empty()
+        log(tr("plotting_jason_track_store_loaded", "📂 已读取 {files} 个 Jason-3 文件，共 {points} 个有效沿轨点").format(files=track_store.file_count, points=len(track_store)))
 
-            if not latitude_list:
-                return {
-                    'ja_time': np.array([]),
-                    'longitude': np.array([]),
-                    'latitude': np.array([]),
-                    'wind': np.array([]),
-                    'swh': np.array([])
-                }
-
-            latitude = np.concatenate(latitude_list)
-            longitude = np.concatenate(longitude_list)
-            wind = np.concatenate(wind_list)
-            swh = np.concatenate(swh_list)
-            time_days = np.concatenate(time_list)
-
-            reference_date = datetime(2000, 1, 1)
-            ja_time = np.zeros((len(time_days), 6))
-            for i, days in enumerate(time_days):
-                dt = reference_date + timedelta(days=float(days))
-                ja_time[i] = [dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second]
-
-            return {
-                'ja_time': ja_time,
-                'longitude': longitude,
-                'latitude': latitude,
-                'wind': wind,
-                'swh': swh
-            }
-        
         for i in range(len(T)):
             # 动态调整更新频率，减少日志更新
             if (i + 1) % update_interval == 0 or i == 0:
@@ -351,20 +335,8 @@ def _match_ww3_jason3_worker(ww3_file, jason3_path, out_folder, log_queue, resul
                 log(tr("plotting_matching_progress", "📊 进度: {current}/{total} ({percent}%) - 已匹配 {matched} 个点").format(current=i + 1, total=len(T), percent=progress_pct, matched=total_matched))
 
             ww3_swh1 = ww3_swh[i, :, :].ravel()
-            year = int(T[i][0:4])
-            month = int(T[i][4:6])
-            day = int(T[i][6:8])
-            hour = int(T[i][8:10])
-
-            window = time_window_hours
-            timeinput = np.zeros((2, 6))
-            start_dt = datetime(year, month, day, hour, 0, 0) - timedelta(hours=window)
-            end_dt = datetime(year, month, day, hour, 0, 0) + timedelta(hours=window)
-            timeinput[0, :] = [start_dt.year, start_dt.month, start_dt.day, start_dt.hour, start_dt.minute,
-                               start_dt.second]
-            timeinput[1, :] = [end_dt.year, end_dt.month, end_dt.day, end_dt.hour, end_dt.minute, end_dt.second]
-
-            jason3 = read_jason3_chen(lon_lat, timeinput, jason3_path)
+
+            jason3 = track_store.window(*windows[i])
             j3_lat = jason3['latitude']
             j3_lon = jason3['longitude']
             j3_swh = jason3['swh']
@@ -372,23 +344,21 @@ def _match_ww3_jason3_worker(ww3_file, jason3_path, out_folder, log_queue, resul
             if len(j3_lat) == 0:
                 continue
 
-            valid_mask = ~np.isnan(ww3_swh1)
-            valid_indices = np.where(valid_mask)[0]
-            
-            if len(valid_indices) == 0:
+            # 掩码（缺测）网格点视为无效
+            valid_mask = np.ma.filled(~np.isnan(ww3_swh1), False)
+            if not valid_mask.any():
                 continue
-            
-            for j in valid_indices:
-                distances = haversine_distance(lat1[j], lon1[j], j3_lat, j3_lon)
-                min_dist = np.min(distances)
-                if min_dist < max_dist_deg:
-                    index = np.argmin(distances)
-                    swh_jason3.append(j3_swh[index])
-                    swh_ww3.append(ww3_swh1[j])
-                    total_matched += 1
 
-        swh_jason3 = np.array(swh_jason3)
-        swh_ww3 = np.array(swh_ww3)
+            # 所有有效网格点一次完成最近邻匹配
+            cells, nearest = collocator.match(valid_mask, j3_lon, j3_lat)
+            if len(cells) == 0:
+                continue
+            swh_jason3.append(j3_swh[nearest])
+            swh_ww3.append(np.ma.getdata(ww3_swh1)[cells])
+            total_matched += len(cells)
+
+        swh_jason3 = np.concatenate(swh_jason3) if swh_jason3 else np.array([])
+        swh_ww3 = np.concatenate(swh_ww3) if swh_ww3 else np.array([])
 
         log('============================================================')
         log('Matching completed!')
@@ -476,8 +446,12 @@ def _match_ww3_jason3_worker(ww3_file, jason3_path, out_folder, log_queue, resul
 
 
 def _run_jason3_swh_worker(lon_lat, time_range, jason_folder, out_folder, log_queue, result_queue,
-                           FIGSIZE=(14, 10), DPI=300, UPSAMPLE_FACTOR=5, CLIM_PCT=99):
-    """在子进程中执行 Jason-3 SWH 绘图计算的独立函数"""
+                           FIGSIZE=(14, 10), DPI=300, UPSAMPLE_FACTOR=5, CLIM_PCT=99, statistic="mean"):
+    """在子进程中执行 Jason-3 SWH 绘图计算的独立函数
+
+    statistic 为地图显示的网格统计量：mean / max / std / count。
+    所有统计量同时保存到 photo/Jason3_SWH_<开始>_<结束>_grid.npz。
+    """
     try:
         # 在子进程中加载当前语言设置
         from setting.config import load_config
@@ -518,24 +492,22 @@ def _run_jason3_swh_worker(lon_lat, time_range, jason_folder, out_folder, log_qu
         
         log("\n" + tr("plotting_jason_searching_files", "=========== Jason-3: Searching Files ==========="))
         
-        # 找到时间范围内的文件（包括GDR和IGDR）
-        time_pattern = r"(\d{8}_\d{6})_(\d{8}_\d{6})"
-        nc_files_gdr = [f for f in os.listdir(jason_folder) if f.startswith("JA3_GPN_") and f.endswith(".nc")]
-        nc_files_igdr = [f for f in os.listdir(jason_folder) if f.startswith("JA3_IPN_") and f.endswith(".nc")]
-        nc_files = nc_files_gdr + nc_files_igdr
-        
-        valid_files = []
-        local_file_ranges = []
-        
-        for f in nc_files:
-            m = re.search(time_pattern, f)
-            if not m:
-                continue
-            t1 = datetime.strptime(m.group(1), "%Y%m%d_%H%M%S")
-            t2 = datetime.strptime(m.group(2), "%Y%m%d_%H%M%S")
-            if t2 >= start_dt and t1 <= end_dt:
-                valid_files.append(f)
-                local_file_ranges.append((t1, t2))
+        # 通过目录索引找到时间范围内的文件（包括GDR和IGDR），并按经纬度范围排除不经过该区域的文件
+        try:
+            with Jason3Catalog(jason_folder) as catalog:
+                catalog.refresh(with_bbox=True, start_dt=start_dt, end_dt=end_dt)
+                file_entries = catalog.query(start_dt, end_dt, include_invalid=True)
+                region_files = {name for name, _, _ in catalog.query(start_dt, end_dt, lon_lat=[lon_min, lon_max, lat_min, lat_max])}
+                invalid_files = set(catalog.invalid_files(start_dt, end_dt))
+        except (sqlite3.Error, OSError) as e:
+            # 索引不可用（数据库被锁定或损坏）时与 query_jason3_files 相同，退回到直接列目录；
+            # 经纬度范围未知的文件视为经过该区域，无效文件在读取时跳过
+            log(tr("plotting_jason_catalog_unavailable", "⚠️ Jason-3 目录索引不可用，改为直接扫描目录：{error}").format(error=e))
+            file_entries = list_jason3_files(jason_folder, start_dt, end_dt)
+            region_files = {name for name, _, _ in file_entries}
+            invalid_files = set()
+        valid_files = [name for name, _, _ in file_entries]
+        local_file_ranges = [(t1, t2) for _, t1, t2 in file_entries]
         
         valid_files = sorted(valid_files)
         if not valid_files:
@@ -628,7 +600,7 @@ def _run_jason3_swh_worker(lon_lat, time_range, jason_folder, out_folder, log_qu
             missing_days_str = [d.strftime('%Y%m%d') for d in missing_days]
             log(tr("plotting_jason_missing_days_found", "⚠️ 发现 {count} 个缺失的天数：{days}").format(count=len(missing_days), days=', '.join(missing_days_str)))
         
-        # 读取数据
+        # 读取数据（每个文件一组数组，最后一次拼接）
         longitude = []
         latitude = []
         swh = []
@@ -641,6 +613,12 @@ def _run_jason3_swh_worker(lon_lat, time_range, jason_folder, out_folder, log_qu
         
         for fname in valid_files:
             path = os.path.join(jason_folder, fname)
+            if fname in invalid_files:
+                log(tr("plotting_jason_skip_invalid", "⚠️ 跳过无效的 Jason-3 文件：{path} -> {error}").format(path=path, error="not a valid NetCDF file"))
+                continue
+            if fname not in region_files:
+                # 索引中的经纬度范围与该区域不重叠
+                continue
             
             # 某些文件可能不是有效的 NetCDF（例如早期下载到的 HTML 登录页面），需要跳过
             try:
@@ -712,9 +690,10 @@ def _run_jason3_swh_worker(lon_lat, time_range, jason_folder, out_folder, log_qu
             if len(lat_tmp) > 0:
                 log(tr("plotting_jason_after_filter", "   去除无效值后: {count} 个有效数据点").format(count=len(lat_tmp)))
             
-            latitude.extend(lat_tmp)
-            longitude.extend(lon_tmp)
-            swh.extend(swh_tmp)
+            if len(lat_tmp) > 0:
+                latitude.append(np.ma.getdata(lat_tmp))
+                longitude.append(np.ma.getdata(lon_tmp))
+                swh.append(np.ma.filled(swh_tmp, np.nan))
         
         if len(swh) == 0:
             log(tr("plotting_jason_no_data_in_region", "❌ 该区域无 Jason-3 数据"))
@@ -750,10 +729,12 @@ def _run_jason3_swh_worker(lon_lat, time_range, jason_folder, out_folder, log_qu
             result_queue.put(None)
             return
         
-        longitude = np.array(longitude)
-        latitude = np.array(latitude)
-        # 处理 masked array，转换为普通数组并处理 NaN
-        swh = np.ma.filled(np.array(swh), np.nan)
+        longitude = np.concatenate(longitude)
+        latitude = np.concatenate(latitude)
+        swh = np.concatenate(swh)
+        # 掩码值填充为 NaN 后不参与统计
+        finite = np.isfinite(swh)
+        longitude, latitude, swh = longitude[finite], latitude[finite], swh[finite]
         
         log(tr("plotting_jason_read_success", "Jason-3 数据读取成功"))
         
@@ -761,15 +742,14 @@ def _run_jason3_swh_worker(lon_lat, time_range, jason_folder, out_folder, log_qu
         lon_grid = np.linspace(lon_min, lon_max, int((lon_max - lon_min) * UPSAMPLE_FACTOR))
         lat_grid = np.linspace(lat_min, lat_max, int((lat_max - lat_min) * UPSAMPLE_FACTOR))
         
-        SWH_grid = np.full((len(lat_grid), len(lon_grid)), np.nan)
-        
-        lon_idx = np.searchsorted(lon_grid, longitude)
-        lat_idx = np.searchsorted(lat_grid, latitude)
-        lon_idx[lon_idx >= len(lon_grid)] = len(lon_grid) - 1
-        lat_idx[lat_idx >= len(lat_grid)] = len(lat_grid) - 1
-        
-        for xi, yi, val in zip(lon_idx, lat_idx, swh):
-            SWH_grid[yi, xi] = val
+        # 一次计算每个网格的样本数、均值、最大值和标准差
+        grid_stats = grid_along_track(longitude, latitude, swh, lon_grid, lat_grid)
+        if statistic not in GRID_STATISTICS:
+            statistic = "mean"
+        if statistic == "count":
+            SWH_grid = np.where(grid_stats['count'] > 0, grid_stats['count'], np.nan).astype(float)
+        else:
+            SWH_grid = grid_stats[statistic]
         
         # 色阶
         vmax = np.nanpercentile(SWH_grid, CLIM_PCT)
@@ -778,7 +758,10 @@ def _run_jason3_swh_worker(lon_lat, time_range, jason_folder, out_folder, log_qu
         # 绘图，保存到 photo 文件夹
         photo_folder = os.path.join(out_folder, 'photo')
         os.makedirs(photo_folder, exist_ok=True)
-        out_file = os.path.join(photo_folder, f"Jason3_SWH_{start_str}_{end_str}.png")
+        stat_suffix = "" if statistic == "mean" else f"_{statistic}"
+        out_file = os.path.join(photo_folder, f"Jason3_SWH{stat_suffix}_{start_str}_{end_str}.png")
+        np.savez(os.path.join(photo_folder, f"Jason3_SWH_{start_str}_{end_str}_grid.npz"),
+                 lon=lon_grid, lat=lat_grid, **grid_stats)
         
         # 切换到 Agg 后端用于生成图片
         original_backend = matplotlib.get_backend()
@@ -802,9 +785,16 @@ def _run_jason3_swh_worker(lon_lat, time_range, jason_folder, out_folder, log_qu
         )
         
         cb = plt.colorbar(pcm, pad=0.02)
-        cb.set_label("SWH (m)")
+        cbar_labels = {
+            "mean": "SWH (m)",
+            "max": "SWH max (m)",
+            "std": "SWH std (m)",
+            "count": "Samples per cell",
+        }
+        cb.set_label(cbar_labels[statistic])
         
-        ax.set_title(f"Jason-3 SWH  ({start_str} ~ {end_str})", fontsize=14)
+        title_stat = "" if statistic == "mean" else f" [{statistic}]"
+        ax.set_title(f"Jason-3 SWH{title_stat}  ({start_str} ~ {end_str})", fontsize=14)
         
         plt.savefig(out_file, dpi=DPI, bbox_inches="tight")
         plt.close(fig)
@@ -1856,37 +1846,14 @@ def _generate_first_spectrum_worker(selected_folder, log_queue, result_queue, en
             # 获取数据 (time, station, frequency, direction)
             # efth converted to m²/Hz/deg for plotting
             E = efth[itime, istation, :, :]  # 获取 (frequency, direction)
-            E = E.T  # 转置为 (direction, frequency) 以匹配 MATLAB
             
             log(tr("plotting_processing_station", "📊 处理站点 {station}，时间：{time}").format(station=istation + 1, time=time_dt[itime].strftime('%Y-%m-%d %H:%M:%S')))
             
-            # 方向维标准化 + 周期插值
-            dir0 = dir_orig.copy()
-            dir0 = np.mod(dir0, 360)
-            idx = np.argsort(dir0)
-            dir_sort = dir0[idx]
-            E_sort = E[idx, :]
-            
-            # 周期闭合
-            dir_ext = np.concatenate([dir_sort, [dir_sort[0] + 360]])
-            n_freq = len(freq)
-            
-            # 高分辨率方向 - 0.5度间隔
-            theta_deg_full = np.linspace(0, 360, 721)
-            
-            E_interp = np.zeros((len(theta_deg_full), n_freq))
-            
-            from scipy.interpolate import PchipInterpolator
-            for i in range(n_freq):
-                E_ext = np.concatenate([E_sort[:, i], [E_sort[0, i]]])
-                interp_func = PchipInterpolator(dir_ext, E_ext, extrapolate=False)
-                E_interp[:, i] = interp_func(theta_deg_full)
+            # 方向维标准化 + 周期插值（所有频率一次完成）
+            E_interp = _interp_spectrum_directions(E, dir_orig)
             
             # 极坐标 → 笛卡尔坐标
-            theta_deg_full_rad = np.deg2rad(90 - theta_deg_full)
-            Theta, R = np.meshgrid(theta_deg_full_rad, freq)
-            X = R * np.cos(Theta)
-            Y = R * np.sin(Theta)
+            X, Y = _spectrum_polar_xy(freq)
             
             # 绘制二维谱
             fig = plt.figure(figsize=(8, 7.5), facecolor='white')
@@ -1905,70 +1872,6 @@ def _generate_first_spectrum_worker(selected_folder, log_queue, result_queue, en
                 log(tr("plotting_threshold_too_high", "⚠️ 最低能量密度 ({threshold}) 大于数据最大值 ({max})，自动调整为 0").format(threshold=threshold, max=f"{data_max:.6f}"))
                 threshold = 0.0
             
-            # 生成刻度值的函数
-            def generate_ticks(min_val, max_val):
-                range_val = max_val - min_val
-                if range_val <= 0:
-                    return np.array([min_val, max_val])
-                
-                rough_step = range_val / 6
-                if rough_step > 0:
-                    magnitude = 10 ** np.floor(np.log10(rough_step))
-                    normalized = rough_step / magnitude
-                    
-                    if normalized <= 0.5:
-                        step = 0.5 * magnitude
-                    elif normalized <= 1:
-                        step = 1 * magnitude
-                    elif normalized <= 2:
-                        step = 2 * magnitude
-                    elif normalized <= 5:
-                        step = 5 * magnitude
-                    else:
-                        step = 10 * magnitude
-                else:
-                    step = 0.1
-                
-                start = np.floor(min_val / step) * step
-                ticks = []
-                current = start
-                while current <= max_val + step * 0.01:
-                    ticks.append(current)
-                    current += step
-                
-                filtered_ticks = []
-                for tick in ticks:
-                    tick_str = f"{tick:.10f}"
-                    digits = [c for c in tick_str if c.isdigit()]
-                    if len(digits) > 0:
-                        last_digit = digits[-1]
-                        if last_digit == '0' or last_digit == '5':
-                            filtered_ticks.append(tick)
-                            continue
-                    
-                    if abs(tick - round(tick)) < 1e-10:
-                        int_val = int(round(tick))
-                        if int_val % 10 == 0 or int_val % 10 == 5:
-                            filtered_ticks.append(tick)
-                
-                if len(filtered_ticks) == 0:
-                    filtered_ticks = ticks
-                
-                filtered_ticks = sorted(set(filtered_ticks))
-                if filtered_ticks[0] > min_val:
-                    filtered_ticks.insert(0, min_val)
-                if filtered_ticks[-1] < max_val:
-                    filtered_ticks.append(max_val)
-                
-                return np.array(filtered_ticks)
-            
-            # 格式化刻度标签
-            def format_tick_label(value):
-                if abs(value) < 0.01:
-                    return f'{value:.2e}'
-                else:
-                    return f'{value:.2f}'
-            
             # 绘制等高线填充图
             levels = 200
             cmap = plt.get_cmap('jet')
@@ -2007,7 +1910,7 @@ def _generate_first_spectrum_worker(selected_folder, log_queue, result_queue, en
             # 使用调整后的阈值和最大值
             cbar_min = vmin_actual
             cbar_max = vmax_actual
-            cbar_ticks = generate_ticks(cbar_min, cbar_max)
+            cbar_ticks = _spectrum_ticks(cbar_min, cbar_max)
             if cbar_min not in cbar_ticks:
                 cbar_ticks = np.concatenate([[cbar_min], cbar_ticks])
                 cbar_ticks = np.sort(cbar_ticks)
@@ -2016,7 +1919,7 @@ def _generate_first_spectrum_worker(selected_folder, log_queue, result_queue, en
                 cbar_ticks = cbar_ticks[:-1]
             
             cbar_ticks = cbar_ticks[cbar_ticks >= cbar_min]
-            tick_labels = [format_tick_label(tick) for tick in cbar_ticks]
+            tick_labels = [_format_spectrum_tick(tick) for tick in cbar_ticks]
             
             cb = plt.colorbar(pcm, ax=ax, fraction=0.03, pad=0.1, ticks=cbar_ticks)
             cb.set_ticklabels(tick_labels)
@@ -2118,8 +2021,507 @@ def _sanitize_filename(name):
         return "station"
     return name
 
+def _spectrum_ticks(min_val, max_val):
+    """生成颜色条刻度值（末位为 0 或 5，并移除非正值）"""
+    range_val = max_val - min_val
+    if range_val <= 0:
+        return np.array([min_val, max_val])
+
+    rough_step = range_val / 6
+    if rough_step > 0:
+        magnitude = 10 ** np.floor(np.log10(rough_step))
+        normalized = rough_step / magnitude
+
+        if normalized <= 0.5:
+            step = 0.5 * magnitude
+        elif normalized <= 1:
+            step = 1 * magnitude
+        elif normalized <= 2:
+            step = 2 * magnitude
+        elif normalized <= 5:
+            step = 5 * magnitude
+        else:
+            step = 10 * magnitude
+    else:
+        step = 0.1
+
+    start = np.floor(min_val / step) * step
+    ticks = []
+    current = start
+    while current <= max_val + step * 0.01:
+        ticks.append(current)
+        current += step
+
+    filtered_ticks = []
+    for tick in ticks:
+        tick_str = f"{tick:.10f}"
+        digits = [c for c in tick_str if c.isdigit()]
+        if len(digits) > 0:
+            last_digit = digits[-1]
+            if last_digit == '0' or last_digit == '5':
+                filtered_ticks.append(tick)
+                continue
+
+        if abs(tick - round(tick)) < 1e-10:
+            int_val = int(round(tick))
+            if int_val % 10 == 0 or int_val % 10 == 5:
+                filtered_ticks.append(tick)
+
+    if len(filtered_ticks) == 0:
+        filtered_ticks = ticks
+
+    filtered_ticks = sorted(set(filtered_ticks))
+    if filtered_ticks[0] > min_val:
+        filtered_ticks.insert(0, min_val)
+    if filtered_ticks[-1] < max_val:
+        filtered_ticks.append(max_val)
+
+    # 移除0值（如果存在，参考 plot_directional_spectrum.py）
+    # 注意：对于归一化模式，0值会在 _spectrum_normalized_cbar_ticks 中单独处理
+    filtered_ticks = [tick for tick in filtered_ticks if tick > 0]
+
+    # 如果移除0后列表为空，至少保留最小值（如果大于0）
+    if len(filtered_ticks) == 0 and min_val > 0:
+        filtered_ticks = [min_val]
+
+    return np.array(filtered_ticks)
+
+
+def _format_spectrum_tick(value):
+    """格式化颜色条刻度标签"""
+    if abs(value) < 0.01:
+        return f'{value:.2e}'
+    else:
+        return f'{value:.2f}'
+
+
+def _spectrum_normalized_cbar_ticks(data_min, data_max):
+    """
+    计算颜色条的归一化刻度值（参考 plot_directional_spectrum.py）
+
+    参数:
+        data_min: 数据最小值
+        data_max: 数据最大值
+
+    返回:
+        cbar_ticks: 归一化后的刻度值数组（0到1之间）
+    """
+    # 生成原始数据的刻度值
+    raw_ticks = _spectrum_ticks(data_min, data_max)
+
+    # 将刻度值归一化到 [0, 1] 范围（除以最大值）
+    normalized_ticks = raw_ticks / data_max if data_max > 0 else raw_ticks
+
+    # 计算最小值的归一化值
+    min_normalized = data_min / data_max if data_max > 0 else data_min
+
+    # 确保颜色条底部有足够的刻度显示
+    filtered_normalized = []
+
+    # 检查第一个归一化刻度值是否离底部太远
+    first_normalized = normalized_ticks[0] if len(normalized_ticks) > 0 else 1.0
+
+    # 如果第一个归一化刻度值大于0.1，说明底部有很大一段没有刻度
+    if first_normalized > 0.1:
+        first_raw = raw_ticks[0] if len(raw_ticks) > 0 else data_max
+        bottom_range = first_raw - data_min
+        if bottom_range > 0:
+            ticks_above = len([t for t in normalized_ticks if t > first_normalized])
+            n_bottom_ticks = max(ticks_above + 2, 5)
+
+            bottom_raw_ticks = _spectrum_ticks(data_min, first_raw)
+            if len(bottom_raw_ticks) < n_bottom_ticks and bottom_range > 0:
+                bottom_raw_ticks = np.linspace(data_min, first_raw, n_bottom_ticks + 1)[1:-1]
+
+            bottom_normalized = bottom_raw_ticks / data_max if data_max > 0 else bottom_raw_ticks
+            bottom_normalized_filtered = [t for t in bottom_normalized if t >= 0.005]
+
+            if len(bottom_normalized_filtered) < n_bottom_ticks - 1:
+                bottom_normalized_filtered = [t for t in bottom_normalized if t > 0]
+
+            if len(bottom_normalized_filtered) == 0 and len(bottom_normalized) > 0:
+                bottom_normalized_filtered = sorted(bottom_normalized)[:min(3, len(bottom_normalized))]
+
+            filtered_normalized.extend(bottom_normalized_filtered)
+    elif data_min > 0 and min_normalized > 0:
+        if min_normalized >= 0.01:
+            filtered_normalized.append(min_normalized)
+        elif data_max - data_min < data_max * 0.1:
+            filtered_normalized.append(min_normalized)
+
+    # 使用动态阈值过滤刻度值
+    if min_normalized < 0.01:
+        threshold = 0.1
+    elif min_normalized < 0.05:
+        threshold = 0.05
+    else:
+        threshold = 0.01
+
+    for tick in normalized_ticks:
+        if tick >= threshold and tick not in filtered_normalized:
+            filtered_normalized.append(tick)
+
+    if len(filtered_normalized) < 3:
+        threshold = max(0.01, threshold * 0.5)
+        existing_bottom = [t for t in filtered_normalized if t < threshold]
+        filtered_normalized = existing_bottom if existing_bottom else []
+        for tick in normalized_ticks:
+            if tick >= threshold and tick not in filtered_normalized:
+                filtered_normalized.append(tick)
+
+    # 确保包含最大值（归一化后为1.0）
+    if len(filtered_normalized) == 0 or (len(filtered_normalized) > 0 and filtered_normalized[-1] < 0.99):
+        if data_max > 0:
+            filtered_normalized.append(1.0)
+    # 对于归一化模式，确保包含0（最小值）
+    if data_min == 0.0 and (len(filtered_normalized) == 0 or filtered_normalized[0] > 0.01):
+        filtered_normalized.insert(0, 0.0)
+
+    # 去重并排序
+    cbar_ticks = np.array(sorted(set(filtered_normalized)))
+
+    return cbar_ticks
+
+
+def _is_normalized_plot_mode(plot_mode):
+    """检查是否为归一化绘制模式（支持中英文翻译）"""
+    normalized_text_zh = tr("plotting_plot_mode_normalized", "最大值归一化")
+    normalized_text_en = "Max Normalized"  # 英文翻译
+    return (plot_mode == "最大值归一化" or
+            plot_mode == normalized_text_zh or
+            plot_mode == normalized_text_en or
+            plot_mode == "normalized")
+
+
+def _plot_normalized_spectrum(E_original, freq_orig, dir_orig, title, output_file):
+    """使用 wavespectra 框架绘制归一化二维谱图（参考 plot_directional_spectrum.py）
+
+    参数:
+        E_original: 原始能量密度数据 (frequency, direction)
+        freq_orig: 原始频率数组
+        dir_orig: 原始方向数组
+        title: 图标题
+        output_file: 输出文件路径
+    """
+    import xarray as xr
+
+    # 创建 xarray DataArray（wavespectra 需要）
+    # E_original 应该是 (frequency, direction) 形状
+    # wavespectra 期望 (freq, dir) 坐标
+    efth_da = xr.DataArray(
+        E_original,  # (freq, dir)
+        dims=['freq', 'dir'],
+        coords={'freq': freq_orig, 'dir': dir_orig},
+        name='efth'
+    )
+
+    # 转换为 SpecArray
+    spec_array = SpecArray(efth_da)
+
+    # 计算数据范围，用于生成颜色条刻度
+    data_min = float(np.nanmin(E_original))
+    data_max = float(np.nanmax(E_original))
+
+    # 使用函数计算归一化后的颜色条刻度值
+    cbar_ticks = _spectrum_normalized_cbar_ticks(data_min, data_max)
+
+    # 使用 jet 颜色映射（参考文件）
+    cmap = plt.get_cmap('jet')
+
+    # 使用 wavespectra 的 plot 方法绘制（自动归一化）
+    # 计算 rmax（最大频率）
+    rmax = np.max(freq_orig)
+
+    # 计算频率刻度（参考文件使用 [0.04,0.1,0.25,0.59]）
+    freq_target = np.array([0.04, 0.1, 0.25, 0.59])
+    radii_ticks = freq_target[freq_target <= rmax].tolist()
+    if len(radii_ticks) == 0:
+        radii_ticks = [rmax * 0.2, rmax * 0.4, rmax * 0.6, rmax * 0.8]
+
+    pobj = spec_array.plot(
+        figsize=(10, 10),
+        cmap=cmap,
+        rmax=rmax if rmax <= 3 else 3,
+        radii_ticks=radii_ticks if len(radii_ticks) > 0 else None
+    )
+
+    # 获取当前图形和坐标轴
+    fig = plt.gcf()
+    ax = plt.gca()
+
+    # 保持图像不变：0度在底部（南），顺时针方向（参考文件）
+    ax.set_theta_zero_location('S')
+    ax.set_theta_direction(-1)
+
+    # 只修改标签文本，让0度标签显示在顶部位置（参考文件）
+    angles_deg = np.arange(0, 360, 30)
+    label_texts = []
+    for angle in angles_deg:
+        label_angle = (angle + 180) % 360
+        label_texts.append(f'{int(label_angle)}°')
+
+    # 设置标签，保持网格位置不变（角度位置不变）
+    ax.set_thetagrids(angles_deg, labels=label_texts)
+
+    # 设置标题，显示站点信息
+    ax.set_title(title, fontsize=10, pad=20)
+
+    # 修改颜色条刻度（wavespectra 自动归一化，刻度值应该是归一化的）
+    # wavespectra 的 plot 方法会自动创建颜色条，尝试找到它
+    cb = None
+    # 方法1：从 pobj 对象获取（如果可用）
+    if hasattr(pobj, 'handles') and hasattr(pobj.handles, 'colorbar'):
+        cb = pobj.handles.colorbar
+    # 方法2：从 pobj 的 mappable 对象获取颜色条
+    if cb is None and hasattr(pobj, 'mappable'):
+        try:
+            cb = fig.colorbar(pobj.mappable, ax=ax)
+        except:
+            pass
+    # 方法3：从 figure 的所有子对象中查找（使用 hasattr 检查颜色条特征）
+    if cb is None:
+        for item in fig.axes:
+            # 颜色条通常有这些方法：set_ticks, set_ticklabels, set_label, update_normal
+            if (hasattr(item, 'set_ticks') and hasattr(item, 'set_ticklabels') and
+                hasattr(item, 'set_label') and hasattr(item, 'update_normal')):
+                cb = item
+                break
+    # 方法4：从 figure 的所有子对象中查找（通过 get_children，检查颜色条特征）
+    if cb is None:
+        for item in fig.get_children():
+            if (hasattr(item, 'set_ticks') and hasattr(item, 'set_ticklabels') and
+                hasattr(item, 'set_label') and hasattr(item, 'update_normal')):
+                cb = item
+                break
+
+    # 如果找到了颜色条，修改其刻度
+    if cb is not None:
+        try:
+            # 设置归一化刻度
+            cb.set_ticks(cbar_ticks)
+            tick_labels = [_format_spectrum_tick(tick) for tick in cbar_ticks]
+            cb.set_ticklabels(tick_labels)
+            cb.set_label('Normalized Energy Density', fontsize=9)
+            if hasattr(cb, 'ax'):
+                cb.ax.tick_params(labelsize=9)
+        except Exception as e:
+            # 如果修改颜色条失败，记录但不中断执行（wavespectra 可能有自己的颜色条实现）
+            pass
+
+    # 保存图片
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=400, bbox_inches='tight',
+                facecolor='white', edgecolor='none', pad_inches=0.1)
+    plt.close(fig)
+
+
+class _SpectrumFigureTemplate:
+    """实际值模式二维谱图的可复用图形模板
+
+    极坐标径向轴、频率同心圆和方向标签只绘制一次，
+    每张图只替换等值线填充、颜色条和标题后保存，避免逐张创建 figure。
+    """
+
+    def __init__(self, freq):
+        self.X, self.Y = _spectrum_polar_xy(freq)
+        self.cmap = plt.get_cmap('jet')
+        self.cmap.set_under('white')
+        self.pcm = None
+
+        self.fig = plt.figure(figsize=(8, 7.5), facecolor='white')
+        ax = self.fig.add_axes([0.08, 0.08, 0.68, 0.84])
+        self.ax = ax
+
+        # 颜色条坐标轴（与 plt.colorbar(pcm, ax=ax, fraction=0.03, pad=0.1) 的布局相同）
+        self.cax, self.cbar_kw = colorbar.make_axes(ax, fraction=0.03, pad=0.1)
+
+        ax.set_aspect('equal')
+        ax.axis('off')
+
+        # 极坐标方向标注
+        dirs = np.arange(0, 360, 30)
+        rmax = np.max(freq)
+
+        # 绘制径向轴
+        for ang in dirs:
+            theta_rad = np.deg2rad(90 - ang)
+            ax.plot([0, rmax * np.cos(theta_rad)],
+                   [0, rmax * np.sin(theta_rad)],
+                   color='black', linewidth=0.5, alpha=0.5, linestyle='--')
+
+        # 频率同心圆
+        freq_target = np.array([0.1, 0.2, 0.3, 0.4, 0.5, 0.6])
+        freq_max = np.max(freq)
+        freq_plot = freq_target[freq_target <= freq_max]
+
+        th = np.linspace(0, 2 * np.pi, 360)
+        for rr in freq_plot:
+            ax.plot(rr * np.cos(th), rr * np.sin(th), 'k:', linewidth=0.5, linestyle='--', alpha=0.5)
+            ax.text(0, rr * 1.03, f'{rr:.2f}',
+                    ha='center', va='bottom', fontsize=6, color='black', alpha=0.5)
+
+        # 外圈
+        ax.plot(freq_max * np.cos(th), freq_max * np.sin(th), 'k-', linewidth=1.0, alpha=0.8, zorder=1)
+
+        # 角度标签：在文字位置绘制白色圆形背景和文字
+        for ang in dirs:
+            x_pos = rmax * 1.12 * np.cos(np.deg2rad(90 - ang))
+            y_pos = rmax * 1.12 * np.sin(np.deg2rad(90 - ang))
+            circle_radius = 0.02 * freq_max
+            circle = plt.Circle((x_pos, y_pos), circle_radius, color='white',
+                               edgecolor='none', zorder=2)
+            ax.add_patch(circle)
+            ax.text(x_pos, y_pos, f'{int(ang)}°', fontsize=10, ha='center', va='center', zorder=3)
+
+        # 调整颜色条高度
+        ax_pos = ax.get_position()
+        cbar_pos = self.cax.get_position()
+        self.cax.set_position([cbar_pos.x0, ax_pos.y0, cbar_pos.width, ax_pos.height])
+
+    def render(self, E_interp, threshold, title, output_file):
+        """绘制一张谱图并保存到 output_file"""
+        data_max = np.nanmax(E_interp)
+
+        # 检查阈值
+        adjusted_threshold = float(threshold)
+        if adjusted_threshold > data_max:
+            adjusted_threshold = 0.0
+
+        # 确保 vmin <= vmax
+        vmin_actual = min(adjusted_threshold, data_max)
+        vmax_actual = data_max
+        if vmin_actual >= vmax_actual:
+            vmin_actual = 0.0
+            if vmax_actual <= vmin_actual:
+                vmax_actual = max(1e-10, abs(data_max))
+
+        # 移除上一张图的等值线填充
+        if self.pcm is not None:
+            self.pcm.remove()
+            self.pcm = None
+
+        # zorder 低于外圈（zorder=1），与先画等值线再画装饰的层次一致
+        levels = 200
+        try:
+            self.pcm = self.ax.contourf(self.X, self.Y, E_interp.T, levels=levels, cmap=self.cmap,
+                                        vmin=vmin_actual, vmax=vmax_actual, extend='neither', zorder=0.9)
+        except ValueError as e:
+            error_msg = str(e).lower()
+            if "minvalue" in error_msg or "maxvalue" in error_msg or "vmin" in error_msg or "vmax" in error_msg:
+                vmin_actual = 0.0
+                vmax_actual = max(data_max, 1e-10)
+                self.pcm = self.ax.contourf(self.X, self.Y, E_interp.T, levels=levels, cmap=self.cmap,
+                                            vmin=vmin_actual, vmax=vmax_actual, extend='neither', zorder=0.9)
+            else:
+                raise
+
+        # 颜色条
+        cbar_min = vmin_actual
+        cbar_max = vmax_actual
+        cbar_ticks = _spectrum_ticks(cbar_min, cbar_max)
+        if cbar_min not in cbar_ticks:
+            cbar_ticks = np.concatenate([[cbar_min], cbar_ticks])
+            cbar_ticks = np.sort(cbar_ticks)
+        if len(cbar_ticks) > 1:
+            cbar_ticks = cbar_ticks[:-1]
+        cbar_ticks = cbar_ticks[cbar_ticks >= cbar_min]
+        tick_labels = [_format_spectrum_tick(tick) for tick in cbar_ticks]
+
+        self.cax.clear()
+        cb = self.fig.colorbar(self.pcm, cax=self.cax, ticks=cbar_ticks, **self.cbar_kw)
+        cb.set_ticklabels(tick_labels)
+        cb.set_label('Energy Density (m²/Hz/deg)', fontsize=9)
+        cb.ax.tick_params(labelsize=9)
+
+        # 标题
+        self.ax.set_title(title, fontsize=10, pad=10)
+
+        # 保存图片
+        self.fig.savefig(output_file, dpi=400, bbox_inches='tight',
+                         facecolor='white', edgecolor='none', pad_inches=0.1)
+
+
+def _peak_rss_mb():
+    """当前进程的峰值常驻内存（MB），平台不支持时返回 None"""
+    try:
+        import resource
+        import sys
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    if sys.platform == 'darwin':
+        return peak / (1024.0 * 1024.0)
+    return peak / 1024.0
+
+
+# 谱图渲染进程的状态（每个进程初始化一次）
+_SPECTRUM_RENDER_STATE = {}
+
+
+def _init_spectrum_render_process(spec_file, freq, dir_orig, energy_threshold, use_wavespectra):
+    """谱图渲染进程初始化：打开一次谱文件，并创建一个可复用的图形模板"""
+    matplotlib.use("Agg")
+    _close_spectrum_render_process()
+    ds = nc.Dataset(spec_file, 'r')
+    _SPECTRUM_RENDER_STATE.update({
+        'ds': ds,
+        'efth': ds.variables['efth'],
+        'freq': freq,
+        'dir_orig': dir_orig,
+        'threshold': energy_threshold,
+        'use_wavespectra': use_wavespectra,
+        'template': None if use_wavespectra else _SpectrumFigureTemplate(freq),
+    })
+
+
+def _close_spectrum_render_process():
+    """释放谱图渲染进程持有的文件和图形"""
+    ds = _SPECTRUM_RENDER_STATE.get('ds')
+    if ds is not None:
+        try:
+            ds.close()
+        except Exception:
+            pass
+    template = _SPECTRUM_RENDER_STATE.get('template')
+    if template is not None:
+        plt.close(template.fig)
+    _SPECTRUM_RENDER_STATE.clear()
+
+
+def _render_spectrum_job(job):
+    """渲染单个 (时间, 站点) 谱图
+
+    参数:
+        job: (itime, istation, title, output_file)
+
+    返回:
+        (itime, istation, error, peak_mb)，成功时 error 为 None
+    """
+    itime, istation, title, output_file = job
+    state = _SPECTRUM_RENDER_STATE
+    error = None
+    try:
+        # 只读取当前 (time, station) 的谱块 (frequency, direction)
+        # WW3 efth units: m²·s·rad⁻¹ == m²/Hz/rad -> convert to m²/Hz/deg for plotting
+        E_original = state['efth'][itime, istation, :, :] * (np.pi / 180.0)
+
+        if state['use_wavespectra']:
+            _plot_normalized_spectrum(E_original, state['freq'], state['dir_orig'], title, output_file)
+        else:
+            E_interp = _interp_spectrum_directions(E_original, state['dir_orig'])
+            state['template'].render(E_interp, state['threshold'], title, output_file)
+    except Exception as e:
+        error = str(e)
+    return itime, istation, error, _peak_rss_mb()
+
+
 def _generate_all_spectrum_worker(selected_folder, log_queue, result_queue, energy_threshold=0.01, spec_file=None, time_step_hours=24, plot_mode="最大值归一化", station_names=None):
-    """生成所有二维谱图的 worker 函数（所有站点、根据时间步长筛选的时间）"""
+    """生成所有二维谱图的 worker 函数（所有站点、根据时间步长筛选的时间）
+
+    efth 按 (时间, 站点) 逐块读取；(站点, 时间) 任务分发到进程池，
+    每个进程复用一个图形模板，进度按任务顺序汇报。
+    """
     station_name_var = None
     try:
         def log(msg):
@@ -2128,8 +2530,189 @@ def _generate_all_spectrum_worker(selected_folder, log_queue, result_queue, ener
                 log_queue.put(msg)
             except:
                 pass
-        
+
         # 精简日志：不输出开始提示
+        start_time = time.perf_counter()
+
+        # 如果指定了文件，使用指定的文件；否则查找 ww3*spec*nc 格式的文件
+        if spec_file and os.path.exists(spec_file):
+            spec_files = [spec_file]
+        else:
+            spec_files = glob.glob(os.path.join(selected_folder, "ww3*spec*nc"))
+
+        if not spec_files:
+            log(tr("plotting_spectrum_file_not_found", "❌ 未找到二维谱文件，请先选择文件"))
+            log_queue.put("__DONE__")
+            result_queue.put(None)
+            return
+
+        spec_file = spec_files[0]
+
+        # 切换到 Agg 后端用于生成图片
+        original_backend = matplotlib.get_backend()
+        matplotlib.use("Agg")
+
+        try:
+            # 读取 NetCDF 文件的坐标信息（efth 在渲染进程中按块读取）
+            with nc.Dataset(spec_file, 'r') as ds:
+                freq = ds.variables['frequency'][:].data  # Hz
+                dir_orig = ds.variables['direction'][:].data  # degree
+                time_values = ds.variables['time'][:].data
+
+                # 读取站点信息
+                lon = ds.variables['longitude'][:].data
+                lat = ds.variables['latitude'][:].data
+                nStation = len(ds.dimensions['station'])
+                station_name_var = ds.variables['station_name'][:] if 'station_name' in ds.variables else None
+
+            # 转换时间
+            t0 = datetime(1990, 1, 1, 0, 0, 0)
+            time_dt = [t0 + timedelta(days=float(t)) for t in time_values]
+
+            # 根据时间步长筛选时间步
+            time_step_hours_float = float(time_step_hours)
+            selected_time_indices = []
+
+            if len(time_dt) > 0:
+                # 第一个时间步总是包含
+                selected_time_indices.append(0)
+                last_selected_time = time_dt[0]
+
+                # 从第二个时间步开始，选择间隔大于等于 time_step_hours 的时间步
+                for i in range(1, len(time_dt)):
+                    time_diff = (time_dt[i] - last_selected_time).total_seconds() / 3600.0
+                    if time_diff >= time_step_hours_float:
+                        selected_time_indices.append(i)
+                        last_selected_time = time_dt[i]
+
+            nSelectedTime = len(selected_time_indices)
+
+            if nSelectedTime == 0:
+                log(tr("plotting_no_valid_timesteps", "❌ 没有符合时间步长要求的时间步"))
+                log_queue.put("__DONE__")
+                result_queue.put(None)
+                return
+
+            # 创建输出目录（保存到 photo/spectrum）
+            photo_folder = os.path.join(selected_folder, 'photo', 'spectrum')
+            os.makedirs(photo_folder, exist_ok=True)
+
+            # 优先使用文件中的站点名称，避免 UI 排序/编辑导致错位
+            file_station_names = _decode_station_names(station_name_var, nStation)
+            if file_station_names and any(file_station_names):
+                station_name_list = file_station_names
+            elif station_names and len(station_names) >= nStation:
+                station_name_list = station_names
+            else:
+                station_name_list = [f"station_{i+1:03d}" for i in range(nStation)]
+
+            # 构建 (时间, 站点) 任务列表
+            jobs = []
+            for itime in selected_time_indices:
+                time_str = time_dt[itime].strftime("%Y-%m-%d %H:%M:%S")
+                time_str_file = time_dt[itime].strftime("%Y%m%d_%H%M%S")
+                for istation in range(nStation):
+                    lon_val, lat_val = _pick_station_lon_lat(lon, lat, istation, nStation)
+                    title = f'Lon: {lon_val:.2f}°, Lat: {lat_val:.2f}°            {time_str}'
+
+                    # 生成输出文件名（使用站点名称）
+                    station_name = _sanitize_filename(station_name_list[istation])
+                    output_file = os.path.join(photo_folder,
+                                              f'spectrum_{station_name}_time_{time_str_file}.png')
+                    jobs.append((itime, istation, title, output_file))
+
+            # 归一化模式使用 wavespectra 绘制，否则使用可复用的手动绘制模板
+            use_wavespectra = _is_normalized_plot_mode(plot_mode) and HAS_WAVESPECTRA
+            init_args = (spec_file, freq, dir_orig, energy_threshold, use_wavespectra)
+
+            total_count = len(jobs)
+            n_workers = max(1, min((os.cpu_count() or 1) - 1, total_count))
+            current_count = 0
+            success_count = 0
+            peak_mb = _peak_rss_mb()
+
+            executor = None
+            if n_workers > 1:
+                try:
+                    executor = ProcessPoolExecutor(max_workers=n_workers,
+                                                   initializer=_init_spectrum_render_process,
+                                                   initargs=init_args)
+                except Exception as e:
+                    log(tr("plotting_spectrum_pool_fallback", "⚠️ 无法启动进程池，改为单进程绘制：{error}").format(error=e))
+                    executor = None
+
+            def consume(results):
+                """按任务顺序汇报结果；峰值内存取各进程峰值的最大值"""
+                nonlocal current_count, success_count, peak_mb
+                for itime, istation, error, job_peak_mb in results:
+                    current_count += 1
+                    if job_peak_mb is not None:
+                        peak_mb = max(peak_mb or 0.0, job_peak_mb)
+
+                    if error is not None:
+                        log(tr("plotting_generate_station_timestep_failed", "❌ 生成站点 {station} 时间步 {timestep} 失败：{error}").format(station=istation+1, timestep=itime+1, error=error))
+                        continue
+
+                    success_count += 1
+
+                    # 生成进度（每10张或最后一张）
+                    if current_count % 10 == 0 or current_count == total_count:
+                        log(tr("plotting_progress_all_spectrum", "📊 进度：{current}/{total} ({success} 成功)").format(current=current_count, total=total_count, success=success_count))
+
+            try:
+                if executor is not None:
+                    try:
+                        # map 按提交顺序返回结果，保证进度有序
+                        chunksize = max(1, min(16, total_count // (n_workers * 4)))
+                        consume(executor.map(_render_spectrum_job, jobs, chunksize=chunksize))
+                    except BrokenProcessPool as e:
+                        # 渲染进程异常退出（例如内存不足被终止）：剩余任务改为单进程绘制
+                        log(tr("plotting_spectrum_pool_broken", "⚠️ 渲染进程异常退出，剩余 {count} 张改为单进程绘制：{error}").format(count=total_count - current_count, error=e))
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        executor = None
+                else:
+                    n_workers = 1
+                if executor is None:
+                    _init_spectrum_render_process(*init_args)
+                    consume(map(_render_spectrum_job, jobs[current_count:]))
+            finally:
+                if executor is not None:
+                    executor.shutdown(wait=True)
+                else:
+                    _close_spectrum_render_process()
+
+            elapsed = time.perf_counter() - start_time
+            memory_text = f"{peak_mb:.0f} MB" if peak_mb is not None else "N/A"
+            log(tr("plotting_spectrum_run_stats", "⏱️ 二维谱绘图耗时 {elapsed:.1f} 秒，各进程峰值内存的最大值 {memory}（{workers} 个进程）").format(elapsed=elapsed, memory=memory_text, workers=n_workers))
+
+            result_queue.put(photo_folder)
+
+        finally:
+            # 恢复后端
+            matplotlib.use(original_backend)
+
+        log_queue.put("__DONE__")
+
+    except Exception as e:
+        import traceback
+        log_queue.put(tr("plotting_generate_all_spectrum_failed", "❌ 生成所有二维谱图失败：{error}").format(error=e))
+        log_queue.put(traceback.format_exc())
+        result_queue.put(None)
+        log_queue.put("__DONE__")
+
+
+def _generate_selected_spectrum_worker(selected_folder, log_queue, result_queue, energy_threshold=0.01, spec_file=None, time_step_hours=24, station_index=0, plot_mode="最大值归一化", station_name=None):
+    """生成选中站点的二维谱图 worker 函数（单个站点、根据时间步长筛选的时间）"""
+    station_name_var = None
+    try:
+        def log(msg):
+            """发送日志到队列"""
+            try:
+                log_queue.put(msg)
+            except:
+                pass
+        
+        log(tr("plotting_start_selected_spectrum", "🔄 开始生成选中站点的二维谱图（站点索引：{index}，时间步长：{hours}小时，在子进程中执行）...").format(index=station_index, hours=time_step_hours))
         
         # 如果指定了文件，使用指定的文件；否则查找 ww3*spec*nc 格式的文件
         if spec_file and os.path.exists(spec_file):
@@ -2165,6 +2748,13 @@ def _generate_all_spectrum_worker(selected_folder, log_queue, result_queue, ener
                 nTime = len(time)
                 station_name_var = ds.variables['station_name'][:] if 'station_name' in ds.variables else None
             
+            # 检查站点索引是否有效
+            if station_index < 0 or station_index >= nStation:
+                log(tr("plotting_invalid_station_index", "❌ 站点索引 {index} 无效，文件中共有 {total} 个站点").format(index=station_index, total=nStation))
+                log_queue.put("__DONE__")
+                result_queue.put(None)
+                return
+            
             # 转换时间
             t0 = datetime(1990, 1, 1, 0, 0, 0)
             time_dt = [t0 + timedelta(days=float(t)) for t in time]
@@ -2197,911 +2787,22 @@ def _generate_all_spectrum_worker(selected_folder, log_queue, result_queue, ener
             photo_folder = os.path.join(selected_folder, 'photo', 'spectrum')
             os.makedirs(photo_folder, exist_ok=True)
             
-            # 生成刻度值的函数（与第一个函数相同）
-            def generate_ticks(min_val, max_val):
-                range_val = max_val - min_val
-                if range_val <= 0:
-                    return np.array([min_val, max_val])
-                
-                rough_step = range_val / 6
-                if rough_step > 0:
-                    magnitude = 10 ** np.floor(np.log10(rough_step))
-                    normalized = rough_step / magnitude
-                    
-                    if normalized <= 0.5:
-                        step = 0.5 * magnitude
-                    elif normalized <= 1:
-                        step = 1 * magnitude
-                    elif normalized <= 2:
-                        step = 2 * magnitude
-                    elif normalized <= 5:
-                        step = 5 * magnitude
-                    else:
-                        step = 10 * magnitude
-                else:
-                    step = 0.1
-                
-                start = np.floor(min_val / step) * step
-                ticks = []
-                current = start
-                while current <= max_val + step * 0.01:
-                    ticks.append(current)
-                    current += step
+            # 绘制单个二维谱图（辅助函数）
+            def plot_single_spectrum(X, Y, E_interp, threshold, lon_val, lat_val, time_str, output_file, plot_mode="最大值归一化", E_original=None, freq_orig=None, dir_orig=None):
+                """绘制单个二维谱图（归一化模式使用 wavespectra 框架）"""
+                # 复用 _generate_all_spectrum_worker 中的相同实现
+                # 这里直接调用相同的逻辑，避免代码重复
+                # 检查是否为归一化模式（支持中英文翻译）
+                normalized_text_zh = tr("plotting_plot_mode_normalized", "最大值归一化")
+                normalized_text_en = "Max Normalized"  # 英文翻译
+                is_normalized = (plot_mode == "最大值归一化" or 
+                                plot_mode == normalized_text_zh or 
+                                plot_mode == normalized_text_en or
+                                plot_mode == "normalized")
                 
-                filtered_ticks = []
-                for tick in ticks:
-                    tick_str = f"{tick:.10f}"
-                    digits = [c for c in tick_str if c.isdigit()]
-                    if len(digits) > 0:
-                        last_digit = digits[-1]
-                        if last_digit == '0' or last_digit == '5':
-                            filtered_ticks.append(tick)
-                            continue
-                    
-                    if abs(tick - round(tick)) < 1e-10:
-                        int_val = int(round(tick))
-                        if int_val % 10 == 0 or int_val % 10 == 5:
-                            filtered_ticks.append(tick)
-                
-                if len(filtered_ticks) == 0:
-                    filtered_ticks = ticks
-                
-                filtered_ticks = sorted(set(filtered_ticks))
-                if filtered_ticks[0] > min_val:
-                    filtered_ticks.insert(0, min_val)
-                if filtered_ticks[-1] < max_val:
-                    filtered_ticks.append(max_val)
-                
-                # 移除0值（如果存在，参考 plot_directional_spectrum.py）
-                # 注意：对于归一化模式，0值会在 calculate_cbar_ticks 中单独处理
-                filtered_ticks = [tick for tick in filtered_ticks if tick > 0]
-                
-                # 如果移除0后列表为空，至少保留最小值（如果大于0）
-                if len(filtered_ticks) == 0 and min_val > 0:
-                    filtered_ticks = [min_val]
-                
-                return np.array(filtered_ticks)
-            
-            # 格式化刻度标签
-            def format_tick_label(value):
-                if abs(value) < 0.01:
-                    return f'{value:.2e}'
-                else:
-                    return f'{value:.2f}'
-            
-            # 计算归一化颜色条刻度值的函数（参考 plot_directional_spectrum.py）
-            def calculate_cbar_ticks(data_min, data_max, generate_ticks_func):
-                """
-                计算颜色条的归一化刻度值（参考 plot_directional_spectrum.py）
-                
-                参数:
-                    data_min: 数据最小值
-                    data_max: 数据最大值
-                    generate_ticks_func: 生成原始刻度值的函数
-                
-                返回:
-                    cbar_ticks: 归一化后的刻度值数组（0到1之间）
-                """
-                # 生成原始数据的刻度值
-                raw_ticks = generate_ticks_func(data_min, data_max)
-                
-                # 将刻度值归一化到 [0, 1] 范围（除以最大值）
-                normalized_ticks = raw_ticks / data_max if data_max > 0 else raw_ticks
-                
-                # 计算最小值的归一化值
-                min_normalized = data_min / data_max if data_max > 0 else data_min
-                
-                # 确保颜色条底部有足够的刻度显示
-                filtered_normalized = []
-                
-                # 检查第一个归一化刻度值是否离底部太远
-                first_normalized = normalized_ticks[0] if len(normalized_ticks) > 0 else 1.0
-                
-                # 如果第一个归一化刻度值大于0.1，说明底部有很大一段没有刻度
-                if first_normalized > 0.1:
-                    first_raw = raw_ticks[0] if len(raw_ticks) > 0 else data_max
-                    bottom_range = first_raw - data_min
-                    if bottom_range > 0:
-                        ticks_above = len([t for t in normalized_ticks if t > first_normalized])
-                        n_bottom_ticks = max(ticks_above + 2, 5)
-                        
-                        bottom_raw_ticks = generate_ticks_func(data_min, first_raw)
-                        if len(bottom_raw_ticks) < n_bottom_ticks and bottom_range > 0:
-                            bottom_raw_ticks = np.linspace(data_min, first_raw, n_bottom_ticks + 1)[1:-1]
-                        
-                        bottom_normalized = bottom_raw_ticks / data_max if data_max > 0 else bottom_raw_ticks
-                        bottom_normalized_filtered = [t for t in bottom_normalized if t >= 0.005]
-                        
-                        if len(bottom_normalized_filtered) < n_bottom_ticks - 1:
-                            bottom_normalized_filtered = [t for t in bottom_normalized if t > 0]
-                        
-                        if len(bottom_normalized_filtered) == 0 and len(bottom_normalized) > 0:
-                            bottom_normalized_filtered = sorted(bottom_normalized)[:min(3, len(bottom_normalized))]
-                        
-                        filtered_normalized.extend(bottom_normalized_filtered)
-                elif data_min > 0 and min_normalized > 0:
-                    if min_normalized >= 0.01:
-                        filtered_normalized.append(min_normalized)
-                    elif data_max - data_min < data_max * 0.1:
-                        filtered_normalized.append(min_normalized)
-                
-                # 使用动态阈值过滤刻度值
-                if min_normalized < 0.01:
-                    threshold = 0.1
-                elif min_normalized < 0.05:
-                    threshold = 0.05
-                else:
-                    threshold = 0.01
-                
-                for tick in normalized_ticks:
-                    if tick >= threshold and tick not in filtered_normalized:
-                        filtered_normalized.append(tick)
-                
-                if len(filtered_normalized) < 3:
-                    threshold = max(0.01, threshold * 0.5)
-                    existing_bottom = [t for t in filtered_normalized if t < threshold]
-                    filtered_normalized = existing_bottom if existing_bottom else []
-                    for tick in normalized_ticks:
-                        if tick >= threshold and tick not in filtered_normalized:
-                            filtered_normalized.append(tick)
-                
-                # 确保包含最大值（归一化后为1.0）
-                if len(filtered_normalized) == 0 or (len(filtered_normalized) > 0 and filtered_normalized[-1] < 0.99):
-                    if data_max > 0:
-                        filtered_normalized.append(1.0)
-                # 对于归一化模式，确保包含0（最小值）
-                if data_min == 0.0 and (len(filtered_normalized) == 0 or filtered_normalized[0] > 0.01):
-                    filtered_normalized.insert(0, 0.0)
-                
-                # 去重并排序
-                cbar_ticks = np.array(sorted(set(filtered_normalized)))
-                
-                return cbar_ticks
-            
-            # 方向维标准化 + 周期插值（辅助函数）
-            def process_spectrum_data(E, dir_orig, freq):
-                """处理单个站点的谱数据"""
-                dir0 = dir_orig.copy()
-                dir0 = np.mod(dir0, 360)
-                idx = np.argsort(dir0)
-                dir_sort = dir0[idx]
-                E_sort = E[idx, :]
-                
-                # 周期闭合
-                dir_ext = np.concatenate([dir_sort, [dir_sort[0] + 360]])
-                n_freq = len(freq)
-                
-                # 高分辨率方向 - 0.5度间隔
-                theta_deg_full = np.linspace(0, 360, 721)
-                
-                E_interp = np.zeros((len(theta_deg_full), n_freq))
-                
-                from scipy.interpolate import PchipInterpolator
-                for i in range(n_freq):
-                    E_ext = np.concatenate([E_sort[:, i], [E_sort[0, i]]])
-                    interp_func = PchipInterpolator(dir_ext, E_ext, extrapolate=False)
-                    E_interp[:, i] = interp_func(theta_deg_full)
-                
-                # 极坐标 → 笛卡尔坐标
-                theta_deg_full_rad = np.deg2rad(90 - theta_deg_full)
-                Theta, R = np.meshgrid(theta_deg_full_rad, freq)
-                X = R * np.cos(Theta)
-                Y = R * np.sin(Theta)
-                
-                return X, Y, E_interp
-            
-            # 绘制单个二维谱图（辅助函数，归一化模式使用 wavespectra 框架）
-            def plot_single_spectrum(X, Y, E_interp, threshold, lon_val, lat_val, time_str, output_file, plot_mode="最大值归一化", E_original=None, freq_orig=None, dir_orig=None):
-                """绘制单个二维谱图
-                
-                参数:
-                    X, Y: 笛卡尔坐标（用于实际值模式）
-                    E_interp: 插值后的能量密度数据（用于实际值模式）
-                    threshold: 能量阈值
-                    lon_val, lat_val: 站点经纬度
-                    time_str: 时间字符串
-                    output_file: 输出文件路径
-                    plot_mode: 绘制模式（"最大值归一化" 或 "实际值"）
-                    E_original: 原始能量密度数据 (frequency, direction)，用于归一化模式（wavespectra）
-                    freq_orig: 原始频率数组，用于归一化模式
-                    dir_orig: 原始方向数组，用于归一化模式
-                """
-                # 检查是否为归一化模式（支持中英文翻译）
-                normalized_text_zh = tr("plotting_plot_mode_normalized", "最大值归一化")
-                normalized_text_en = "Max Normalized"  # 英文翻译
-                is_normalized = (plot_mode == "最大值归一化" or 
-                                plot_mode == normalized_text_zh or 
-                                plot_mode == normalized_text_en or
-                                plot_mode == "normalized")
-                
-                if is_normalized and HAS_WAVESPECTRA and E_original is not None and freq_orig is not None and dir_orig is not None:
-                    # 使用 wavespectra 框架绘制归一化图（参考 plot_directional_spectrum.py）
-                    import xarray as xr
-                    
-                    # 创建 xarray DataArray（wavespectra 需要）
-                    # E_original 应该是 (frequency, direction) 形状
-                    # wavespectra 期望 (freq, dir) 坐标
-                    efth_da = xr.DataArray(
-                        E_original,  # (freq, dir)
-                        dims=['freq', 'dir'],
-                        coords={'freq': freq_orig, 'dir': dir_orig},
-                        name='efth'
-                    )
-                    
-                    # 转换为 SpecArray
-                    spec_array = SpecArray(efth_da)
-                    
-                    # 计算数据范围，用于生成颜色条刻度
-                    data_min = float(np.nanmin(E_original))
-                    data_max = float(np.nanmax(E_original))
-                    
-                    # 使用函数计算归一化后的颜色条刻度值
-                    cbar_ticks = calculate_cbar_ticks(data_min, data_max, generate_ticks)
-                    
-                    # 使用 jet 颜色映射（参考文件）
-                    cmap = plt.get_cmap('jet')
-                    
-                    # 使用 wavespectra 的 plot 方法绘制（自动归一化）
-                    # 计算 rmax（最大频率）
-                    rmax = np.max(freq_orig)
-                    
-                    # 计算频率刻度（参考文件使用 [0.04,0.1,0.25,0.59]）
-                    freq_target = np.array([0.04, 0.1, 0.25, 0.59])
-                    radii_ticks = freq_target[freq_target <= rmax].tolist()
-                    if len(radii_ticks) == 0:
-                        radii_ticks = [rmax * 0.2, rmax * 0.4, rmax * 0.6, rmax * 0.8]
-                    
-                    pobj = spec_array.plot(
-                        figsize=(10, 10),
-                        cmap=cmap,
-                        rmax=rmax if rmax <= 3 else 3,
-                        radii_ticks=radii_ticks if len(radii_ticks) > 0 else None
-                    )
-                    
-                    # 获取当前图形和坐标轴
-                    fig = plt.gcf()
-                    ax = plt.gca()
-                    
-                    # 保持图像不变：0度在底部（南），顺时针方向（参考文件）
-                    ax.set_theta_zero_location('S')
-                    ax.set_theta_direction(-1)
-                    
-                    # 只修改标签文本，让0度标签显示在顶部位置（参考文件）
-                    angles_deg = np.arange(0, 360, 30)
-                    label_texts = []
-                    for angle in angles_deg:
-                        label_angle = (angle + 180) % 360
-                        label_texts.append(f'{int(label_angle)}°')
-                    
-                    # 设置标签，保持网格位置不变（角度位置不变）
-                    ax.set_thetagrids(angles_deg, labels=label_texts)
-                    
-                    # 设置标题，显示站点信息
-                    ax.set_title(f'Lon: {lon_val:.2f}°, Lat: {lat_val:.2f}°            {time_str}', 
-                                fontsize=10, pad=20)
-                    
-                    # 修改颜色条刻度（wavespectra 自动归一化，刻度值应该是归一化的）
-                    # wavespectra 的 plot 方法会自动创建颜色条，尝试找到它
-                    cb = None
-                    # 方法1：从 pobj 对象获取（如果可用）
-                    if hasattr(pobj, 'handles') and hasattr(pobj.handles, 'colorbar'):
-                        cb = pobj.handles.colorbar
-                    # 方法2：从 pobj 的 mappable 对象获取颜色条
-                    if cb is None and hasattr(pobj, 'mappable'):
-                        try:
-                            cb = fig.colorbar(pobj.mappable, ax=ax)
-                        except:
-                            pass
-                    # 方法3：从 figure 的所有子对象中查找（使用 hasattr 检查颜色条特征）
-                    if cb is None:
-                        for item in fig.axes:
-                            # 颜色条通常有这些方法：set_ticks, set_ticklabels, set_label, update_normal
-                            if (hasattr(item, 'set_ticks') and hasattr(item, 'set_ticklabels') and 
-                                hasattr(item, 'set_label') and hasattr(item, 'update_normal')):
-                                cb = item
-                                break
-                    # 方法4：从 figure 的所有子对象中查找（通过 get_children，检查颜色条特征）
-                    if cb is None:
-                        for item in fig.get_children():
-                            if (hasattr(item, 'set_ticks') and hasattr(item, 'set_ticklabels') and 
-                                hasattr(item, 'set_label') and hasattr(item, 'update_normal')):
-                                cb = item
-                                break
-                    
-                    # 如果找到了颜色条，修改其刻度
-                    if cb is not None:
-                        try:
-                            # 设置归一化刻度
-                            cb.set_ticks(cbar_ticks)
-                            tick_labels = [format_tick_label(tick) for tick in cbar_ticks]
-                            cb.set_ticklabels(tick_labels)
-                            cb.set_label('Normalized Energy Density', fontsize=9)
-                            if hasattr(cb, 'ax'):
-                                cb.ax.tick_params(labelsize=9)
-                        except Exception as e:
-                            # 如果修改颜色条失败，记录但不中断执行（wavespectra 可能有自己的颜色条实现）
-                            pass
-                    
-                    # 保存图片
-                    plt.tight_layout()
-                    plt.savefig(output_file, dpi=400, bbox_inches='tight', 
-                                facecolor='white', edgecolor='none', pad_inches=0.1)
-                    plt.close(fig)
-                    
-                else:
-                    # 实际值模式，使用手动绘制方法（原有逻辑）
-                    # 计算原始数据范围（归一化前）
-                    original_data_min = np.nanmin(E_interp)
-                    original_data_max = np.nanmax(E_interp)
-                    
-                    # 实际值模式
-                    data_min = original_data_min
-                    data_max = original_data_max
-                    
-                    # 检查阈值
-                    adjusted_threshold = float(threshold)
-                    if adjusted_threshold > data_max:
-                        adjusted_threshold = 0.0
-                    
-                    # 确保 vmin <= vmax
-                    vmin_actual = min(adjusted_threshold, data_max)
-                    vmax_actual = data_max
-                    if vmin_actual >= vmax_actual:
-                        vmin_actual = 0.0
-                        if vmax_actual <= vmin_actual:
-                            vmax_actual = max(1e-10, abs(data_max))
-                    
-                    # 绘制二维谱
-                    fig = plt.figure(figsize=(8, 7.5), facecolor='white')
-                    ax = fig.add_axes([0.08, 0.08, 0.68, 0.84])
-                    
-                    levels = 200
-                    cmap = plt.get_cmap('jet')
-                    cmap.set_under('white')
-                    
-                    try:
-                        pcm = ax.contourf(X, Y, E_interp.T, levels=levels, cmap=cmap, 
-                                        vmin=vmin_actual, vmax=vmax_actual, extend='neither')
-                    except ValueError as e:
-                        error_msg = str(e).lower()
-                        if "minvalue" in error_msg or "maxvalue" in error_msg or "vmin" in error_msg or "vmax" in error_msg:
-                            adjusted_threshold = 0.0
-                            vmin_actual = 0.0
-                            vmax_actual = max(data_max, 1e-10)
-                            pcm = ax.contourf(X, Y, E_interp.T, levels=levels, cmap=cmap, 
-                                            vmin=vmin_actual, vmax=vmax_actual, extend='neither')
-                        else:
-                            raise
-                    
-                    ax.set_aspect('equal')
-                    ax.axis('off')
-                    
-                    # 颜色条
-                    cbar_min = vmin_actual
-                    cbar_max = vmax_actual
-                    cbar_ticks = generate_ticks(cbar_min, cbar_max)
-                    if cbar_min not in cbar_ticks:
-                        cbar_ticks = np.concatenate([[cbar_min], cbar_ticks])
-                        cbar_ticks = np.sort(cbar_ticks)
-                    if len(cbar_ticks) > 1:
-                        cbar_ticks = cbar_ticks[:-1]
-                    cbar_ticks = cbar_ticks[cbar_ticks >= cbar_min]
-                    tick_labels = [format_tick_label(tick) for tick in cbar_ticks]
-                    
-                    cb = plt.colorbar(pcm, ax=ax, fraction=0.03, pad=0.1, ticks=cbar_ticks)
-                    cb.set_ticklabels(tick_labels)
-                    cb.set_label('Energy Density (m²/Hz/deg)', fontsize=9)
-                    cb.ax.tick_params(labelsize=9)
-                    
-                    # 标题
-                    title_str = f'Lon: {lon_val:.2f}°, Lat: {lat_val:.2f}°            {time_str}'
-                    ax.set_title(title_str, fontsize=10, pad=10)
-                    
-                    # 极坐标方向标注
-                    dirs = np.arange(0, 360, 30)
-                    rmax = np.max(freq)
-                    
-                    # 绘制径向轴
-                    for ang in dirs:
-                        theta_rad = np.deg2rad(90 - ang)
-                        ax.plot([0, rmax * np.cos(theta_rad)], 
-                               [0, rmax * np.sin(theta_rad)],
-                               color='black', linewidth=0.5, alpha=0.5, linestyle='--')
-                    
-                    # 角度标签
-                    angle_labels = []
-                    for ang in dirs:
-                        x_pos = rmax * 1.12 * np.cos(np.deg2rad(90 - ang))
-                        y_pos = rmax * 1.12 * np.sin(np.deg2rad(90 - ang))
-                        label = f'{int(ang)}°'
-                        angle_labels.append((x_pos, y_pos, label))
-                    
-                    # 频率同心圆
-                    freq_target = np.array([0.1, 0.2, 0.3, 0.4, 0.5, 0.6])
-                    freq_max = np.max(freq)
-                    freq_plot = freq_target[freq_target <= freq_max]
-                    
-                    th = np.linspace(0, 2 * np.pi, 360)
-                    for i, rr in enumerate(freq_plot):
-                        ax.plot(rr * np.cos(th), rr * np.sin(th), 'k:', linewidth=0.5, linestyle='--', alpha=0.5)
-                        ax.text(0, rr * 1.03, f'{rr:.2f}',
-                                ha='center', va='bottom', fontsize=6, color='black', alpha=0.5)
-                    
-                    # 外圈
-                    ax.plot(freq_max * np.cos(th), freq_max * np.sin(th), 'k-', linewidth=1.0, alpha=0.8, zorder=1)
-                    
-                    # 在文字位置绘制白色圆形背景和文字
-                    for x_pos, y_pos, label in angle_labels:
-                        circle_radius = 0.02 * freq_max
-                        circle = plt.Circle((x_pos, y_pos), circle_radius, color='white', 
-                                           edgecolor='none', zorder=2)
-                        ax.add_patch(circle)
-                        ax.text(x_pos, y_pos, label, fontsize=10, ha='center', va='center', zorder=3)
-                    
-                    plt.tight_layout()
-                    
-                    # 调整颜色条高度
-                    ax_pos = ax.get_position()
-                    cbar_pos = cb.ax.get_position()
-                    cb.ax.set_position([cbar_pos.x0, ax_pos.y0, cbar_pos.width, ax_pos.height])
-                    
-                    # 保存图片
-                    plt.savefig(output_file, dpi=400, bbox_inches='tight', 
-                                facecolor='white', edgecolor='none', pad_inches=0.1)
-                    plt.close(fig)
-            
-            # 优先使用文件中的站点名称，避免 UI 排序/编辑导致错位
-            file_station_names = _decode_station_names(station_name_var, nStation)
-            if file_station_names and any(file_station_names):
-                station_name_list = file_station_names
-            elif station_names and len(station_names) >= nStation:
-                station_name_list = station_names
-            else:
-                station_name_list = [f"station_{i+1:03d}" for i in range(nStation)]
-
-            # 遍历所有站点和筛选后的时间步
-            total_count = nStation * nSelectedTime
-            current_count = 0
-            success_count = 0
-            
-            for time_idx, itime in enumerate(selected_time_indices):
-                for istation in range(nStation):
-                    current_count += 1
-                    
-                    try:
-                        # 获取数据 (time, station, frequency, direction)
-                        E_original = efth[itime, istation, :, :]  # 获取 (frequency, direction)，用于 wavespectra
-                        E = E_original.T  # 转置为 (direction, frequency)，用于手动绘制
-                        
-                        # 处理数据（用于实际值模式的手动绘制）
-                        X, Y, E_interp = process_spectrum_data(E, dir_orig, freq)
-                        
-                        # 获取站点信息
-                        lon_val, lat_val = _pick_station_lon_lat(lon, lat, istation, nStation)
-                        time_str = time_dt[itime].strftime("%Y-%m-%d %H:%M:%S")
-                        
-                        # 获取站点名称（如果提供了站点名称列表）
-                        station_name = _sanitize_filename(station_name_list[istation])
-                        
-                        # 生成输出文件名（使用站点名称）
-                        time_str_file = time_dt[itime].strftime("%Y%m%d_%H%M%S")
-                        output_file = os.path.join(photo_folder, 
-                                                  f'spectrum_{station_name}_time_{time_str_file}.png')
-                        
-                        # 绘制并保存（传入原始数据用于归一化模式）
-                        plot_single_spectrum(X, Y, E_interp, energy_threshold, 
-                                           lon_val, lat_val, time_str, output_file, plot_mode,
-                                           E_original=E_original, freq_orig=freq, dir_orig=dir_orig)
-                        
-                        success_count += 1
-                        
-                        # 生成进度（每10张或最后一张）
-                        if current_count % 10 == 0 or current_count == total_count:
-                            log(tr("plotting_progress_all_spectrum", "📊 进度：{current}/{total} ({success} 成功)").format(current=current_count, total=total_count, success=success_count))
-                    
-                    except Exception as e:
-                        log(tr("plotting_generate_station_timestep_failed", "❌ 生成站点 {station} 时间步 {timestep} 失败：{error}").format(station=istation+1, timestep=itime+1, error=e))
-                        continue
-            
-            result_queue.put(photo_folder)
-            
-        finally:
-            # 恢复后端
-            matplotlib.use(original_backend)
-        
-        log_queue.put("__DONE__")
-        
-    except Exception as e:
-        import traceback
-        log_queue.put(tr("plotting_generate_all_spectrum_failed", "❌ 生成所有二维谱图失败：{error}").format(error=e))
-        log_queue.put(traceback.format_exc())
-        result_queue.put(None)
-        log_queue.put("__DONE__")
-
-
-def _generate_selected_spectrum_worker(selected_folder, log_queue, result_queue, energy_threshold=0.01, spec_file=None, time_step_hours=24, station_index=0, plot_mode="最大值归一化", station_name=None):
-    """生成选中站点的二维谱图 worker 函数（单个站点、根据时间步长筛选的时间）"""
-    station_name_var = None
-    try:
-        def log(msg):
-            """发送日志到队列"""
-            try:
-                log_queue.put(msg)
-            except:
-                pass
-        
-        log(tr("plotting_start_selected_spectrum", "🔄 开始生成选中站点的二维谱图（站点索引：{index}，时间步长：{hours}小时，在子进程中执行）...").format(index=station_index, hours=time_step_hours))
-        
-        # 如果指定了文件，使用指定的文件；否则查找 ww3*spec*nc 格式的文件
-        if spec_file and os.path.exists(spec_file):
-            spec_files = [spec_file]
-        else:
-            spec_files = glob.glob(os.path.join(selected_folder, "ww3*spec*nc"))
-        
-        if not spec_files:
-            log(tr("plotting_spectrum_file_not_found", "❌ 未找到二维谱文件，请先选择文件"))
-            log_queue.put("__DONE__")
-            result_queue.put(None)
-            return
-        
-        spec_file = spec_files[0]
-        
-        # 切换到 Agg 后端用于生成图片
-        original_backend = matplotlib.get_backend()
-        matplotlib.use("Agg")
-        
-        try:
-            # 读取 NetCDF 文件
-            with nc.Dataset(spec_file, 'r') as ds:
-                freq = ds.variables['frequency'][:].data  # Hz
-                dir_orig = ds.variables['direction'][:].data  # degree
-                # WW3 efth units: m²·s·rad⁻¹ == m²/Hz/rad -> convert to m²/Hz/deg for plotting
-                efth = ds.variables['efth'][:] * (np.pi / 180.0)
-                time = ds.variables['time'][:].data
-                
-                # 读取站点信息
-                lon = ds.variables['longitude'][:].data
-                lat = ds.variables['latitude'][:].data
-                nStation = len(ds.dimensions['station'])
-                nTime = len(time)
-                station_name_var = ds.variables['station_name'][:] if 'station_name' in ds.variables else None
-            
-            # 检查站点索引是否有效
-            if station_index < 0 or station_index >= nStation:
-                log(tr("plotting_invalid_station_index", "❌ 站点索引 {index} 无效，文件中共有 {total} 个站点").format(index=station_index, total=nStation))
-                log_queue.put("__DONE__")
-                result_queue.put(None)
-                return
-            
-            # 转换时间
-            t0 = datetime(1990, 1, 1, 0, 0, 0)
-            time_dt = [t0 + timedelta(days=float(t)) for t in time]
-            
-            # 根据时间步长筛选时间步
-            time_step_hours_float = float(time_step_hours)
-            selected_time_indices = []
-            
-            if len(time_dt) > 0:
-                # 第一个时间步总是包含
-                selected_time_indices.append(0)
-                last_selected_time = time_dt[0]
-                
-                # 从第二个时间步开始，选择间隔大于等于 time_step_hours 的时间步
-                for i in range(1, len(time_dt)):
-                    time_diff = (time_dt[i] - last_selected_time).total_seconds() / 3600.0
-                    if time_diff >= time_step_hours_float:
-                        selected_time_indices.append(i)
-                        last_selected_time = time_dt[i]
-            
-            nSelectedTime = len(selected_time_indices)
-            
-            if nSelectedTime == 0:
-                log(tr("plotting_no_valid_timesteps", "❌ 没有符合时间步长要求的时间步"))
-                log_queue.put("__DONE__")
-                result_queue.put(None)
-                return
-            
-            # 创建输出目录（保存到 photo/spectrum）
-            photo_folder = os.path.join(selected_folder, 'photo', 'spectrum')
-            os.makedirs(photo_folder, exist_ok=True)
-            
-            # 复用 _generate_all_spectrum_worker 中的辅助函数
-            # 生成刻度值的函数
-            def generate_ticks(min_val, max_val):
-                range_val = max_val - min_val
-                if range_val <= 0:
-                    return np.array([min_val, max_val])
-                
-                rough_step = range_val / 6
-                if rough_step > 0:
-                    magnitude = 10 ** np.floor(np.log10(rough_step))
-                    normalized = rough_step / magnitude
-                    
-                    if normalized <= 0.5:
-                        step = 0.5 * magnitude
-                    elif normalized <= 1:
-                        step = 1 * magnitude
-                    elif normalized <= 2:
-                        step = 2 * magnitude
-                    elif normalized <= 5:
-                        step = 5 * magnitude
-                    else:
-                        step = 10 * magnitude
-                else:
-                    step = 0.1
-                
-                start = np.floor(min_val / step) * step
-                ticks = []
-                current = start
-                while current <= max_val + step * 0.01:
-                    ticks.append(current)
-                    current += step
-                
-                filtered_ticks = []
-                for tick in ticks:
-                    tick_str = f"{tick:.10f}"
-                    digits = [c for c in tick_str if c.isdigit()]
-                    if len(digits) > 0:
-                        last_digit = digits[-1]
-                        if last_digit == '0' or last_digit == '5':
-                            filtered_ticks.append(tick)
-                            continue
-                    
-                    if abs(tick - round(tick)) < 1e-10:
-                        int_val = int(round(tick))
-                        if int_val % 10 == 0 or int_val % 10 == 5:
-                            filtered_ticks.append(tick)
-                
-                if len(filtered_ticks) == 0:
-                    filtered_ticks = ticks
-                
-                filtered_ticks = sorted(set(filtered_ticks))
-                if filtered_ticks[0] > min_val:
-                    filtered_ticks.insert(0, min_val)
-                if filtered_ticks[-1] < max_val:
-                    filtered_ticks.append(max_val)
-                
-                # 移除0值（如果存在，参考 plot_directional_spectrum.py）
-                # 注意：对于归一化模式，0值会在 calculate_cbar_ticks 中单独处理
-                filtered_ticks = [tick for tick in filtered_ticks if tick > 0]
-                
-                # 如果移除0后列表为空，至少保留最小值（如果大于0）
-                if len(filtered_ticks) == 0 and min_val > 0:
-                    filtered_ticks = [min_val]
-                
-                return np.array(filtered_ticks)
-            
-            # 格式化刻度标签
-            def format_tick_label(value):
-                if abs(value) < 0.01:
-                    return f'{value:.2e}'
-                else:
-                    return f'{value:.2f}'
-            
-            # 计算归一化颜色条刻度值的函数（参考 plot_directional_spectrum.py）
-            def calculate_cbar_ticks(data_min, data_max, generate_ticks_func):
-                """
-                计算颜色条的归一化刻度值（参考 plot_directional_spectrum.py）
-                
-                参数:
-                    data_min: 数据最小值（归一化模式下应该是0）
-                    data_max: 数据最大值（归一化模式下应该是1）
-                    generate_ticks_func: 生成原始刻度值的函数
-                
-                返回:
-                    cbar_ticks: 归一化后的刻度值数组（0到1之间）
-                """
-                # 生成原始数据的刻度值
-                raw_ticks = generate_ticks_func(data_min, data_max)
-                
-                # 将刻度值归一化到 [0, 1] 范围（除以最大值）
-                # 注意：对于归一化模式，data_min=0, data_max=1，所以归一化后值不变
-                normalized_ticks = raw_ticks / data_max if data_max > 0 else raw_ticks
-                
-                # 计算最小值的归一化值
-                min_normalized = data_min / data_max if data_max > 0 else data_min
-                
-                # 确保颜色条底部有足够的刻度显示
-                filtered_normalized = []
-                
-                # 检查第一个归一化刻度值是否离底部太远
-                first_normalized = normalized_ticks[0] if len(normalized_ticks) > 0 else 1.0
-                
-                # 如果第一个归一化刻度值大于0.1，说明底部有很大一段没有刻度
-                if first_normalized > 0.1:
-                    first_raw = raw_ticks[0] if len(raw_ticks) > 0 else data_max
-                    bottom_range = first_raw - data_min
-                    if bottom_range > 0:
-                        ticks_above = len([t for t in normalized_ticks if t > first_normalized])
-                        n_bottom_ticks = max(ticks_above + 2, 5)
-                        
-                        bottom_raw_ticks = generate_ticks_func(data_min, first_raw)
-                        if len(bottom_raw_ticks) < n_bottom_ticks and bottom_range > 0:
-                            bottom_raw_ticks = np.linspace(data_min, first_raw, n_bottom_ticks + 1)[1:-1]
-                        
-                        bottom_normalized = bottom_raw_ticks / data_max if data_max > 0 else bottom_raw_ticks
-                        bottom_normalized_filtered = [t for t in bottom_normalized if t >= 0.005]
-                        
-                        if len(bottom_normalized_filtered) < n_bottom_ticks - 1:
-                            bottom_normalized_filtered = [t for t in bottom_normalized if t > 0]
-                        
-                        if len(bottom_normalized_filtered) == 0 and len(bottom_normalized) > 0:
-                            bottom_normalized_filtered = sorted(bottom_normalized)[:min(3, len(bottom_normalized))]
-                        
-                        filtered_normalized.extend(bottom_normalized_filtered)
-                elif data_min > 0 and min_normalized > 0:
-                    if min_normalized >= 0.01:
-                        filtered_normalized.append(min_normalized)
-                    elif data_max - data_min < data_max * 0.1:
-                        filtered_normalized.append(min_normalized)
-                
-                # 使用动态阈值过滤刻度值
-                if min_normalized < 0.01:
-                    threshold = 0.1
-                elif min_normalized < 0.05:
-                    threshold = 0.05
-                else:
-                    threshold = 0.01
-                
-                for tick in normalized_ticks:
-                    if tick >= threshold and tick not in filtered_normalized:
-                        filtered_normalized.append(tick)
-                
-                if len(filtered_normalized) < 3:
-                    threshold = max(0.01, threshold * 0.5)
-                    existing_bottom = [t for t in filtered_normalized if t < threshold]
-                    filtered_normalized = existing_bottom if existing_bottom else []
-                    for tick in normalized_ticks:
-                        if tick >= threshold and tick not in filtered_normalized:
-                            filtered_normalized.append(tick)
-                
-                # 确保包含最大值（归一化后为1.0）和最小值（归一化后为0.0）
-                if len(filtered_normalized) == 0 or (len(filtered_normalized) > 0 and filtered_normalized[-1] < 0.99):
-                    if data_max > 0:
-                        filtered_normalized.append(1.0)
-                # 对于归一化模式，确保包含0（最小值）
-                if data_min == 0.0 and (len(filtered_normalized) == 0 or filtered_normalized[0] > 0.01):
-                    filtered_normalized.insert(0, 0.0)
-                
-                # 去重并排序
-                cbar_ticks = np.array(sorted(set(filtered_normalized)))
-                
-                return cbar_ticks
-            
-            # 方向维标准化 + 周期插值（辅助函数）
-            def process_spectrum_data(E, dir_orig, freq):
-                """处理单个站点的谱数据"""
-                dir0 = dir_orig.copy()
-                dir0 = np.mod(dir0, 360)
-                idx = np.argsort(dir0)
-                dir_sort = dir0[idx]
-                E_sort = E[idx, :]
-                
-                # 周期闭合
-                dir_ext = np.concatenate([dir_sort, [dir_sort[0] + 360]])
-                n_freq = len(freq)
-                
-                # 高分辨率方向 - 0.5度间隔
-                theta_deg_full = np.linspace(0, 360, 721)
-                
-                E_interp = np.zeros((len(theta_deg_full), n_freq))
-                
-                from scipy.interpolate import PchipInterpolator
-                for i in range(n_freq):
-                    E_ext = np.concatenate([E_sort[:, i], [E_sort[0, i]]])
-                    interp_func = PchipInterpolator(dir_ext, E_ext, extrapolate=False)
-                    E_interp[:, i] = interp_func(theta_deg_full)
-                
-                # 极坐标 → 笛卡尔坐标
-                theta_deg_full_rad = np.deg2rad(90 - theta_deg_full)
-                Theta, R = np.meshgrid(theta_deg_full_rad, freq)
-                X = R * np.cos(Theta)
-                Y = R * np.sin(Theta)
-                
-                return X, Y, E_interp
-            
-            # 计算归一化颜色条刻度值的函数（参考 plot_directional_spectrum.py）
-            def calculate_cbar_ticks(data_min, data_max, generate_ticks_func):
-                """
-                计算颜色条的归一化刻度值（参考 plot_directional_spectrum.py）
-                
-                参数:
-                    data_min: 数据最小值
-                    data_max: 数据最大值
-                    generate_ticks_func: 生成原始刻度值的函数
-                
-                返回:
-                    cbar_ticks: 归一化后的刻度值数组（0到1之间）
-                """
-                # 生成原始数据的刻度值
-                raw_ticks = generate_ticks_func(data_min, data_max)
-                
-                # 将刻度值归一化到 [0, 1] 范围（除以最大值）
-                normalized_ticks = raw_ticks / data_max if data_max > 0 else raw_ticks
-                
-                # 计算最小值的归一化值
-                min_normalized = data_min / data_max if data_max > 0 else data_min
-                
-                # 确保颜色条底部有足够的刻度显示
-                filtered_normalized = []
-                
-                # 检查第一个归一化刻度值是否离底部太远
-                first_normalized = normalized_ticks[0] if len(normalized_ticks) > 0 else 1.0
-                
-                # 如果第一个归一化刻度值大于0.1，说明底部有很大一段没有刻度
-                if first_normalized > 0.1:
-                    first_raw = raw_ticks[0] if len(raw_ticks) > 0 else data_max
-                    bottom_range = first_raw - data_min
-                    if bottom_range > 0:
-                        ticks_above = len([t for t in normalized_ticks if t > first_normalized])
-                        n_bottom_ticks = max(ticks_above + 2, 5)
-                        
-                        bottom_raw_ticks = generate_ticks_func(data_min, first_raw)
-                        if len(bottom_raw_ticks) < n_bottom_ticks and bottom_range > 0:
-                            bottom_raw_ticks = np.linspace(data_min, first_raw, n_bottom_ticks + 1)[1:-1]
-                        
-                        bottom_normalized = bottom_raw_ticks / data_max if data_max > 0 else bottom_raw_ticks
-                        bottom_normalized_filtered = [t for t in bottom_normalized if t >= 0.005]
-                        
-                        if len(bottom_normalized_filtered) < n_bottom_ticks - 1:
-                            bottom_normalized_filtered = [t for t in bottom_normalized if t > 0]
-                        
-                        if len(bottom_normalized_filtered) == 0 and len(bottom_normalized) > 0:
-                            bottom_normalized_filtered = sorted(bottom_normalized)[:min(3, len(bottom_normalized))]
-                        
-                        filtered_normalized.extend(bottom_normalized_filtered)
-                elif data_min > 0 and min_normalized > 0:
-                    if min_normalized >= 0.01:
-                        filtered_normalized.append(min_normalized)
-                    elif data_max - data_min < data_max * 0.1:
-                        filtered_normalized.append(min_normalized)
-                
-                # 使用动态阈值过滤刻度值
-                if min_normalized < 0.01:
-                    threshold = 0.1
-                elif min_normalized < 0.05:
-                    threshold = 0.05
-                else:
-                    threshold = 0.01
-                
-                for tick in normalized_ticks:
-                    if tick >= threshold and tick not in filtered_normalized:
-                        filtered_normalized.append(tick)
-                
-                if len(filtered_normalized) < 3:
-                    threshold = max(0.01, threshold * 0.5)
-                    existing_bottom = [t for t in filtered_normalized if t < threshold]
-                    filtered_normalized = existing_bottom if existing_bottom else []
-                    for tick in normalized_ticks:
-                        if tick >= threshold and tick not in filtered_normalized:
-                            filtered_normalized.append(tick)
-                
-                # 确保包含最大值（归一化后为1.0）
-                if len(filtered_normalized) == 0 or (len(filtered_normalized) > 0 and filtered_normalized[-1] < 0.99):
-                    if data_max > 0:
-                        filtered_normalized.append(1.0)
-                
-                # 去重并排序
-                cbar_ticks = np.array(sorted(set(filtered_normalized)))
-                
-                return cbar_ticks
-            
-            # 绘制单个二维谱图（辅助函数）
-            def plot_single_spectrum(X, Y, E_interp, threshold, lon_val, lat_val, time_str, output_file, plot_mode="最大值归一化", E_original=None, freq_orig=None, dir_orig=None):
-                """绘制单个二维谱图（归一化模式使用 wavespectra 框架）"""
-                # 复用 _generate_all_spectrum_worker 中的相同实现
-                # 这里直接调用相同的逻辑，避免代码重复
-                # 检查是否为归一化模式（支持中英文翻译）
-                normalized_text_zh = tr("plotting_plot_mode_normalized", "最大值归一化")
-                normalized_text_en = "Max Normalized"  # 英文翻译
-                is_normalized = (plot_mode == "最大值归一化" or 
-                                plot_mode == normalized_text_zh or 
-                                plot_mode == normalized_text_en or
-                                plot_mode == "normalized")
-                
-                if is_normalized and HAS_WAVESPECTRA and E_original is not None and freq_orig is not None and dir_orig is not None:
-                    # 使用 wavespectra 框架绘制归一化图（参考 plot_directional_spectrum.py）
-                    import xarray as xr
+                if is_normalized and HAS_WAVESPECTRA and E_original is not None and freq_orig is not None and dir_orig is not None:
+                    # 使用 wavespectra 框架绘制归一化图（参考 plot_directional_spectrum.py）
+                    import xarray as xr
                     
                     # 创建 xarray DataArray（wavespectra 需要）
                     efth_da = xr.DataArray(
@@ -3119,7 +2820,7 @@ def _generate_selected_spectrum_worker(selected_folder, log_queue, result_queue,
                     data_max = float(np.nanmax(E_original))
                     
                     # 使用函数计算归一化后的颜色条刻度值
-                    cbar_ticks = calculate_cbar_ticks(data_min, data_max, generate_ticks)
+                    cbar_ticks = _spectrum_normalized_cbar_ticks(data_min, data_max)
                     
                     # 使用 jet 颜色映射（参考文件）
                     cmap = plt.get_cmap('jet')
@@ -3195,7 +2896,7 @@ def _generate_selected_spectrum_worker(selected_folder, log_queue, result_queue,
                         try:
                             # 设置归一化刻度
                             cb.set_ticks(cbar_ticks)
-                            tick_labels = [format_tick_label(tick) for tick in cbar_ticks]
+                            tick_labels = [_format_spectrum_tick(tick) for tick in cbar_ticks]
                             cb.set_ticklabels(tick_labels)
                             cb.set_label('Normalized Energy Density', fontsize=9)
                             if hasattr(cb, 'ax'):
@@ -3255,14 +2956,14 @@ def _generate_selected_spectrum_worker(selected_folder, log_queue, result_queue,
                     
                     cbar_min = vmin_actual
                     cbar_max = vmax_actual
-                    cbar_ticks = generate_ticks(cbar_min, cbar_max)
+                    cbar_ticks = _spectrum_ticks(cbar_min, cbar_max)
                     if cbar_min not in cbar_ticks:
                         cbar_ticks = np.concatenate([[cbar_min], cbar_ticks])
                         cbar_ticks = np.sort(cbar_ticks)
                     if len(cbar_ticks) > 1:
                         cbar_ticks = cbar_ticks[:-1]
                     cbar_ticks = cbar_ticks[cbar_ticks >= cbar_min]
-                    tick_labels = [format_tick_label(tick) for tick in cbar_ticks]
+                    tick_labels = [_format_spectrum_tick(tick) for tick in cbar_ticks]
                     
                     cb = plt.colorbar(pcm, ax=ax, fraction=0.03, pad=0.1, ticks=cbar_ticks)
                     cb.set_ticklabels(tick_labels)
@@ -3333,16 +3034,18 @@ def _generate_selected_spectrum_worker(selected_folder, log_queue, result_queue,
             current_count = 0
             success_count = 0
             
+            # 极坐标网格对所有时间步相同，只计算一次
+            X, Y = _spectrum_polar_xy(freq)
+            
             for time_idx, itime in enumerate(selected_time_indices):
                 current_count += 1
                 
                 try:
                     # 获取数据 (time, station, frequency, direction)
                     E_original = efth[itime, station_index, :, :]  # 获取 (frequency, direction)，用于 wavespectra
-                    E = E_original.T  # 转置为 (direction, frequency)，用于手动绘制
                     
-                    # 处理数据（用于实际值模式的手动绘制）
-                    X, Y, E_interp = process_spectrum_data(E, dir_orig, freq)
+                    # 方向插值（用于实际值模式的手动绘制），所有频率一次完成
+                    E_interp = _interp_spectrum_directions(E_original, dir_orig)
                     
                     # 获取时间字符串
                     time_str = time_dt[itime].strftime("%Y-%m-%d %H:%M:%S")
@@ -3384,3 +3087,407 @@ def _generate_selected_spectrum_worker(selected_folder, log_queue, result_queue,
         log_queue.put(traceback.format_exc())
         result_queue.put(None)
         log_queue.put("__DONE__")
+
+
+# 风场文件中经纬度、时间和风速分量的候选变量名（支持标准、CFSR 和 CCMP 格式）
+_WIND_LON_NAMES = ["longitude", "lon", "LONGITUDE", "LON", "Longitude"]
+_WIND_LAT_NAMES = ["latitude", "lat", "LATITUDE", "LAT", "Latitude"]
+_WIND_TIME_NAMES = ["valid_time", "time", "Time", "TIME", "t", "MT", "mt"]
+_WIND_U_NAMES = ["u10", "U10", "wndewd", "WNDEWD", "eastward_wind", "u", "uwnd", "UWND", "uwnd10m", "UWND10M"]
+_WIND_V_NAMES = ["v10", "V10", "wndnwd", "WNDNWD", "northward_wind", "v", "vwnd", "VWND", "vwnd10m", "VWND10M"]
+
+# 上采样因子，提高背景风速图的精度
+_WIND_UPSAMPLE_FACTOR = 3
+
+
+def _pick_wind_var_name(ds, candidates):
+    """返回数据集中第一个存在的候选变量名"""
+    for name in candidates:
+        if name in ds.variables:
+            return name
+    return None
+
+
+def _wind_quiver_step(longitude, latitude, density=None):
+    """箭头/风旗密度（步长）：指定密度优先，否则按网格大小自动计算"""
+    if density is not None:
+        return max(1, int(density))
+    grid_size = max(len(longitude), len(latitude))
+    if grid_size > 300:
+        q_step = max(1, int(grid_size / 400))
+    elif grid_size > 150:
+        q_step = max(1, int(grid_size / 350))
+    elif grid_size > 80:
+        q_step = max(1, int(grid_size / 300))
+    else:
+        q_step = max(1, int(grid_size / 250))
+    return max(q_step, 3)
+
+
+class _WindFieldFigureTemplate:
+    """风场图的可复用图形模板
+
+    地图底图（范围、海岸线、海陆填充）、颜色条位置和箭头/风旗位置只创建一次；
+    每个时间步只替换等速填充、等值线和颜色条，箭头/风旗通过 set_UVC 原地更新。
+    """
+
+    def __init__(self, longitude, latitude, extent, q_step, flag_mode="arrow"):
+        self.lon2d, self.lat2d = np.meshgrid(longitude, latitude)
+        self.shape = (len(latitude), len(longitude))
+        self.q_step = q_step
+        self.cmap = plt.get_cmap("RdBu_r")
+        self.filled = None
+        self.contour_lines = None
+
+        # 上采样后的经纬度网格只需计算一次
+        if _WIND_UPSAMPLE_FACTOR > 1:
+            lon_up = np.linspace(longitude.min(), longitude.max(), len(longitude) * _WIND_UPSAMPLE_FACTOR)
+            lat_up = np.linspace(latitude.min(), latitude.max(), len(latitude) * _WIND_UPSAMPLE_FACTOR)
+            self.lon2d_plot, self.lat2d_plot = np.meshgrid(lon_up, lat_up)
+        else:
+            self.lon2d_plot, self.lat2d_plot = self.lon2d, self.lat2d
+
+        self.fig = plt.figure(figsize=(10, 8), dpi=150, facecolor='white')
+        ax = self.fig.add_subplot(projection=ccrs.PlateCarree())
+        self.ax = ax
+        # 只显示风场数据覆盖的区域，不显示范围外的地图
+        ax.set_extent(extent, crs=ccrs.PlateCarree())
+        ax.set_facecolor('white')
+        ax.set_axis_off()
+        ax.coastlines(resolution="50m", linewidth=0.5)
+        ax.add_feature(cfeature.OCEAN, facecolor="#a4d6ff")
+        ax.add_feature(cfeature.LAND, facecolor="#e6e6e6")
+
+        # 颜色条坐标轴（布局与 fig.colorbar(filled, ax=ax, fraction=0.046, pad=0.04) 相同）
+        placeholder = cm.ScalarMappable(cmap=self.cmap)
+        self.cax = self.fig.colorbar(placeholder, ax=ax, orientation="vertical", fraction=0.046, pad=0.04).ax
+
+        # 箭头/风旗位置固定，每个时间步只更新 U/V
+        s = (slice(None, None, q_step), slice(None, None, q_step))
+        zeros = np.zeros_like(self.lon2d[s], dtype=float)
+        if flag_mode == "arrow":
+            self.flags = ax.quiver(self.lon2d[s], self.lat2d[s], zeros, zeros,
+                                   color="black", scale=400, transform=ccrs.PlateCarree())
+        elif flag_mode == "barbs":
+            self.flags = ax.barbs(self.lon2d[s], self.lat2d[s], zeros, zeros,
+                                  length=5, transform=ccrs.PlateCarree())
+        else:
+            self.flags = None
+        if self.flags is not None:
+            # 箭头/风旗先于等速填充创建，提高层级使其绘制在填充和等值线之上
+            self.flags.set_zorder(2.5)
+
+        # 布局只计算一次（标题长度固定）
+        ax.set_title("10m Wind Field (0000-00-00 00:00)")
+        self.fig.subplots_adjust(left=0, right=1, top=0.95, bottom=0)
+        self.fig.tight_layout(pad=0.1)
+
+    def _remove_speed_artists(self):
+        """移除上一个时间步的等速填充和等值线（含标注）"""
+        if self.contour_lines is not None:
+            # ContourSet.remove 会一并移除 clabel 标注
+            self.contour_lines.remove()
+            self.contour_lines = None
+        if self.filled is not None:
+            self.filled.remove()
+            self.filled = None
+
+    def render(self, u, v, title, output_file):
+        """绘制一个时间步的风场并保存到 output_file"""
+        speed = np.sqrt(u ** 2 + v ** 2)
+        if _WIND_UPSAMPLE_FACTOR > 1:
+            # 双线性插值上采样
+            speed_plot = cv2.resize(
+                speed,
+                (self.shape[1] * _WIND_UPSAMPLE_FACTOR, self.shape[0] * _WIND_UPSAMPLE_FACTOR),
+                interpolation=cv2.INTER_LINEAR
+            )
+        else:
+            speed_plot = speed
+
+        try:
+            speed_min = float(np.nanmin(speed_plot))
+            speed_max = float(np.nanmax(speed_plot))
+        except Exception:
+            speed_min, speed_max = 0.0, 0.0
+        if speed_max <= speed_min:
+            speed_max = speed_min + 1.0
+        levels = np.linspace(speed_min, speed_max, 10)
+
+        self._remove_speed_artists()
+        ax = self.ax
+        self.filled = ax.contourf(self.lon2d_plot, self.lat2d_plot, speed_plot, levels=levels,
+                                  cmap=self.cmap, transform=ccrs.PlateCarree())
+        # 叠加细的等值线便于识别梯度
+        self.contour_lines = ax.contour(self.lon2d_plot, self.lat2d_plot, speed_plot, levels=levels,
+                                        colors="black", linewidths=0.4, alpha=0.5,
+                                        transform=ccrs.PlateCarree())
+        ax.clabel(self.contour_lines, inline=True, fontsize=7, fmt="%.1f")
+
+        if self.flags is not None:
+            s = (slice(None, None, self.q_step), slice(None, None, self.q_step))
+            self.flags.set_UVC(u[s], v[s])
+
+        self.cax.clear()
+        cbar = self.fig.colorbar(self.filled, cax=self.cax, orientation="vertical")
+        cbar.set_label("Wind speed (m/s)")
+
+        ax.set_title(title)
+        # 使用 bbox_inches='tight' 裁剪图片，只保留数据范围内的内容
+        self.fig.savefig(output_file, dpi=250, bbox_inches='tight', pad_inches=0.05,
+                         facecolor='white', edgecolor='none')
+
+
+# 风场渲染进程的状态（每个进程初始化一次）
+_WIND_RENDER_STATE = {}
+
+
+def _init_wind_render_process(data_nc_path, u_name, v_name, longitude, latitude, extent, q_step, flag_mode):
+    """风场渲染进程初始化：打开一次风场文件，并创建一个可复用的图形模板"""
+    matplotlib.use("Agg")
+    _close_wind_render_process()
+    ds = nc.Dataset(data_nc_path, 'r')
+    _WIND_RENDER_STATE.update({
+        'ds': ds,
+        'u': ds.variables[u_name],
+        'v': ds.variables[v_name],
+        'template': _WindFieldFigureTemplate(longitude, latitude, extent, q_step, flag_mode),
+    })
+
+
+def _close_wind_render_process():
+    """释放风场渲染进程持有的文件和图形"""
+    ds = _WIND_RENDER_STATE.get('ds')
+    if ds is not None:
+        try:
+            ds.close()
+        except Exception:
+            pass
+    template = _WIND_RENDER_STATE.get('template')
+    if template is not None:
+        plt.close(template.fig)
+    _WIND_RENDER_STATE.clear()
+
+
+def _render_wind_job(job):
+    """渲染单个时间步的风场图
+
+    参数:
+        job: (idx, title, output_file)
+
+    返回:
+        (idx, output_file, error, peak_mb)，成功时 error 为 None
+    """
+    idx, title, output_file = job
+    state = _WIND_RENDER_STATE
+    error = None
+    try:
+        # 只读取当前时间步
+        u = np.array(state['u'][idx])
+        v = np.array(state['v'][idx])
+        state['template'].render(u, v, title, output_file)
+    except Exception as e:
+        error = str(e)
+    return idx, output_file, error, _peak_rss_mb()
+
+
+def _make_wind_field_maps_worker(data_nc_path, output_dir, time_step_hours, log_queue, result_queue,
+                                 flag_mode="arrow", density=None):
+    """在子进程中生成风场图
+
+    只在主进程读取坐标和时间；各时间步分发到进程池，按时间步切片读取 u/v，
+    每个进程复用一个图形模板。结果为已保存图片路径列表。
+
+    参数:
+        flag_mode: "arrow"（箭头）、"barbs"（风旗）或 "none"
+        density: 箭头/风旗步长，None 表示按网格大小自动计算
+    """
+    try:
+        # 在子进程中加载当前语言设置
+        try:
+            from setting.config import load_config
+            from setting.language_manager import load_language
+            config = load_config()
+            load_language(config.get("LANGUAGE", "zh_CN"))
+        except Exception:
+            pass
+
+        def log(msg):
+            """发送日志到队列"""
+            try:
+                log_queue.put(msg)
+            except:
+                pass
+
+        start_time = time.perf_counter()
+        matplotlib.use("Agg")
+        try:
+            system = platform.system()
+            if system == 'Linux':
+                plt.rcParams['font.sans-serif'] = [
+                    'DejaVu Sans', 'Liberation Sans', 'Noto Sans', 'Arial', 'Droid Sans Fallback'
+                ]
+                plt.rcParams['axes.unicode_minus'] = False
+        except Exception:
+            pass
+
+        with nc.Dataset(data_nc_path, 'r') as ds:
+            lon_name = _pick_wind_var_name(ds, _WIND_LON_NAMES)
+            lat_name = _pick_wind_var_name(ds, _WIND_LAT_NAMES)
+            time_name = _pick_wind_var_name(ds, _WIND_TIME_NAMES)
+
+            if not lon_name or not lat_name or not time_name:
+                missing = []
+                if not lon_name:
+                    missing.append(tr("longitude", "经度"))
+                if not lat_name:
+                    missing.append(tr("latitude", "纬度"))
+                if not time_name:
+                    missing.append(tr("time", "时间"))
+                raise KeyError(tr("missing_variables", "缺少变量：{vars}").format(vars=', '.join(missing)))
+
+            u_name = _pick_wind_var_name(ds, _WIND_U_NAMES)
+            v_name = _pick_wind_var_name(ds, _WIND_V_NAMES)
+            if not u_name:
+                raise KeyError(tr("missing_eastward_wind", "缺少东向风变量（u10/wndewd/uwnd）"))
+            if not v_name:
+                raise KeyError(tr("missing_northward_wind", "缺少北向风变量（v10/wndnwd/vwnd）"))
+
+            longitude = np.array(ds.variables[lon_name][:])
+            latitude = np.array(ds.variables[lat_name][:])
+            time_var = ds.variables[time_name]
+            time_values = np.array(time_var[:])
+
+            times_dt = None
+            if time_values.size > 0:
+                try:
+                    units = getattr(time_var, "units", None)
+                    calendar = getattr(time_var, "calendar", "standard")
+                    if units:
+                        times_dt = num2date(time_values, units, calendar=calendar)
+                except Exception as e:
+                    log(tr("wind_time_parse_failed", "⚠️ 时间解析失败，改用索引：{error}").format(error=e))
+                    times_dt = None
+
+        if time_values.size == 0:
+            log(tr("wind_time_dimension_empty", "⚠️ 时间维度为空，无法生成风场图"))
+            result_queue.put([])
+            log_queue.put("__DONE__")
+            return
+
+        # 根据时间步长筛选时间步
+        indices = []
+        if times_dt is not None and len(times_dt) > 0:
+            last = None
+            for i, t in enumerate(times_dt):
+                if last is None or (t - last) >= timedelta(hours=time_step_hours) - timedelta(seconds=1):
+                    indices.append(i)
+                    last = t
+        else:
+            step_guess = 1
+            if len(time_values) > 1:
+                try:
+                    dt_seconds = float(time_values[1] - time_values[0])
+                    if dt_seconds > 0:
+                        step_guess = max(1, int(round((time_step_hours * 3600) / dt_seconds)))
+                except Exception:
+                    step_guess = 1
+            indices = list(range(0, len(time_values), step_guess))
+        if not indices:
+            indices = [0]
+
+        # 清空旧文件，再创建目录
+        try:
+            if os.path.exists(output_dir):
+                for f in glob.glob(os.path.join(output_dir, "*")):
+                    try:
+                        os.remove(f)
+                    except Exception:
+                        pass
+            os.makedirs(output_dir, exist_ok=True)
+        except Exception as e:
+            log(tr("wind_clean_output_dir_failed", "❌ 清理输出目录失败: {error}").format(error=e))
+            result_queue.put([])
+            log_queue.put("__DONE__")
+            return
+
+        # 不添加边距，只显示数据范围
+        extent = [float(np.min(longitude)), float(np.max(longitude)),
+                  float(np.min(latitude)), float(np.max(latitude))]
+        q_step = _wind_quiver_step(longitude, latitude, density)
+
+        jobs = []
+        for idx in indices:
+            if times_dt is not None and len(times_dt) > idx:
+                ts_label = times_dt[idx].strftime("%Y%m%d_%H%M%S")
+                title_time = times_dt[idx].strftime("%Y-%m-%d %H:%M")
+            else:
+                ts_label = f"idx{idx:03d}"
+                title_time = f"Index {idx}"
+            jobs.append((idx, f"10m Wind Field ({title_time})", os.path.join(output_dir, f"wind_{ts_label}.png")))
+
+        init_args = (data_nc_path, u_name, v_name, longitude, latitude, extent, q_step, flag_mode)
+        total_count = len(jobs)
+        n_workers = max(1, min((os.cpu_count() or 1) - 1, total_count))
+        saved_paths = []
+        current_count = 0
+        peak_mb = _peak_rss_mb()
+
+        executor = None
+        if n_workers > 1:
+            try:
+                executor = ProcessPoolExecutor(max_workers=n_workers,
+                                               initializer=_init_wind_render_process,
+                                               initargs=init_args)
+            except Exception as e:
+                log(tr("plotting_wind_pool_fallback", "⚠️ 无法启动风场图进程池，改为单进程绘制：{error}").format(error=e))
+                executor = None
+
+        def consume(results):
+            """按任务顺序汇报结果；峰值内存取各进程峰值的最大值"""
+            nonlocal current_count, peak_mb
+            for idx, out_path, error, job_peak_mb in results:
+                current_count += 1
+                if job_peak_mb is not None:
+                    peak_mb = max(peak_mb or 0.0, job_peak_mb)
+                if error is not None:
+                    log(tr("plotting_generate_timestep_failed", "❌ 生成时间步 {timestep} 失败：{error}").format(timestep=idx+1, error=error))
+                    continue
+                saved_paths.append(out_path)
+                if current_count % 10 == 0 or current_count == total_count:
+                    log(tr("plotting_wind_progress", "📊 风场图进度：{current}/{total}").format(current=current_count, total=total_count))
+
+        try:
+            if executor is not None:
+                try:
+                    # map 按提交顺序返回结果，保证进度有序
+                    consume(executor.map(_render_wind_job, jobs))
+                except BrokenProcessPool as e:
+                    # 渲染进程异常退出（例如内存不足被终止）：剩余任务改为单进程绘制
+                    log(tr("plotting_wind_pool_broken", "⚠️ 风场图渲染进程异常退出，剩余 {count} 张改为单进程绘制：{error}").format(count=total_count - current_count, error=e))
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = None
+            else:
+                n_workers = 1
+            if executor is None:
+                _init_wind_render_process(*init_args)
+                consume(map(_render_wind_job, jobs[current_count:]))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+            else:
+                _close_wind_render_process()
+
+        elapsed = time.perf_counter() - start_time
+        memory_text = f"{peak_mb:.0f} MB" if peak_mb is not None else "N/A"
+        log(tr("plotting_wind_run_stats", "⏱️ 风场绘图耗时 {elapsed:.1f} 秒，各进程峰值内存的最大值 {memory}（{workers} 个进程）").format(elapsed=elapsed, memory=memory_text, workers=n_workers))
+
+        result_queue.put(saved_paths)
+        log_queue.put("__DONE__")
+
+    except Exception as e:
+        import traceback
+        log_queue.put(tr("wind_generation_failed", "❌ 生成风场图失败: {error}").format(error=e))
+        log_queue.put(traceback.format_exc())
+        result_queue.put([])
+        log_queue.put("__DONE__")
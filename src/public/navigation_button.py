@@ -631,6 +631,11 @@ class NavigationMixin:
                 wave_files = glob.glob(os.path.join(self.selected_folder, "ww3*.nc"))
                 # 排除 spec 文件
                 wave_files = [f for f in wave_files if "spec" not in os.path.basename(f).lower()]
+                # 已选择的波高文件（如下载的子集文件）仍在当前工作目录下时优先显示
+                selected = getattr(self, 'selected_wave_height_file', None)
+                if selected and os.path.exists(selected) and os.path.abspath(selected).startswith(
+                        os.path.abspath(self.selected_folder) + os.sep):
+                    wave_files = [selected] + [f for f in wave_files if f != selected]
                 if wave_files:
                     file_name = os.path.basename(wave_files[0])
                     if len(file_name) > 30:
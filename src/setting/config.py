@@ -175,6 +175,30 @@ DEFAULT_CONFIG = {
 
     # 服务器工作目录路径（用于存储和运行 WW3 作业）
     "SERVER_PATH": "/public/home/weiyl001/workSpace/",
+
+    # 上传/下载时并行的 SFTP 通道数
+    "SFTP_CHANNELS": "4",
+
+    # 大小和修改时间一致时是否再用 sha256 校验，决定能否跳过传输
+    "SFTP_VERIFY_CHECKSUM": False,
+
+    # 增量同步时是否删除本地已删除、之前上传过的远程文件
+    "SYNC_DELETE_STALE": False,
+
+    # 生成的运行脚本中多个强迫场的 ww3_prnc 是否并行执行
+    "PRNC_PARALLEL": True,
+
+    # 嵌套网格预处理（ww3_grid / ww3_prnc / ww3_strt）最多同时执行的步骤数
+    "PREPROCESS_MAX_JOBS": "4",
+
+    # 嵌套网格生成后是否协调内外网格的陆海掩膜（reconcile_masks）
+    "NESTED_RECONCILE_MASKS": True,
+
+    # 无精确缓存时，是否复用同分辨率、范围重叠的缓存网格，仅计算新增区域（增量生成）
+    "GRID_INCREMENTAL": True,
+
+    # Python 版 gridgen 只写出二进制网格包（grid.grid），WW3 文本网格文件在后台写出
+    "GRID_TEXT_BACKGROUND": True,
     
 
     # ---------- 绘图参数配置 ----------
@@ -57,6 +57,7 @@ QButtonGroup = QtWidgets.QButtonGroup
 QSpinBox = QtWidgets.QSpinBox
 from setting.config import *
 from plot.workers import _match_ww3_jason3_worker, _run_jason3_swh_worker, _make_wave_maps_worker
+from plot.jason3_data import Jason3Catalog, query_jason3_files
 from setting.language_manager import tr
 
 class Jason3Mixin:
@@ -371,16 +372,7 @@ class Jason3Mixin:
 
         def _has_local_files():
             """检查是否有文件在时间范围内（不检查是否所有天数都被覆盖）"""
-            nc_files = [f for f in os.listdir(local_folder) if f.startswith("JA3_GPN_") and f.endswith(".nc")]
-            for f in nc_files:
-                m = re.search(time_pattern, f)
-                if not m:
-                    continue
-                t1 = datetime.strptime(m.group(1), "%Y%m%d_%H%M%S")
-                t2 = datetime.strptime(m.group(2), "%Y%m%d_%H%M%S")
-                if t2 >= start_dt and t1 <= end_dt:
-                    return True
-            return False
+            return any(name.startswith("JA3_GPN_") for name, _, _ in query_jason3_files(local_folder, start_dt, end_dt))
 
         # 检查是否有缺失的天数
         def _check_missing_days():
@@ -390,21 +382,9 @@ class Jason3Mixin:
                 # 如果文件夹不存在，返回所有天数
                 return [start_dt.date() + timedelta(days=i) for i in range((end_dt.date() - start_dt.date()).days + 1)]
             
-            local_nc_files = [f for f in os.listdir(local_folder) if (f.startswith("JA3_GPN_") or f.startswith("JA3_IPN_")) and f.endswith(".nc")]
-            local_file_ranges = []
-            
-            for filename in local_nc_files:
-                # 匹配GDR和IGDR格式（两者格式相同）
-                m = re.search(time_pattern, filename)
-                if m:
-                    try:
-                        file_start = datetime.strptime(m.group(1), "%Y%m%d_%H%M%S")
-                        file_end = datetime.strptime(m.group(2), "%Y%m%d_%H%M%S")
-                        # 检查是否在目标时间范围内（有重叠即可）
-                        if file_end >= start_dt and file_start <= end_dt:
-                            local_file_ranges.append((file_start, file_end))
-                    except ValueError:
-                        continue
+            # 通过目录索引查询与目标时间范围重叠的文件（有重叠即可）
+            local_file_ranges = [(file_start, file_end) for _, file_start, file_end in
+                                 query_jason3_files(local_folder, start_dt, end_dt)]
             
             missing_days = []
             current_date = start_dt.date()
@@ -477,6 +457,13 @@ class Jason3Mixin:
             self.log_signal.emit("🔄 等待文件写入完成...")
             time.sleep(3)  # 等待3秒确保文件完全写入
             
+            # 下载可能覆盖同名文件，强制重新检查索引中每个文件的大小和修改时间
+            try:
+                with Jason3Catalog(local_folder) as catalog:
+                    catalog.refresh(force=True)
+            except Exception:
+                pass
+
             # 再次检查缺失天数
             remaining_missing = _check_missing_days()
             if not remaining_missing:
@@ -486,7 +473,7 @@ class Jason3Mixin:
                 download_result[0] = False
                 # 列出本地文件以便调试
                 if os.path.isdir(local_folder):
-                    local_files = [f for f in os.listdir(local_folder) if (f.startswith("JA3_GPN_") or f.startswith("JA3_IPN_")) and f.endswith(".nc")]
+                    local_files = [name for name, _, _ in query_jason3_files(local_folder)]
                     self.log_signal.emit(f"⚠️ 仍有 {len(remaining_missing)} 个缺失天数：{', '.join([d.strftime('%Y%m%d') for d in remaining_missing])}")
                     if local_files:
                         self.log_signal.emit(f"   本地文件数量：{len(local_files)}")
@@ -556,7 +543,7 @@ class Jason3Mixin:
             self.log_signal.emit(f"🔄 本地未找到指定时间范围的 Jason-3 文件，尝试从服务器下载：{remote_dir}")
 
             try:
-                sftp = self.ssh.open_sftp()
+                sftp = self.ssh_manager.open_sftp()
             except Exception as e:
                 self.log_signal.emit(f"❌ 无法打开服务器 SFTP 连接，下载 Jason-3 数据失败：{e}")
                 sftp = None
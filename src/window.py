@@ -98,8 +98,6 @@ class MainWindow(FluentWindow, Style, Log, FileOpsMixin, HomeStepOneCard, HomeSt
     update_queue_table_signal = QtCore.Signal(list, str)  # 用于更新任务队列表格 (task_lines, time_cn)
     show_image_signal = QtCore.Signal(str, str)  # 用于显示图片 (image_path, window_title)
     show_fit_image_signal = QtCore.Signal(str, str)  # 用于在Qt窗口中显示拟合图 (image_path, window_title)
-    add_image_to_drawer_signal = QtCore.Signal(str, int, int)  # 用于在抽屉中添加图片 (image_path, width, height)
-    images_loading_complete_signal = QtCore.Signal()  # 图片加载完成信号
     show_info_bar_signal = QtCore.Signal(str, str, str)  # 用于显示 InfoBar (type, title, content)
 
 
@@ -171,8 +169,6 @@ class MainWindow(FluentWindow, Style, Log, FileOpsMixin, HomeStepOneCard, HomeSt
 
         # 连接信号到槽函数 - 使用 QueuedConnection 确保跨线程安全
         self.log_signal.connect(self.log, Qt.ConnectionType.QueuedConnection)
-        self.add_image_to_drawer_signal.connect(self._add_single_image_to_drawer, Qt.ConnectionType.QueuedConnection)
-        self.images_loading_complete_signal.connect(self._on_images_loading_complete, Qt.ConnectionType.QueuedConnection)
         self.show_info_bar_signal.connect(self._show_info_bar, Qt.ConnectionType.QueuedConnection)
 
         # 监听系统主题变化（延迟设置，确保 log 方法可用）